@@ -5,9 +5,94 @@ Módulo principal que inicia a demonstração de Cadastro e Login de Usuários.
 Permite ao usuário escolher com qual interface gráfica iniciar.
 """
 
+import argparse
 import os
+import sys
 
 
+# Opções de linha de comando do iniciador
+parser = argparse.ArgumentParser(description="Demo de 'Cadastro e Login de Usuários'.")
+parser.add_argument(
+    "--metricas",
+    metavar="ARQUIVO",
+    help="Exporta as métricas da autenticação para um arquivo de texto do Prometheus."
+)
+parser.add_argument(
+    "--rastrear-sql",
+    metavar="ARQUIVO",
+    nargs="?",
+    const="1",
+    help="Rastreia as instruções SQL e grava um relatório ao sair (na saída de erros, se omitido)."
+)
+parser.add_argument(
+    "--vigiar-laco",
+    metavar="MS",
+    nargs="?",
+    const="200",
+    help="Registra no log os travamentos do laço de eventos acima de MS milissegundos (padrão: 200)."
+)
+parser.add_argument(
+    "--perfilar",
+    metavar="ARQUIVO",
+    help="Amostra as pilhas de execução e grava um arquivo 'collapsed' para gráficos de chama."
+)
+parser.add_argument(
+    "--perfilar-hz",
+    metavar="HZ",
+    help="Frequência de amostragem do perfilador (padrão: 100)."
+)
+parser.add_argument(
+    "--memoria",
+    action="store_true",
+    help="Registra no log o crescimento de memória e de widgets a cada ação das interfaces."
+)
+parser.add_argument(
+    "--auditar-widgets",
+    action="store_true",
+    help="Avisa no log quando a árvore de widgets do Tkinter cresce a cada troca de tela."
+)
+parser.add_argument(
+    "--daemon",
+    metavar="SOCKET",
+    help="Usa o daemon de autenticação escutando no socket Unix informado."
+)
+parser.add_argument(
+    "--db",
+    metavar="CAMINHO",
+    help="Caminho do banco de dados, ':memory:' ou uma URI 'file:' (padrão: 'usuarios.db')."
+)
+parser.add_argument(
+    "--backup",
+    metavar="DIRETORIO",
+    help="Faz cópias de segurança periódicas do banco de dados no diretório informado."
+)
+argumentos = parser.parse_args()
+
+# Repassa as opções para os módulos da aplicação por meio de variáveis de ambiente
+if argumentos.metricas:
+    os.environ["CADASTRO_LOGIN_METRICAS"] = argumentos.metricas
+if argumentos.rastrear_sql:
+    os.environ["CADASTRO_LOGIN_RASTREAR_SQL"] = argumentos.rastrear_sql
+if argumentos.vigiar_laco:
+    os.environ["CADASTRO_LOGIN_VIGIA_LACO"] = argumentos.vigiar_laco
+if argumentos.daemon:
+    os.environ["CADASTRO_LOGIN_DAEMON"] = argumentos.daemon
+if argumentos.db:
+    os.environ["CADASTRO_LOGIN_DB"] = argumentos.db
+if argumentos.backup:
+    os.environ["CADASTRO_LOGIN_BACKUP"] = argumentos.backup
+if argumentos.memoria:
+    os.environ["CADASTRO_LOGIN_MEMORIA"] = "1"
+if argumentos.auditar_widgets:
+    os.environ["CADASTRO_LOGIN_AUDITAR_WIDGETS"] = "1"
+if argumentos.perfilar:
+    os.environ["CADASTRO_LOGIN_PERFILADOR"] = argumentos.perfilar
+if argumentos.perfilar_hz:
+    os.environ["CADASTRO_LOGIN_PERFILADOR_HZ"] = argumentos.perfilar_hz
+
+# Remove as opções do iniciador para não confundir os frameworks das interfaces
+sys.argv = sys.argv[:1]
+
 print("Bem-vindo à demo de 'Cadastro e Login de Usuários' (Digite: tk=Tkinter, kv=Kivy, qt=PySide6)")
 print("E-mail do autor: luizrdererita@gmail.com\n-")
 
@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+"""
+Último login e contagem de logins de cada usuário, gravados em lotes.
+
+Gravar o acesso a cada login transformaria toda leitura ('fazer_login') em
+uma escrita, com um commit por login. O acumulador guarda na memória do
+processo, por usuário, o instante do login mais recente e a quantidade de
+logins ainda não gravados, e os grava periodicamente em uma única transação
+('registrar_acessos', um 'executemany' com UPSERT): N logins do mesmo usuário
+entre duas gravações viram uma única linha.
+
+A gravação roda em uma thread com conexão própria; sem uma conexão própria
+(armazenamento em memória ou réplica em memória), ela é feita no próprio
+login quando o intervalo tiver passado. Ao encerrar, os acessos pendentes são
+gravados. As consultas ('obter') somam os valores gravados aos pendentes.
+"""
+
+import atexit
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from registros import Acesso
+
+
+logger = logging.getLogger(__name__)
+
+
+class AcumuladorAcessos:
+    """
+    Classe que acumula os logins na memória e os grava em lotes.
+
+    Attributes:
+        armazenamento (Armazenamento): O armazenamento dos acessos, usado nas consultas.
+        intervalo (float): O intervalo entre as gravações, em segundos.
+        registrados (int): A quantidade de logins registrados.
+        gravados (int): A quantidade de linhas gravadas (uma por usuário e gravação).
+        gravacoes (int): A quantidade de transações de gravação.
+    """
+
+    def __init__(self, armazenamento, intervalo=5.0, relogio=time.time):
+        """
+        Inicializa o acumulador sem iniciar a thread gravadora.
+
+        Args:
+            armazenamento (Armazenamento): O armazenamento dos acessos.
+            intervalo (float): O intervalo entre as gravações, em segundos.
+            relogio (callable): Retorna o instante atual, em segundos.
+
+        Returns:
+            None
+        """
+        self.armazenamento = armazenamento
+        self.intervalo = intervalo
+        self.relogio = relogio
+
+        self.registrados = 0
+        self.gravados = 0
+        self.gravacoes = 0
+
+        # Acessos pendentes: id do usuário -> [último login, quantidade de logins]
+        self._pendentes = {}
+        self._trava = threading.Lock()
+        # Segura uma gravação inteira, para que uma consulta não veja os
+        # pendentes já retirados da memória e ainda não confirmados
+        self._trava_gravacao = threading.Lock()
+        self._gravado_em = relogio()
+
+        self._thread = None
+        self._parar = threading.Event()
+
+    def registrar(self, id_usuario, instante=None):
+        """
+        Registra um login bem-sucedido, somente na memória.
+
+        Args:
+            id_usuario (int): O id do usuário.
+            instante (float): O instante do login (padrão: o relógio do acumulador).
+
+        Returns:
+            None
+        """
+        instante = self.relogio() if instante is None else instante
+
+        with self._trava:
+            self._acumular(id_usuario, instante, 1)
+            self.registrados += 1
+
+        # Sem a thread gravadora, o login que encontra o intervalo vencido grava os pendentes
+        if self._thread is None and instante - self._gravado_em >= self.intervalo:
+            try:
+                self.gravar()
+            except sqlite3.Error as erro:
+                logger.warning("Falha ao gravar os acessos: %s", erro)
+
+    def obter(self, id_usuario):
+        """
+        Obtém o último login e a contagem de logins de um usuário, incluindo os ainda não gravados.
+
+        Args:
+            id_usuario (int): O id do usuário.
+
+        Returns:
+            Acesso / None: O registro ou None se o usuário nunca fez login.
+        """
+        with self._trava_gravacao:
+            acesso = self.armazenamento.obter_acesso(id_usuario)
+            with self._trava:
+                pendente = self._pendentes.get(id_usuario)
+                pendente = tuple(pendente) if pendente is not None else None
+
+        if pendente is None:
+            return acesso
+        if acesso is None:
+            return Acesso(id_usuario, *pendente)
+
+        return Acesso(id_usuario, max(acesso.ultimo_login_em, pendente[0]), acesso.logins + pendente[1])
+
+    def pendentes(self):
+        """
+        Conta os usuários com acessos ainda não gravados.
+
+        Returns:
+            int: A quantidade de usuários.
+        """
+        with self._trava:
+            return len(self._pendentes)
+
+    def gravar(self, armazenamento=None):
+        """
+        Grava os acessos pendentes em uma única transação.
+
+        Se a gravação falhar, os acessos voltam para a memória e são gravados
+        na próxima.
+
+        Args:
+            armazenamento (Armazenamento): O armazenamento usado na gravação
+                (padrão: o do acumulador).
+
+        Returns:
+            int: A quantidade de usuários gravados.
+
+        Raises:
+            sqlite3.Error: Erro lançado se a gravação falhar.
+        """
+        armazenamento = self.armazenamento if armazenamento is None else armazenamento
+
+        with self._trava_gravacao:
+            with self._trava:
+                pendentes, self._pendentes = self._pendentes, {}
+            self._gravado_em = self.relogio()
+
+            if not pendentes:
+                return 0
+
+            try:
+                armazenamento.registrar_acessos([
+                    (id_usuario, ultimo_login_em, logins)
+                    for id_usuario, (ultimo_login_em, logins) in pendentes.items()
+                ])
+            except Exception:
+                with self._trava:
+                    for id_usuario, (ultimo_login_em, logins) in pendentes.items():
+                        self._acumular(id_usuario, ultimo_login_em, logins)
+                raise
+
+        self.gravados += len(pendentes)
+        self.gravacoes += 1
+
+        return len(pendentes)
+
+    def iniciar(self, fabrica):
+        """
+        Inicia a thread que grava os acessos pendentes a cada intervalo.
+
+        Args:
+            fabrica (callable): Cria, na thread gravadora, o armazenamento com a
+                conexão própria da thread (ver 'Armazenamento.fabrica_conexao').
+
+        Returns:
+            None
+        """
+        if self._thread is not None:
+            return
+
+        self._parar.clear()
+        self._thread = threading.Thread(
+            target=self._executar, args=(fabrica,), name="gravacao-acessos", daemon=True
+        )
+        self._thread.start()
+
+    def fechar(self):
+        """
+        Grava os acessos pendentes e encerra a thread gravadora, se houver.
+
+        Returns:
+            None
+        """
+        if self._thread is not None:
+            self._parar.set()
+            self._thread.join()
+            self._thread = None
+            return
+
+        try:
+            self.gravar()
+        except sqlite3.Error as erro:
+            logger.error("Falha ao gravar os acessos de %d usuários ao encerrar: %s", self.pendentes(), erro)
+
+    def _acumular(self, id_usuario, ultimo_login_em, logins):
+        """
+        Soma logins aos pendentes de um usuário (chamado com a trava adquirida).
+
+        Args:
+            id_usuario (int): O id do usuário.
+            ultimo_login_em (float): O instante do login mais recente.
+            logins (int): A quantidade de logins.
+
+        Returns:
+            None
+        """
+        pendente = self._pendentes.get(id_usuario)
+        if pendente is None:
+            self._pendentes[id_usuario] = [ultimo_login_em, logins]
+        else:
+            if ultimo_login_em > pendente[0]:
+                pendente[0] = ultimo_login_em
+            pendente[1] += logins
+
+    def _executar(self, fabrica):
+        """
+        Laço da thread gravadora: grava os pendentes a cada intervalo e ao encerrar.
+
+        Args:
+            fabrica (callable): Cria o armazenamento da thread.
+
+        Returns:
+            None
+        """
+        armazenamento = fabrica()
+        try:
+            while not self._parar.wait(self.intervalo):
+                try:
+                    self.gravar(armazenamento)
+                except sqlite3.Error as erro:
+                    # Ex.: o banco travado por outra escrita; os acessos ficam para o próximo ciclo
+                    logger.warning("Falha ao gravar os acessos: %s", erro)
+            try:
+                self.gravar(armazenamento)
+            except sqlite3.Error as erro:
+                logger.error("Falha ao gravar os acessos de %d usuários ao encerrar: %s", self.pendentes(), erro)
+        finally:
+            armazenamento.fechar_conexao()
+
+
+def criar_acumulador(armazenamento):
+    """
+    Cria o acumulador de acessos de um armazenamento conforme as variáveis de ambiente.
+
+    'CADASTRO_LOGIN_ACESSOS_INTERVALO' define o intervalo entre as gravações
+    em segundos (padrão: 5; 0 desativa o registro dos acessos). A thread
+    gravadora só é iniciada se o armazenamento puder ser aberto novamente em
+    outra conexão ('fabrica_conexao'). Os pendentes são gravados ao encerrar o
+    processo. Um armazenamento somente leitura não registra os acessos.
+
+    Args:
+        armazenamento (Armazenamento): O armazenamento dos acessos.
+
+    Returns:
+        AcumuladorAcessos / None: O acumulador ou None se o registro estiver
+            desativado ou o armazenamento for somente leitura.
+    """
+    intervalo = float(os.environ.get("CADASTRO_LOGIN_ACESSOS_INTERVALO", "5"))
+    if intervalo <= 0 or armazenamento.somente_leitura:
+        return None
+
+    acumulador = AcumuladorAcessos(armazenamento, intervalo)
+
+    fabrica = armazenamento.fabrica_conexao()
+    if fabrica is not None:
+        acumulador.iniciar(fabrica)
+    atexit.register(acumulador.fechar)
+
+    return acumulador
@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""
+Invalidação dos caches do processo quando outro processo altera o Banco de Dados.
+
+Várias interfaces (ou o daemon e uma interface) podem usar o mesmo arquivo.
+Os caches de cada processo, como as sugestões de usuários relembrados do
+QCompleter, não enxergam as escritas dos outros. O vigia consulta
+periodicamente a versão dos dados do armazenamento ('PRAGMA data_version',
+que só muda com commits de outras conexões) e chama as funções de
+invalidação registradas somente quando ela mudou. A consulta não lê
+nenhuma tabela, então o custo de cada verificação é de poucos microssegundos.
+
+A verificação usa a conexão do próprio armazenamento, portanto precisa rodar
+na thread dona dela: o QTimer na interface Qt e a thread do banco no daemon.
+"""
+
+import logging
+import os
+import sqlite3
+
+
+logger = logging.getLogger(__name__)
+
+
+class VigiaAlteracoes:
+    """
+    Classe que detecta escritas de outras conexões e invalida os caches registrados.
+
+    Attributes:
+        banco_de_dados (Armazenamento): O armazenamento vigiado.
+        intervalo (float): O intervalo entre as verificações, em segundos.
+        verificacoes (int): A quantidade de verificações feitas.
+        invalidacoes (int): A quantidade de alterações detectadas.
+    """
+
+    def __init__(self, banco_de_dados, intervalo=1.0, agendar=None):
+        """
+        Inicializa o vigia sem iniciá-lo.
+
+        Args:
+            banco_de_dados (Armazenamento): O armazenamento vigiado.
+            intervalo (float): O intervalo entre as verificações, em segundos.
+            agendar (callable): Função 'agendar(segundos, funcao)' que executa
+                'funcao' uma vez no laço de eventos após o intervalo. Sem ela,
+                quem criou o vigia chama 'verificar' periodicamente.
+
+        Returns:
+            None
+        """
+        self.banco_de_dados = banco_de_dados
+        self.intervalo = intervalo
+        self.agendar = agendar
+        self.verificacoes = 0
+        self.invalidacoes = 0
+
+        self._invalidadores = []
+        self._versao = None
+        self._ativo = False
+
+    def registrar(self, invalidar):
+        """
+        Registra uma função chamada (sem argumentos) a cada alteração detectada.
+
+        As funções são chamadas na ordem de registro.
+
+        Args:
+            invalidar (callable): A função que descarta ou recarrega um cache.
+
+        Returns:
+            callable: A própria função, para uso como decorador.
+        """
+        self._invalidadores.append(invalidar)
+        return invalidar
+
+    def remover(self, invalidar):
+        """
+        Remove uma função de invalidação registrada.
+
+        Args:
+            invalidar (callable): A função registrada.
+
+        Returns:
+            None
+        """
+        if invalidar in self._invalidadores:
+            self._invalidadores.remove(invalidar)
+
+    def iniciar(self):
+        """
+        Lê a versão atual dos dados e agenda a primeira verificação.
+
+        Deve ser chamado a partir da thread dona da conexão do armazenamento.
+
+        Returns:
+            None
+        """
+        self._versao = self.banco_de_dados.versao_dados()
+        self._ativo = True
+        if self.agendar is not None:
+            self.agendar(self.intervalo, self._ciclo)
+
+    def parar(self):
+        """
+        Interrompe as verificações agendadas.
+
+        Returns:
+            None
+        """
+        self._ativo = False
+
+    def verificar(self):
+        """
+        Compara a versão dos dados com a última lida e invalida os caches se ela mudou.
+
+        Returns:
+            bool: True se outra conexão alterou os dados desde a última verificação.
+        """
+        self.verificacoes += 1
+        versao = self.banco_de_dados.versao_dados()
+        if versao == self._versao:
+            return False
+
+        self._versao = versao
+        self.invalidacoes += 1
+        for invalidar in list(self._invalidadores):
+            try:
+                invalidar()
+            except Exception:
+                logger.exception("Falha ao invalidar um cache após uma alteração do banco de dados")
+
+        return True
+
+    def _ciclo(self):
+        """
+        Verifica a versão dos dados e agenda a próxima verificação.
+
+        Returns:
+            None
+        """
+        if not self._ativo:
+            return
+
+        try:
+            self.verificar()
+        except sqlite3.Error as erro:
+            # Ex.: o arquivo travado por uma escrita longa; tenta de novo no próximo ciclo
+            logger.warning("Falha ao verificar alterações do banco de dados: %s", erro)
+
+        self.agendar(self.intervalo, self._ciclo)
+
+
+def intervalo_configurado():
+    """
+    Obtém o intervalo das verificações da variável de ambiente 'CADASTRO_LOGIN_ALTERACOES_INTERVALO'.
+
+    Returns:
+        float / None: O intervalo em segundos (padrão: 1) ou None se as verificações
+            estiverem desabilitadas (valor 0).
+    """
+    intervalo = float(os.environ.get("CADASTRO_LOGIN_ALTERACOES_INTERVALO", "1"))
+    return intervalo if intervalo > 0 else None
+
+
+def criar_vigia(banco_de_dados, agendar=None):
+    """
+    Cria o vigia de um armazenamento, se ele puder ser alterado por outros processos.
+
+    Com a réplica em memória, a recarga da réplica é a primeira invalidação
+    registrada, para que os demais caches sejam recarregados a partir dela.
+
+    Args:
+        banco_de_dados (Armazenamento / ClienteAutenticacao): O objeto usado pelas interfaces.
+        agendar (callable): Função 'agendar(segundos, funcao)' do laço de eventos.
+
+    Returns:
+        VigiaAlteracoes / None: O vigia (não iniciado) ou None se as verificações
+            estiverem desabilitadas ou não fizerem sentido (armazenamento em
+            memória ou cliente do daemon, cujo cache é vigiado pelo próprio daemon).
+    """
+    intervalo = intervalo_configurado()
+    versao_dados = getattr(banco_de_dados, "versao_dados", None)
+    if intervalo is None or versao_dados is None or versao_dados() is None:
+        return None
+
+    vigia = VigiaAlteracoes(banco_de_dados, intervalo, agendar)
+    if getattr(banco_de_dados, "disco", None) is not None:
+        vigia.registrar(banco_de_dados.carregar_replica)
+
+    return vigia
+
+
+def vigiar_qt(banco_de_dados):
+    """
+    Cria um vigia agendado pelo laço de eventos do PySide6.
+
+    Args:
+        banco_de_dados (Armazenamento / ClienteAutenticacao): O objeto usado pela interface.
+
+    Returns:
+        VigiaAlteracoes / None: O vigia (não iniciado) ou None.
+    """
+    from PySide6.QtCore import QTimer
+
+    return criar_vigia(banco_de_dados, lambda segundos, funcao: QTimer.singleShot(int(segundos * 1000), funcao))
+
@@ -0,0 +1,545 @@
+# -*- coding: utf-8 -*-
+"""
+Interface comum dos armazenamentos de usuários, usuários relembrados e sessões.
+
+Um armazenamento implementa as operações primitivas (inserir, buscar, paginar,
+remover). As regras de negócio usadas pelas interfaces e pelo daemon (cadastro,
+login e "lembrar de mim") são implementadas aqui, sobre essas primitivas, e
+valem para qualquer armazenamento: o 'BancoDeDados' (SQLite) e o
+'ArmazenamentoMemoria' (dicionários).
+"""
+
+import abc
+import time
+from concurrent.futures import Future
+
+import bcrypt
+
+import auditoria
+import metricas
+
+
+# Interfaces gráficas com listas de usuários relembrados
+UIS = ("tk", "qt", "kv")
+
+# Colunas que podem ser pedidas nas páginas de usuários relembrados
+COLUNAS_PAGINA = ("id_usuario", "nome_usuario", "email", "senha")
+
+
+class ErroChaveDuplicada(ValueError):
+    """
+    Erro lançado quando um valor único (nome de usuário, e-mail ou token) já existe.
+
+    Attributes:
+        motivo (str): Um código curto que identifica o valor repetido
+            ('nome_usuario_em_uso', 'email_em_uso' ou 'sessao_em_uso').
+    """
+
+    def __init__(self, mensagem, motivo):
+        """
+        Inicializa o erro.
+
+        Args:
+            mensagem (str): A mensagem exibida para o usuário.
+            motivo (str): Um código curto que identifica o valor repetido.
+
+        Returns:
+            None
+        """
+        super().__init__(mensagem)
+        self.motivo = motivo
+
+
+def validar_ui(ui):
+    """
+    Verifica se uma interface gráfica possui lista de usuários relembrados.
+
+    Args:
+        ui (str): A interface gráfica.
+
+    Raises:
+        ValueError: Erro lançado se a interface for desconhecida.
+    """
+    if ui not in UIS:
+        raise ValueError(f"Interface inválida: {ui!r}")
+
+
+def validar_colunas(colunas):
+    """
+    Verifica as colunas pedidas em uma página de usuários relembrados.
+
+    Args:
+        colunas (tuple): As colunas pedidas.
+
+    Raises:
+        ValueError: Erro lançado se alguma coluna for desconhecida.
+    """
+    invalidas = set(colunas) - set(COLUNAS_PAGINA)
+    if invalidas:
+        raise ValueError(f"Colunas inválidas: {', '.join(sorted(invalidas))}")
+
+
+def _executar_em_futuro(funcao, *args):
+    """
+    Executa uma função imediatamente e entrega o resultado em um futuro já resolvido.
+
+    Args:
+        funcao (callable): A função executada.
+        *args: Os argumentos da função.
+
+    Returns:
+        concurrent.futures.Future: O futuro com o retorno ou o erro da função.
+    """
+    futuro = Future()
+    try:
+        futuro.set_result(funcao(*args))
+    except Exception as erro:
+        futuro.set_exception(erro)
+    return futuro
+
+
+class Armazenamento(abc.ABC):
+    """
+    Classe base dos armazenamentos.
+
+    As subclasses implementam os métodos abstratos (as operações primitivas);
+    uma subclasse incompleta falha ao ser instanciada. Os demais métodos são
+    as regras de negócio compartilhadas.
+
+    Attributes:
+        remoto (bool): Indica se a instância é um cliente do daemon de autenticação.
+        somente_leitura (bool): Indica se o armazenamento não aceita escritas.
+        sessoes (GerenciadorSessoes): Abre uma sessão a cada login bem-sucedido
+            (None não registra sessões).
+        acessos (AcumuladorAcessos): Acumula o último login e a contagem de logins
+            de cada usuário (None não os registra).
+    """
+
+    remoto = False
+    somente_leitura = False
+    sessoes = None
+    acessos = None
+
+    # Usuários
+
+    @abc.abstractmethod
+    def inserir_usuario(self, nome_usuario, email, senha):
+        """
+        Insere um usuário, de forma durável.
+
+        Args:
+            nome_usuario (str): O nome de usuário.
+            email (str): O email.
+            senha (bytes): A senha criptografada.
+
+        Returns:
+            int: O id do novo usuário.
+
+        Raises:
+            ErroChaveDuplicada: Erro lançado se o nome de usuário ou o email já existir.
+        """
+
+    @abc.abstractmethod
+    def obter_usuario(self, nome_usuario_email):
+        """
+        Obtém os dados de um usuário pelo nome de usuário ou email.
+
+        Args:
+            nome_usuario_email (str): O nome de usuário ou email do usuário.
+
+        Returns:
+            Usuario / None: Os dados do usuário ou None.
+        """
+
+    @abc.abstractmethod
+    def consultar_existentes(self, nomes_usuario, emails, tamanho_bloco=400):
+        """
+        Obtém quais nomes de usuário e e-mails já estão cadastrados.
+
+        Args:
+            nomes_usuario (list): Os nomes de usuário a serem consultados.
+            emails (list): Os e-mails a serem consultados.
+            tamanho_bloco (int): Quantos valores são consultados de cada vez.
+
+        Returns:
+            tuple: (set de nomes de usuário em uso, set de e-mails em uso).
+        """
+
+    # Usuários relembrados
+
+    @abc.abstractmethod
+    def adicionar_relembrado(self, ui, id_usuario):
+        """
+        Adiciona um usuário à lista de relembrados de uma interface.
+
+        Args:
+            ui (str): A interface gráfica (tk, kv, qt).
+            id_usuario (int): O id do usuário.
+
+        Returns:
+            bool: True se o usuário foi adicionado, False se ele já estava na lista.
+        """
+
+    @abc.abstractmethod
+    def obter_usuarios_relembrados(self, ui):
+        """
+        Obtém todos os usuários relembrados de uma interface.
+
+        Args:
+            ui (str): A interface gráfica (tk, kv, qt).
+
+        Returns:
+            list: Uma lista de registros 'UsuarioRelembrado'.
+        """
+
+    @abc.abstractmethod
+    def obter_pagina_relembrados(self, ui, apos_id=0, limite=20, prefixo=None,
+                                 colunas=("id_usuario", "nome_usuario")):
+        """
+        Obtém uma página de usuários relembrados, paginada pela posição na lista (keyset).
+
+        As linhas seguem a ordem do cursor. Nos armazenamentos de um único
+        arquivo ela é a ordem de inserção; no fragmentado, não.
+
+        Args:
+            ui (str): A interface gráfica (tk, kv, qt).
+            apos_id (int): O cursor retornado pela página anterior (0 para a primeira).
+            limite (int): A quantidade máxima de usuários na página.
+            prefixo (str): Filtra os usuários cujo nome de usuário ou email começa
+                com o texto (sem diferenciar maiúsculas de minúsculas ASCII).
+            colunas (tuple): As colunas retornadas, entre 'id_usuario', 'nome_usuario', 'email' e 'senha'.
+
+        Returns:
+            tuple: (lista de tuplas com as colunas pedidas, cursor da próxima página ou None).
+        """
+
+    @abc.abstractmethod
+    def obter_usuario_relembrado(self, ui, nome_usuario):
+        """
+        Obtém os dados de um único usuário relembrado, incluindo a senha.
+
+        Args:
+            ui (str): A interface gráfica (tk, kv, qt).
+            nome_usuario (str): O nome de usuário escolhido.
+
+        Returns:
+            UsuarioRelembrado / None: O usuário relembrado ou None se ele não estiver relembrado.
+        """
+
+    # Sessões
+
+    @abc.abstractmethod
+    def criar_sessao(self, token, id_usuario, ui, criada_em, expira_em):
+        """
+        Grava uma sessão.
+
+        Args:
+            token (str): O identificador opaco da sessão.
+            id_usuario (int): O id do usuário.
+            ui (str): A interface gráfica que abriu a sessão.
+            criada_em (float): O instante da criação.
+            expira_em (float): O instante da expiração.
+
+        Returns:
+            Sessao: A sessão gravada.
+
+        Raises:
+            ErroChaveDuplicada: Erro lançado se o token já existir.
+        """
+
+    @abc.abstractmethod
+    def obter_sessao(self, token):
+        """
+        Obtém uma sessão pelo token, mesmo que ela já tenha expirado.
+
+        Args:
+            token (str): O identificador da sessão.
+
+        Returns:
+            Sessao / None: A sessão ou None.
+        """
+
+    @abc.abstractmethod
+    def obter_sessoes_usuario(self, id_usuario, agora):
+        """
+        Obtém as sessões ainda válidas de um usuário, das mais antigas para as mais novas.
+
+        Args:
+            id_usuario (int): O id do usuário.
+            agora (float): O instante de referência (as sessões que expiram até ele ficam de fora).
+
+        Returns:
+            list: As sessões (Sessao) em ordem de criação.
+        """
+
+    @abc.abstractmethod
+    def remover_sessao(self, token):
+        """
+        Remove uma sessão.
+
+        Args:
+            token (str): O identificador da sessão.
+
+        Returns:
+            bool: True se a sessão existia.
+        """
+
+    @abc.abstractmethod
+    def remover_sessoes_expiradas(self, agora, limite=500):
+        """
+        Remove um lote das sessões expiradas, das mais antigas para as mais novas.
+
+        Args:
+            agora (float): O instante de referência.
+            limite (int): A quantidade máxima de sessões removidas.
+
+        Returns:
+            int: A quantidade de sessões removidas.
+        """
+
+    # Acessos
+
+    @abc.abstractmethod
+    def registrar_acessos(self, acessos):
+        """
+        Acumula os logins de vários usuários em uma única transação.
+
+        O último login de cada usuário passa a ser o mais recente entre o
+        gravado e o informado, e as contagens são somadas.
+
+        Args:
+            acessos (list): Tuplas (id_usuario, ultimo_login_em, logins), uma por usuário.
+
+        Returns:
+            None
+        """
+
+    @abc.abstractmethod
+    def obter_acesso(self, id_usuario):
+        """
+        Obtém o último login e a contagem de logins gravados de um usuário.
+
+        Args:
+            id_usuario (int): O id do usuário.
+
+        Returns:
+            Acesso / None: O registro ou None se não houver logins gravados.
+        """
+
+    @abc.abstractmethod
+    def fechar_conexao(self):
+        """
+        Libera os recursos do armazenamento.
+
+        Returns:
+            None
+        """
+
+    def fabrica_conexao(self):
+        """
+        Obtém uma função que abre este armazenamento em uma conexão própria.
+
+        Usada pelas threads de segundo plano (limpeza das sessões, gravação dos
+        acessos), que não podem compartilhar a conexão do processo.
+
+        Returns:
+            callable / None: A função ou None se o armazenamento não puder ser
+                aberto novamente (ex.: em memória).
+        """
+        return None
+
+    def versao_dados(self):
+        """
+        Obtém um marcador que muda quando outra conexão altera os dados.
+
+        Os armazenamentos que não são compartilhados entre processos retornam
+        None, e os seus caches nunca precisam ser invalidados por fora.
+
+        Returns:
+            object / None: O marcador (comparável por igualdade) ou None.
+        """
+        return None
+
+    # Regras de negócio
+
+    def cadastrar_usuario(self, nome_usuario, email, senha):
+        """
+        Cadastra um novo usuário.
+
+        Args:
+            nome_usuario (str): O nome de usuário do novo usuário.
+            email (str): O email do novo usuário.
+            senha (bytes): A senha criptografada do novo usuário.
+
+        Returns:
+            None
+        """
+        self.inserir_usuario(nome_usuario, email, senha)
+
+    def enviar_cadastro(self, nome_usuario, email, senha):
+        """
+        Cadastra um novo usuário, entregando o resultado em um futuro.
+
+        Os armazenamentos com escrita agrupada resolvem o futuro somente após o
+        commit do grupo; aqui o cadastro é feito e confirmado imediatamente.
+
+        Args:
+            nome_usuario (str): O nome de usuário do novo usuário.
+            email (str): O email do novo usuário.
+            senha (bytes): A senha criptografada do novo usuário.
+
+        Returns:
+            concurrent.futures.Future: Resolvido com o id do usuário (ou com o erro).
+        """
+        return _executar_em_futuro(self.inserir_usuario, nome_usuario, email, senha)
+
+    def verificar_criptografia(self, senha_inserida, senha_criptografada):
+        """
+        Verifica se a senha inserida pelo usuário é igual a senha criptografada no sistema.
+
+        Args:
+            senha_inserida (str): A senha inserida pelo usuário.
+            senha_criptografada (bytes): A senha criptografada armazenada.
+
+        Returns:
+            bool: True se as senhas forem equivalentes ou False, caso contrário.
+        """
+        inicio = metricas.cronometrar()
+        resultado = bcrypt.checkpw(senha_inserida.encode(), senha_criptografada)
+
+        if inicio is not None:
+            metricas.DURACAO_HASH.observar(time.perf_counter() - inicio, operacao="checkpw")
+
+        return resultado
+
+    def obter_senha_criptografada(self, nome_usuario_email, senha):
+        """
+        Retorna a senha criptografada do usuário solicitado.
+
+        Args:
+            nome_usuario_email (str): O nome de usuário ou email do usuário.
+            senha (str): A senha do usuário.
+
+        Returns:
+            bytes / None: A senha criptografada ou None se o usuário não existir ou a senha não conferir.
+        """
+        usuario = self.obter_usuario(nome_usuario_email)
+
+        if usuario and self.verificar_criptografia(senha, usuario.senha):
+            return usuario.senha
+
+    def conferir_senha(self, usuario, senha):
+        """
+        Confere a senha informada com a senha criptografada de um usuário.
+
+        Não acessa o armazenamento, podendo ser executado em outra thread.
+
+        Args:
+            usuario (Usuario): Os dados do usuário obtidos por 'obter_usuario' (ou None).
+            senha (str): A senha informada.
+
+        Returns:
+            bool: True se a senha corresponder, False caso contrário.
+        """
+        if not usuario:
+            return False
+
+        criptografia = usuario.senha
+        teste = self.verificar_criptografia(senha, criptografia)
+
+        return bool(teste or senha.encode() == criptografia)
+
+    def contabilizar_login(self, ui, login, nome_usuario_email=None):
+        """
+        Registra o resultado de uma tentativa de login nas métricas e na auditoria.
+
+        Args:
+            ui (str): A interface gráfica (tk, kv, qt) que solicitou o login.
+            login (bool): Indica se o login foi bem-sucedido.
+            nome_usuario_email (str): O nome de usuário ou email informado.
+
+        Returns:
+            None
+        """
+        if metricas.registro.habilitado:
+            metricas.LOGINS.incrementar(
+                ui=ui or "desconhecida",
+                resultado="sucesso" if login else "falha"
+            )
+        auditoria.registrar("login", ui, nome_usuario_email, login)
+
+    def fazer_login(self, nome_usuario_email, senha, ui=None):
+        """
+        Realiza o login de um usuário no sistema.
+
+        Args:
+            nome_usuario_email (str): O nome de usuário ou email do usuário.
+            senha (str): A senha do usuário.
+            ui (str): A interface gráfica (tk, kv, qt) que solicitou o login.
+
+        Returns:
+            bool / Sessao: A sessão aberta (ou True, sem gerenciador de sessões)
+                se o login for bem-sucedido, False caso contrário.
+        """
+        usuario = self.obter_usuario(nome_usuario_email)
+        login = self.conferir_senha(usuario, senha)
+        self.contabilizar_login(ui, login, nome_usuario_email)
+
+        if login and self.acessos is not None:
+            self.acessos.registrar(usuario.id)
+
+        if login and self.sessoes is not None:
+            return self.sessoes.abrir(usuario.id, ui)
+
+        return login
+
+    def lembrar_usuario(self, ui, nome_usuario_email, senha):
+        """
+        Adiciona o usuário à lista de usuários relembrados, se as credenciais conferirem.
+
+        Args:
+            ui (str): A interface gráfica (tk, kv, qt).
+            nome_usuario_email (str): O nome de usuário ou email a ser relembrado.
+            senha (bytes): A senha criptografada do usuário a ser relembrado.
+
+        Returns:
+            None
+        """
+        usuario = self.obter_usuario(nome_usuario_email)
+
+        # A senha recebida é a criptografada, então a comparação é direta
+        if usuario and usuario.senha == senha:
+            self.adicionar_relembrado(ui, usuario.id)
+
+    def enviar_lembranca(self, ui, nome_usuario_email, senha):
+        """
+        Relembra um usuário ('lembrar_usuario'), entregando o resultado em um futuro.
+
+        Args:
+            ui (str): A interface gráfica (tk, kv, qt).
+            nome_usuario_email (str): O nome de usuário ou email a ser relembrado.
+            senha (bytes): A senha criptografada do usuário a ser relembrado.
+
+        Returns:
+            concurrent.futures.Future: Resolvido com None (ou com o erro).
+        """
+        return _executar_em_futuro(self.lembrar_usuario, ui, nome_usuario_email, senha)
+
+    def iterar_relembrados(self, ui, tamanho_pagina=100, prefixo=None,
+                           colunas=("id_usuario", "nome_usuario")):
+        """
+        Percorre todos os usuários relembrados de uma interface, página a página.
+
+        Args:
+            ui (str): A interface gráfica (tk, kv, qt).
+            tamanho_pagina (int): A quantidade de usuários buscada por consulta.
+            prefixo (str): Filtra os usuários cujo nome de usuário ou email começa com o texto.
+            colunas (tuple): As colunas retornadas, entre 'id_usuario', 'nome_usuario', 'email' e 'senha'.
+
+        Yields:
+            tuple: As colunas pedidas de cada usuário relembrado.
+        """
+        apos_id = 0
+        while apos_id is not None:
+            linhas, apos_id = self.obter_pagina_relembrados(ui, apos_id, tamanho_pagina, prefixo, colunas)
+            yield from linhas
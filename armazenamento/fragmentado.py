@@ -0,0 +1,395 @@
+# -*- coding: utf-8 -*-
+"""
+Armazenamento SQLite fragmentado em vários arquivos.
+
+O SQLite aceita um único escritor por arquivo, então os cadastros de todos os
+usuários disputam o mesmo arquivo. Aqui os usuários são distribuídos entre N
+arquivos ('fragmentos') por um hash estável do nome de usuário normalizado, e
+escritas de usuários diferentes podem ser confirmadas em paralelo (por vários
+processos ou threads, cada um com as suas conexões).
+
+- O fragmento de um usuário é escolhido pelo nome de usuário; o id global é
+  'id local * N + índice do fragmento', então o id também leva ao fragmento.
+- O diretório de e-mails (e-mail -> nome de usuário) garante a unicidade dos
+  e-mails entre fragmentos. Ele também é dividido pelo hash do e-mail, para
+  que os cadastros não voltem a disputar um único arquivo.
+  A reserva do e-mail e o usuário são confirmados em arquivos diferentes:
+  se o processo parar entre os dois commits, o e-mail fica reservado sem
+  usuário ('reparar_diretorio_emails' remove essas reservas órfãs).
+- As listas de relembrados ficam no fragmento do usuário. As páginas usam
+  como cursor o id global da lista ('id local * N + índice') e intercalam as
+  linhas de todos os fragmentos.
+- As sessões ficam no fragmento do hash do token.
+- O último login e a contagem de logins ficam no fragmento do usuário.
+
+O número de fragmentos é gravado em cada arquivo e não pode mudar depois.
+"""
+
+import functools
+import hashlib
+import heapq
+import os
+import sqlite3
+
+from armazenamento.base import Armazenamento, ErroChaveDuplicada, validar_colunas, validar_ui
+from database import BancoDeDados
+from registros import Acesso
+
+
+def indice_fragmento(chave, fragmentos):
+    """
+    Calcula o fragmento de uma chave com um hash estável entre processos.
+
+    O 'hash()' do Python muda a cada processo, então não serve aqui: os
+    trabalhadores e o daemon precisam concordar sobre o fragmento de cada chave.
+
+    Args:
+        chave (str): O nome de usuário, e-mail ou token (sem diferenciar maiúsculas de minúsculas).
+        fragmentos (int): O número de fragmentos.
+
+    Returns:
+        int: O índice do fragmento.
+    """
+    resumo = hashlib.blake2b(chave.casefold().encode(), digest_size=8).digest()
+    return int.from_bytes(resumo, "big") % fragmentos
+
+
+class ArmazenamentoFragmentado(Armazenamento):
+    """
+    Classe que distribui usuários, relembrados e sessões entre vários arquivos SQLite.
+
+    Attributes:
+        caminho (str): O diretório dos fragmentos.
+        arquivo (None): Não há um único arquivo, então as cópias periódicas não se aplicam.
+        fragmentos (list): Os 'BancoDeDados' de cada fragmento.
+    """
+
+    arquivo = None
+
+    def __init__(self, diretorio, fragmentos=4):
+        """
+        Abre (ou cria) os fragmentos em um diretório.
+
+        Args:
+            diretorio (str): O diretório dos arquivos 'usuarios_<i>.db'.
+            fragmentos (int): O número de fragmentos.
+
+        Returns:
+            None
+
+        Raises:
+            ValueError: Erro lançado se o caminho for um arquivo ou se o diretório
+                já tiver outro número de fragmentos.
+        """
+        if os.path.isfile(diretorio):
+            raise ValueError(
+                f"O armazenamento fragmentado exige um diretório, mas '{diretorio}' é um arquivo "
+                f"(ex.: o banco de dados de um único arquivo)."
+            )
+        os.makedirs(diretorio, exist_ok=True)
+        self.caminho = diretorio
+        self.fragmentos = [
+            BancoDeDados(os.path.join(diretorio, f"usuarios_{indice}.db"))
+            for indice in range(fragmentos)
+        ]
+
+        try:
+            for indice, banco_de_dados in enumerate(self.fragmentos):
+                self._preparar_fragmento(banco_de_dados, indice)
+        except ValueError:
+            self.fechar_conexao()
+            raise
+
+    def _preparar_fragmento(self, banco_de_dados, indice):
+        """
+        Cria as tabelas próprias do modo fragmentado e confere o número de fragmentos.
+
+        Args:
+            banco_de_dados (BancoDeDados): O fragmento.
+            indice (int): O índice do fragmento.
+
+        Returns:
+            None
+
+        Raises:
+            ValueError: Erro lançado se o arquivo pertencer a outra fragmentação.
+        """
+        banco_de_dados.executar("""
+            CREATE TABLE IF NOT EXISTS fragmentacao (
+                indice INTEGER NOT NULL,
+                total INTEGER NOT NULL
+            )
+        """)
+        banco_de_dados.executar("""
+            CREATE TABLE IF NOT EXISTS diretorio_emails (
+                email VARCHAR(150) PRIMARY KEY,
+                nome_usuario VARCHAR(20) NOT NULL
+            )
+        """)
+
+        linha = banco_de_dados.executar("SELECT indice, total FROM fragmentacao").fetchone()
+        if linha is None:
+            banco_de_dados.executar(
+                "INSERT INTO fragmentacao (indice, total) VALUES (?, ?)", (indice, len(self.fragmentos))
+            )
+        elif tuple(linha) != (indice, len(self.fragmentos)):
+            raise ValueError(
+                f"O fragmento {indice} de '{self.caminho}' pertence a uma divisão em {linha[1]} "
+                f"fragmentos, não em {len(self.fragmentos)}."
+            )
+
+        banco_de_dados.conexao.commit()
+
+    # Roteamento
+
+    def _indice(self, chave):
+        return indice_fragmento(chave, len(self.fragmentos))
+
+    def _global(self, id_local, indice):
+        return id_local * len(self.fragmentos) + indice
+
+    def _local(self, id_global):
+        return divmod(id_global, len(self.fragmentos))
+
+    def _converter(self, registro, indice):
+        """
+        Troca o id local de um registro de usuário pelo id global.
+
+        Args:
+            registro (Usuario / UsuarioRelembrado): O registro lido de um fragmento.
+            indice (int): O índice do fragmento.
+
+        Returns:
+            Usuario / UsuarioRelembrado: O registro com o id global (ou None).
+        """
+        if registro is None:
+            return None
+        id_local, *valores = registro
+        return type(registro)(self._global(id_local, indice), *valores)
+
+    # Usuários
+
+    def inserir_usuario(self, nome_usuario, email, senha):
+        """Reserva o e-mail no diretório e insere o usuário no fragmento do nome."""
+        diretorio = self.fragmentos[self._indice(email)]
+        try:
+            diretorio.executar_escrita(
+                "INSERT INTO diretorio_emails (email, nome_usuario) VALUES (?, ?)",
+                (email, nome_usuario), nome="reservar_email"
+            )
+        except sqlite3.IntegrityError as erro:
+            raise ErroChaveDuplicada(f"O endereço de e-mail '{email}' já está em uso!", "email_em_uso") from erro
+        diretorio.confirmar()
+
+        indice = self._indice(nome_usuario)
+        try:
+            id_local = self.fragmentos[indice].inserir_usuario(nome_usuario, email, senha)
+        except Exception:
+            # Libera o e-mail reservado pelo cadastro que falhou (rejeitado ou com erro no fragmento)
+            diretorio.executar_escrita("DELETE FROM diretorio_emails WHERE email = ?", (email,), nome="liberar_email")
+            diretorio.confirmar()
+            raise
+
+        return self._global(id_local, indice)
+
+    def reparar_diretorio_emails(self):
+        """
+        Remove do diretório de e-mails as reservas sem usuário correspondente.
+
+        Uma reserva fica órfã se o processo parar entre a confirmação da
+        reserva e a do usuário. Deve ser executado sem cadastros em andamento,
+        pois a reserva de um cadastro ainda não concluído também não tem usuário.
+
+        Returns:
+            int: A quantidade de reservas removidas.
+        """
+        removidas = 0
+        for banco_de_dados in self.fragmentos:
+            reservas = banco_de_dados.executar(
+                "SELECT email, nome_usuario FROM diretorio_emails", nome="listar_diretorio"
+            ).fetchall()
+
+            orfas = []
+            for email, nome_usuario in reservas:
+                usuario = self.fragmentos[self._indice(nome_usuario)].obter_usuario(nome_usuario)
+                if usuario is None or usuario.email != email:
+                    orfas.append((email,))
+
+            if orfas:
+                banco_de_dados.executar_escrita(
+                    "DELETE FROM diretorio_emails WHERE email = ?", orfas, nome="liberar_email", varios=True
+                )
+                banco_de_dados.confirmar()
+                removidas += len(orfas)
+
+        return removidas
+
+    def obter_usuario(self, nome_usuario_email):
+        """Procura pelo nome no fragmento do nome e, se preciso, pelo e-mail via diretório."""
+        indice = self._indice(nome_usuario_email)
+        usuario = self.fragmentos[indice].obter_usuario(nome_usuario_email)
+        if usuario is not None:
+            return self._converter(usuario, indice)
+
+        linha = self.fragmentos[indice].executar(
+            "SELECT nome_usuario FROM diretorio_emails WHERE email = ?",
+            (nome_usuario_email,), nome="consultar_diretorio"
+        ).fetchone()
+        if linha is None:
+            return None
+
+        indice = self._indice(linha[0])
+        return self._converter(self.fragmentos[indice].obter_usuario(nome_usuario_email), indice)
+
+    def consultar_existentes(self, nomes_usuario, emails, tamanho_bloco=400):
+        """Agrupa os nomes e os e-mails por fragmento e consulta cada fragmento separadamente."""
+        nomes_por_fragmento = [[] for _ in self.fragmentos]
+        for nome_usuario in nomes_usuario:
+            nomes_por_fragmento[self._indice(nome_usuario)].append(nome_usuario)
+        emails_por_fragmento = [[] for _ in self.fragmentos]
+        for email in emails:
+            emails_por_fragmento[self._indice(email)].append(email)
+
+        nomes_em_uso = set()
+        emails_em_uso = set()
+        for banco_de_dados, nomes, emails_fragmento in zip(self.fragmentos, nomes_por_fragmento, emails_por_fragmento):
+            if nomes:
+                nomes_em_uso |= banco_de_dados.consultar_existentes(nomes, [], tamanho_bloco)[0]
+
+            for inicio in range(0, len(emails_fragmento), tamanho_bloco):
+                bloco = emails_fragmento[inicio:inicio + tamanho_bloco]
+                banco_de_dados.executar(
+                    f"SELECT email FROM diretorio_emails WHERE email IN ({', '.join('?' * len(bloco))})",
+                    bloco, nome="consultar_diretorio"
+                )
+                emails_em_uso.update(email for email, in banco_de_dados.cursor.fetchall())
+
+        return nomes_em_uso, emails_em_uso
+
+    # Usuários relembrados
+
+    def adicionar_relembrado(self, ui, id_usuario):
+        """Adiciona o usuário à lista do seu próprio fragmento."""
+        id_local, indice = self._local(id_usuario)
+        return self.fragmentos[indice].adicionar_relembrado(ui, id_local)
+
+    def obter_usuarios_relembrados(self, ui):
+        """Reúne as listas de todos os fragmentos, com os ids globais."""
+        return [
+            self._converter(usuario, indice)
+            for indice, banco_de_dados in enumerate(self.fragmentos)
+            for usuario in banco_de_dados.obter_usuarios_relembrados(ui)
+        ]
+
+    def obter_pagina_relembrados(self, ui, apos_id=0, limite=20, prefixo=None,
+                                 colunas=("id_usuario", "nome_usuario")):
+        """Intercala as próximas linhas de cada fragmento pelo id global da lista."""
+        validar_ui(ui)
+        validar_colunas(colunas)
+
+        total = len(self.fragmentos)
+        posicao_id = colunas.index("id_usuario") if "id_usuario" in colunas else None
+
+        def linhas_globais(indice, banco_de_dados):
+            # id global > apos_id  <=>  id local > (apos_id - indice) // total
+            linhas = banco_de_dados.obter_linhas_relembrados(
+                ui, (apos_id - indice) // total, limite + 1, prefixo, colunas
+            )
+            for id_lista, *valores in linhas:
+                if posicao_id is not None:
+                    valores[posicao_id] = self._global(valores[posicao_id], indice)
+                yield (self._global(id_lista, indice), *valores)
+
+        # Cada fragmento contribui com até 'limite + 1' linhas, já em ordem
+        intercaladas = heapq.merge(*(
+            linhas_globais(indice, banco_de_dados) for indice, banco_de_dados in enumerate(self.fragmentos)
+        ))
+        linhas = [linha for _, linha in zip(range(limite + 1), intercaladas)]
+        proximo = linhas[limite - 1][0] if len(linhas) > limite else None
+
+        return [linha[1:] for linha in linhas[:limite]], proximo
+
+    def obter_usuario_relembrado(self, ui, nome_usuario):
+        """Consulta somente o fragmento do nome de usuário."""
+        indice = self._indice(nome_usuario)
+        return self._converter(self.fragmentos[indice].obter_usuario_relembrado(ui, nome_usuario), indice)
+
+    # Sessões
+
+    def criar_sessao(self, token, id_usuario, ui, criada_em, expira_em):
+        """Grava a sessão no fragmento do token."""
+        return self.fragmentos[self._indice(token)].criar_sessao(token, id_usuario, ui, criada_em, expira_em)
+
+    def obter_sessao(self, token):
+        """Consulta somente o fragmento do token."""
+        return self.fragmentos[self._indice(token)].obter_sessao(token)
+
+    def obter_sessoes_usuario(self, id_usuario, agora):
+        """Junta as sessões do usuário de todos os fragmentos, já que elas são distribuídas pelo token."""
+        sessoes = []
+        for banco_de_dados in self.fragmentos:
+            sessoes += banco_de_dados.obter_sessoes_usuario(id_usuario, agora)
+        return sorted(sessoes, key=lambda sessao: sessao.criada_em)
+
+    def remover_sessao(self, token):
+        """Remove a sessão do fragmento do token."""
+        return self.fragmentos[self._indice(token)].remover_sessao(token)
+
+    def remover_sessoes_expiradas(self, agora, limite=500):
+        """Escolhe as mais antigas entre todos os fragmentos e remove cada uma no seu fragmento."""
+        candidatas = []
+        for banco_de_dados in self.fragmentos:
+            banco_de_dados.executar("""
+                SELECT expira_em, token FROM sessoes WHERE expira_em <= ? ORDER BY expira_em LIMIT ?
+            """, (agora, limite), nome="listar_sessoes_expiradas")
+            candidatas += [(expira_em, token, banco_de_dados) for expira_em, token in banco_de_dados.cursor]
+
+        tokens_por_fragmento = {}
+        for _, token, banco_de_dados in heapq.nsmallest(limite, candidatas, key=lambda candidata: candidata[0]):
+            tokens_por_fragmento.setdefault(banco_de_dados, []).append((token,))
+
+        # Uma transação por fragmento, pelas mesmas primitivas de escrita dos demais métodos
+        removidas = 0
+        for banco_de_dados, tokens in tokens_por_fragmento.items():
+            banco_de_dados.executar_escrita(
+                "DELETE FROM sessoes WHERE token = ?", tokens, nome="remover_sessoes_expiradas", varios=True
+            )
+            removidas += banco_de_dados.cursor.rowcount
+            banco_de_dados.confirmar()
+
+        return removidas
+
+    # Acessos
+
+    def registrar_acessos(self, acessos):
+        """Separa os acessos pelo fragmento de cada usuário; cada fragmento grava os seus em uma transação."""
+        por_fragmento = {}
+        for id_usuario, ultimo_login_em, logins in acessos:
+            id_local, indice = self._local(id_usuario)
+            por_fragmento.setdefault(indice, []).append((id_local, ultimo_login_em, logins))
+
+        for indice, locais in por_fragmento.items():
+            self.fragmentos[indice].registrar_acessos(locais)
+
+    def obter_acesso(self, id_usuario):
+        """Consulta somente o fragmento do usuário."""
+        id_local, indice = self._local(id_usuario)
+        acesso = self.fragmentos[indice].obter_acesso(id_local)
+        return None if acesso is None else Acesso(id_usuario, acesso.ultimo_login_em, acesso.logins)
+
+    def fechar_conexao(self):
+        """Fecha as conexões de todos os fragmentos."""
+        if self.acessos is not None:
+            self.acessos.fechar()
+            self.acessos = None
+
+        for banco_de_dados in self.fragmentos:
+            banco_de_dados.fechar_conexao()
+
+    def fabrica_conexao(self):
+        """Abre os mesmos fragmentos em outras conexões."""
+        return functools.partial(ArmazenamentoFragmentado, self.caminho, len(self.fragmentos))
+
+    def versao_dados(self):
+        """Obtém as versões dos dados de todos os fragmentos (ver 'BancoDeDados.versao_dados')."""
+        return tuple(banco_de_dados.versao_dados() for banco_de_dados in self.fragmentos)
@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+"""
+Armazenamento em memória, indexado por dicionários.
+
+Não grava nada em disco: serve para testes de carga e para comparar o custo
+do Python puro com o do SQLite. Os dados se perdem ao encerrar o processo e,
+como a conexão do SQLite, uma instância não deve ser usada por várias threads
+ao mesmo tempo.
+"""
+
+import bisect
+import heapq
+
+from armazenamento.base import UIS, Armazenamento, ErroChaveDuplicada, validar_colunas, validar_ui
+from registros import Acesso, Sessao, Usuario, UsuarioRelembrado
+
+
+# Converte somente as letras ASCII, como o LIKE do SQLite
+_MINUSCULAS_ASCII = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+
+
+class ArmazenamentoMemoria(Armazenamento):
+    """
+    Classe que guarda usuários, usuários relembrados e sessões em dicionários.
+
+    Attributes:
+        caminho (None): Não há caminho; mantido pela compatibilidade com o 'BancoDeDados'.
+        arquivo (None): Não há arquivo em disco.
+    """
+
+    caminho = None
+    arquivo = None
+
+    def __init__(self):
+        """
+        Inicializa os índices vazios.
+
+        Returns:
+            None
+        """
+        self._usuarios = {}
+        self._por_nome = {}
+        self._por_email = {}
+        self._ultimo_id = 0
+
+        # Por interface: ids da lista em ordem crescente, os ids de usuário e as
+        # chaves de busca por prefixo na mesma ordem, e o id da lista de cada
+        # usuário relembrado
+        self._ids_lista = {ui: [] for ui in UIS}
+        self._ids_usuario = {ui: [] for ui in UIS}
+        self._chaves_prefixo = {ui: [] for ui in UIS}
+        self._relembrados = {ui: {} for ui in UIS}
+        self._ultimo_id_lista = {ui: 0 for ui in UIS}
+
+        self._sessoes = {}
+        # Tokens das sessões de cada usuário (dicionário usado como conjunto ordenado)
+        self._sessoes_usuario = {}
+        # Fila (expira_em, token) das expirações; entradas obsoletas são descartadas na remoção
+        self._expiracoes = []
+
+        self._acessos = {}
+
+    def inserir_usuario(self, nome_usuario, email, senha):
+        """Insere o usuário nos índices por id, nome de usuário e e-mail."""
+        if nome_usuario in self._por_nome:
+            raise ErroChaveDuplicada(f"O nome de usuário '{nome_usuario}' já está em uso!", "nome_usuario_em_uso")
+        if email in self._por_email:
+            raise ErroChaveDuplicada(f"O endereço de e-mail '{email}' já está em uso!", "email_em_uso")
+
+        self._ultimo_id += 1
+        id_usuario = self._ultimo_id
+        self._usuarios[id_usuario] = Usuario(id_usuario, nome_usuario, email, senha)
+        self._por_nome[nome_usuario] = id_usuario
+        self._por_email[email] = id_usuario
+
+        return id_usuario
+
+    def obter_usuario(self, nome_usuario_email):
+        """Procura o usuário pelo nome de usuário e, depois, pelo e-mail."""
+        id_usuario = self._por_nome.get(nome_usuario_email) or self._por_email.get(nome_usuario_email)
+        return self._usuarios.get(id_usuario)
+
+    def consultar_existentes(self, nomes_usuario, emails, tamanho_bloco=400):
+        """Consulta os índices diretamente (o tamanho do bloco não se aplica)."""
+        return (
+            {nome for nome in nomes_usuario if nome in self._por_nome},
+            {email for email in emails if email in self._por_email},
+        )
+
+    def adicionar_relembrado(self, ui, id_usuario):
+        """Acrescenta o usuário ao fim da lista da interface, com o próximo id da lista."""
+        validar_ui(ui)
+        if id_usuario in self._relembrados[ui]:
+            return False
+
+        self._ultimo_id_lista[ui] += 1
+        id_lista = self._ultimo_id_lista[ui]
+        self._ids_lista[ui].append(id_lista)
+        self._ids_usuario[ui].append(id_usuario)
+        usuario = self._usuarios[id_usuario]
+        self._chaves_prefixo[ui].append((
+            usuario.nome_usuario.translate(_MINUSCULAS_ASCII),
+            usuario.email.translate(_MINUSCULAS_ASCII),
+        ))
+        self._relembrados[ui][id_usuario] = id_lista
+
+        return True
+
+    def _relembrado(self, id_usuario):
+        """
+        Monta o registro de um usuário relembrado.
+
+        Args:
+            id_usuario (int): O id do usuário.
+
+        Returns:
+            UsuarioRelembrado: O registro com os dados do usuário.
+        """
+        return UsuarioRelembrado(*self._usuarios[id_usuario])
+
+    def obter_usuarios_relembrados(self, ui):
+        """Monta os registros de todos os usuários da lista, na ordem da lista."""
+        validar_ui(ui)
+        return [self._relembrado(id_usuario) for id_usuario in self._ids_usuario[ui]]
+
+    def obter_pagina_relembrados(self, ui, apos_id=0, limite=20, prefixo=None,
+                                 colunas=("id_usuario", "nome_usuario")):
+        """Localiza o início da página por busca binária nos ids da lista."""
+        validar_ui(ui)
+        validar_colunas(colunas)
+
+        ids_lista = self._ids_lista[ui]
+        ids_usuario = self._ids_usuario[ui]
+        chaves = self._chaves_prefixo[ui]
+        if prefixo:
+            prefixo = prefixo.translate(_MINUSCULAS_ASCII)
+
+        # Como no SQLite, uma linha a mais indica se existe uma próxima página
+        encontradas = []
+        for posicao in range(bisect.bisect_right(ids_lista, apos_id), len(ids_lista)):
+            if prefixo:
+                nome_usuario, email = chaves[posicao]
+                if not (nome_usuario.startswith(prefixo) or email.startswith(prefixo)):
+                    continue
+
+            encontradas.append((ids_lista[posicao], self._usuarios[ids_usuario[posicao]]))
+            if len(encontradas) > limite:
+                break
+
+        proximo = encontradas[limite - 1][0] if len(encontradas) > limite else None
+        linhas = [
+            tuple(getattr(usuario, "id" if coluna == "id_usuario" else coluna) for coluna in colunas)
+            for _, usuario in encontradas[:limite]
+        ]
+
+        return linhas, proximo
+
+    def obter_usuario_relembrado(self, ui, nome_usuario):
+        """Procura o usuário pelo nome e confere se ele está na lista da interface."""
+        validar_ui(ui)
+        id_usuario = self._por_nome.get(nome_usuario)
+        if id_usuario not in self._relembrados[ui]:
+            return None
+        return self._relembrado(id_usuario)
+
+    def criar_sessao(self, token, id_usuario, ui, criada_em, expira_em):
+        """Guarda a sessão pelo token e agenda a sua expiração na fila."""
+        if token in self._sessoes:
+            raise ErroChaveDuplicada("O token da sessão já está em uso!", "sessao_em_uso")
+
+        sessao = Sessao(token, id_usuario, ui, criada_em, expira_em)
+        self._sessoes[token] = sessao
+        self._sessoes_usuario.setdefault(id_usuario, {})[token] = None
+        heapq.heappush(self._expiracoes, (expira_em, token))
+
+        return sessao
+
+    def obter_sessao(self, token):
+        """Obtém a sessão pelo token, em tempo constante."""
+        return self._sessoes.get(token)
+
+    def obter_sessoes_usuario(self, id_usuario, agora):
+        """Percorre somente os tokens do usuário, sem varrer todas as sessões."""
+        sessoes = [self._sessoes[token] for token in self._sessoes_usuario.get(id_usuario, ())]
+        return sorted(
+            (sessao for sessao in sessoes if sessao.expira_em > agora),
+            key=lambda sessao: sessao.criada_em
+        )
+
+    def _descartar_sessao(self, sessao):
+        """Retira a sessão dos índices por token e por usuário."""
+        del self._sessoes[sessao.token]
+        tokens = self._sessoes_usuario[sessao.id_usuario]
+        del tokens[sessao.token]
+        if not tokens:
+            del self._sessoes_usuario[sessao.id_usuario]
+
+    def remover_sessao(self, token):
+        """Remove a sessão; a entrada na fila de expirações é descartada depois."""
+        sessao = self._sessoes.get(token)
+        if sessao is None:
+            return False
+
+        self._descartar_sessao(sessao)
+        return True
+
+    def remover_sessoes_expiradas(self, agora, limite=500):
+        """Retira da fila as expirações vencidas, das mais antigas para as mais novas."""
+        removidas = 0
+        while self._expiracoes and removidas < limite and self._expiracoes[0][0] <= agora:
+            expira_em, token = heapq.heappop(self._expiracoes)
+            sessao = self._sessoes.get(token)
+            # Ignora sessões já removidas (ou recriadas com o mesmo token)
+            if sessao is not None and sessao.expira_em == expira_em:
+                self._descartar_sessao(sessao)
+                removidas += 1
+
+        return removidas
+
+    def registrar_acessos(self, acessos):
+        """Soma as contagens e mantém o login mais recente de cada usuário."""
+        for id_usuario, ultimo_login_em, logins in acessos:
+            gravado = self._acessos.get(id_usuario)
+            if gravado is not None:
+                ultimo_login_em = max(gravado.ultimo_login_em, ultimo_login_em)
+                logins += gravado.logins
+            self._acessos[id_usuario] = Acesso(id_usuario, ultimo_login_em, logins)
+
+    def obter_acesso(self, id_usuario):
+        """Obtém o registro do usuário, em tempo constante."""
+        return self._acessos.get(id_usuario)
+
+    def fechar_conexao(self):
+        """Não há recursos a liberar."""
@@ -0,0 +1,353 @@
+# -*- coding: utf-8 -*-
+"""
+Registro de auditoria dos eventos de autenticação (logins, cadastros e "lembrar de mim").
+
+Registrar um evento só acrescenta uma tupla a uma fila em memória
+('collections.deque', cujas inclusões e retiradas são atômicas e não usam
+travas), então o custo no caminho do login é de poucos microssegundos. Uma
+thread gravadora retira os eventos periodicamente e os grava em lotes, um
+commit por lote, em um arquivo SQLite próprio, separado do banco de usuários.
+A tabela só aceita inclusões: gatilhos rejeitam alterações e remoções.
+
+A fila é limitada. Com ela cheia (ex.: o disco do registro travado), os
+novos eventos são descartados e contados em 'descartados' e na métrica
+'auth_auditoria_descartados_total', em vez de atrasar os logins.
+
+Quando o arquivo atinge o tamanho máximo, ele é renomeado para
+'<arquivo>.1' (os anteriores passam para '.2', '.3', ...) e um novo é criado;
+somente os 'manter' arquivos mais recentes são mantidos.
+
+Cada arquivo tem um único processo gravador, o que mantém a rotação segura
+(renomear um arquivo SQLite com outro processo escrevendo nele perderia o
+diário). Um processo criado com 'os.fork' (ex.: os trabalhadores do modo
+pré-fork) grava em '<raiz>-<pid><extensão>' com uma thread própria, já que a
+thread do processo pai não é copiada, e deve chamar 'parar' antes de sair
+com 'os._exit'.
+"""
+
+import atexit
+import collections
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+import metricas
+
+
+logger = logging.getLogger(__name__)
+
+# Colunas gravadas para cada evento, na ordem das tuplas da fila
+COLUNAS = ("instante", "tipo", "ui", "usuario", "sucesso", "detalhe")
+
+
+class RegistroAuditoria:
+    """
+    Classe que enfileira eventos de auditoria e os grava em lotes em uma thread própria.
+
+    Attributes:
+        caminho (str): O arquivo SQLite do registro deste processo.
+        caminho_base (str): O arquivo do processo que criou o registro (os
+            processos filhos gravam em arquivos derivados dele).
+        capacidade (int): A quantidade máxima de eventos aguardando gravação.
+        lote (int): A quantidade máxima de eventos gravados por commit.
+        intervalo (float): O intervalo entre as gravações, em segundos.
+        max_bytes (int): O tamanho a partir do qual o arquivo é rotacionado.
+        manter (int): A quantidade de arquivos rotacionados mantidos.
+        gravados (int): A quantidade de eventos gravados.
+        descartados (int): A quantidade de eventos descartados com a fila cheia.
+        rotacoes (int): A quantidade de rotações do arquivo.
+    """
+
+    def __init__(self, caminho, capacidade=10000, lote=500, intervalo=0.5, max_bytes=10 * 2 ** 20, manter=5):
+        """
+        Inicializa o registro sem iniciar a thread gravadora.
+
+        Args:
+            caminho (str): O arquivo SQLite do registro.
+            capacidade (int): A quantidade máxima de eventos aguardando gravação.
+            lote (int): A quantidade máxima de eventos gravados por commit.
+            intervalo (float): O intervalo entre as gravações, em segundos.
+            max_bytes (int): O tamanho a partir do qual o arquivo é rotacionado.
+            manter (int): A quantidade de arquivos rotacionados mantidos.
+
+        Returns:
+            None
+        """
+        self.caminho = caminho
+        self.caminho_base = caminho
+        self.capacidade = capacidade
+        self.lote = lote
+        self.intervalo = intervalo
+        self.max_bytes = max_bytes
+        self.manter = manter
+
+        self.gravados = 0
+        self.descartados = 0
+        self.rotacoes = 0
+
+        self._fila = collections.deque()
+        # Usada somente ao descartar, fora do caminho comum
+        self._trava_descartes = threading.Lock()
+        self._parar = threading.Event()
+        self._thread = None
+
+    def registrar(self, tipo, ui=None, usuario=None, sucesso=True, detalhe=None):
+        """
+        Enfileira um evento para a próxima gravação.
+
+        Args:
+            tipo (str): O tipo do evento (ex.: 'login', 'cadastro', 'lembrar').
+            ui (str): A interface gráfica (tk, kv, qt) de origem.
+            usuario (str): O nome de usuário ou e-mail informado.
+            sucesso (bool): Indica se a operação foi bem-sucedida.
+            detalhe (str): Um código curto (ex.: o motivo de uma rejeição).
+
+        Returns:
+            bool: True se o evento foi enfileirado, False se foi descartado.
+        """
+        if len(self._fila) >= self.capacidade:
+            with self._trava_descartes:
+                self.descartados += 1
+            if metricas.registro.habilitado:
+                metricas.AUDITORIA_DESCARTADOS.incrementar(tipo=tipo)
+            return False
+
+        self._fila.append((time.time(), tipo, ui, usuario, int(bool(sucesso)), detalhe))
+        return True
+
+    def iniciar(self):
+        """
+        Abre o arquivo do registro e inicia a thread gravadora.
+
+        Returns:
+            None
+
+        Raises:
+            sqlite3.Error: Erro lançado se o arquivo não puder ser aberto.
+        """
+        if self._thread is not None:
+            return
+
+        # Abre uma vez aqui para que um caminho inválido falhe na inicialização
+        self._abrir().close()
+
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._executar, name="auditoria", daemon=True)
+        self._thread.start()
+        atexit.register(self.parar)
+
+    def parar(self):
+        """
+        Grava os eventos pendentes e encerra a thread gravadora.
+
+        Returns:
+            None
+        """
+        if self._thread is not None:
+            self._parar.set()
+            self._thread.join()
+            self._thread = None
+
+    def reiniciar_apos_fork(self):
+        """
+        Prepara o registro em um processo filho criado com 'os.fork'.
+
+        A fila copiada do pai é descartada (o pai grava esses eventos), as
+        contagens são zeradas e, se o pai tinha a thread gravadora, o filho
+        inicia a sua, gravando em um arquivo próprio.
+
+        Returns:
+            None
+        """
+        ativo = self._thread is not None
+
+        self._fila = collections.deque()
+        self._trava_descartes = threading.Lock()
+        self._parar = threading.Event()
+        self._thread = None
+        self.gravados = 0
+        self.descartados = 0
+        self.rotacoes = 0
+
+        raiz, extensao = os.path.splitext(self.caminho_base)
+        self.caminho = f"{raiz}-{os.getpid()}{extensao}"
+
+        if ativo:
+            self.iniciar()
+
+    def _abrir(self):
+        """
+        Abre (ou cria) o arquivo do registro.
+
+        Returns:
+            sqlite3.Connection: A conexão com o arquivo.
+        """
+        conexao = sqlite3.connect(self.caminho)
+        conexao.executescript("""
+            CREATE TABLE IF NOT EXISTS eventos (
+                id INTEGER PRIMARY KEY,
+                instante REAL NOT NULL,
+                tipo TEXT NOT NULL,
+                ui TEXT,
+                usuario TEXT,
+                sucesso INTEGER NOT NULL,
+                detalhe TEXT
+            );
+            CREATE TRIGGER IF NOT EXISTS eventos_sem_alteracao BEFORE UPDATE ON eventos
+            BEGIN SELECT RAISE(ABORT, 'o registro de auditoria só aceita inclusões'); END;
+            CREATE TRIGGER IF NOT EXISTS eventos_sem_remocao BEFORE DELETE ON eventos
+            BEGIN SELECT RAISE(ABORT, 'o registro de auditoria só aceita inclusões'); END;
+        """)
+        return conexao
+
+    def _rotacionar(self, conexao):
+        """
+        Renomeia o arquivo atual, descarta o mais antigo e abre um novo.
+
+        Args:
+            conexao (sqlite3.Connection): A conexão com o arquivo atual.
+
+        Returns:
+            sqlite3.Connection: A conexão com o novo arquivo.
+        """
+        conexao.close()
+
+        try:
+            for numero in range(self.manter - 1, 0, -1):
+                anterior = f"{self.caminho}.{numero}"
+                if os.path.exists(anterior):
+                    os.replace(anterior, f"{self.caminho}.{numero + 1}")
+            if self.manter > 0:
+                os.replace(self.caminho, f"{self.caminho}.1")
+            else:
+                os.remove(self.caminho)
+            self.rotacoes += 1
+        except OSError as erro:
+            # Segue gravando no arquivo atual; a rotação é tentada de novo no próximo lote
+            logger.error("Falha ao rotacionar o registro de auditoria: %s", erro)
+
+        return self._abrir()
+
+    def _gravar_pendentes(self, conexao):
+        """
+        Grava, em lotes, os eventos que estavam na fila.
+
+        Args:
+            conexao (sqlite3.Connection): A conexão com o arquivo.
+
+        Returns:
+            sqlite3.Connection: A conexão em uso (outra, se o arquivo foi rotacionado).
+        """
+        while self._fila:
+            eventos = []
+            while self._fila and len(eventos) < self.lote:
+                eventos.append(self._fila.popleft())
+
+            with conexao:
+                conexao.executemany(
+                    f"INSERT INTO eventos ({', '.join(COLUNAS)}) VALUES ({', '.join('?' * len(COLUNAS))})",
+                    eventos
+                )
+            self.gravados += len(eventos)
+
+            if os.path.getsize(self.caminho) >= self.max_bytes:
+                conexao = self._rotacionar(conexao)
+
+        return conexao
+
+    def _executar(self):
+        """
+        Laço da thread gravadora: grava os pendentes a cada intervalo e ao encerrar.
+
+        Returns:
+            None
+        """
+        conexao = self._abrir()
+        try:
+            while not self._parar.wait(self.intervalo):
+                try:
+                    conexao = self._gravar_pendentes(conexao)
+                except (sqlite3.Error, OSError) as erro:
+                    # Os eventos do lote com falha se perdem; os demais seguem na fila
+                    logger.error("Falha ao gravar o registro de auditoria: %s", erro)
+            conexao = self._gravar_pendentes(conexao)
+        finally:
+            conexao.close()
+
+
+# Registro global usado pela aplicação (None se a auditoria estiver desabilitada)
+_registro = None
+
+
+def registrar(tipo, ui=None, usuario=None, sucesso=True, detalhe=None):
+    """
+    Enfileira um evento no registro global, se a auditoria estiver habilitada.
+
+    Args:
+        tipo (str): O tipo do evento (ex.: 'login', 'cadastro', 'lembrar').
+        ui (str): A interface gráfica (tk, kv, qt) de origem.
+        usuario (str): O nome de usuário ou e-mail informado.
+        sucesso (bool): Indica se a operação foi bem-sucedida.
+        detalhe (str): Um código curto (ex.: o motivo de uma rejeição).
+
+    Returns:
+        None
+    """
+    if _registro is not None:
+        _registro.registrar(tipo, ui, usuario, sucesso, detalhe)
+
+
+def parar():
+    """
+    Grava os eventos pendentes do registro global e encerra a sua thread gravadora.
+
+    Chamado automaticamente ao encerrar o interpretador; os processos que saem
+    com 'os._exit' devem chamá-lo antes.
+
+    Returns:
+        None
+    """
+    if _registro is not None:
+        _registro.parar()
+
+
+def _reiniciar_apos_fork():
+    """Recria a thread gravadora do registro global no processo filho."""
+    if _registro is not None:
+        _registro.reiniciar_apos_fork()
+
+
+os.register_at_fork(after_in_child=_reiniciar_apos_fork)
+
+
+def habilitar(caminho, **opcoes):
+    """
+    Habilita o registro global de auditoria e inicia a sua thread gravadora.
+
+    Args:
+        caminho (str): O arquivo SQLite do registro.
+        **opcoes: As demais opções de 'RegistroAuditoria'.
+
+    Returns:
+        RegistroAuditoria: O registro global.
+    """
+    global _registro
+
+    if _registro is None:
+        registro = RegistroAuditoria(caminho, **opcoes)
+        registro.iniciar()
+        _registro = registro
+
+    return _registro
+
+
+# Habilita a auditoria automaticamente se a variável de ambiente estiver definida
+if os.environ.get("CADASTRO_LOGIN_AUDITORIA"):
+    habilitar(
+        os.environ["CADASTRO_LOGIN_AUDITORIA"],
+        capacidade=int(os.environ.get("CADASTRO_LOGIN_AUDITORIA_FILA", "10000")),
+        max_bytes=int(float(os.environ.get("CADASTRO_LOGIN_AUDITORIA_MAX_MB", "10")) * 2 ** 20),
+        manter=int(os.environ.get("CADASTRO_LOGIN_AUDITORIA_MANTER", "5")),
+    )
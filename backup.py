@@ -0,0 +1,406 @@
+# -*- coding: utf-8 -*-
+"""
+Cópias de segurança a quente do banco de dados de usuários.
+
+As cópias usam a API de backup do SQLite ('sqlite3.Connection.backup'), que
+copia o banco em passos de algumas páginas com uma pausa entre eles. O bloqueio
+de leitura só é mantido durante cada passo, então os logins e cadastros seguem
+sendo atendidos durante a cópia. Se o banco for alterado por outra conexão no
+meio da cópia, o SQLite a reinicia sozinho, e o resultado é sempre um retrato
+consistente. Para que escritas frequentes não reiniciem a cópia indefinidamente,
+depois de alguns reinícios ela é refeita em um único passo (em modo WAL isso não
+bloqueia as escritas; no modo padrão elas aguardam o fim da cópia).
+
+Cada cópia é gravada em um arquivo temporário, conferida com
+'PRAGMA integrity_check' e só então renomeada. As cópias mais antigas são
+removidas (rotação).
+
+Uso (a partir da pasta raiz do projeto):
+
+    python -m backup copias/
+    python -m backup copias/ --manter 14 --paginas 256 --pausa 0.01
+    python -m backup --verificar copias/usuarios-20240101-120000-000000.db
+"""
+
+import argparse
+import atexit
+import datetime
+import logging
+import os
+import pathlib
+import sqlite3
+import sys
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+# Prefixo e extensão dos arquivos de cópia (o nome inclui o instante da cópia)
+PREFIXO = "usuarios-"
+EXTENSAO = ".db"
+
+
+class ErroBackup(Exception):
+    """Erro lançado quando uma cópia não pode ser produzida ou falha na verificação."""
+
+
+class _CopiaReiniciada(Exception):
+    """Interrompe uma cópia em passos que foi reiniciada vezes demais."""
+
+
+def _uri_leitura(caminho):
+    """
+    Monta a URI somente leitura de um arquivo.
+
+    O caminho é codificado pela 'pathlib', então nomes com '?', '#', '%' ou
+    espaços não são confundidos com parâmetros da URI.
+
+    Args:
+        caminho (str): O caminho do arquivo.
+
+    Returns:
+        str: A URI 'file:' com 'mode=ro'.
+    """
+    return pathlib.Path(caminho).resolve().as_uri() + "?mode=ro"
+
+
+def verificar_integridade(caminho):
+    """
+    Confere a integridade de um arquivo de banco de dados.
+
+    Args:
+        caminho (str): O caminho do arquivo.
+
+    Returns:
+        list: Os problemas encontrados (vazia se o arquivo estiver íntegro).
+    """
+    conexao = sqlite3.connect(_uri_leitura(caminho), uri=True)
+    try:
+        resultado = [linha[0] for linha in conexao.execute("PRAGMA integrity_check")]
+    except sqlite3.DatabaseError as erro:
+        # Arquivos muito danificados nem chegam a ser conferidos
+        return [str(erro)]
+    finally:
+        conexao.close()
+
+    return [] if resultado == ["ok"] else resultado
+
+
+def nome_copia(instante=None):
+    """
+    Monta o nome do arquivo de uma cópia.
+
+    Args:
+        instante (float): O instante da cópia (padrão: agora).
+
+    Returns:
+        str: O nome do arquivo (ex.: 'usuarios-20240101-120000-000000.db').
+    """
+    # Com os microssegundos, duas cópias no mesmo segundo não têm o mesmo nome;
+    # os nomes continuam em ordem cronológica (inclusive os antigos, sem eles)
+    instante = time.time() if instante is None else instante
+    return PREFIXO + datetime.datetime.fromtimestamp(instante).strftime("%Y%m%d-%H%M%S-%f") + EXTENSAO
+
+
+def listar_copias(diretorio):
+    """
+    Lista as cópias de um diretório, da mais antiga para a mais recente.
+
+    Args:
+        diretorio (str): O diretório das cópias.
+
+    Returns:
+        list: Os caminhos das cópias.
+    """
+    if not os.path.isdir(diretorio):
+        return []
+
+    nomes = sorted(
+        nome for nome in os.listdir(diretorio)
+        if nome.startswith(PREFIXO) and nome.endswith(EXTENSAO)
+    )
+    return [os.path.join(diretorio, nome) for nome in nomes]
+
+
+def rotacionar(diretorio, manter):
+    """
+    Remove as cópias mais antigas, mantendo apenas as mais recentes.
+
+    Args:
+        diretorio (str): O diretório das cópias.
+        manter (int): Quantas cópias são mantidas.
+
+    Returns:
+        list: Os caminhos das cópias removidas.
+    """
+    copias = listar_copias(diretorio)
+    removidas = copias[:max(0, len(copias) - manter)]
+    for caminho in removidas:
+        os.remove(caminho)
+
+    return removidas
+
+
+def fazer_backup(origem, diretorio, paginas=64, pausa=0.005, manter=7, max_reinicios=5):
+    """
+    Copia o banco de dados a quente, confere a cópia e aplica a rotação.
+
+    Args:
+        origem (str): O caminho do banco de dados copiado.
+        diretorio (str): O diretório das cópias (criado se não existir).
+        paginas (int): Quantas páginas são copiadas a cada passo.
+        pausa (float): A pausa entre os passos, em segundos.
+        manter (int): Quantas cópias são mantidas (0 desliga a rotação).
+        max_reinicios (int): Quantos reinícios são tolerados antes da cópia em um único passo.
+
+    Returns:
+        dict: O caminho, o tamanho, os passos, os reinícios, a duração e as cópias removidas.
+
+    Raises:
+        ErroBackup: Erro lançado se a origem não existir ou a cópia não estiver íntegra.
+    """
+    if not os.path.exists(origem):
+        raise ErroBackup(f"O banco de dados '{origem}' não existe.")
+
+    os.makedirs(diretorio, exist_ok=True)
+    destino = os.path.join(diretorio, nome_copia())
+    # Nunca sobrescreve uma cópia (ou a cópia em andamento) com o mesmo nome
+    while os.path.exists(destino) or os.path.exists(destino + ".tmp"):
+        destino = os.path.join(diretorio, nome_copia())
+    temporario = destino + ".tmp"
+
+    passos = reinicios = 0
+    anteriores = None
+
+    def progresso(status, restantes, total):
+        nonlocal passos, reinicios, anteriores
+        passos += 1
+        # As páginas restantes só aumentam quando o SQLite reinicia a cópia
+        if anteriores is not None and restantes > anteriores:
+            reinicios += 1
+            if reinicios > max_reinicios:
+                raise _CopiaReiniciada()
+        anteriores = restantes
+
+    inicio = time.perf_counter()
+    # Somente leitura: a cópia nunca altera o banco de origem
+    fonte = sqlite3.connect(_uri_leitura(origem), uri=True)
+    copia = sqlite3.connect(temporario)
+    try:
+        try:
+            fonte.backup(copia, pages=paginas, progress=progresso, sleep=pausa)
+        except _CopiaReiniciada:
+            fonte.backup(copia, pages=-1)
+            passos += 1
+    except sqlite3.Error as erro:
+        copia.close()
+        os.remove(temporario)
+        raise ErroBackup(f"Falha ao copiar '{origem}': {erro}") from erro
+    finally:
+        fonte.close()
+    copia.close()
+    duracao = time.perf_counter() - inicio
+
+    problemas = verificar_integridade(temporario)
+    if problemas:
+        os.remove(temporario)
+        raise ErroBackup(f"A cópia de '{origem}' não está íntegra: {'; '.join(problemas[:5])}")
+
+    os.replace(temporario, destino)
+    removidas = rotacionar(diretorio, manter) if manter > 0 else []
+
+    return {
+        "caminho": destino,
+        "bytes": os.path.getsize(destino),
+        "passos": passos,
+        "reinicios": reinicios,
+        "duracao": duracao,
+        "removidas": removidas,
+    }
+
+
+class AgendadorBackup:
+    """
+    Classe que faz cópias periódicas do banco de dados em uma thread própria.
+
+    Attributes:
+        origem (str): O caminho do banco de dados copiado.
+        diretorio (str): O diretório das cópias.
+        intervalo (float): O intervalo entre as cópias, em segundos.
+        manter (int): Quantas cópias são mantidas.
+        paginas (int): Quantas páginas são copiadas a cada passo.
+        pausa (float): A pausa entre os passos, em segundos.
+        ultima (dict): O resultado da última cópia bem-sucedida.
+        falhas (int): Quantas cópias falharam.
+    """
+
+    def __init__(self, origem, diretorio, intervalo=3600.0, manter=7, paginas=64, pausa=0.005):
+        """
+        Inicializa o agendador.
+
+        Args:
+            origem (str): O caminho do banco de dados copiado.
+            diretorio (str): O diretório das cópias.
+            intervalo (float): O intervalo entre as cópias, em segundos.
+            manter (int): Quantas cópias são mantidas.
+            paginas (int): Quantas páginas são copiadas a cada passo.
+            pausa (float): A pausa entre os passos, em segundos.
+
+        Returns:
+            None
+        """
+        self.origem = origem
+        self.diretorio = diretorio
+        self.intervalo = intervalo
+        self.manter = manter
+        self.paginas = paginas
+        self.pausa = pausa
+
+        self.ultima = None
+        self.falhas = 0
+
+        self._parar = threading.Event()
+        self._thread = None
+
+    def copiar(self):
+        """
+        Faz uma cópia agora, registrando no log o resultado ou a falha.
+
+        Returns:
+            dict / None: O resultado da cópia ou None se ela falhou.
+        """
+        try:
+            resultado = fazer_backup(self.origem, self.diretorio, self.paginas, self.pausa, self.manter)
+        except (ErroBackup, OSError, sqlite3.Error):
+            self.falhas += 1
+            logger.exception("Falha na cópia de segurança de '%s'", self.origem)
+            return None
+
+        self.ultima = resultado
+        logger.info(
+            "Cópia de segurança gravada em '%s' (%d bytes, %d passos, %d reinícios, %.2fs)",
+            resultado["caminho"], resultado["bytes"], resultado["passos"],
+            resultado["reinicios"], resultado["duracao"]
+        )
+        return resultado
+
+    def iniciar(self):
+        """
+        Inicia as cópias periódicas (a primeira cópia é feita após um intervalo).
+
+        Returns:
+            None
+        """
+        if self._thread is not None:
+            return
+
+        def executar():
+            while not self._parar.wait(self.intervalo):
+                self.copiar()
+
+        self._parar.clear()
+        self._thread = threading.Thread(target=executar, name="agendador-backup", daemon=True)
+        self._thread.start()
+
+        atexit.register(self.parar)
+
+    def parar(self):
+        """
+        Interrompe as cópias periódicas, aguardando uma cópia em andamento.
+
+        Returns:
+            None
+        """
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+# Agendador global, criado somente quando as cópias periódicas são habilitadas
+_agendador = None
+
+
+def agendar_se_configurado(origem):
+    """
+    Inicia as cópias periódicas se a variável de ambiente correspondente estiver definida.
+
+    O diretório das cópias vem de 'CADASTRO_LOGIN_BACKUP'; o intervalo (em
+    segundos) de 'CADASTRO_LOGIN_BACKUP_INTERVALO' e a quantidade de cópias
+    mantidas de 'CADASTRO_LOGIN_BACKUP_MANTER'. O agendador é único por processo.
+
+    Args:
+        origem (str): O arquivo do banco de dados copiado (None se ele estiver em
+            memória ou dividido em vários arquivos).
+
+    Returns:
+        AgendadorBackup / None: O agendador em execução ou None.
+    """
+    global _agendador
+
+    diretorio = os.environ.get("CADASTRO_LOGIN_BACKUP")
+    if not diretorio:
+        return None
+
+    if origem is None:
+        logger.warning("Cópias de segurança ignoradas: o armazenamento não é um único arquivo SQLite")
+        return None
+
+    if _agendador is None:
+        # Garante que as cópias e as falhas apareçam no log
+        logging.basicConfig(level=logging.INFO)
+
+        _agendador = AgendadorBackup(
+            origem, diretorio,
+            intervalo=float(os.environ.get("CADASTRO_LOGIN_BACKUP_INTERVALO", "3600")),
+            manter=int(os.environ.get("CADASTRO_LOGIN_BACKUP_MANTER", "7")),
+        )
+        _agendador.iniciar()
+
+    return _agendador
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Faz uma cópia de segurança a quente do banco de dados.")
+    parser.add_argument("diretorio", nargs="?", help="Diretório das cópias.")
+    parser.add_argument("--origem", help="Banco de dados copiado (padrão: CADASTRO_LOGIN_DB ou 'usuarios.db').")
+    parser.add_argument("--manter", type=int, default=7, help="Cópias mantidas (0 desliga a rotação).")
+    parser.add_argument("--paginas", type=int, default=64, help="Páginas copiadas a cada passo.")
+    parser.add_argument("--pausa", type=float, default=0.005, help="Pausa entre os passos, em segundos.")
+    parser.add_argument("--verificar", metavar="ARQUIVO", help="Apenas confere a integridade de uma cópia.")
+    argumentos = parser.parse_args()
+
+    if argumentos.verificar:
+        problemas = verificar_integridade(argumentos.verificar)
+        for problema in problemas:
+            print(problema, file=sys.stderr)
+        print(f"'{argumentos.verificar}': {'íntegra' if not problemas else 'corrompida'}", file=sys.stderr)
+        sys.exit(1 if problemas else 0)
+
+    if not argumentos.diretorio:
+        parser.error("informe o diretório das cópias ou --verificar")
+
+    # Importado aqui: o módulo 'database' importa este módulo para o agendador
+    from database import caminho_arquivo, caminho_configurado
+
+    origem = caminho_arquivo(argumentos.origem or caminho_configurado())
+    if origem is None:
+        parser.error("o banco de dados em memória não pode ser copiado por outro processo")
+
+    try:
+        resultado = fazer_backup(
+            origem, argumentos.diretorio,
+            argumentos.paginas, argumentos.pausa, argumentos.manter
+        )
+    except ErroBackup as erro:
+        print(f"ERRO! {erro}", file=sys.stderr)
+        sys.exit(1)
+
+    print(
+        f"Cópia gravada em '{resultado['caminho']}' ({resultado['bytes']} bytes, "
+        f"{resultado['passos']} passos, {resultado['reinicios']} reinícios, {resultado['duracao']:.2f}s)",
+        file=sys.stderr
+    )
+    for caminho in resultado["removidas"]:
+        print(f"Cópia antiga removida: '{caminho}'", file=sys.stderr)
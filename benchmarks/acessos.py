@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+Custo do registro dos acessos no caminho do login: gravação a cada login ou acumulada.
+
+Compara o tempo de registrar um login com uma gravação por login (um UPSERT e
+um commit, como seria um UPDATE dentro de 'fazer_login') e com o acumulador,
+que grava em lotes em uma thread com conexão própria. Em seguida, confere que
+as consultas somam os acessos ainda não gravados e que o encerramento grava
+todos os pendentes.
+
+Uso (a partir da pasta raiz do projeto):
+
+    python -m benchmarks.acessos [--usuarios N] [--logins N] [--diretorio DIR]
+"""
+
+import argparse
+import collections
+import os
+import random
+import sys
+import tempfile
+import time
+
+from acessos import AcumuladorAcessos
+from database import BancoDeDados
+
+
+# Hash fixo: o custo do bcrypt não faz parte da medição
+CRIPTOGRAFIA = b"$2b$12$" + b"x" * 53
+
+
+def medir(funcao, ids):
+    """
+    Mede o tempo médio de registrar um login.
+
+    Args:
+        funcao (callable): Registra o login de um usuário pelo id.
+        ids (list): Os ids dos usuários, na ordem dos logins.
+
+    Returns:
+        float: O tempo médio por login, em microssegundos.
+    """
+    inicio = time.perf_counter()
+    for id_usuario in ids:
+        funcao(id_usuario)
+
+    return (time.perf_counter() - inicio) / len(ids) * 1e6
+
+
+def comparar(usuarios=1000, logins=50000, diretorio=None, saida=sys.stdout):
+    """
+    Executa as medições e as conferências.
+
+    Args:
+        usuarios (int): A quantidade de usuários.
+        logins (int): A quantidade de logins registrados pelo acumulador.
+        diretorio (str): O diretório do banco de dados (padrão: um diretório temporário do sistema).
+        saida (file): O arquivo onde o relatório será escrito.
+
+    Returns:
+        dict: Os resultados.
+    """
+    aleatorio = random.Random(42)
+    ids = [aleatorio.randint(1, usuarios) for _ in range(logins)]
+    esperados = collections.Counter(ids)
+
+    resultado = {}
+    with tempfile.TemporaryDirectory(dir=diretorio) as temporario:
+        caminho = os.path.join(temporario, "usuarios.db")
+        banco_de_dados = BancoDeDados(caminho)
+        banco_de_dados.executar("PRAGMA journal_mode=WAL", nome="journal_mode").fetchone()
+        for i in range(usuarios):
+            banco_de_dados.inserir_usuario(f"usuario_{i}", f"usuario_{i}@exemplo.com", CRIPTOGRAFIA)
+
+        # A gravação por login é lenta: mede uma fração dos logins
+        resultado["gravação por login (µs)"] = medir(
+            lambda id_usuario: banco_de_dados.registrar_acessos([(id_usuario, time.time(), 1)]),
+            ids[:max(logins // 20, 1)]
+        )
+        banco_de_dados.executar_escrita("DELETE FROM acessos", nome="limpar_acessos")
+        banco_de_dados.confirmar()
+
+        acumulador = AcumuladorAcessos(banco_de_dados, intervalo=0.002)
+        acumulador.iniciar(banco_de_dados.fabrica_conexao())
+        resultado["acumulador (µs)"] = medir(acumulador.registrar, ids)
+
+        # Consulta antes de encerrar: parte dos logins ainda está só na memória
+        resultado["pendentes na consulta"] = acumulador.pendentes()
+        amostra = aleatorio.sample(sorted(esperados), min(50, len(esperados)))
+        consultas_corretas = all(acumulador.obter(id_usuario).logins == esperados[id_usuario] for id_usuario in amostra)
+
+        acumulador.fechar()
+        resultado["consultas com os pendentes"] = "ok" if consultas_corretas else "ERRO"
+        resultado["gravações (transações)"] = acumulador.gravacoes
+        resultado["linhas gravadas"] = acumulador.gravados
+        resultado["pendentes após encerrar"] = acumulador.pendentes()
+
+        gravados = dict(banco_de_dados.executar("SELECT id_usuario, logins FROM acessos", nome="listar_acessos"))
+        resultado["contagens no banco"] = "ok" if gravados == dict(esperados) else "ERRO"
+        banco_de_dados.fechar_conexao()
+
+    saida.write(f"{usuarios} usuários, {logins} logins\n")
+    for nome, valor in resultado.items():
+        saida.write(f"{nome:<32}{valor:>12.2f}\n" if isinstance(valor, float) else f"{nome:<32}{valor:>12}\n")
+
+    return resultado
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--usuarios", type=int, default=1000, help="Quantidade de usuários.")
+    parser.add_argument("--logins", type=int, default=50000, help="Quantidade de logins registrados.")
+    parser.add_argument("--diretorio", help="Diretório do banco de dados (ex.: um SSD, para medir o custo real do fsync).")
+    argumentos = parser.parse_args()
+
+    comparar(argumentos.usuarios, argumentos.logins, argumentos.diretorio)
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+Custo da detecção de alterações comparado a recarregar o cache a cada acesso.
+
+Mede, em um arquivo com usuários relembrados, o tempo de uma verificação do
+vigia ('PRAGMA data_version') e o de recarregar a primeira página de
+sugestões, que é o que um cache sem invalidação precisaria fazer a cada acesso
+para não ficar desatualizado. Em seguida, confirma que uma escrita de outro
+processo é detectada e que as escritas da própria conexão não invalidam nada.
+
+Uso (a partir da pasta raiz do projeto):
+
+    python -m benchmarks.alteracoes [--usuarios N] [--repeticoes N]
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+from alteracoes import VigiaAlteracoes
+from database import BancoDeDados
+
+
+# Hash fixo: o custo do bcrypt não faz parte da medição
+CRIPTOGRAFIA = b"$2b$12$" + b"x" * 53
+
+
+def escrever_em_outro_processo(caminho):
+    """
+    Relembra um usuário novo a partir de outra conexão, em outro processo.
+
+    Args:
+        caminho (str): O arquivo do banco de dados.
+
+    Returns:
+        None
+    """
+    banco_de_dados = BancoDeDados(caminho)
+    id_usuario = banco_de_dados.inserir_usuario("externo", "externo@exemplo.com", CRIPTOGRAFIA)
+    banco_de_dados.adicionar_relembrado("qt", id_usuario)
+    banco_de_dados.fechar_conexao()
+
+
+def medir(usuarios=5000, repeticoes=20000, saida=sys.stdout):
+    """
+    Executa as medições e a verificação da detecção.
+
+    Args:
+        usuarios (int): A quantidade de usuários relembrados.
+        repeticoes (int): A quantidade de verificações e de recargas medidas.
+        saida (file): O arquivo onde o relatório será escrito.
+
+    Returns:
+        dict: Os microssegundos por operação e as invalidações observadas.
+    """
+    resultado = {}
+    with tempfile.TemporaryDirectory() as temporario:
+        caminho = os.path.join(temporario, "usuarios.db")
+        banco_de_dados = BancoDeDados(caminho)
+        for i in range(usuarios):
+            id_usuario = banco_de_dados.inserir_usuario(f"usuario_{i}", f"usuario_{i}@exemplo.com", CRIPTOGRAFIA)
+            banco_de_dados.adicionar_relembrado("qt", id_usuario)
+
+        vigia = VigiaAlteracoes(banco_de_dados)
+        vigia.iniciar()
+
+        inicio = time.perf_counter()
+        for _ in range(repeticoes):
+            vigia.verificar()
+        resultado["verificação (µs)"] = (time.perf_counter() - inicio) / repeticoes * 1e6
+
+        inicio = time.perf_counter()
+        for _ in range(repeticoes):
+            banco_de_dados.obter_pagina_relembrados("qt", limite=50, colunas=("nome_usuario",))
+        resultado["recarga da página (µs)"] = (time.perf_counter() - inicio) / repeticoes * 1e6
+
+        banco_de_dados.inserir_usuario("local", "local@exemplo.com", CRIPTOGRAFIA)
+        resultado["invalidações após escrita local"] = int(vigia.verificar())
+
+        processo = multiprocessing.Process(target=escrever_em_outro_processo, args=(caminho,))
+        processo.start()
+        processo.join()
+        resultado["invalidações após escrita externa"] = int(vigia.verificar())
+
+        banco_de_dados.fechar_conexao()
+
+    saida.write(f"{usuarios} usuários relembrados, {repeticoes} repetições\n")
+    for nome, valor in resultado.items():
+        saida.write(f"{nome:<36}{valor:>12.2f}\n" if isinstance(valor, float) else f"{nome:<36}{valor:>12}\n")
+
+    return resultado
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--usuarios", type=int, default=5000, help="Quantidade de usuários relembrados.")
+    parser.add_argument("--repeticoes", type=int, default=20000, help="Quantidade de verificações e de recargas.")
+    argumentos = parser.parse_args()
+
+    medir(argumentos.usuarios, argumentos.repeticoes)
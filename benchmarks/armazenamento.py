@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+Comparação do custo das operações em cada armazenamento.
+
+Executa as mesmas operações (cadastros, buscas, "lembrar de mim", páginas de
+relembrados e sessões) no armazenamento em memória, no SQLite em memória e no
+SQLite em arquivo, e reporta os microssegundos por operação. A diferença entre
+os dois primeiros é o custo do SQLite em si; a diferença para o terceiro é o
+custo do disco (um commit, e portanto um fsync, por escrita).
+
+Uso (a partir da pasta raiz do projeto):
+
+    python -m benchmarks.armazenamento [--usuarios N] [--diretorio DIR]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+from armazenamento.memoria import ArmazenamentoMemoria
+from database import BancoDeDados
+
+
+# Hash fixo: o custo do bcrypt não faz parte da comparação
+CRIPTOGRAFIA = b"$2b$12$" + b"x" * 53
+
+
+def obter_armazenamentos(diretorio):
+    """
+    Obtém os armazenamentos comparados.
+
+    Args:
+        diretorio (str): O diretório do arquivo do SQLite.
+
+    Returns:
+        list: Tuplas (nome, função que cria uma instância vazia).
+    """
+    return [
+        ("memoria", ArmazenamentoMemoria),
+        ("sqlite (:memory:)", lambda: BancoDeDados(":memory:")),
+        ("sqlite (arquivo)", lambda: BancoDeDados(os.path.join(diretorio, f"usuarios_{time.time_ns()}.db"))),
+    ]
+
+
+def medir(funcao, argumentos):
+    """
+    Mede o tempo médio de uma operação.
+
+    Args:
+        funcao (callable): A operação.
+        argumentos (list): Os argumentos de cada chamada (tuplas).
+
+    Returns:
+        float: O tempo médio por chamada, em microssegundos.
+    """
+    inicio = time.perf_counter()
+    for argumento in argumentos:
+        funcao(*argumento)
+
+    return (time.perf_counter() - inicio) / len(argumentos) * 1e6
+
+
+def comparar_armazenamento(armazenamento, usuarios, consultas, aleatorio):
+    """
+    Executa as operações em um armazenamento vazio.
+
+    Args:
+        armazenamento (Armazenamento): O armazenamento medido.
+        usuarios (int): A quantidade de usuários cadastrados.
+        consultas (int): A quantidade de cada operação de leitura.
+        aleatorio (random.Random): O gerador dos valores consultados.
+
+    Returns:
+        dict: Os microssegundos por operação, pelo nome da operação.
+    """
+    nomes = [f"usuario_{i}" for i in range(usuarios)]
+    sorteados = [aleatorio.choice(nomes) for _ in range(consultas)]
+    tempos = {}
+
+    tempos["inserir_usuario"] = medir(armazenamento.inserir_usuario, [
+        (nome, f"{nome}@exemplo.com", CRIPTOGRAFIA) for nome in nomes
+    ])
+    tempos["obter_usuario (nome)"] = medir(armazenamento.obter_usuario, [(nome,) for nome in sorteados])
+    tempos["obter_usuario (e-mail)"] = medir(armazenamento.obter_usuario, [
+        (f"{nome}@exemplo.com",) for nome in sorteados
+    ])
+    tempos["consultar_existentes (100)"] = medir(armazenamento.consultar_existentes, [
+        (sorteados[i:i + 50], [f"novo_{j}@exemplo.com" for j in range(i, i + 50)])
+        for i in range(0, consultas, 50)
+    ])
+    tempos["lembrar_usuario"] = medir(armazenamento.lembrar_usuario, [
+        ("tk", nome, CRIPTOGRAFIA) for nome in nomes[::2]
+    ])
+    tempos["obter_pagina_relembrados"] = medir(armazenamento.obter_pagina_relembrados, [
+        ("tk", aleatorio.randrange(usuarios // 2), 20) for _ in range(consultas)
+    ])
+    tempos["obter_pagina_relembrados (prefixo)"] = medir(armazenamento.obter_pagina_relembrados, [
+        ("tk", 0, 20, nome[:-1]) for nome in sorteados[:consultas // 10]
+    ])
+    tempos["obter_usuario_relembrado"] = medir(armazenamento.obter_usuario_relembrado, [
+        ("tk", nome) for nome in sorteados
+    ])
+    tempos["criar_sessao"] = medir(armazenamento.criar_sessao, [
+        (f"token_{i}", i % usuarios + 1, "tk", 0.0, float(i)) for i in range(usuarios)
+    ])
+    tempos["obter_sessao"] = medir(armazenamento.obter_sessao, [
+        (f"token_{aleatorio.randrange(usuarios)}",) for _ in range(consultas)
+    ])
+    tempos["remover_sessoes_expiradas (lote 500)"] = medir(armazenamento.remover_sessoes_expiradas, [
+        (float(usuarios), 500) for _ in range(max(1, usuarios // 500))
+    ])
+
+    return tempos
+
+
+def comparar(usuarios=5000, consultas=5000, diretorio=None, saida=sys.stdout):
+    """
+    Executa a comparação em todos os armazenamentos.
+
+    Args:
+        usuarios (int): A quantidade de usuários cadastrados.
+        consultas (int): A quantidade de cada operação de leitura.
+        diretorio (str): O diretório do arquivo do SQLite (padrão: um diretório temporário).
+        saida (file): O arquivo onde o relatório será escrito.
+
+    Returns:
+        dict: Os microssegundos por operação, por armazenamento.
+    """
+    resultados = {}
+
+    with tempfile.TemporaryDirectory(dir=diretorio) as temporario:
+        for nome, criar in obter_armazenamentos(temporario):
+            armazenamento = criar()
+            try:
+                resultados[nome] = comparar_armazenamento(
+                    armazenamento, usuarios, consultas, random.Random(42)
+                )
+            finally:
+                armazenamento.fechar_conexao()
+
+    nomes = list(resultados)
+    saida.write(f"{usuarios} usuários, {consultas} consultas por operação (µs/operação)\n")
+    saida.write(f"{'operação':<38}" + "".join(f"{nome:>20}" for nome in nomes) + "\n")
+    for operacao in resultados[nomes[0]]:
+        saida.write(f"{operacao:<38}" + "".join(
+            f"{resultados[nome][operacao]:>20.2f}" for nome in nomes
+        ) + "\n")
+
+    return resultados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--usuarios", type=int, default=5000, help="Quantidade de usuários cadastrados.")
+    parser.add_argument("--consultas", type=int, default=5000, help="Quantidade de cada operação de leitura.")
+    parser.add_argument("--diretorio", help="Diretório do arquivo do SQLite (ex.: um tmpfs ou um SSD).")
+    argumentos = parser.parse_args()
+
+    comparar(argumentos.usuarios, argumentos.consultas, argumentos.diretorio)
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+Custo do registro de auditoria no caminho do login, descartes e rotação.
+
+Compara o tempo de registrar um evento com a auditoria desabilitada, com a
+fila da thread gravadora e com uma gravação síncrona (um INSERT e um commit
+por evento, como seria dentro de 'fazer_login'). Em seguida, inunda uma fila
+pequena para mostrar a contagem dos descartes e grava eventos suficientes
+para rotacionar um arquivo pequeno.
+
+Uso (a partir da pasta raiz do projeto):
+
+    python -m benchmarks.auditoria [--eventos N] [--diretorio DIR]
+"""
+
+import argparse
+import glob
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+import auditoria
+from auditoria import COLUNAS, RegistroAuditoria
+
+
+def medir(funcao, eventos):
+    """
+    Mede o tempo médio de registrar um evento.
+
+    Args:
+        funcao (callable): Registra um evento ('tipo', 'ui', 'usuario', 'sucesso').
+        eventos (int): A quantidade de eventos registrados.
+
+    Returns:
+        float: O tempo médio por evento, em microssegundos.
+    """
+    inicio = time.perf_counter()
+    for i in range(eventos):
+        funcao("login", "tk", f"usuario_{i}", True)
+
+    return (time.perf_counter() - inicio) / eventos * 1e6
+
+
+def comparar(eventos=20000, diretorio=None, saida=sys.stdout):
+    """
+    Executa as medições.
+
+    Args:
+        eventos (int): A quantidade de eventos de cada medição.
+        diretorio (str): O diretório dos arquivos (padrão: um diretório temporário do sistema).
+        saida (file): O arquivo onde o relatório será escrito.
+
+    Returns:
+        dict: Os resultados.
+    """
+    resultado = {}
+    with tempfile.TemporaryDirectory(dir=diretorio) as temporario:
+        resultado["desabilitada (µs/evento)"] = medir(auditoria.registrar, eventos)
+
+        registro = RegistroAuditoria(os.path.join(temporario, "fila.db"), capacidade=eventos)
+        registro.iniciar()
+        resultado["fila (µs/evento)"] = medir(registro.registrar, eventos)
+        registro.parar()
+        resultado["gravados pela thread"] = registro.gravados
+
+        # A gravação síncrona é lenta: mede uma fração dos eventos
+        conexao = RegistroAuditoria(os.path.join(temporario, "sincrona.db"))._abrir()
+        sql = f"INSERT INTO eventos ({', '.join(COLUNAS)}) VALUES ({', '.join('?' * len(COLUNAS))})"
+
+        def gravar(tipo, ui, usuario, sucesso):
+            with conexao:
+                conexao.execute(sql, (time.time(), tipo, ui, usuario, int(sucesso), None))
+
+        resultado["síncrona (µs/evento)"] = medir(gravar, max(eventos // 20, 1))
+        conexao.close()
+
+        # Uma fila pequena e uma gravação a cada segundo: o excesso é descartado e contado
+        registro = RegistroAuditoria(os.path.join(temporario, "cheia.db"), capacidade=1000, intervalo=1.0)
+        registro.iniciar()
+        medir(registro.registrar, eventos)
+        registro.parar()
+        resultado["fila de 1000: gravados"] = registro.gravados
+        resultado["fila de 1000: descartados"] = registro.descartados
+
+        caminho = os.path.join(temporario, "rotacao.db")
+        registro = RegistroAuditoria(caminho, lote=200, max_bytes=64 * 1024, manter=3)
+        registro.iniciar()
+        medir(registro.registrar, eventos)
+        registro.parar()
+        resultado["rotações (64 KiB, manter 3)"] = registro.rotacoes
+        resultado["arquivos mantidos"] = len(glob.glob(caminho + ".*"))
+        resultado["eventos no arquivo atual"] = sqlite3.connect(caminho).execute(
+            "SELECT COUNT(*) FROM eventos"
+        ).fetchone()[0]
+
+    saida.write(f"{eventos} eventos por medição\n")
+    for nome, valor in resultado.items():
+        saida.write(f"{nome:<32}{valor:>12.2f}\n" if isinstance(valor, float) else f"{nome:<32}{valor:>12}\n")
+
+    return resultado
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--eventos", type=int, default=20000, help="Quantidade de eventos de cada medição.")
+    parser.add_argument("--diretorio", help="Diretório dos arquivos (ex.: um SSD, para medir o custo real do fsync).")
+    argumentos = parser.parse_args()
+
+    comparar(argumentos.eventos, argumentos.diretorio)
@@ -0,0 +1,314 @@
+# -*- coding: utf-8 -*-
+"""
+Verificação de conformidade dos armazenamentos.
+
+Executa o mesmo conjunto de verificações (usuários, cadastro e login, usuários
+relembrados, paginação e sessões) em cada armazenamento e falha se algum deles
+se comportar de forma diferente do contrato de 'armazenamento.base.Armazenamento'.
+
+Uso (a partir da pasta raiz do projeto):
+
+    python -m benchmarks.conformidade_armazenamento [--armazenamento sqlite memoria fragmentado]
+"""
+
+import argparse
+import atexit
+import shutil
+import sys
+import tempfile
+
+import bcrypt
+
+from armazenamento.base import ErroChaveDuplicada
+from armazenamento.fragmentado import ArmazenamentoFragmentado
+from armazenamento.memoria import ArmazenamentoMemoria
+from database import BancoDeDados
+
+
+def criar_fragmentado():
+    """
+    Cria um armazenamento fragmentado vazio em um diretório temporário.
+
+    Returns:
+        ArmazenamentoFragmentado: O armazenamento, com 3 fragmentos (o diretório é removido ao sair).
+    """
+    diretorio = tempfile.mkdtemp(prefix="conformidade_")
+    atexit.register(shutil.rmtree, diretorio, True)
+    return ArmazenamentoFragmentado(diretorio, 3)
+
+
+# Armazenamentos verificados: nome -> função que cria uma instância vazia
+ARMAZENAMENTOS = {
+    "sqlite": lambda: BancoDeDados(":memory:"),
+    "memoria": ArmazenamentoMemoria,
+    "fragmentado": criar_fragmentado,
+}
+
+SENHA = "senha_de_teste"
+
+
+class Falha(Exception):
+    """Erro lançado quando uma verificação não é atendida."""
+
+
+def conferir(condicao, descricao):
+    """
+    Confere uma condição da verificação.
+
+    Args:
+        condicao (bool): A condição esperada.
+        descricao (str): O que foi conferido, para o relatório.
+
+    Raises:
+        Falha: Erro lançado se a condição não for atendida.
+    """
+    if not condicao:
+        raise Falha(descricao)
+
+
+def conferir_erro(tipo, funcao, descricao, motivo=None):
+    """
+    Confere se uma função lança o erro esperado.
+
+    Args:
+        tipo (type): O tipo do erro esperado.
+        funcao (callable): A função executada sem argumentos.
+        descricao (str): O que foi conferido, para o relatório.
+        motivo (str): O 'motivo' esperado no erro (opcional).
+
+    Raises:
+        Falha: Erro lançado se a função não lançar o erro esperado.
+    """
+    try:
+        funcao()
+    except tipo as erro:
+        conferir(motivo is None or getattr(erro, "motivo", None) == motivo, f"{descricao} (motivo)")
+    else:
+        raise Falha(f"{descricao}: nenhum {tipo.__name__} lançado")
+
+
+def verificar_usuarios(armazenamento, criptografia):
+    """Inserção, busca por nome e e-mail, unicidade e consulta de existentes."""
+    id_ana = armazenamento.inserir_usuario("ana", "ana@exemplo.com", criptografia)
+    id_bia = armazenamento.inserir_usuario("bia", "bia@exemplo.com", criptografia)
+    conferir(id_bia != id_ana, "os ids são distintos")
+
+    usuario = armazenamento.obter_usuario("ana")
+    conferir(tuple(usuario) == (id_ana, "ana", "ana@exemplo.com", criptografia), "busca pelo nome")
+    conferir(usuario.id == id_ana and usuario.senha == criptografia, "acesso pelos atributos")
+    conferir(armazenamento.obter_usuario("bia@exemplo.com").id == id_bia, "busca pelo e-mail")
+    conferir(armazenamento.obter_usuario("carla") is None, "usuário inexistente")
+    conferir(armazenamento.obter_usuario("ANA") is None, "a busca diferencia maiúsculas")
+
+    conferir_erro(ErroChaveDuplicada, lambda: armazenamento.inserir_usuario("ana", "outra@exemplo.com", b"x"),
+                  "nome de usuário repetido", "nome_usuario_em_uso")
+    conferir_erro(ErroChaveDuplicada, lambda: armazenamento.inserir_usuario("carla", "bia@exemplo.com", b"x"),
+                  "e-mail repetido", "email_em_uso")
+    conferir(armazenamento.obter_usuario("carla") is None, "o cadastro rejeitado não deixa resíduos")
+    armazenamento.inserir_usuario("carla", "outra@exemplo.com", criptografia)
+    conferir(armazenamento.obter_usuario("outra@exemplo.com").nome_usuario == "carla",
+             "o e-mail de um cadastro rejeitado continua livre")
+
+    nomes, emails = armazenamento.consultar_existentes(
+        ["ana", "davi", "bia"], ["bia@exemplo.com", "x@exemplo.com"], tamanho_bloco=2
+    )
+    conferir(nomes == {"ana", "bia"} and emails == {"bia@exemplo.com"}, "consulta de existentes em blocos")
+    conferir(armazenamento.consultar_existentes([], []) == (set(), set()), "consulta de existentes vazia")
+
+
+def verificar_login(armazenamento, criptografia):
+    """Cadastro, login, senha criptografada e contabilização."""
+    armazenamento.cadastrar_usuario("davi", "davi@exemplo.com", criptografia)
+
+    conferir(armazenamento.fazer_login("davi", SENHA, "tk"), "login pelo nome")
+    conferir(armazenamento.fazer_login("davi@exemplo.com", SENHA, "qt"), "login pelo e-mail")
+    conferir(not armazenamento.fazer_login("davi", "senha_errada", "tk"), "senha errada")
+    conferir(not armazenamento.fazer_login("ninguem", SENHA, "tk"), "usuário inexistente")
+    conferir(armazenamento.obter_senha_criptografada("davi", SENHA) == criptografia, "senha criptografada")
+    conferir(armazenamento.obter_senha_criptografada("davi", "senha_errada") is None,
+             "senha criptografada com a senha errada")
+
+
+def verificar_relembrados(armazenamento, criptografia):
+    """Lembrar de mim, isolamento por interface e busca de um relembrado."""
+    id_eva = armazenamento.inserir_usuario("eva", "eva@exemplo.com", criptografia)
+    armazenamento.inserir_usuario("ivo", "ivo@exemplo.com", criptografia)
+
+    armazenamento.lembrar_usuario("tk", "eva", b"hash_errado")
+    conferir(armazenamento.obter_usuarios_relembrados("tk") == [], "credenciais erradas não são relembradas")
+
+    armazenamento.lembrar_usuario("tk", "eva@exemplo.com", criptografia)
+    armazenamento.lembrar_usuario("tk", "eva", criptografia)
+    relembrados = armazenamento.obter_usuarios_relembrados("tk")
+    conferir([tuple(usuario) for usuario in relembrados] == [(id_eva, "eva", "eva@exemplo.com", criptografia)],
+             "o usuário é relembrado uma única vez")
+    conferir(relembrados[0].id_usuario == id_eva, "registro 'UsuarioRelembrado'")
+    conferir(armazenamento.adicionar_relembrado("tk", id_eva) is False, "adição repetida retorna False")
+    conferir(armazenamento.obter_usuarios_relembrados("qt") == [], "as listas são separadas por interface")
+
+    conferir(armazenamento.obter_usuario_relembrado("tk", "eva").senha == criptografia, "busca de um relembrado")
+    conferir(armazenamento.obter_usuario_relembrado("tk", "ivo") is None, "usuário não relembrado")
+    conferir(armazenamento.obter_usuario_relembrado("kv", "eva") is None, "relembrado em outra interface")
+    conferir_erro(ValueError, lambda: armazenamento.obter_usuarios_relembrados("gtk"), "interface inválida")
+
+
+def verificar_paginacao(armazenamento, criptografia):
+    """
+    Páginas keyset, cursores, filtro por prefixo e seleção de colunas.
+
+    A ordem das páginas é a do cursor, que só coincide com a ordem de inserção
+    nos armazenamentos de um único arquivo; por isso os conteúdos são comparados
+    sem a ordem, mas sem admitir repetições.
+    """
+    nomes = [f"Pag_{i:02d}" for i in range(25)] + ["pagX1", "pa%x", "outro"]
+    for nome in nomes:
+        id_usuario = armazenamento.inserir_usuario(nome, f"{nome.lower()}@exemplo.com", criptografia)
+        armazenamento.adicionar_relembrado("kv", id_usuario)
+
+    paginas = []
+    apos_id = 0
+    while apos_id is not None:
+        linhas, apos_id = armazenamento.obter_pagina_relembrados("kv", apos_id, 10)
+        paginas.append([nome for _, nome in linhas])
+    conferir([len(pagina) for pagina in paginas] == [10, 10, 8], "tamanho das páginas")
+    conferir(sorted(sum(paginas, [])) == sorted(nomes), "as páginas cobrem a lista sem repetições")
+
+    linhas, proximo = armazenamento.obter_pagina_relembrados("kv", 0, 28)
+    conferir(len(linhas) == 28 and proximo is None, "página exata não tem próxima")
+
+    iterados = [nome for _, nome in armazenamento.iterar_relembrados("kv", tamanho_pagina=7)]
+    conferir(sorted(iterados) == sorted(nomes), "iteração por todas as páginas")
+
+    com_prefixo = [nome for _, nome in armazenamento.iterar_relembrados("kv", 4, prefixo="PAG_1")]
+    conferir(sorted(com_prefixo) == [f"Pag_{i}" for i in range(10, 20)], "prefixo sem diferenciar maiúsculas")
+    conferir(sorted(nome for _, nome in armazenamento.iterar_relembrados("kv", prefixo="pag_")) == nomes[:25],
+             "o '_' do prefixo é literal")
+    conferir([nome for _, nome in armazenamento.iterar_relembrados("kv", prefixo="pa%")] == ["pa%x"],
+             "o '%' do prefixo é literal")
+    conferir([nome for _, nome in armazenamento.iterar_relembrados("kv", prefixo="outro@")] == ["outro"],
+             "o prefixo também filtra pelo e-mail")
+
+    linhas, _ = armazenamento.obter_pagina_relembrados("kv", 0, 1, "pag_00", colunas=("email", "senha"))
+    conferir(linhas == [("pag_00@exemplo.com", criptografia)], "seleção de colunas")
+    ids = [id_usuario for id_usuario, _ in armazenamento.iterar_relembrados("kv")]
+    conferir(sorted(ids) == sorted(armazenamento.obter_usuario(nome).id for nome in nomes),
+             "os ids de usuário das páginas")
+    conferir_erro(ValueError, lambda: armazenamento.obter_pagina_relembrados("kv", colunas=("id",)),
+                  "coluna inválida")
+
+
+def verificar_sessoes(armazenamento, criptografia):
+    """Criação, busca, remoção, sessões por usuário e remoção em lotes das sessões expiradas."""
+    id_usuario = armazenamento.inserir_usuario("sol", "sol@exemplo.com", criptografia)
+
+    sessao = armazenamento.criar_sessao("t0", id_usuario, "tk", 100.0, 200.0)
+    conferir(tuple(sessao) == ("t0", id_usuario, "tk", 100.0, 200.0), "sessão criada")
+    conferir(armazenamento.obter_sessao("t0") == sessao, "busca pelo token")
+    conferir(armazenamento.obter_sessao("nenhum") is None, "token inexistente")
+    conferir_erro(ErroChaveDuplicada, lambda: armazenamento.criar_sessao("t0", id_usuario, "qt", 1.0, 2.0),
+                  "token repetido", "sessao_em_uso")
+
+    conferir(armazenamento.remover_sessao("t0") is True, "remoção de uma sessão")
+    conferir(armazenamento.remover_sessao("t0") is False, "remoção repetida")
+    conferir(armazenamento.obter_sessao("t0") is None, "sessão removida")
+
+    for i in range(10):
+        armazenamento.criar_sessao(f"s{i}", id_usuario, "kv", 0.0, 300.0 + i)
+    conferir(armazenamento.remover_sessoes_expiradas(304.0, limite=3) == 3, "lote limitado")
+    conferir(armazenamento.obter_sessao("s0") is None and armazenamento.obter_sessao("s3") is not None,
+             "as mais antigas são removidas primeiro")
+    conferir(armazenamento.remover_sessoes_expiradas(304.0, limite=100) == 2, "restante das expiradas")
+    conferir(armazenamento.remover_sessoes_expiradas(304.0) == 0, "nada mais a remover")
+    conferir(armazenamento.obter_sessao("s5").expira_em == 305.0, "as válidas permanecem")
+
+    for token, criada_em in (("u0", 330.0), ("u1", 310.0), ("u2", 320.0)):
+        armazenamento.criar_sessao(token, id_usuario, "qt", criada_em, 500.0)
+    conferir([sessao.token for sessao in armazenamento.obter_sessoes_usuario(id_usuario, 400.0)]
+             == ["u1", "u2", "u0"], "sessões do usuário em ordem de criação, sem as expiradas")
+    armazenamento.remover_sessao("u2")
+    conferir([sessao.token for sessao in armazenamento.obter_sessoes_usuario(id_usuario, 400.0)]
+             == ["u1", "u0"], "sessão removida fora da lista do usuário")
+    conferir(armazenamento.obter_sessoes_usuario(id_usuario + 1000, 400.0) == [], "usuário sem sessões")
+
+
+def verificar_acessos(armazenamento, criptografia):
+    """Gravação em lote dos acessos, com o último login mais recente e as contagens somadas."""
+    ids = [armazenamento.inserir_usuario(f"luz{i}", f"luz{i}@exemplo.com", criptografia) for i in range(4)]
+
+    conferir(armazenamento.obter_acesso(ids[0]) is None, "usuário sem acessos")
+    armazenamento.registrar_acessos([(id_usuario, 100.0 + i, i + 1) for i, id_usuario in enumerate(ids)])
+    conferir(tuple(armazenamento.obter_acesso(ids[2])) == (ids[2], 102.0, 3), "acesso gravado")
+
+    armazenamento.registrar_acessos([(ids[0], 50.0, 2), (ids[1], 200.0, 1)])
+    conferir(tuple(armazenamento.obter_acesso(ids[0])) == (ids[0], 100.0, 3), "login mais antigo não substitui o gravado")
+    conferir(tuple(armazenamento.obter_acesso(ids[1])) == (ids[1], 200.0, 3), "login mais recente e contagem somada")
+    conferir(tuple(armazenamento.obter_acesso(ids[3])) == (ids[3], 103.0, 4), "usuários fora do lote permanecem")
+    armazenamento.registrar_acessos([])
+
+
+VERIFICACOES = (
+    verificar_usuarios,
+    verificar_login,
+    verificar_relembrados,
+    verificar_paginacao,
+    verificar_sessoes,
+    verificar_acessos,
+)
+
+
+def verificar_conformidade(nomes=None, saida=sys.stdout):
+    """
+    Executa todas as verificações em cada armazenamento.
+
+    Cada verificação recebe uma instância nova e vazia do armazenamento.
+
+    Args:
+        nomes (list): Os armazenamentos verificados (padrão: todos).
+        saida (file): O arquivo onde o relatório será escrito.
+
+    Returns:
+        list: As falhas encontradas, como tuplas (armazenamento, verificação, detalhe).
+    """
+    criptografia = bcrypt.hashpw(SENHA.encode(), bcrypt.gensalt(4))
+    falhas = []
+
+    for nome in nomes or ARMAZENAMENTOS:
+        for verificacao in VERIFICACOES:
+            armazenamento = ARMAZENAMENTOS[nome]()
+            try:
+                verificacao(armazenamento, criptografia)
+            except Falha as erro:
+                falhas.append((nome, verificacao.__name__, str(erro)))
+                saida.write(f"    FALHA  [{nome}] {verificacao.__name__}: {erro}\n")
+            else:
+                saida.write(f"       ok  [{nome}] {verificacao.__name__}\n")
+            finally:
+                armazenamento.fechar_conexao()
+
+    return falhas
+
+
+def main():
+    """
+    Ponto de entrada da verificação pela linha de comando.
+
+    Returns:
+        int: O código de saída (0 se todos os armazenamentos estiverem conformes).
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--armazenamento", nargs="+", choices=list(ARMAZENAMENTOS),
+                        help="Armazenamentos verificados (padrão: todos).")
+    argumentos = parser.parse_args()
+
+    falhas = verificar_conformidade(argumentos.armazenamento)
+
+    if falhas:
+        print(f"\n{len(falhas)} verificação(ões) falharam.")
+        return 1
+
+    print("\nTodos os armazenamentos estão conformes.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+Comparação dos cadastros por segundo com e sem a escrita agrupada (group commit).
+
+Vários clientes (threads) cadastram usuários ao mesmo tempo. Sem a escrita
+agrupada, os cadastros passam por uma única thread do banco, como no daemon,
+e cada um é confirmado com o seu próprio commit. Com a escrita agrupada, cada
+cliente aguarda o futuro do seu cadastro, e a thread escritora confirma
+vários cadastros por commit. O ganho depende do custo do fsync do disco.
+
+Uso (a partir da pasta raiz do projeto):
+
+    python -m benchmarks.escrita_agrupada [--clientes C] [--usuarios N] [--linhas L] [--espera-ms MS] [--diretorio DIR]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from database import BancoDeDados
+
+
+# Hash fixo: o custo do bcrypt não faz parte da medição
+CRIPTOGRAFIA = b"$2b$12$" + b"x" * 53
+
+
+def executar_clientes(clientes, usuarios, cadastrar):
+    """
+    Executa os clientes concorrentes e mede o tempo total.
+
+    Args:
+        clientes (int): A quantidade de threads clientes.
+        usuarios (int): A quantidade de cadastros por cliente.
+        cadastrar (callable): Cadastra um usuário (nome_usuario, email, senha) e
+            retorna somente após o commit.
+
+    Returns:
+        float: A duração, em segundos.
+    """
+    largada = threading.Barrier(clientes + 1)
+
+    def cliente(numero):
+        largada.wait()
+        for i in range(usuarios):
+            nome = f"c{numero}_{i}"
+            cadastrar(nome, f"{nome}@exemplo.com", CRIPTOGRAFIA)
+
+    threads = [threading.Thread(target=cliente, args=(numero,)) for numero in range(clientes)]
+    for thread in threads:
+        thread.start()
+
+    largada.wait()
+    inicio = time.perf_counter()
+    for thread in threads:
+        thread.join()
+
+    return time.perf_counter() - inicio
+
+
+def medir_isolada(caminho, clientes, usuarios):
+    """
+    Mede os cadastros confirmados um a um por uma única thread do banco.
+
+    Args:
+        caminho (str): O arquivo do banco de dados.
+        clientes (int): A quantidade de threads clientes.
+        usuarios (int): A quantidade de cadastros por cliente.
+
+    Returns:
+        dict: Os cadastros por segundo e a média de escritas por commit.
+    """
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="banco")
+    banco_de_dados = executor.submit(BancoDeDados, caminho).result()
+
+    def cadastrar(*args):
+        executor.submit(banco_de_dados.cadastrar_usuario, *args).result()
+
+    duracao = executar_clientes(clientes, usuarios, cadastrar)
+    executor.submit(banco_de_dados.fechar_conexao).result()
+    executor.shutdown()
+
+    return {"cadastros/s": clientes * usuarios / duracao, "escritas/commit": 1.0}
+
+
+def medir_agrupada(caminho, clientes, usuarios, max_linhas, max_espera):
+    """
+    Mede os cadastros confirmados em grupos pelo escritor agrupado.
+
+    Args:
+        caminho (str): O arquivo do banco de dados.
+        clientes (int): A quantidade de threads clientes.
+        usuarios (int): A quantidade de cadastros por cliente.
+        max_linhas (int): A quantidade máxima de escritas por commit.
+        max_espera (float): O tempo máximo de espera por mais escritas, em segundos.
+
+    Returns:
+        dict: Os cadastros por segundo e a média de escritas por commit.
+    """
+    banco_de_dados = BancoDeDados(caminho)
+    banco_de_dados.agrupar_escritas(max_linhas, max_espera)
+    escritor = banco_de_dados.escritor
+
+    duracao = executar_clientes(clientes, usuarios, banco_de_dados.cadastrar_usuario)
+    banco_de_dados.fechar_conexao()
+
+    return {
+        "cadastros/s": clientes * usuarios / duracao,
+        "escritas/commit": escritor.linhas / max(escritor.grupos, 1),
+    }
+
+
+def comparar(clientes=32, usuarios=100, max_linhas=50, max_espera=0.005, diretorio=None, saida=sys.stdout):
+    """
+    Executa a comparação, cada modo em um arquivo novo.
+
+    Args:
+        clientes (int): A quantidade de threads clientes.
+        usuarios (int): A quantidade de cadastros por cliente.
+        max_linhas (int): A quantidade máxima de escritas por commit.
+        max_espera (float): O tempo máximo de espera por mais escritas, em segundos.
+        diretorio (str): O diretório dos arquivos (padrão: um diretório temporário do sistema).
+        saida (file): O arquivo onde o relatório será escrito.
+
+    Returns:
+        dict: Os resultados de cada modo.
+    """
+    resultados = {}
+    with tempfile.TemporaryDirectory(dir=diretorio) as temporario:
+        resultados["commit por cadastro"] = medir_isolada(
+            os.path.join(temporario, "isolada.db"), clientes, usuarios
+        )
+        resultados[f"agrupada ({max_linhas} / {max_espera * 1000:g} ms)"] = medir_agrupada(
+            os.path.join(temporario, "agrupada.db"), clientes, usuarios, max_linhas, max_espera
+        )
+
+    saida.write(f"{clientes} clientes, {usuarios} cadastros por cliente\n")
+    saida.write(f"{'modo':<28}{'cadastros/s':>14}{'escritas/commit':>18}\n")
+    for nome, resultado in resultados.items():
+        saida.write(f"{nome:<28}{resultado['cadastros/s']:>14.0f}{resultado['escritas/commit']:>18.1f}\n")
+
+    return resultados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clientes", type=int, default=32, help="Quantidade de clientes concorrentes.")
+    parser.add_argument("--usuarios", type=int, default=100, help="Cadastros por cliente.")
+    parser.add_argument("--linhas", type=int, default=50, help="Máximo de escritas por commit.")
+    parser.add_argument("--espera-ms", type=float, default=5.0, help="Espera máxima por mais escritas, em ms.")
+    parser.add_argument("--diretorio", help="Diretório dos arquivos (ex.: um SSD, para medir o custo real do fsync).")
+    argumentos = parser.parse_args()
+
+    comparar(argumentos.clientes, argumentos.usuarios, argumentos.linhas, argumentos.espera_ms / 1000,
+             argumentos.diretorio)
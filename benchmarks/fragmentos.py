@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+Medição dos cadastros por segundo com escritores concorrentes em 1 e em N fragmentos.
+
+Vários processos cadastram usuários ao mesmo tempo, como os trabalhadores da
+API HTTP em modo pré-fork. Em um único arquivo os commits são serializados
+pela trava de escrita do SQLite; no armazenamento fragmentado, escritas em
+fragmentos diferentes são confirmadas em paralelo. Todos os arquivos usam o
+modo WAL e a sincronização padrão, como no servidor.
+
+Uso (a partir da pasta raiz do projeto):
+
+    python -m benchmarks.fragmentos [--processos P] [--usuarios N] [--fragmentos 1 2 4] [--diretorio DIR]
+"""
+
+import argparse
+import multiprocessing
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+from armazenamento.fragmentado import ArmazenamentoFragmentado
+from database import BancoDeDados
+
+
+# Hash fixo: o custo do bcrypt não faz parte da medição
+CRIPTOGRAFIA = b"$2b$12$" + b"x" * 53
+
+
+def abrir(diretorio, fragmentos):
+    """
+    Abre o armazenamento medido.
+
+    Args:
+        diretorio (str): O diretório dos arquivos.
+        fragmentos (int): O número de fragmentos (0 para um 'BancoDeDados' comum).
+
+    Returns:
+        Armazenamento: O armazenamento aberto.
+    """
+    if fragmentos == 0:
+        return BancoDeDados(os.path.join(diretorio, "usuarios.db"))
+    return ArmazenamentoFragmentado(diretorio, fragmentos)
+
+
+def escritor(diretorio, fragmentos, processo, usuarios, largada, falhas):
+    """
+    Cadastra usuários em um processo escritor.
+
+    Args:
+        diretorio (str): O diretório dos arquivos.
+        fragmentos (int): O número de fragmentos (0 para um 'BancoDeDados' comum).
+        processo (int): O número do processo, usado nos nomes de usuário.
+        usuarios (int): A quantidade de cadastros do processo.
+        largada (multiprocessing.Barrier): A barreira que inicia todos os escritores juntos.
+        falhas (multiprocessing.Value): O contador de cadastros que falharam por trava.
+
+    Returns:
+        None
+    """
+    armazenamento = abrir(diretorio, fragmentos)
+    largada.wait()
+
+    for i in range(usuarios):
+        nome = f"p{processo}_{i}"
+        try:
+            armazenamento.inserir_usuario(nome, f"{nome}@exemplo.com", CRIPTOGRAFIA)
+        except sqlite3.OperationalError:
+            with falhas.get_lock():
+                falhas.value += 1
+
+    armazenamento.fechar_conexao()
+
+
+def medir(fragmentos, processos, usuarios, diretorio):
+    """
+    Mede os cadastros por segundo de uma configuração.
+
+    Args:
+        fragmentos (int): O número de fragmentos (0 para um 'BancoDeDados' comum).
+        processos (int): A quantidade de processos escritores.
+        usuarios (int): A quantidade de cadastros por processo.
+        diretorio (str): O diretório onde os arquivos temporários são criados.
+
+    Returns:
+        tuple: (cadastros por segundo, cadastros que falharam por trava).
+    """
+    with tempfile.TemporaryDirectory(dir=diretorio) as temporario:
+        # Cria as tabelas e ativa o WAL antes dos escritores, como o servidor pré-fork
+        armazenamento = abrir(temporario, fragmentos)
+        for banco_de_dados in getattr(armazenamento, "fragmentos", [armazenamento]):
+            banco_de_dados.executar("PRAGMA journal_mode=WAL", nome="journal_mode").fetchone()
+        armazenamento.fechar_conexao()
+
+        largada = multiprocessing.Barrier(processos + 1)
+        falhas = multiprocessing.Value("i", 0)
+        escritores = [
+            multiprocessing.Process(
+                target=escritor, args=(temporario, fragmentos, processo, usuarios, largada, falhas)
+            )
+            for processo in range(processos)
+        ]
+        for processo in escritores:
+            processo.start()
+
+        largada.wait()
+        inicio = time.perf_counter()
+        for processo in escritores:
+            processo.join()
+        duracao = time.perf_counter() - inicio
+
+    return processos * usuarios / duracao, falhas.value
+
+
+def comparar(processos=4, usuarios=500, fragmentos=(1, 2, 4), diretorio=None, saida=sys.stdout):
+    """
+    Mede um único arquivo e cada número de fragmentos.
+
+    Args:
+        processos (int): A quantidade de processos escritores.
+        usuarios (int): A quantidade de cadastros por processo.
+        fragmentos (tuple): Os números de fragmentos medidos.
+        diretorio (str): O diretório dos arquivos (padrão: um diretório temporário do sistema).
+        saida (file): O arquivo onde o relatório será escrito.
+
+    Returns:
+        dict: (cadastros por segundo, falhas) por configuração.
+    """
+    configuracoes = {"sqlite (1 arquivo)": 0}
+    configuracoes.update((f"fragmentado ({total})", total) for total in fragmentos)
+
+    saida.write(f"{processos} processos, {usuarios} cadastros por processo\n")
+    saida.write(f"{'armazenamento':<24}{'cadastros/s':>14}{'falhas':>10}\n")
+
+    resultados = {}
+    for nome, total in configuracoes.items():
+        resultados[nome] = medir(total, processos, usuarios, diretorio)
+        por_segundo, falhas = resultados[nome]
+        saida.write(f"{nome:<24}{por_segundo:>14.0f}{falhas:>10}\n")
+
+    return resultados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--processos", type=int, default=4, help="Quantidade de processos escritores.")
+    parser.add_argument("--usuarios", type=int, default=500, help="Cadastros por processo.")
+    parser.add_argument("--fragmentos", type=int, nargs="+", default=[1, 2, 4], help="Números de fragmentos medidos.")
+    parser.add_argument("--diretorio", help="Diretório dos arquivos (ex.: um SSD, para medir o custo real do fsync).")
+    argumentos = parser.parse_args()
+
+    comparar(argumentos.processos, argumentos.usuarios, argumentos.fragmentos, argumentos.diretorio)
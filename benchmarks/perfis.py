@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+Comparação dos perfis de configuração do SQLite nas cargas de cadastro e de login.
+
+Para cada perfil de 'database.PERFIS', cria um banco de dados novo, mede os
+cadastros (um commit por cadastro) e, após reabrir a conexão com o cache de
+páginas do SQLite vazio, mede as buscas do login pelo nome de usuário e pelo
+e-mail. Com 'mmap_size', as páginas lidas vêm diretamente do cache do sistema
+operacional mapeado em memória, sem cópias para o cache do SQLite.
+
+O hash do bcrypt fica de fora: o custo do login medido é o do banco de dados.
+
+Uso (a partir da pasta raiz do projeto):
+
+    python -m benchmarks.perfis [--usuarios N] [--consultas N] [--perfis padrao vazao] [--diretorio DIR]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+from database import PERFIS, BancoDeDados
+
+
+# Hash fixo: o custo do bcrypt não faz parte da comparação
+CRIPTOGRAFIA = b"$2b$12$" + b"x" * 53
+
+
+def medir(funcao, argumentos):
+    """
+    Mede o tempo médio de uma operação.
+
+    Args:
+        funcao (callable): A operação.
+        argumentos (list): Os argumentos de cada chamada (tuplas).
+
+    Returns:
+        float: O tempo médio por chamada, em microssegundos.
+    """
+    inicio = time.perf_counter()
+    for argumento in argumentos:
+        funcao(*argumento)
+
+    return (time.perf_counter() - inicio) / len(argumentos) * 1e6
+
+
+def medir_perfil(perfil, caminho, usuarios, consultas, aleatorio):
+    """
+    Executa as cargas de cadastro e de login em um perfil.
+
+    Args:
+        perfil (str): O nome do perfil.
+        caminho (str): O arquivo do banco de dados (novo).
+        usuarios (int): A quantidade de usuários cadastrados.
+        consultas (int): A quantidade de buscas de cada tipo.
+        aleatorio (random.Random): O gerador dos usuários buscados.
+
+    Returns:
+        dict: Os microssegundos por operação e os PRAGMAs efetivos.
+    """
+    nomes = [f"usuario_{i}" for i in range(usuarios)]
+    sorteados = [aleatorio.choice(nomes) for _ in range(consultas)]
+    resultado = {}
+
+    banco_de_dados = BancoDeDados(caminho, perfil)
+    resultado["cadastro"] = medir(banco_de_dados.cadastrar_usuario, [
+        (nome, f"{nome}@exemplo.com", CRIPTOGRAFIA) for nome in nomes
+    ])
+    banco_de_dados.fechar_conexao()
+
+    # Reabre a conexão para que as leituras comecem com o cache do SQLite vazio
+    banco_de_dados = BancoDeDados(caminho, perfil)
+    resultado["pragmas"] = banco_de_dados.aplicar_perfil()
+    resultado["login (nome)"] = medir(banco_de_dados.obter_usuario, [(nome,) for nome in sorteados])
+    resultado["login (e-mail)"] = medir(banco_de_dados.obter_usuario, [
+        (f"{nome}@exemplo.com",) for nome in sorteados
+    ])
+    banco_de_dados.fechar_conexao()
+
+    return resultado
+
+
+def comparar(usuarios=10000, consultas=20000, perfis=None, diretorio=None, saida=sys.stdout):
+    """
+    Executa as cargas em cada perfil e escreve a tabela comparativa.
+
+    Args:
+        usuarios (int): A quantidade de usuários cadastrados.
+        consultas (int): A quantidade de buscas de cada tipo.
+        perfis (list): Os perfis comparados (padrão: todos).
+        diretorio (str): O diretório dos arquivos (padrão: um diretório temporário do sistema).
+        saida (file): O arquivo onde o relatório será escrito.
+
+    Returns:
+        dict: Os resultados de cada perfil.
+    """
+    resultados = {}
+    with tempfile.TemporaryDirectory(dir=diretorio) as temporario:
+        for perfil in perfis or PERFIS:
+            resultados[perfil] = medir_perfil(
+                perfil, os.path.join(temporario, f"{perfil}.db"), usuarios, consultas, random.Random(42)
+            )
+
+    operacoes = ("cadastro", "login (nome)", "login (e-mail)")
+    saida.write(f"{usuarios} usuários, {consultas} buscas de cada tipo (µs/operação)\n")
+    saida.write(f"{'perfil':<14}" + "".join(f"{operacao:>16}" for operacao in operacoes)
+                + f"{'journal':>10}{'synchronous':>13}{'mmap (MiB)':>12}\n")
+    for perfil, resultado in resultados.items():
+        pragmas = resultado["pragmas"]
+        saida.write(
+            f"{perfil:<14}" + "".join(f"{resultado[operacao]:>16.2f}" for operacao in operacoes)
+            + f"{pragmas.get('journal_mode', 'delete'):>10}"
+            + f"{pragmas.get('synchronous', 2):>13}"
+            + f"{(pragmas.get('mmap_size') or 0) / 2 ** 20:>12.0f}\n"
+        )
+
+    return resultados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--usuarios", type=int, default=10000, help="Quantidade de usuários cadastrados.")
+    parser.add_argument("--consultas", type=int, default=20000, help="Quantidade de buscas de cada tipo.")
+    parser.add_argument("--perfis", nargs="+", choices=list(PERFIS), help="Perfis comparados (padrão: todos).")
+    parser.add_argument("--diretorio", help="Diretório dos arquivos (ex.: um SSD, para medir o custo real do fsync).")
+    argumentos = parser.parse_args()
+
+    comparar(argumentos.usuarios, argumentos.consultas, argumentos.perfis, argumentos.diretorio)
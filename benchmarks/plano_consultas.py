@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+"""
+Verificação dos planos de execução (EXPLAIN QUERY PLAN) das consultas frequentes.
+
+Popula um banco de dados temporário, executa cada operação do 'BancoDeDados' e
+do 'InsereDados' capturando as instruções emitidas e falha se alguma consulta
+frequente percorrer uma tabela inteira (SCAN) ou depender de um índice
+automático criado em tempo de execução.
+
+Uso (a partir da pasta raiz do projeto):
+
+    python -m benchmarks.plano_consultas [--usuarios N]
+"""
+
+import argparse
+import sys
+
+import bcrypt
+
+from controller import InsereDados, ValidadorLote
+from database import BancoDeDados
+from rastreamento_sql import normalizar_sql
+
+
+# Credenciais do usuário usado nas consultas
+NOME_USUARIO = "usuario_42"
+EMAIL = "usuario_42@exemplo.com"
+SENHA = "senha_de_teste"
+
+# Instruções que possuem plano de execução
+_COMANDOS_DML = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+
+
+def popular_banco(banco_de_dados, usuarios):
+    """
+    Insere usuários e usuários relembrados fictícios no banco de dados.
+
+    Todos os usuários compartilham o mesmo hash de senha, gerado uma única vez
+    com custo baixo, para que a preparação não seja dominada pelo bcrypt.
+
+    Args:
+        banco_de_dados (BancoDeDados): O banco de dados a ser populado.
+        usuarios (int): A quantidade de usuários a ser inserida.
+
+    Returns:
+        bytes: O hash da senha compartilhada pelos usuários.
+    """
+    criptografia = bcrypt.hashpw(SENHA.encode(), bcrypt.gensalt(4))
+
+    banco_de_dados.cursor.executemany(
+        "INSERT INTO usuarios (nome_usuario, email, senha) VALUES (?, ?, ?)",
+        (
+            (f"usuario_{i}", f"usuario_{i}@exemplo.com", criptografia)
+            for i in range(usuarios)
+        )
+    )
+    for ui in ("tk", "qt", "kv"):
+        banco_de_dados.cursor.executemany(
+            f"INSERT INTO {ui}_usuarios_relembrados (id_usuario) VALUES (?)",
+            ((id_usuario,) for id_usuario in range(1, usuarios + 1, 10))
+        )
+    banco_de_dados.conexao.commit()
+
+    return criptografia
+
+
+def cadastrar_rejeitado(banco_de_dados):
+    """
+    Tenta cadastrar um usuário cujo nome já está em uso.
+
+    Args:
+        banco_de_dados (BancoDeDados): O banco de dados utilizado.
+
+    Returns:
+        None
+    """
+    try:
+        InsereDados(banco_de_dados, NOME_USUARIO, "outro@exemplo.com", SENHA)
+    except ValueError:
+        pass
+
+
+def obter_operacoes(criptografia):
+    """
+    Obtém as operações exercitadas pela verificação.
+
+    Args:
+        criptografia (bytes): O hash da senha dos usuários fictícios.
+
+    Returns:
+        list: Tuplas (nome, função, permite_scan). 'permite_scan' indica as
+            operações que, por definição, percorrem a tabela inteira.
+    """
+    operacoes = [
+        ("fazer_login (nome)", lambda b: b.fazer_login(NOME_USUARIO, SENHA), False),
+        ("fazer_login (e-mail)", lambda b: b.fazer_login(EMAIL, SENHA), False),
+        ("obter_senha_criptografada", lambda b: b.obter_senha_criptografada(NOME_USUARIO, SENHA), False),
+        ("InsereDados", lambda b: InsereDados(b, "usuario_novo", "novo@exemplo.com", SENHA), False),
+        ("InsereDados (rejeitado)", cadastrar_rejeitado, False),
+        ("ValidadorLote", lambda b: ValidadorLote(b, tamanho_bloco=50).validar(
+            (f"usuario_{i * 7}", f"lote_{i}@exemplo.com") for i in range(120)
+        ), False),
+        ("criar_sessao", lambda b: b.criar_sessao("token_de_teste", 42, "tk", 0.0, 3600.0), False),
+        ("obter_sessao", lambda b: b.obter_sessao("token_de_teste"), False),
+        ("obter_sessoes_usuario", lambda b: b.obter_sessoes_usuario(42, 0.0), False),
+        ("remover_sessoes_expiradas", lambda b: b.remover_sessoes_expiradas(7200.0, 100), False),
+        ("remover_sessao", lambda b: b.remover_sessao("token_de_teste"), False),
+        ("registrar_acessos", lambda b: b.registrar_acessos([(42, 0.0, 1), (43, 0.0, 2)]), False),
+        ("obter_acesso", lambda b: b.obter_acesso(42), False),
+    ]
+
+    for ui in ("tk", "qt", "kv"):
+        operacoes += [
+            (f"lembrar_usuario ({ui})",
+             lambda b, ui=ui: b.lembrar_usuario(ui, NOME_USUARIO, criptografia), False),
+            (f"checar_id_usuario_relembrado ({ui})",
+             lambda b, ui=ui: b.checar_id_usuario_relembrado(ui, 43), False),
+            (f"checar_nome_usuario_email_relembrado ({ui})",
+             lambda b, ui=ui: b.checar_nome_usuario_email_relembrado(ui, EMAIL), False),
+            (f"obter_usuarios_relembrados ({ui})",
+             lambda b, ui=ui: b.obter_usuarios_relembrados(ui), True),
+            (f"obter_pagina_relembrados ({ui})",
+             lambda b, ui=ui: b.obter_pagina_relembrados(ui, 500, 20, "usuario_9"), False),
+            (f"obter_usuario_relembrado ({ui})",
+             lambda b, ui=ui: b.obter_usuario_relembrado(ui, NOME_USUARIO), False),
+        ]
+
+    return operacoes
+
+
+def plano_problematico(detalhe):
+    """
+    Verifica se uma linha do plano de execução indica uma busca O(n).
+
+    Args:
+        detalhe (str): O texto de uma linha do EXPLAIN QUERY PLAN.
+
+    Returns:
+        bool: True se a linha for um SCAN ou usar um índice automático.
+    """
+    # 'SCAN CONSTANT ROW' percorre a única linha de um 'SELECT ?' sem tabela
+    if detalhe == "SCAN CONSTANT ROW":
+        return False
+    return detalhe.startswith("SCAN") or "AUTOMATIC" in detalhe
+
+
+def verificar_planos(usuarios=10000, saida=sys.stdout):
+    """
+    Executa a verificação dos planos em um banco de dados temporário.
+
+    Args:
+        usuarios (int): A quantidade de usuários fictícios.
+        saida (file): O arquivo onde o relatório será escrito.
+
+    Returns:
+        list: As falhas encontradas, como tuplas (operação, instrução, detalhe).
+    """
+    falhas = []
+    # Um banco de dados em memória isola a verificação (e permite execuções em paralelo)
+    banco_de_dados = BancoDeDados(":memory:")
+    criptografia = popular_banco(banco_de_dados, usuarios)
+
+    for nome, funcao, permite_scan in obter_operacoes(criptografia):
+        capturadas = []
+        banco_de_dados.conexao.set_trace_callback(capturadas.append)
+        funcao(banco_de_dados)
+        banco_de_dados.conexao.set_trace_callback(None)
+
+        # Explica cada forma de instrução uma única vez por operação
+        formas = {}
+        for sql in capturadas:
+            if sql.lstrip().upper().startswith(_COMANDOS_DML):
+                formas.setdefault(normalizar_sql(sql), sql)
+
+        for forma, sql in formas.items():
+            plano = banco_de_dados.conexao.execute(
+                "EXPLAIN QUERY PLAN " + sql
+            ).fetchall()
+            saida.write(f"[{nome}] {forma}\n")
+
+            for _, _, _, detalhe in plano:
+                situacao = "ok"
+                if plano_problematico(detalhe):
+                    situacao = "permitido" if permite_scan else "FALHA"
+                    if not permite_scan:
+                        falhas.append((nome, forma, detalhe))
+                saida.write(f"    {situacao:>9}  {detalhe}\n")
+
+    banco_de_dados.fechar_conexao()
+
+    return falhas
+
+
+def main():
+    """
+    Ponto de entrada da verificação pela linha de comando.
+
+    Returns:
+        int: O código de saída (0 se todos os planos forem aceitáveis).
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--usuarios", type=int, default=10000,
+                        help="Quantidade de usuários fictícios no banco de dados.")
+    argumentos = parser.parse_args()
+
+    falhas = verificar_planos(argumentos.usuarios)
+
+    if falhas:
+        print(f"\n{len(falhas)} consulta(s) frequente(s) percorrem tabelas inteiras:")
+        for nome, forma, detalhe in falhas:
+            print(f"  - [{nome}] {detalhe}: {forma}")
+        return 1
+
+    print("\nTodas as consultas frequentes utilizam índices.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+Comparação de memória e custo de construção das linhas de usuários relembrados.
+
+Lê a mesma consulta de usuários relembrados como tuplas (o formato antigo),
+como registros 'UsuarioRelembrado' com '__slots__' e como 'sqlite3.Row', e
+reporta os bytes por registro (do contêiner e no total, medidos com o
+tracemalloc) e o tempo de construção por registro.
+
+Uso (a partir da pasta raiz do projeto):
+
+    python -m benchmarks.registros [--usuarios N] [--repeticoes N]
+"""
+
+import argparse
+import gc
+import sqlite3
+import statistics
+import sys
+import time
+import tracemalloc
+
+from database import BancoDeDados
+from registros import UsuarioRelembrado
+
+
+# Formatos comparados: (nome, row_factory)
+FORMATOS = (
+    ("tupla", None),
+    ("UsuarioRelembrado", UsuarioRelembrado.fabrica),
+    ("sqlite3.Row", sqlite3.Row),
+)
+
+CONSULTA = """
+    SELECT id_usuario, nome_usuario, email, senha FROM usuarios AS u
+    JOIN tk_usuarios_relembrados AS ur ON u.id = ur.id_usuario
+"""
+
+
+def popular_banco(banco_de_dados, usuarios):
+    """
+    Insere usuários fictícios, todos relembrados pela interface Tk.
+
+    Args:
+        banco_de_dados (BancoDeDados): O banco de dados a ser populado.
+        usuarios (int): A quantidade de usuários a ser inserida.
+
+    Returns:
+        None
+    """
+    criptografia = b"$2b$12$" + b"x" * 53
+    banco_de_dados.cursor.executemany(
+        "INSERT INTO usuarios (nome_usuario, email, senha) VALUES (?, ?, ?)",
+        ((f"usuario_{i}", f"usuario_{i}@exemplo.com", criptografia) for i in range(usuarios))
+    )
+    banco_de_dados.cursor.executemany(
+        "INSERT INTO tk_usuarios_relembrados (id_usuario) VALUES (?)",
+        ((id_usuario,) for id_usuario in range(1, usuarios + 1))
+    )
+    banco_de_dados.conexao.commit()
+
+
+def medir_memoria(banco_de_dados, fabrica):
+    """
+    Mede a memória retida por uma lista com todas as linhas da consulta.
+
+    Args:
+        banco_de_dados (BancoDeDados): O banco de dados populado.
+        fabrica (callable): A 'row_factory' usada (None para tuplas).
+
+    Returns:
+        tuple: (bytes por registro no total, bytes por registro do contêiner).
+    """
+    gc.collect()
+    tracemalloc.start()
+    antes = tracemalloc.get_traced_memory()[0]
+
+    linhas = banco_de_dados.executar(CONSULTA, fabrica=fabrica).fetchall()
+
+    gc.collect()
+    total = tracemalloc.get_traced_memory()[0] - antes
+    tracemalloc.stop()
+
+    conteiner = sys.getsizeof(linhas[0])
+    return total / len(linhas), conteiner
+
+
+def medir_construcao(banco_de_dados, fabrica, repeticoes):
+    """
+    Mede o tempo para ler e construir todas as linhas da consulta.
+
+    Args:
+        banco_de_dados (BancoDeDados): O banco de dados populado.
+        fabrica (callable): A 'row_factory' usada (None para tuplas).
+        repeticoes (int): Quantas vezes a leitura é repetida (vale a mediana).
+
+    Returns:
+        float: O tempo mediano por registro, em microssegundos.
+    """
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        linhas = banco_de_dados.executar(CONSULTA, fabrica=fabrica).fetchall()
+        tempos.append((time.perf_counter() - inicio) / len(linhas))
+        del linhas
+
+    return statistics.median(tempos) * 1e6
+
+
+def comparar(usuarios=100000, repeticoes=5, saida=sys.stdout):
+    """
+    Executa a comparação em um banco de dados temporário.
+
+    Args:
+        usuarios (int): A quantidade de usuários relembrados.
+        repeticoes (int): Quantas vezes cada leitura é repetida.
+        saida (file): O arquivo onde o relatório será escrito.
+
+    Returns:
+        dict: Os resultados por formato: (bytes totais, bytes do contêiner, µs por registro).
+    """
+    resultados = {}
+    # Um banco de dados em memória isola a comparação (e permite execuções em paralelo)
+    banco_de_dados = BancoDeDados(":memory:")
+    popular_banco(banco_de_dados, usuarios)
+
+    for nome, fabrica in FORMATOS:
+        total, conteiner = medir_memoria(banco_de_dados, fabrica)
+        tempo = medir_construcao(banco_de_dados, fabrica, repeticoes)
+        resultados[nome] = (total, conteiner, tempo)
+
+    banco_de_dados.fechar_conexao()
+
+    saida.write(f"{usuarios} usuários relembrados, mediana de {repeticoes} leituras\n")
+    saida.write(f"{'formato':<18} {'bytes/registro':>15} {'contêiner':>10} {'µs/registro':>12}\n")
+    for nome, (total, conteiner, tempo) in resultados.items():
+        saida.write(f"{nome:<18} {total:>15.1f} {conteiner:>10} {tempo:>12.3f}\n")
+
+    return resultados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--usuarios", type=int, default=100000, help="Quantidade de usuários relembrados.")
+    parser.add_argument("--repeticoes", type=int, default=5, help="Repetições de cada leitura.")
+    argumentos = parser.parse_args()
+
+    comparar(argumentos.usuarios, argumentos.repeticoes)
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+Comparação da latência das leituras no arquivo e na réplica em memória.
+
+Popula um arquivo com usuários e relembrados e mede, após reabrir a conexão,
+as leituras do login (pelo nome de usuário e pelo e-mail), do "lembrar de mim"
+e da paginação por prefixo em três modos: o arquivo com o perfil 'padrao', o
+arquivo com o perfil 'equilibrado' (com 'mmap_size') e a réplica em memória.
+Também mede o tempo de carga da réplica, o custo de um cadastro com e sem
+ela e, ao final, executa a verificação de consistência da réplica.
+
+Uso (a partir da pasta raiz do projeto):
+
+    python -m benchmarks.replica [--usuarios N] [--consultas N] [--diretorio DIR]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+from database import BancoDeDados
+
+
+# Hash fixo: o custo do bcrypt não faz parte da comparação
+CRIPTOGRAFIA = b"$2b$12$" + b"x" * 53
+
+MODOS = {
+    "disco (padrao)": {"perfil": "padrao"},
+    "disco (equilibrado)": {"perfil": "equilibrado"},
+    "réplica": {"perfil": "padrao", "replica": True},
+}
+
+
+def medir(funcao, argumentos):
+    """
+    Mede o tempo médio de uma operação.
+
+    Args:
+        funcao (callable): A operação.
+        argumentos (list): Os argumentos de cada chamada (tuplas).
+
+    Returns:
+        float: O tempo médio por chamada, em microssegundos.
+    """
+    inicio = time.perf_counter()
+    for argumento in argumentos:
+        funcao(*argumento)
+
+    return (time.perf_counter() - inicio) / len(argumentos) * 1e6
+
+
+def popular(caminho, usuarios):
+    """
+    Cadastra os usuários e relembra um em cada dez na interface 'tk'.
+
+    Args:
+        caminho (str): O arquivo do banco de dados (novo).
+        usuarios (int): A quantidade de usuários cadastrados.
+
+    Returns:
+        list: Os nomes de usuário cadastrados.
+    """
+    nomes = [f"usuario_{i:06d}" for i in range(usuarios)]
+    banco_de_dados = BancoDeDados(caminho)
+    for nome in nomes:
+        id_usuario = banco_de_dados.inserir_usuario(nome, f"{nome}@exemplo.com", CRIPTOGRAFIA)
+        if id_usuario % 10 == 0:
+            banco_de_dados.adicionar_relembrado("tk", id_usuario)
+    banco_de_dados.fechar_conexao()
+
+    return nomes
+
+
+def medir_modo(caminho, modo, nomes, consultas, aleatorio):
+    """
+    Mede as leituras e um lote de cadastros em um modo.
+
+    Args:
+        caminho (str): O arquivo do banco de dados (já populado).
+        modo (dict): Os argumentos de 'BancoDeDados' do modo.
+        nomes (list): Os nomes de usuário cadastrados.
+        consultas (int): A quantidade de leituras de cada tipo.
+        aleatorio (random.Random): O gerador dos usuários buscados.
+
+    Returns:
+        dict: Os microssegundos por operação, a carga em ms e os problemas da réplica.
+    """
+    sorteados = [aleatorio.choice(nomes) for _ in range(consultas)]
+    # Os relembrados são os usuários de id múltiplo de dez (posição 9, 19, ... da lista)
+    relembrados = [(nomes[aleatorio.randrange(len(nomes) // 10) * 10 + 9],) for _ in range(consultas)]
+    prefixos = [(f"usuario_{aleatorio.randrange(1000):03d}",) for _ in range(consultas // 10)]
+    resultado = {}
+
+    inicio = time.perf_counter()
+    banco_de_dados = BancoDeDados(caminho, **modo)
+    resultado["abertura (ms)"] = (time.perf_counter() - inicio) * 1000
+
+    resultado["login (nome)"] = medir(banco_de_dados.obter_usuario, [(nome,) for nome in sorteados])
+    resultado["login (e-mail)"] = medir(banco_de_dados.obter_usuario, [
+        (f"{nome}@exemplo.com",) for nome in sorteados
+    ])
+    resultado["relembrado"] = medir(
+        lambda nome: banco_de_dados.obter_usuario_relembrado("tk", nome), relembrados
+    )
+    resultado["página (prefixo)"] = medir(
+        lambda prefixo: banco_de_dados.obter_pagina_relembrados("tk", limite=20, prefixo=prefixo), prefixos
+    )
+    resultado["cadastro"] = medir(banco_de_dados.inserir_usuario, [
+        (f"novo_{i}", f"novo_{i}@exemplo.com", CRIPTOGRAFIA) for i in range(max(consultas // 20, 1))
+    ])
+
+    resultado["problemas"] = banco_de_dados.verificar_replica() if banco_de_dados.disco is not None else None
+    banco_de_dados.fechar_conexao()
+
+    return resultado
+
+
+def comparar(usuarios=50000, consultas=20000, diretorio=None, saida=sys.stdout):
+    """
+    Executa as leituras em cada modo, sempre sobre uma cópia do mesmo arquivo populado.
+
+    Args:
+        usuarios (int): A quantidade de usuários cadastrados.
+        consultas (int): A quantidade de leituras de cada tipo.
+        diretorio (str): O diretório dos arquivos (padrão: um diretório temporário do sistema).
+        saida (file): O arquivo onde o relatório será escrito.
+
+    Returns:
+        dict: Os resultados de cada modo.
+    """
+    resultados = {}
+    with tempfile.TemporaryDirectory(dir=diretorio) as temporario:
+        original = os.path.join(temporario, "usuarios.db")
+        nomes = popular(original, usuarios)
+        with open(original, "rb") as arquivo:
+            conteudo = arquivo.read()
+
+        for numero, (nome, modo) in enumerate(MODOS.items()):
+            # Cada modo cadastra usuários: parte de uma cópia intacta do arquivo
+            caminho = os.path.join(temporario, f"modo_{numero}.db")
+            with open(caminho, "wb") as arquivo:
+                arquivo.write(conteudo)
+            resultados[nome] = medir_modo(caminho, modo, nomes, consultas, random.Random(42))
+
+    operacoes = ("login (nome)", "login (e-mail)", "relembrado", "página (prefixo)", "cadastro")
+    saida.write(f"{usuarios} usuários, {consultas} leituras de cada tipo (µs/operação)\n")
+    saida.write(f"{'modo':<22}" + "".join(f"{operacao:>18}" for operacao in operacoes) + f"{'abertura (ms)':>15}\n")
+    for nome, resultado in resultados.items():
+        saida.write(
+            f"{nome:<22}" + "".join(f"{resultado[operacao]:>18.2f}" for operacao in operacoes)
+            + f"{resultado['abertura (ms)']:>15.1f}\n"
+        )
+
+    problemas = resultados["réplica"]["problemas"]
+    saida.write("Verificação da réplica: " + ("; ".join(problemas) if problemas else "idêntica ao arquivo") + "\n")
+
+    return resultados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--usuarios", type=int, default=50000, help="Quantidade de usuários cadastrados.")
+    parser.add_argument("--consultas", type=int, default=20000, help="Quantidade de leituras de cada tipo.")
+    parser.add_argument("--diretorio", help="Diretório dos arquivos.")
+    argumentos = parser.parse_args()
+
+    comparar(argumentos.usuarios, argumentos.consultas, argumentos.diretorio)
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+Medição das sessões sob muitas aberturas: custo das buscas e tamanho da tabela.
+
+Abre sessões curtas sem parar para usuários sorteados, com o limite de sessões
+simultâneas por usuário e a thread de limpeza em uma conexão própria, e
+acompanha o número de linhas da tabela 'sessoes'. Mede também a busca de uma
+sessão ativa pelo gerenciador (memória do processo) e diretamente no banco.
+
+Uso (a partir da pasta raiz do projeto):
+
+    python -m benchmarks.sessoes [--usuarios N] [--segundos S] [--duracao S] [--limite N]
+"""
+
+import argparse
+import functools
+import os
+import random
+import sys
+import tempfile
+import time
+
+from database import BancoDeDados
+from sessoes import GerenciadorSessoes
+
+
+# Hash fixo: o custo do bcrypt não faz parte da medição
+CRIPTOGRAFIA = b"$2b$12$" + b"x" * 53
+
+
+def contar_sessoes(banco_de_dados):
+    """
+    Conta as linhas da tabela de sessões.
+
+    Args:
+        banco_de_dados (BancoDeDados): O banco de dados.
+
+    Returns:
+        int: A quantidade de linhas.
+    """
+    return banco_de_dados.executar("SELECT COUNT(*) FROM sessoes", nome="contar_sessoes").fetchone()[0]
+
+
+def medir(usuarios=1000, segundos=5.0, duracao=0.5, limite=3, saida=sys.stdout):
+    """
+    Executa a carga de aberturas e as medições das buscas.
+
+    Args:
+        usuarios (int): A quantidade de usuários.
+        segundos (float): A duração da carga de aberturas.
+        duracao (float): A validade de cada sessão, em segundos.
+        limite (int): A quantidade máxima de sessões simultâneas por usuário.
+        saida (file): O arquivo onde o relatório será escrito.
+
+    Returns:
+        dict: Os resultados.
+    """
+    aleatorio = random.Random(42)
+    resultado = {}
+    with tempfile.TemporaryDirectory() as temporario:
+        caminho = os.path.join(temporario, "usuarios.db")
+        banco_de_dados = BancoDeDados(caminho)
+        banco_de_dados.executar("PRAGMA journal_mode=WAL", nome="journal_mode").fetchone()
+        for i in range(usuarios):
+            banco_de_dados.inserir_usuario(f"usuario_{i}", f"usuario_{i}@exemplo.com", CRIPTOGRAFIA)
+
+        gerenciador = GerenciadorSessoes(banco_de_dados, duracao, limite, lote=200)
+        gerenciador.iniciar_limpeza(functools.partial(BancoDeDados, caminho), intervalo=duracao / 2)
+
+        maximo = 0
+        tokens = []
+        inicio = time.perf_counter()
+        while time.perf_counter() - inicio < segundos:
+            sessao = gerenciador.abrir(aleatorio.randint(1, usuarios), "tk")
+            tokens.append(sessao.token)
+            if gerenciador.abertas % 500 == 0:
+                maximo = max(maximo, contar_sessoes(banco_de_dados))
+        resultado["aberturas/s"] = gerenciador.abertas / (time.perf_counter() - inicio)
+
+        # Busca as sessões mais recentes, ainda ativas
+        recentes = tokens[-200:] * 50
+        inicio = time.perf_counter()
+        for token in recentes:
+            gerenciador.obter(token)
+        resultado["obter (gerenciador, µs)"] = (time.perf_counter() - inicio) / len(recentes) * 1e6
+
+        inicio = time.perf_counter()
+        for token in recentes:
+            banco_de_dados.obter_sessao(token)
+        resultado["obter_sessao (banco, µs)"] = (time.perf_counter() - inicio) / len(recentes) * 1e6
+
+        gerenciador.parar_limpeza()
+        resultado["sessões abertas"] = gerenciador.abertas
+        resultado["encerradas pelo limite"] = gerenciador.excedentes
+        resultado["removidas pela limpeza"] = gerenciador.removidas
+        resultado["maior tamanho da tabela"] = maximo
+        resultado["tamanho final da tabela"] = contar_sessoes(banco_de_dados)
+        banco_de_dados.fechar_conexao()
+
+    saida.write(f"{usuarios} usuários, {segundos:g} s de aberturas, sessões de {duracao:g} s, "
+                f"até {limite} por usuário\n")
+    for nome, valor in resultado.items():
+        saida.write(f"{nome:<28}{valor:>12.2f}\n" if isinstance(valor, float) else f"{nome:<28}{valor:>12}\n")
+
+    return resultado
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--usuarios", type=int, default=1000, help="Quantidade de usuários.")
+    parser.add_argument("--segundos", type=float, default=5.0, help="Duração da carga de aberturas.")
+    parser.add_argument("--duracao", type=float, default=0.5, help="Validade de cada sessão, em segundos.")
+    parser.add_argument("--limite", type=int, default=3, help="Sessões simultâneas por usuário.")
+    argumentos = parser.parse_args()
+
+    medir(argumentos.usuarios, argumentos.segundos, argumentos.duracao, argumentos.limite)
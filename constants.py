@@ -12,3 +12,6 @@ C_ERROR = get_hex_from_rgb(255, 0, 0)
 C_LIGHTYELLOW = get_hex_from_rgb(255, 255, 100)
 # Cor usada para notificações de erros
 C_WHITE = get_hex_from_rgb(255, 255, 255)
+
+# Quantidade de usuários relembrados sugeridos de cada vez nos campos de login
+TAMANHO_PAGINA_SUGESTOES = 20
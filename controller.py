@@ -4,6 +4,119 @@
 
 import bcrypt
 import re
+import time
+
+import auditoria
+import metricas
+
+
+class ErroValidacao(ValueError):
+    """
+    Erro lançado quando um dado de cadastro não passa na validação.
+
+    Attributes:
+        motivo (str): Um código curto que identifica o motivo da rejeição.
+    """
+
+    def __init__(self, mensagem, motivo):
+        """
+        Inicializa o erro de validação.
+
+        Args:
+            mensagem (str): A mensagem exibida para o usuário.
+            motivo (str): Um código curto que identifica o motivo da rejeição.
+
+        Returns:
+            None
+        """
+        super().__init__(mensagem)
+        self.motivo = motivo
+
+
+# Padrões de formato, compilados uma única vez
+PADRAO_NOME_USUARIO = re.compile(r'^[A-Za-z0-9_]+$')
+PADRAO_EMAIL = re.compile(r'^[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}$')
+
+
+def validar_formato_nome_usuario(nome_usuario):
+    """
+    Verifica o formato de um nome de usuário, sem consultar o Banco de Dados.
+
+    Args:
+        nome_usuario (str): O nome de usuário a ser verificado.
+
+    Raises:
+        ErroValidacao: Erro lançado se o nome de usuário for inválido.
+    """
+    if len(nome_usuario) < 3:
+        raise ErroValidacao(
+            'O nome de usuário deve ter no mínimo 3 caracteres!',
+            'nome_usuario_curto'
+        )
+
+    elif len(nome_usuario) > 20:
+        raise ErroValidacao(
+            'O nome de usuário deve ter no máximo 20 caracteres!',
+            'nome_usuario_longo'
+        )
+
+    elif not PADRAO_NOME_USUARIO.match(nome_usuario):
+        raise ErroValidacao(
+            'O nome de usuário não deve conter espaços ou caracteres especiais!',
+            'nome_usuario_invalido'
+        )
+
+
+def validar_formato_email(email):
+    """
+    Verifica o formato de um endereço de e-mail, sem consultar o Banco de Dados.
+
+    Args:
+        email (str): O email a ser verificado.
+
+    Raises:
+        ErroValidacao: Erro lançado se o email for inválido.
+    """
+    if len(email) < 6:
+        raise ErroValidacao(
+            'O endereço de e-mail deve ter no mínimo 6 caracteres!',
+            'email_curto'
+        )
+
+    elif len(email) > 150:
+        raise ErroValidacao(
+            'O endereço de e-mail deve ter no máximo 150 caracteres!',
+            'email_longo'
+        )
+
+    elif not PADRAO_EMAIL.match(email):
+        raise ErroValidacao(
+            'O endereço de e-mail fornecido não é válido!',
+            'email_invalido'
+        )
+
+
+def validar_senha(senha):
+    """
+    Verifica se uma senha é válida e emite um erro se não for.
+
+    Args:
+        senha (str): A senha a ser verificada.
+
+    Raises:
+        ErroValidacao: Erro lançado se a senha for inválida.
+    """
+    if len(senha) < 8:
+        raise ErroValidacao(
+            'A senha deve ter no mínimo 8 caracteres!',
+            'senha_curta'
+        )
+
+    elif len(senha) > 64:
+        raise ErroValidacao(
+            'A senha deve ter no máximo 64 caracteres!',
+            'senha_longa'
+        )
 
 
 class LembrarUsuario:
@@ -17,7 +130,7 @@ class LembrarUsuario:
 
         Args:
             ui (str): A interface gráfica (tk, kv, qt) para a qual o usuário está sendo relembrado.
-            banco_de_dados (BancoDeDados): Instância do objeto BancoDeDados.
+            banco_de_dados (Armazenamento): O armazenamento (ex.: BancoDeDados).
             nome_usuario_email (str): O nome de usuário ou email a ser relembrado.
             senha (str): A senha do usuário a ser relembrado.
             login (bool): Indica se é um processo de login (True) ou cadastro (False).
@@ -31,22 +144,34 @@ class LembrarUsuario:
         self.senha = senha
         
         if self.login:
-            self.banco_de_dados.lembrar_usuario(ui, self.nome_usuario_email, self.senha)
+            try:
+                self.banco_de_dados.lembrar_usuario(ui, self.nome_usuario_email, self.senha)
+            except Exception as erro:
+                auditoria.registrar(
+                    "lembrar", ui, nome_usuario_email, False, getattr(erro, "motivo", type(erro).__name__)
+                )
+                raise
+            auditoria.registrar("lembrar", ui, nome_usuario_email)
 
 class InsereDados:
     """
     Classe para administrar a inserção de dados nos campos de preenchimento.
     """
 
-    def __init__(self, banco_de_dados, nome_usuario, email, senha):
+    def __init__(self, banco_de_dados, nome_usuario, email, senha, senha_criptografada=None, aguardar=True):
         """
         Inicializa um objeto InsereDados.
 
         Args:
-            banco_de_dados (BancoDeDados): Instância do objeto BancoDeDados.
+            banco_de_dados (Armazenamento): O armazenamento (ex.: BancoDeDados).
             nome_usuario (str): O nome de usuário do novo usuário.
             email (str): O email do novo usuário.
             senha (str): A senha do novo usuário.
+            senha_criptografada (bytes): A senha já criptografada (opcional), para
+                quando o hash for calculado em outra thread.
+            aguardar (bool): Se False, o cadastro é entregue com 'enviar_cadastro'
+                e o futuro do seu commit fica em 'self.cadastro', para ser
+                aguardado fora da thread do banco (ex.: pelo daemon).
         
         Returns:
             None
@@ -55,11 +180,62 @@ class InsereDados:
         self.nome_usuario = nome_usuario
         self.email = email
         self.senha = senha
+        self.cadastro = None
         
-        self.senha_criptografada = self.gerar_criptografia(senha)
+        # Um cliente do daemon de autenticação delega validação, hash e cadastro
+        if banco_de_dados.remoto:
+            banco_de_dados.inserir_dados(nome_usuario, email, senha)
+            return
+        
+        if senha_criptografada is None:
+            senha_criptografada = self.gerar_criptografia(senha)
+        self.senha_criptografada = senha_criptografada
         
         if self.verificar_dados():
-            self.banco_de_dados.cadastrar_usuario(self.nome_usuario, self.email, self.senha_criptografada)
+            if aguardar:
+                try:
+                    self.banco_de_dados.cadastrar_usuario(self.nome_usuario, self.email, self.senha_criptografada)
+                except Exception as erro:
+                    self.auditar_cadastro(erro)
+                    raise
+                self.auditar_cadastro()
+            else:
+                self.cadastro = self.banco_de_dados.enviar_cadastro(
+                    self.nome_usuario, self.email, self.senha_criptografada
+                )
+                # O resultado só é conhecido após o commit do cadastro
+                self.cadastro.add_done_callback(self._auditar_envio)
+
+    def auditar_cadastro(self, erro=None):
+        """
+        Registra o resultado do cadastro na auditoria.
+
+        Args:
+            erro (Exception): O erro que rejeitou o cadastro (None se ele foi bem-sucedido).
+
+        Returns:
+            None
+        """
+        if erro is None:
+            auditoria.registrar("cadastro", usuario=self.nome_usuario)
+        else:
+            auditoria.registrar(
+                "cadastro", usuario=self.nome_usuario, sucesso=False,
+                detalhe=getattr(erro, "motivo", type(erro).__name__)
+            )
+
+    def _auditar_envio(self, cadastro):
+        """
+        Registra na auditoria o resultado de um cadastro enviado, após o seu commit.
+
+        Args:
+            cadastro (concurrent.futures.Future): O futuro do cadastro.
+
+        Returns:
+            None
+        """
+        if not cadastro.cancelled():
+            self.auditar_cadastro(cadastro.exception())
 
     def verificar_dados(self):
         """
@@ -78,6 +254,11 @@ class InsereDados:
             self.verificar_email(self.email)
             self.verificar_senha(self.senha)
         except ValueError as erro:
+            if metricas.registro.habilitado:
+                metricas.CADASTROS_REJEITADOS.incrementar(
+                    motivo=getattr(erro, "motivo", "desconhecido")
+                )
+            self.auditar_cadastro(erro)
             raise erro
         
         return True
@@ -90,27 +271,17 @@ class InsereDados:
             nome_usuario (str): O nome de usuário a ser verificado.
 
         Raises:
-            ValueError: Erro lançado se o nome de usuário for inválido.
+            ErroValidacao: Erro lançado se o nome de usuário for inválido.
         """
-        padrao = r'^[A-Za-z0-9_]+$'
-            
-        if len(nome_usuario) < 3:
-            raise ValueError('O nome de usuário deve ter no mínimo 3 caracteres!')
-        
-        elif len(nome_usuario) > 20:
-            raise ValueError('O nome de usuário deve ter no máximo 20 caracteres!')
-        
-        elif not re.match(padrao, nome_usuario):
-            raise ValueError('O nome de usuário não deve conter espaços ou caracteres especiais!')
-        
-        self.banco_de_dados.cursor.execute("""
-            SELECT nome_usuario from usuarios WHERE(nome_usuario = ?)
-        """, (nome_usuario,))
+        validar_formato_nome_usuario(nome_usuario)
         
-        usuario = self.banco_de_dados.cursor.fetchone()
+        nomes_em_uso, _ = self.banco_de_dados.consultar_existentes([nome_usuario], [])
         
-        if usuario:
-            raise ValueError(f"O nome de usuário '{nome_usuario}' já está em uso!")
+        if nomes_em_uso:
+            raise ErroValidacao(
+                f"O nome de usuário '{nome_usuario}' já está em uso!",
+                'nome_usuario_em_uso'
+            )
         
     def verificar_email(self, email):
         """
@@ -120,27 +291,17 @@ class InsereDados:
             email (str): O email a ser verificado.
 
         Raises:
-            ValueError: Erro lançado se o email for inválido.
+            ErroValidacao: Erro lançado se o email for inválido.
         """
-        padrao_email = r'^[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}$'
-        
-        if len(email) < 6:
-            raise ValueError('O endereço de e-mail deve ter no mínimo 6 caracteres!')
-
-        elif len(email) > 150:
-            raise ValueError('O endereço de e-mail deve ter no máximo 150 caracteres!')
-        
-        elif not re.match(padrao_email, email):
-            raise ValueError('O endereço de e-mail fornecido não é válido!')
+        validar_formato_email(email)
         
-        self.banco_de_dados.cursor.execute("""
-            SELECT nome_usuario from usuarios WHERE(email = ?)
-        """, (email,))
+        _, emails_em_uso = self.banco_de_dados.consultar_existentes([], [email])
         
-        usuario = self.banco_de_dados.cursor.fetchone()
-        
-        if usuario:
-            raise ValueError(f"O endereço de e-mail '{email}' já está em uso!")
+        if emails_em_uso:
+            raise ErroValidacao(
+                f"O endereço de e-mail '{email}' já está em uso!",
+                'email_em_uso'
+            )
         
     def verificar_senha(self, senha):
         """
@@ -150,15 +311,12 @@ class InsereDados:
             senha (str): A senha a ser verificada.
 
         Raises:
-            ValueError: Erro lançado se a senha for inválida.
+            ErroValidacao: Erro lançado se a senha for inválida.
         """
-        if len(senha) < 8:
-            raise ValueError('A senha deve ter no mínimo 8 caracteres!')
-
-        elif len(senha) > 64:
-            raise ValueError('A senha deve ter no máximo 64 caracteres!')
+        validar_senha(senha)
 
-    def gerar_criptografia(self, senha):
+    @staticmethod
+    def gerar_criptografia(senha):
         """
         Gera uma senha criptografada usando técnicas de hash e salt.
 
@@ -168,7 +326,147 @@ class InsereDados:
         Returns:
             bytes: A senha criptografada.
         """
+        inicio = metricas.cronometrar()
         salt = bcrypt.gensalt()
         senha_hasheada = bcrypt.hashpw(senha.encode(), salt)
         
+        if inicio is not None:
+            metricas.DURACAO_HASH.observar(time.perf_counter() - inicio, operacao="hashpw")
+        
         return senha_hasheada
+
+
+class ValidadorLote:
+    """
+    Classe para validar milhares de candidatos a cadastro de uma só vez.
+
+    Os formatos são verificados em uma única passagem com os padrões
+    pré-compilados, e a unicidade é resolvida em blocos pelo armazenamento (no
+    SQLite, cada bloco faz uma única consulta com 'IN (...)' para os nomes de
+    usuário e os e-mails).
+    Valores repetidos dentro do próprio lote também são rejeitados; a
+    primeira ocorrência é a que segue para a verificação no Banco de Dados.
+
+    Attributes:
+        banco_de_dados (Armazenamento): O armazenamento (ex.: BancoDeDados).
+        tamanho_bloco (int): Quantos candidatos são consultados por instrução.
+    """
+
+    def __init__(self, banco_de_dados, tamanho_bloco=400):
+        """
+        Inicializa um objeto ValidadorLote.
+
+        Args:
+            banco_de_dados (Armazenamento): O armazenamento (ex.: BancoDeDados).
+            tamanho_bloco (int): Quantos candidatos são consultados por instrução
+                (cada candidato usa até dois parâmetros).
+
+        Returns:
+            None
+        """
+        self.banco_de_dados = banco_de_dados
+        self.tamanho_bloco = tamanho_bloco
+
+    @staticmethod
+    def _erro(campo, erro):
+        """
+        Converte um erro de validação em um dicionário.
+
+        Args:
+            campo (str): O campo rejeitado ('nome_usuario', 'email' ou 'senha').
+            erro (ErroValidacao): O erro de validação.
+
+        Returns:
+            dict: O erro com 'campo', 'motivo' e 'mensagem'.
+        """
+        return {"campo": campo, "motivo": erro.motivo, "mensagem": str(erro)}
+
+    def validar(self, candidatos):
+        """
+        Valida um lote de candidatos a cadastro.
+
+        Args:
+            candidatos (iterable): Dicionários com 'nome_usuario', 'email' e,
+                opcionalmente, 'senha' (ou tuplas na mesma ordem).
+
+        Returns:
+            list: Um dicionário por candidato, na ordem recebida, com 'indice',
+                'nome_usuario', 'email', 'valido' e a lista de 'erros'.
+        """
+        validadores = (
+            ("nome_usuario", validar_formato_nome_usuario),
+            ("email", validar_formato_email),
+            ("senha", validar_senha),
+        )
+
+        resultados = []
+        primeiros = {"nome_usuario": {}, "email": {}}
+
+        # Primeira passagem: formato e repetições dentro do lote
+        for indice, candidato in enumerate(candidatos):
+            if not isinstance(candidato, dict):
+                candidato = dict(zip(("nome_usuario", "email", "senha"), candidato))
+
+            resultado = {
+                "indice": indice,
+                "nome_usuario": candidato.get("nome_usuario"),
+                "email": candidato.get("email"),
+                "valido": True,
+                "erros": [],
+            }
+            resultados.append(resultado)
+
+            for campo, validador in validadores:
+                valor = candidato.get(campo)
+                if valor is None and campo == "senha":
+                    continue
+
+                try:
+                    if not isinstance(valor, str):
+                        raise ErroValidacao(f"O campo '{campo}' deve ser um texto!", f"{campo}_invalido")
+                    validador(valor)
+                except ErroValidacao as erro:
+                    resultado["erros"].append(self._erro(campo, erro))
+                    continue
+
+                if campo in primeiros:
+                    primeiro = primeiros[campo].setdefault(valor, indice)
+                    if primeiro != indice:
+                        resultado["erros"].append({
+                            "campo": campo,
+                            "motivo": f"{campo}_duplicado",
+                            "mensagem": f"'{valor}' já aparece no item {primeiro} do lote!",
+                        })
+
+        # Segunda passagem: unicidade no Banco de Dados, em blocos
+        nomes_em_uso, emails_em_uso = self._consultar_existentes(
+            list(primeiros["nome_usuario"]), list(primeiros["email"])
+        )
+        for nome_usuario, indice in primeiros["nome_usuario"].items():
+            if nome_usuario in nomes_em_uso:
+                resultados[indice]["erros"].append(self._erro("nome_usuario", ErroValidacao(
+                    f"O nome de usuário '{nome_usuario}' já está em uso!", 'nome_usuario_em_uso'
+                )))
+        for email, indice in primeiros["email"].items():
+            if email in emails_em_uso:
+                resultados[indice]["erros"].append(self._erro("email", ErroValidacao(
+                    f"O endereço de e-mail '{email}' já está em uso!", 'email_em_uso'
+                )))
+
+        for resultado in resultados:
+            resultado["valido"] = not resultado["erros"]
+
+        return resultados
+
+    def _consultar_existentes(self, nomes_usuario, emails):
+        """
+        Obtém quais nomes de usuário e e-mails já estão cadastrados, em blocos.
+
+        Args:
+            nomes_usuario (list): Os nomes de usuário a serem consultados.
+            emails (list): Os e-mails a serem consultados.
+
+        Returns:
+            tuple: (set de nomes de usuário em uso, set de e-mails em uso).
+        """
+        return self.banco_de_dados.consultar_existentes(nomes_usuario, emails, self.tamanho_bloco)
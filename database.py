@@ -1,30 +1,288 @@
 # -*- coding: utf-8 -*-
 """Módulo para criar e administrar as regras de negócio do Banco de Dados."""
 
-import bcrypt
+import functools
+import itertools
+import os
 import sqlite3
+import time
+import urllib.parse
 
+import acessos
+import backup
+import escrita_agrupada
+import metricas
+import rastreamento_sql
+import sessoes
+from armazenamento.base import Armazenamento, ErroChaveDuplicada, validar_colunas, validar_ui
+from armazenamento.memoria import ArmazenamentoMemoria
+from registros import Acesso, Sessao, Usuario, UsuarioRelembrado
 
-class BancoDeDados:
+
+# Colunas que podem ser pedidas nas páginas de usuários relembrados
+COLUNAS_RELEMBRADOS = {
+    "id_usuario": "ur.id_usuario",
+    "nome_usuario": "u.nome_usuario",
+    "email": "u.email",
+    "senha": "u.senha",
+}
+
+# Caminho usado quando nem o construtor nem a variável de ambiente informam outro
+CAMINHO_PADRAO = "usuarios.db"
+# Diretório padrão do armazenamento fragmentado (distinto do arquivo padrão)
+DIRETORIO_FRAGMENTOS_PADRAO = "usuarios_fragmentos"
+
+# Perfis de configuração da conexão: PRAGMAs aplicados ao conectar, nesta ordem.
+# - padrao: os padrões do SQLite (journal de rollback, synchronous=FULL, sem mmap).
+# - duravel: WAL com fsync a cada commit; nenhum commit confirmado se perde.
+# - equilibrado: WAL com synchronous=NORMAL (uma queda de energia pode desfazer
+#   os últimos commits, mas não corrompe o arquivo), cache maior e leituras por mmap.
+# - vazao: sem fsync (uma queda do sistema pode corromper o arquivo); somente
+#   para cargas descartáveis, como testes de carga e importações refeitas do zero.
+PERFIS = {
+    "padrao": {},
+    "duravel": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -8000,
+        "mmap_size": 0,
+        "temp_store": "DEFAULT",
+        "busy_timeout": 5000,
+    },
+    "equilibrado": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -32000,
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+    "vazao": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "cache_size": -64000,
+        "mmap_size": 1024 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 10000,
+    },
+}
+
+
+def caminho_configurado():
     """
-    Classe para criar e administrar o Banco de Dados.
+    Obtém o caminho do banco de dados configurado para o processo.
+
+    Returns:
+        str: O valor de 'CADASTRO_LOGIN_DB' ou o caminho padrão.
     """
+    return os.environ.get("CADASTRO_LOGIN_DB") or CAMINHO_PADRAO
 
-    def __init__(self):
+
+def caminho_arquivo(caminho):
+    """
+    Obtém o arquivo em disco por trás de um caminho ou URI do SQLite.
+
+    Args:
+        caminho (str): Um caminho, ':memory:' ou uma URI 'file:' (ex.:
+            'file:usuarios.db?mode=ro' ou 'file:teste?mode=memory&cache=shared').
+
+    Returns:
+        str / None: O caminho do arquivo ou None se o banco estiver em memória.
+    """
+    if caminho in ("", ":memory:"):
+        return None
+    if not caminho.startswith("file:"):
+        return caminho
+
+    partes = urllib.parse.urlsplit(caminho)
+    consulta = urllib.parse.parse_qs(partes.query)
+    arquivo = urllib.parse.unquote(partes.path)
+    if consulta.get("mode") == ["memory"] or arquivo in ("", ":memory:"):
+        return None
+    return arquivo
+
+
+class BancoDeDados(Armazenamento):
+    """
+    Classe para criar e administrar o Banco de Dados (o armazenamento SQLite).
+
+    As regras de negócio (cadastro, login e "lembrar de mim") vêm da classe
+    base 'Armazenamento'; esta classe implementa as operações primitivas em SQL.
+
+    Attributes:
+        caminho (str): O caminho ou a URI do banco de dados aberto.
+        arquivo (str): O arquivo em disco do banco de dados (None se estiver em memória).
+        perfil (str): O perfil de configuração da conexão (ver 'PERFIS').
+        escritor (EscritorAgrupado): O escritor dos cadastros e relembrados
+            confirmados em grupo (None se cada escrita for confirmada sozinha).
+        confirmacao_adiada (bool): Indica se os métodos de escrita deixam o
+            commit para quem os chamou (usado pela thread do escritor agrupado).
+        disco (sqlite3.Connection): A conexão com o arquivo quando as leituras
+            são atendidas pela réplica em memória (None sem réplica).
+        somente_leitura (bool): Indica se a conexão não pode gravar no arquivo
+            (ver 'detectar_somente_leitura'); nesse caso as tabelas não são criadas.
+    """
+
+    escritor = None
+    confirmacao_adiada = False
+    disco = None
+
+    def __init__(self, caminho=None, perfil=None, replica=False):
         """
         Inicializa a conexão com o Banco de Dados e cria a tabela de usuários.
         
         Args:
-            None
+            caminho (str): O caminho do banco de dados, ':memory:' ou uma URI 'file:'
+                (ex.: 'file:usuarios.db?mode=ro'). Padrão: a variável de ambiente
+                'CADASTRO_LOGIN_DB' ou 'usuarios.db' no diretório atual.
+            perfil (str): O perfil de configuração da conexão (ver 'PERFIS').
+                Padrão: a variável de ambiente 'CADASTRO_LOGIN_PERFIL' ou 'padrao'.
+            replica (bool): Carrega o arquivo em uma réplica em memória, que passa
+                a atender as leituras (ver 'carregar_replica').
         
         Returns:
             None
+
+        Raises:
+            ValueError: Erro lançado se o perfil for desconhecido ou se a réplica
+                for pedida para um banco de dados em memória.
         """
         
-        self.conexao = sqlite3.connect('usuarios.db')
+        self.caminho = caminho or caminho_configurado()
+        self.arquivo = caminho_arquivo(self.caminho)
+        self.perfil = perfil or os.environ.get("CADASTRO_LOGIN_PERFIL") or "padrao"
+        if self.perfil not in PERFIS:
+            raise ValueError(f"Perfil desconhecido: {self.perfil!r} (perfis: {', '.join(PERFIS)})")
+
+        self.conexao = sqlite3.connect(self.caminho, uri=self.caminho.startswith("file:"))
         self.cursor = self.conexao.cursor()
 
-        self.criar_tabela()
+        # Rastreia as instruções SQL se o rastreamento estiver habilitado
+        self.rastreador = rastreamento_sql.obter_rastreador()
+        if self.rastreador is not None:
+            self.rastreador.instalar(self.conexao)
+
+        self.aplicar_perfil()
+        # Uma conexão somente leitura usa o esquema do arquivo como ele está
+        self.somente_leitura = self.detectar_somente_leitura()
+        if not self.somente_leitura:
+            self.criar_tabela()
+
+        if replica:
+            self.carregar_replica()
+
+    def detectar_somente_leitura(self):
+        """
+        Verifica se a conexão não pode gravar no banco de dados.
+
+        A conexão é somente leitura se a URI pedir 'mode=ro' ou 'immutable=1',
+        se 'PRAGMA query_only' estiver ativo ou se o arquivo existir sem
+        permissão de escrita para o processo.
+
+        Returns:
+            bool: True se a conexão for somente leitura.
+        """
+        if self.caminho.startswith("file:"):
+            consulta = urllib.parse.parse_qs(urllib.parse.urlsplit(self.caminho).query)
+            if consulta.get("mode") == ["ro"] or consulta.get("immutable") == ["1"]:
+                return True
+        if self.conexao.execute("PRAGMA query_only").fetchone()[0]:
+            return True
+
+        return self.arquivo is not None and os.path.exists(self.arquivo) and not os.access(self.arquivo, os.W_OK)
+
+    def carregar_replica(self):
+        """
+        Copia o arquivo para um banco de dados em memória, que passa a atender as leituras.
+
+        A cópia usa a API de backup do SQLite. Depois dela, cada escrita é
+        executada primeiro no arquivo (que confere as restrições) e em seguida
+        na réplica, e as duas são confirmadas juntas: se o commit no arquivo
+        falhar, a réplica também é desfeita. As escritas feitas no arquivo por
+        outras conexões não chegam à réplica; 'verificar_replica' as detecta e
+        uma nova chamada a este método recarrega a cópia.
+
+        Returns:
+            None
+
+        Raises:
+            ValueError: Erro lançado se o banco de dados estiver em memória.
+        """
+        if self.arquivo is None:
+            raise ValueError("A réplica em memória exige um banco de dados em arquivo.")
+
+        if self.disco is None:
+            self.disco = self.conexao
+            anterior = None
+        else:
+            anterior = self.conexao
+
+        memoria = sqlite3.connect(":memory:")
+        self.disco.backup(memoria)
+        self._versao_disco = self.disco.execute("PRAGMA data_version").fetchone()[0]
+
+        self.conexao = memoria
+        self.cursor = memoria.cursor()
+        if self.rastreador is not None:
+            self.rastreador.instalar(self.conexao)
+
+        if anterior is not None:
+            anterior.close()
+
+    def verificar_replica(self):
+        """
+        Compara a réplica em memória com o arquivo, tabela por tabela.
+
+        Returns:
+            list: Os problemas encontrados (vazia se a réplica for idêntica ao arquivo).
+
+        Raises:
+            ValueError: Erro lançado se não houver réplica.
+        """
+        if self.disco is None:
+            raise ValueError("O banco de dados não possui réplica em memória.")
+
+        problemas = []
+        if self.disco.execute("PRAGMA data_version").fetchone()[0] != self._versao_disco:
+            problemas.append("O arquivo foi alterado por outra conexão após a carga da réplica.")
+
+        tabelas = [
+            tabela for tabela, in
+            self.disco.execute("SELECT name FROM sqlite_master WHERE type = 'table' ORDER BY name")
+        ]
+        for tabela in tabelas:
+            consulta = f'SELECT rowid, * FROM "{tabela}" ORDER BY rowid'
+            pares = itertools.zip_longest(self.disco.execute(consulta), self.conexao.execute(consulta))
+            diferentes = [linha_disco or linha_replica for linha_disco, linha_replica in pares
+                          if linha_disco != linha_replica]
+            if diferentes:
+                problemas.append(
+                    f"Tabela '{tabela}': {len(diferentes)} linha(s) diferente(s) a partir do rowid {diferentes[0][0]}."
+                )
+
+        return problemas
+
+    def aplicar_perfil(self):
+        """
+        Aplica os PRAGMAs do perfil de configuração à conexão.
+
+        Returns:
+            dict: O valor efetivo de cada PRAGMA, como o SQLite o reporta (None se não reportado).
+        """
+        efetivos = {}
+        for pragma, valor in PERFIS[self.perfil].items():
+            try:
+                # Lê o resultado para que nenhuma instrução fique pendente na conexão
+                self.executar(f"PRAGMA {pragma}={valor}", nome=pragma).fetchall()
+            except sqlite3.OperationalError:
+                # Uma conexão somente leitura não pode mudar o journal do arquivo
+                if pragma != "journal_mode":
+                    raise
+            # Bancos em memória não reportam alguns valores (ex.: 'mmap_size')
+            linha = self.executar(f"PRAGMA {pragma}", nome=pragma).fetchone()
+            efetivos[pragma] = linha[0] if linha else None
+
+        return efetivos
         
     def criar_tabela(self):
         """
@@ -74,92 +332,318 @@ class BancoDeDados:
         )                   
         """)
         
+        # Cria os índices das buscas por id de usuário nas tabelas de usuários relembrados
+        for ui in ("tk", "qt", "kv"):
+            self.cursor.execute(f"""
+            CREATE INDEX IF NOT EXISTS idx_{ui}_usuarios_relembrados_id_usuario
+            ON {ui}_usuarios_relembrados (id_usuario)
+            """)
+
+        # Cria a tabela de sessões se ela não existir
+        self.cursor.execute("""
+        CREATE TABLE IF NOT EXISTS sessoes (
+            token TEXT PRIMARY KEY,
+            id_usuario INTEGER NOT NULL,
+            ui VARCHAR(2),
+            criada_em REAL NOT NULL,
+            expira_em REAL NOT NULL,
+            FOREIGN KEY (id_usuario) REFERENCES usuarios (id)
+        )
+        """)
+
+        # Cria o índice usado na remoção das sessões expiradas
+        self.cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_sessoes_expira_em ON sessoes (expira_em)
+        """)
+
+        # Cria o índice usado no limite de sessões simultâneas por usuário
+        self.cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_sessoes_id_usuario ON sessoes (id_usuario, criada_em)
+        """)
+
+        # Cria a tabela do último login e da contagem de logins de cada usuário
+        self.cursor.execute("""
+        CREATE TABLE IF NOT EXISTS acessos (
+            id_usuario INTEGER PRIMARY KEY,
+            ultimo_login_em REAL NOT NULL,
+            logins INTEGER NOT NULL,
+            FOREIGN KEY (id_usuario) REFERENCES usuarios (id)
+        )
+        """)
+        
         # Encerra a conexão com o Banco de Dados
         self.conexao.commit()
         
+    def executar(self, sql, parametros=(), nome=None, fabrica=None, varios=False):
+        """
+        Executa uma instrução SQL no cursor do Banco de Dados.
+
+        Quando as métricas estão habilitadas, o tempo da instrução é registrado
+        no histograma de latência de consultas com o rótulo 'nome'. Quando o
+        rastreamento de SQL está habilitado, o tempo também é entregue ao rastreador.
+
+        Args:
+            sql (str): A instrução SQL a ser executada.
+            parametros (tuple): Os parâmetros da instrução.
+            nome (str): Um nome curto que identifica a consulta nas métricas.
+            fabrica (callable): A 'row_factory' das linhas lidas (ex.: 'Usuario.fabrica');
+                None mantém as tuplas.
+            varios (bool): Executa a instrução uma vez para cada tupla de 'parametros'
+                ('executemany').
+
+        Returns:
+            sqlite3.Cursor: O cursor com o resultado da instrução.
+        """
+        # Cada instrução define o formato das suas próprias linhas
+        self.cursor.row_factory = fabrica
+        executar = self.cursor.executemany if varios else self.cursor.execute
+
+        if not metricas.registro.habilitado and self.rastreador is None:
+            return executar(sql, parametros)
+
+        inicio = time.perf_counter()
+        try:
+            return executar(sql, parametros)
+        finally:
+            duracao = time.perf_counter() - inicio
+            if metricas.registro.habilitado:
+                metricas.DURACAO_CONSULTA.observar(duracao, consulta=nome or "desconhecida")
+            if self.rastreador is not None:
+                self.rastreador.finalizar(duracao)
+
+    def executar_escrita(self, sql, parametros=(), nome=None, varios=False):
+        """
+        Executa uma instrução que altera dados, no arquivo e na réplica em memória, se houver.
+
+        As instruções de escrita são determinísticas, então executá-las nos
+        dois bancos (com o mesmo conteúdo) produz os mesmos ids e as mesmas linhas.
+
+        Args:
+            sql (str): A instrução SQL a ser executada.
+            parametros (tuple): Os parâmetros da instrução.
+            nome (str): Um nome curto que identifica a consulta nas métricas.
+            varios (bool): Executa a instrução uma vez para cada tupla de 'parametros'.
+
+        Returns:
+            sqlite3.Cursor: O cursor com o resultado da instrução (na réplica, se houver).
+        """
+        if self.disco is None:
+            return self.executar(sql, parametros, nome, varios=varios)
+
+        # O arquivo é a fonte da verdade: as restrições são conferidas nele primeiro
+        if varios:
+            self.disco.executemany(sql, parametros)
+        else:
+            self.disco.execute(sql, parametros)
+        try:
+            return self.executar(sql, parametros, nome, varios=varios)
+        except sqlite3.Error:
+            self.disco.rollback()
+            raise
+
+    def confirmar(self):
+        """
+        Confirma a transação atual, exceto quando o commit for adiado para o fim de um grupo.
+
+        Com a réplica em memória, o arquivo é confirmado primeiro; se ele falhar,
+        a transação da réplica é desfeita.
+
+        Returns:
+            None
+        """
+        if self.confirmacao_adiada:
+            return
+
+        if self.disco is not None:
+            try:
+                self.disco.commit()
+            except sqlite3.Error:
+                self.conexao.rollback()
+                raise
+        self.conexao.commit()
+
+    def agrupar_escritas(self, max_linhas=50, max_espera=0.005):
+        """
+        Passa a confirmar os cadastros e os relembrados em grupos, em uma thread escritora.
+
+        O escritor usa uma conexão própria com o mesmo arquivo; as leituras
+        continuam nesta conexão e enxergam cada escrita após o commit do seu grupo.
+
+        Args:
+            max_linhas (int): A quantidade máxima de escritas por commit.
+            max_espera (float): O tempo máximo de espera por mais escritas, em segundos.
+
+        Returns:
+            None
+
+        Raises:
+            ValueError: Erro lançado se o banco de dados estiver em memória (a
+                conexão do escritor abriria outro banco de dados) ou tiver uma
+                réplica em memória (que não receberia as escritas do escritor).
+        """
+        if self.arquivo is None:
+            raise ValueError("A escrita agrupada exige um banco de dados em arquivo.")
+        if self.disco is not None:
+            raise ValueError("A escrita agrupada não pode ser usada com a réplica em memória.")
+
+        if self.escritor is None:
+            self.escritor = escrita_agrupada.EscritorAgrupado(
+                functools.partial(BancoDeDados, self.caminho, self.perfil), max_linhas, max_espera
+            )
+            self.escritor.iniciar()
+
     def cadastrar_usuario(self, nome_usuario, email, senha):
         """
-        Cadastra um novo usuário no Banco de Dados.
+        Cadastra um novo usuário, aguardando o commit do grupo se a escrita for agrupada.
 
         Args:
             nome_usuario (str): O nome de usuário do novo usuário.
             email (str): O email do novo usuário.
-            senha (str): A senha do novo usuário.
+            senha (bytes): A senha criptografada do novo usuário.
 
         Returns:
             None
         """
-        
-        self.cursor.execute("""
-            INSERT INTO usuarios (nome_usuario, email, senha)
-            VALUES (?, ?, ?)
-        """, (nome_usuario, email, senha))
+        if self.escritor is None:
+            return super().cadastrar_usuario(nome_usuario, email, senha)
+        self.escritor.cadastrar_usuario(nome_usuario, email, senha).result()
 
-        self.conexao.commit()
-    
-    def verificar_criptografia(self, senha_inserida, senha_criptografada):
+    def enviar_cadastro(self, nome_usuario, email, senha):
         """
-        Verifica se a senha inserida pelo usuário é igual a senha criptografada no sistema.
-        
+        Entrega o cadastro ao escritor agrupado, se houver, sem aguardar o commit.
+
         Args:
-            senha_inserida (str): A senha inserida pelo usuário.
-            senha_criptografada (str): A senha criptografada no banco de dados.
-        
+            nome_usuario (str): O nome de usuário do novo usuário.
+            email (str): O email do novo usuário.
+            senha (bytes): A senha criptografada do novo usuário.
+
         Returns:
-            bool: True se as senhas forem equivalentes ou False, caso contrário.
+            concurrent.futures.Future: Resolvido com o id do usuário após o commit.
         """
-        return bcrypt.checkpw(senha_inserida.encode(), senha_criptografada)
-    
-    def obter_senha_criptografada(self, nome_usuario_email, senha):
+        if self.escritor is None:
+            return super().enviar_cadastro(nome_usuario, email, senha)
+        return self.escritor.cadastrar_usuario(nome_usuario, email, senha)
+
+    def lembrar_usuario(self, ui, nome_usuario_email, senha):
         """
-        Retorna a senha criptografada do usuário solicitado.
+        Relembra um usuário, aguardando o commit do grupo se a escrita for agrupada.
 
         Args:
-            nome_usuario_email (str): O nome de usuário ou email do usuário.
-            senha (str): A senha do usuário.
+            ui (str): A interface gráfica (tk, kv, qt).
+            nome_usuario_email (str): O nome de usuário ou email a ser relembrado.
+            senha (bytes): A senha criptografada do usuário a ser relembrado.
 
         Returns:
-            str: A senha criptografada do usuário ou False, caso o usuário não seja encontrado.
+            None
         """
-        
-        self.cursor.execute("""
-            SELECT senha FROM usuarios WHERE (nome_usuario = ? OR email = ?)
-        """, (nome_usuario_email, nome_usuario_email))
+        if self.escritor is None:
+            return super().lembrar_usuario(ui, nome_usuario_email, senha)
+        self.escritor.lembrar_usuario(ui, nome_usuario_email, senha).result()
 
-        criptografia = self.cursor.fetchone()[0]
-        
-        if bcrypt.checkpw(senha.encode(), criptografia):        
-            return criptografia
-        
-    def fazer_login(self, nome_usuario_email, senha):
+    def enviar_lembranca(self, ui, nome_usuario_email, senha):
+        """
+        Entrega o "lembrar de mim" ao escritor agrupado, se houver, sem aguardar o commit.
+
+        Args:
+            ui (str): A interface gráfica (tk, kv, qt).
+            nome_usuario_email (str): O nome de usuário ou email a ser relembrado.
+            senha (bytes): A senha criptografada do usuário a ser relembrado.
+
+        Returns:
+            concurrent.futures.Future: Resolvido com None após o commit.
+        """
+        if self.escritor is None:
+            return super().enviar_lembranca(ui, nome_usuario_email, senha)
+        return self.escritor.lembrar_usuario(ui, nome_usuario_email, senha)
+
+    def inserir_usuario(self, nome_usuario, email, senha):
         """
-        Realiza o login de um usuário no sistema.
+        Insere um usuário no Banco de Dados.
+
+        Args:
+            nome_usuario (str): O nome de usuário do novo usuário.
+            email (str): O email do novo usuário.
+            senha (bytes): A senha criptografada do novo usuário.
+
+        Returns:
+            int: O id do novo usuário.
+
+        Raises:
+            ErroChaveDuplicada: Erro lançado se o nome de usuário ou o email já existir.
+        """
+        try:
+            self.executar_escrita("""
+                INSERT INTO usuarios (nome_usuario, email, senha)
+                VALUES (?, ?, ?)
+            """, (nome_usuario, email, senha), nome="cadastrar_usuario")
+        except sqlite3.IntegrityError as erro:
+            if "usuarios.email" in str(erro):
+                raise ErroChaveDuplicada(f"O endereço de e-mail '{email}' já está em uso!", "email_em_uso") from erro
+            raise ErroChaveDuplicada(f"O nome de usuário '{nome_usuario}' já está em uso!", "nome_usuario_em_uso") from erro
+
+        self.confirmar()
+
+        return self.cursor.lastrowid
+
+    def obter_usuario(self, nome_usuario_email):
+        """
+        Obtém os dados de um usuário pelo nome de usuário ou email.
 
         Args:
             nome_usuario_email (str): O nome de usuário ou email do usuário.
-            senha (str): A senha do usuário.
 
         Returns:
-            bool: True se o login for bem-sucedido, False caso contrário.
+            Usuario / None: Os dados do usuário (id, nome_usuario, email, senha) ou None.
         """
         
-        self.cursor.execute("""
-            SELECT * FROM usuarios WHERE (nome_usuario = ? OR email = ?)
-        """, (nome_usuario_email, nome_usuario_email))
+        self.executar("""
+            SELECT id, nome_usuario, email, senha FROM usuarios WHERE (nome_usuario = ? OR email = ?)
+        """, (nome_usuario_email, nome_usuario_email), nome="obter_usuario", fabrica=Usuario.fabrica)
         
-        usuario = self.cursor.fetchone()
-        
-        if usuario:
-            criptografia = usuario[3]
-            teste = self.verificar_criptografia(senha, criptografia)
-            
-            if teste or senha.encode() == criptografia:
-                return True
-            
-            return False
-        else:
-            return False
+        return self.cursor.fetchone()
     
+    def consultar_existentes(self, nomes_usuario, emails, tamanho_bloco=400):
+        """
+        Obtém quais nomes de usuário e e-mails já estão cadastrados.
+
+        Cada bloco resolve os nomes e os e-mails na mesma instrução, com uma
+        única ida ao Banco de Dados; as buscas usam os índices das colunas UNIQUE.
+
+        Args:
+            nomes_usuario (list): Os nomes de usuário a serem consultados.
+            emails (list): Os e-mails a serem consultados.
+            tamanho_bloco (int): Quantos valores de cada coluna são consultados por instrução.
+
+        Returns:
+            tuple: (set de nomes de usuário em uso, set de e-mails em uso).
+        """
+        nomes_em_uso = set()
+        emails_em_uso = set()
+
+        for inicio in range(0, max(len(nomes_usuario), len(emails)), tamanho_bloco):
+            bloco_nomes = nomes_usuario[inicio:inicio + tamanho_bloco]
+            bloco_emails = emails[inicio:inicio + tamanho_bloco]
+
+            consultas = []
+            if bloco_nomes:
+                consultas.append(
+                    "SELECT 0, nome_usuario FROM usuarios WHERE nome_usuario IN "
+                    f"({', '.join('?' * len(bloco_nomes))})"
+                )
+            if bloco_emails:
+                consultas.append(
+                    "SELECT 1, email FROM usuarios WHERE email IN "
+                    f"({', '.join('?' * len(bloco_emails))})"
+                )
+
+            self.executar(
+                " UNION ALL ".join(consultas), (*bloco_nomes, *bloco_emails), nome="consultar_existentes"
+            )
+            for coluna, valor in self.cursor.fetchall():
+                (emails_em_uso if coluna else nomes_em_uso).add(valor)
+
+        return nomes_em_uso, emails_em_uso
+
     def checar_id_usuario_relembrado(self, ui, id_usuario):
         """
         Procura por uma id de usuário cadastrada na lista de usuários relembrados.
@@ -170,9 +654,9 @@ class BancoDeDados:
         Returns:
             list / bool: Uma lista com os dados do usuário ou False.
         """
-        self.cursor.execute(f"""
+        self.executar(f"""
             SELECT * FROM {ui}_usuarios_relembrados WHERE id_usuario = ?
-        """, (id_usuario,))
+        """, (id_usuario,), nome="checar_id_usuario_relembrado")
             
         return self.cursor.fetchone()
     
@@ -186,49 +670,41 @@ class BancoDeDados:
         Returns:
             list / bool: Uma lista com os dados do usuário ou False.
         """
-        self.cursor.execute(f"""
+        self.executar(f"""
             SELECT * 
             FROM usuarios AS u
             JOIN {ui}_usuarios_relembrados AS ur ON u.id = ur.id_usuario
             WHERE u.nome_usuario = ? OR u.email = ?
-        """, (nome_usuario_email, nome_usuario_email))
+        """, (nome_usuario_email, nome_usuario_email), nome="checar_nome_usuario_email_relembrado")
         
         return self.cursor.fetchone()
         
-    def lembrar_usuario(self, ui, nome_usuario_email, senha):
+    def adicionar_relembrado(self, ui, id_usuario):
         """
-        Cadastra o usuário na tabela de usuários lembrados.
+        Adiciona um usuário à tabela de usuários relembrados de uma interface.
 
         Args:
-            nome_usuario_email (str): O nome de usuário ou email a ser relembrado.
-            senha (str): A senha do usuário a ser relembrado.
-        
+            ui (str): A interface gráfica (tk, kv, qt).
+            id_usuario (int): O id do usuário.
+
         Returns:
-            None
+            bool: True se o usuário foi adicionado, False se ele já estava na lista.
         """
-        # Verifica se o usuário está cadastrado no sistema
-        self.cursor.execute("""
-            SELECT * FROM usuarios WHERE (nome_usuario = ? OR email = ?) AND senha = ?
-        """, (nome_usuario_email, nome_usuario_email, senha))
+        validar_ui(ui)
+
+        # A verificação e a inserção são feitas na mesma instrução
+        self.executar_escrita(f"""
+            INSERT INTO {ui}_usuarios_relembrados (id_usuario)
+            SELECT ? WHERE NOT EXISTS (
+                SELECT 1 FROM {ui}_usuarios_relembrados WHERE id_usuario = ?
+            )
+        """, (id_usuario, id_usuario), nome="inserir_usuario_relembrado")
+        adicionado = self.cursor.rowcount == 1
+
+        self.confirmar()
+
+        return adicionado
 
-        # Armazena as credênciais do usuário se ele for válido
-        usuario_cadastrado = self.cursor.fetchone()
-        
-        # Cadastra o usuário na lista de usuários lembrados se ele ainda não estiver cadastrado
-        if usuario_cadastrado:
-            # Obtém a id de usuário do usuário que foi verificado
-            id_usuario = usuario_cadastrado[0]
-            # Verifica se o usuário já está na lista de usuários lembrados
-            usuario_na_lista = self.checar_id_usuario_relembrado(ui, id_usuario)
-            
-            # Cadastra o usuário caso ele ainda não esteja na lista de usuáios lembrados
-            if not usuario_na_lista:
-                self.cursor.execute(f"""
-                    INSERT INTO {ui}_usuarios_relembrados (id_usuario) VALUES(?)
-                """, (id_usuario,))
-            
-            self.conexao.commit()
-    
     def obter_usuarios_relembrados(self, ui):
         """
         Obtém uma lista com os dados de todos os usuários relembrados.
@@ -237,17 +713,294 @@ class BancoDeDados:
             ui (str): A interface gráfica (tk, kv, qt) para a qual os usuários foram relembrados.
 
         Returns:
-            list: Uma lista de tuplas contendo os dados dos usuários relembrados.
+            list: Uma lista de registros 'UsuarioRelembrado'.
         """
-        self.cursor.execute(f"""
+        validar_ui(ui)
+
+        self.executar(f"""
             SELECT id_usuario, nome_usuario, email, senha FROM usuarios AS u
             JOIN {ui}_usuarios_relembrados AS ur ON u.id = ur.id_usuario
-        """)
+        """, nome="obter_usuarios_relembrados", fabrica=UsuarioRelembrado.fabrica)
         
         lista_usuarios_relembrados = self.cursor.fetchall()
         
         return lista_usuarios_relembrados
-        
+
+    def obter_pagina_relembrados(self, ui, apos_id=0, limite=20, prefixo=None,
+                                 colunas=("id_usuario", "nome_usuario")):
+        """
+        Obtém uma página de usuários relembrados, paginada pelo id da lista (keyset).
+
+        A página percorre a chave primária da tabela de relembrados a partir de
+        'apos_id', então o custo de cada página não depende de quantas vieram antes.
+
+        Args:
+            ui (str): A interface gráfica (tk, kv, qt) para a qual os usuários foram relembrados.
+            apos_id (int): O cursor retornado pela página anterior (0 para a primeira).
+            limite (int): A quantidade máxima de usuários na página.
+            prefixo (str): Filtra os usuários cujo nome de usuário ou email começa com o texto.
+            colunas (tuple): As colunas retornadas, entre 'id_usuario', 'nome_usuario', 'email' e 'senha'.
+
+        Returns:
+            tuple: (lista de tuplas com as colunas pedidas, cursor da próxima página ou None).
+        """
+        # Uma linha a mais indica se existe uma próxima página
+        linhas = self.obter_linhas_relembrados(ui, apos_id, limite + 1, prefixo, colunas)
+        proximo = linhas[limite - 1][0] if len(linhas) > limite else None
+
+        return [linha[1:] for linha in linhas[:limite]], proximo
+
+    def obter_linhas_relembrados(self, ui, apos_id, limite, prefixo=None,
+                                 colunas=("id_usuario", "nome_usuario")):
+        """
+        Obtém as linhas de relembrados após um id da lista, com o id da lista na primeira coluna.
+
+        Base das páginas de relembrados; o armazenamento fragmentado a usa para
+        intercalar as páginas de cada fragmento.
+
+        Args:
+            ui (str): A interface gráfica (tk, kv, qt).
+            apos_id (int): O id da lista a partir do qual as linhas são lidas.
+            limite (int): A quantidade máxima de linhas.
+            prefixo (str): Filtra os usuários cujo nome de usuário ou email começa com o texto.
+            colunas (tuple): As colunas retornadas após o id da lista.
+
+        Returns:
+            list: Tuplas (id da lista, *colunas), em ordem de id da lista.
+        """
+        validar_ui(ui)
+        validar_colunas(colunas)
+
+        condicoes = ["ur.id > ?"]
+        parametros = [apos_id]
+        if prefixo:
+            # Escapa os curingas do LIKE presentes no próprio texto digitado
+            padrao = prefixo.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            condicoes.append("(u.nome_usuario LIKE ? ESCAPE '\\' OR u.email LIKE ? ESCAPE '\\')")
+            parametros += [padrao, padrao]
+
+        self.executar(f"""
+            SELECT ur.id, {', '.join(COLUNAS_RELEMBRADOS[coluna] for coluna in colunas)}
+            FROM {ui}_usuarios_relembrados AS ur
+            JOIN usuarios AS u ON u.id = ur.id_usuario
+            WHERE {' AND '.join(condicoes)}
+            ORDER BY ur.id LIMIT ?
+        """, (*parametros, limite), nome="obter_pagina_relembrados")
+
+        return self.cursor.fetchall()
+
+    def obter_usuario_relembrado(self, ui, nome_usuario):
+        """
+        Obtém os dados de um único usuário relembrado, incluindo a senha.
+
+        Usado quando uma sugestão é escolhida, para que as listas de sugestões
+        não precisem carregar as senhas de todos os usuários.
+
+        Args:
+            ui (str): A interface gráfica (tk, kv, qt) para a qual o usuário foi relembrado.
+            nome_usuario (str): O nome de usuário escolhido.
+
+        Returns:
+            UsuarioRelembrado / None: O usuário relembrado ou None se ele não estiver relembrado.
+        """
+        validar_ui(ui)
+
+        self.executar(f"""
+            SELECT u.id, u.nome_usuario, u.email, u.senha FROM usuarios AS u
+            WHERE u.nome_usuario = ? AND EXISTS (
+                SELECT 1 FROM {ui}_usuarios_relembrados AS ur WHERE ur.id_usuario = u.id
+            )
+        """, (nome_usuario,), nome="obter_usuario_relembrado", fabrica=UsuarioRelembrado.fabrica)
+
+        return self.cursor.fetchone()
+
+    def criar_sessao(self, token, id_usuario, ui, criada_em, expira_em):
+        """
+        Grava uma sessão no Banco de Dados.
+
+        Args:
+            token (str): O identificador opaco da sessão.
+            id_usuario (int): O id do usuário.
+            ui (str): A interface gráfica que abriu a sessão.
+            criada_em (float): O instante da criação.
+            expira_em (float): O instante da expiração.
+
+        Returns:
+            Sessao: A sessão gravada.
+
+        Raises:
+            ErroChaveDuplicada: Erro lançado se o token já existir.
+        """
+        try:
+            self.executar_escrita("""
+                INSERT INTO sessoes (token, id_usuario, ui, criada_em, expira_em)
+                VALUES (?, ?, ?, ?, ?)
+            """, (token, id_usuario, ui, criada_em, expira_em), nome="criar_sessao")
+        except sqlite3.IntegrityError as erro:
+            raise ErroChaveDuplicada("O token da sessão já está em uso!", "sessao_em_uso") from erro
+
+        self.confirmar()
+
+        return Sessao(token, id_usuario, ui, criada_em, expira_em)
+
+    def obter_sessao(self, token):
+        """
+        Obtém uma sessão pelo token, mesmo que ela já tenha expirado.
+
+        Args:
+            token (str): O identificador da sessão.
+
+        Returns:
+            Sessao / None: A sessão ou None.
+        """
+        self.executar("""
+            SELECT token, id_usuario, ui, criada_em, expira_em FROM sessoes WHERE token = ?
+        """, (token,), nome="obter_sessao", fabrica=Sessao.fabrica)
+
+        return self.cursor.fetchone()
+
+    def obter_sessoes_usuario(self, id_usuario, agora):
+        """
+        Obtém as sessões ainda válidas de um usuário, das mais antigas para as mais novas.
+
+        Args:
+            id_usuario (int): O id do usuário.
+            agora (float): O instante de referência (as sessões que expiram até ele ficam de fora).
+
+        Returns:
+            list: As sessões (Sessao) em ordem de criação.
+        """
+        self.executar("""
+            SELECT token, id_usuario, ui, criada_em, expira_em FROM sessoes
+            WHERE id_usuario = ? AND expira_em > ?
+            ORDER BY criada_em
+        """, (id_usuario, agora), nome="obter_sessoes_usuario", fabrica=Sessao.fabrica)
+
+        return self.cursor.fetchall()
+
+    def remover_sessao(self, token):
+        """
+        Remove uma sessão.
+
+        Args:
+            token (str): O identificador da sessão.
+
+        Returns:
+            bool: True se a sessão existia.
+        """
+        self.executar_escrita("DELETE FROM sessoes WHERE token = ?", (token,), nome="remover_sessao")
+        removida = self.cursor.rowcount == 1
+
+        self.confirmar()
+
+        return removida
+
+    def remover_sessoes_expiradas(self, agora, limite=500):
+        """
+        Remove um lote das sessões expiradas, das mais antigas para as mais novas.
+
+        O lote limita o tempo de cada transação, para que a remoção não segure
+        a escrita do banco enquanto logins aguardam.
+
+        Args:
+            agora (float): O instante de referência.
+            limite (int): A quantidade máxima de sessões removidas.
+
+        Returns:
+            int: A quantidade de sessões removidas.
+        """
+        self.executar_escrita("""
+            DELETE FROM sessoes WHERE token IN (
+                SELECT token FROM sessoes WHERE expira_em <= ? ORDER BY expira_em LIMIT ?
+            )
+        """, (agora, limite), nome="remover_sessoes_expiradas")
+        removidas = self.cursor.rowcount
+
+        self.confirmar()
+
+        return removidas
+
+    def registrar_acessos(self, acessos):
+        """
+        Acumula os logins de vários usuários em uma única transação.
+
+        Um único 'executemany' com UPSERT grava todos os usuários: o último
+        login passa a ser o mais recente entre o gravado e o informado, e as
+        contagens são somadas.
+
+        Args:
+            acessos (list): Tuplas (id_usuario, ultimo_login_em, logins), uma por usuário.
+
+        Returns:
+            None
+        """
+        if not acessos:
+            return
+
+        try:
+            self.executar_escrita("""
+                INSERT INTO acessos (id_usuario, ultimo_login_em, logins) VALUES (?, ?, ?)
+                ON CONFLICT (id_usuario) DO UPDATE SET
+                    ultimo_login_em = max(ultimo_login_em, excluded.ultimo_login_em),
+                    logins = logins + excluded.logins
+            """, acessos, nome="registrar_acessos", varios=True)
+        except sqlite3.Error:
+            # Uma falha no meio do 'executemany' deixaria parte das linhas na transação
+            if self.disco is not None:
+                self.disco.rollback()
+            self.conexao.rollback()
+            raise
+
+        self.confirmar()
+
+    def obter_acesso(self, id_usuario):
+        """
+        Obtém o último login e a contagem de logins gravados de um usuário.
+
+        Args:
+            id_usuario (int): O id do usuário.
+
+        Returns:
+            Acesso / None: O registro ou None se não houver logins gravados.
+        """
+        self.executar("""
+            SELECT id_usuario, ultimo_login_em, logins FROM acessos WHERE id_usuario = ?
+        """, (id_usuario,), nome="obter_acesso", fabrica=Acesso.fabrica)
+
+        return self.cursor.fetchone()
+
+    def fabrica_conexao(self):
+        """
+        Obtém uma função que abre o mesmo arquivo, com o mesmo perfil, em outra conexão.
+
+        Returns:
+            callable / None: A função ou None se o banco de dados estiver em
+                memória ou tiver a réplica em memória (que não receberia as
+                escritas feitas pela outra conexão).
+        """
+        if self.arquivo is None or self.disco is not None:
+            return None
+
+        return functools.partial(BancoDeDados, self.caminho, self.perfil)
+
+    def versao_dados(self):
+        """
+        Obtém o 'PRAGMA data_version' do arquivo, que muda a cada commit de outra conexão.
+
+        Os commits feitos por esta mesma conexão não alteram o valor, então ele
+        indica somente as escritas de outros processos (ou do escritor agrupado).
+        Com a réplica em memória, o valor é lido da conexão com o arquivo.
+
+        Returns:
+            int / None: A versão dos dados vista por esta conexão ou None se o
+                banco de dados estiver em memória.
+        """
+        if self.arquivo is None:
+            return None
+
+        conexao = self.disco if self.disco is not None else self.conexao
+        return conexao.execute("PRAGMA data_version").fetchone()[0]
+
     def fechar_conexao(self):
         """
         Fecha a conexão com o Banco de Dados.
@@ -258,5 +1011,99 @@ class BancoDeDados:
         Returns:
             None
         """
-        
+        # Grava os logins ainda acumulados na memória
+        if self.acessos is not None:
+            self.acessos.fechar()
+            self.acessos = None
+
+        # Confirma as escritas ainda na fila do escritor agrupado
+        if self.escritor is not None:
+            self.escritor.fechar()
+            self.escritor = None
+
+        if self.disco is not None:
+            self.disco.close()
         self.conexao.close()
+
+
+def criar_armazenamento(caminho=None):
+    """
+    Cria o armazenamento configurado para o processo.
+
+    A variável de ambiente 'CADASTRO_LOGIN_ARMAZENAMENTO' escolhe entre o
+    SQLite ('sqlite', o padrão), o armazenamento em memória ('memoria'), que
+    não grava nada em disco e serve para testes de carga, e o SQLite dividido
+    em vários arquivos ('fragmentado'). No modo fragmentado o caminho é um
+    diretório (padrão: 'CADASTRO_LOGIN_DB' ou 'usuarios_fragmentos') e
+    'CADASTRO_LOGIN_FRAGMENTOS' define o número de arquivos (4).
+
+    No SQLite em arquivo, 'CADASTRO_LOGIN_AGRUPAR_ESCRITAS' (escritas por commit)
+    e 'CADASTRO_LOGIN_AGRUPAR_ESCRITAS_MS' (espera máxima, padrão 5) habilitam a
+    escrita agrupada (ver 'BancoDeDados.agrupar_escritas') e
+    'CADASTRO_LOGIN_REPLICA=1' carrega a réplica em memória das leituras (ver
+    'BancoDeDados.carregar_replica').
+
+    Args:
+        caminho (str): O caminho do banco de dados SQLite (ver 'BancoDeDados') ou
+            o diretório dos fragmentos.
+
+    Returns:
+        Armazenamento: O armazenamento criado.
+
+    Raises:
+        ValueError: Erro lançado se o armazenamento configurado for desconhecido
+            ou se a escrita agrupada ou a réplica forem pedidas para um banco de
+            dados em memória, ou se o diretório dos fragmentos for um arquivo.
+    """
+    tipo = os.environ.get("CADASTRO_LOGIN_ARMAZENAMENTO") or "sqlite"
+    if tipo == "sqlite":
+        banco_de_dados = BancoDeDados(caminho, replica=os.environ.get("CADASTRO_LOGIN_REPLICA") == "1")
+
+        # Escrita agrupada: até N escritas por commit, esperando até M milissegundos
+        max_linhas = os.environ.get("CADASTRO_LOGIN_AGRUPAR_ESCRITAS")
+        if max_linhas:
+            max_espera = float(os.environ.get("CADASTRO_LOGIN_AGRUPAR_ESCRITAS_MS") or 5) / 1000
+            banco_de_dados.agrupar_escritas(int(max_linhas), max_espera)
+
+        return banco_de_dados
+    if tipo == "memoria":
+        return ArmazenamentoMemoria()
+    if tipo == "fragmentado":
+        # Importado aqui porque o módulo depende do 'BancoDeDados'
+        from armazenamento.fragmentado import ArmazenamentoFragmentado
+        fragmentos = int(os.environ.get("CADASTRO_LOGIN_FRAGMENTOS") or 4)
+        diretorio = caminho or os.environ.get("CADASTRO_LOGIN_DB") or DIRETORIO_FRAGMENTOS_PADRAO
+        return ArmazenamentoFragmentado(diretorio, fragmentos)
+
+    raise ValueError(f"Armazenamento desconhecido: {tipo!r}")
+
+
+def abrir_banco_de_dados():
+    """
+    Abre o Banco de Dados local ou um cliente do daemon de autenticação.
+
+    Se a variável de ambiente 'CADASTRO_LOGIN_DAEMON' apontar para o socket de
+    um daemon, as interfaces compartilham a conexão e os caches do daemon.
+    Caso contrário, cada login bem-sucedido abre uma sessão (ver 'sessoes.criar_gerenciador')
+    e é contado nos acessos do usuário (ver 'acessos.criar_acumulador').
+
+    Returns:
+        Armazenamento / ClienteAutenticacao: O objeto usado pelas interfaces.
+    """
+    caminho_socket = os.environ.get("CADASTRO_LOGIN_DAEMON")
+    if caminho_socket:
+        from servidor.cliente import ClienteAutenticacao
+        return ClienteAutenticacao(caminho_socket)
+
+    banco_de_dados = criar_armazenamento()
+
+    # Inicia as cópias de segurança periódicas se elas estiverem habilitadas
+    backup.agendar_se_configurado(banco_de_dados.arquivo)
+
+    # Registra as sessões abertas pelos logins e remove as expiradas em segundo plano
+    banco_de_dados.sessoes = sessoes.criar_gerenciador(banco_de_dados)
+
+    # Acumula o último login e a contagem de logins, gravados em lotes
+    banco_de_dados.acessos = acessos.criar_acumulador(banco_de_dados)
+
+    return banco_de_dados
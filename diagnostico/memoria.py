@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+"""Módulo para medir o crescimento de memória a cada ação das interfaces gráficas."""
+
+import collections
+import contextlib
+import functools
+import gc
+import inspect
+import logging
+import os
+import tracemalloc
+
+
+logger = logging.getLogger(__name__)
+
+# Alocações internas que não interessam ao diagnóstico
+_FILTROS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def _formatar_bytes(tamanho):
+    """
+    Formata uma quantidade de bytes com sinal e unidade legível.
+
+    Args:
+        tamanho (int): A quantidade de bytes.
+
+    Returns:
+        str: O tamanho formatado (ex.: '+1.5 KiB').
+    """
+    valor = float(tamanho)
+    for unidade in ("B", "KiB", "MiB"):
+        if abs(valor) < 1024 or unidade == "MiB":
+            break
+        valor /= 1024
+
+    return f"{valor:+.1f} {unidade}"
+
+
+class MonitorMemoria:
+    """
+    Classe que compara instantâneos do 'tracemalloc' antes e depois de cada ação.
+
+    Attributes:
+        ui (str): A interface gráfica monitorada (tk, qt, kv).
+        contar_widgets (callable): Função que retorna um Counter de widgets por classe.
+        maiores (int): Quantos locais de alocação aparecem em cada relatório.
+        historico (list): Os resultados de cada ação medida.
+    """
+
+    def __init__(self, ui, contar_widgets, maiores=10, quadros=5):
+        """
+        Inicializa o monitor e começa a rastrear as alocações.
+
+        Args:
+            ui (str): A interface gráfica monitorada (tk, qt, kv).
+            contar_widgets (callable): Função que retorna um Counter de widgets por classe.
+            maiores (int): Quantos locais de alocação aparecem em cada relatório.
+            quadros (int): Quantos quadros da pilha são guardados por alocação.
+
+        Returns:
+            None
+        """
+        self.ui = ui
+        self.contar_widgets = contar_widgets
+        self.maiores = maiores
+        self.historico = []
+        self._profundidade = 0
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(quadros)
+
+    def _instantaneo(self):
+        """
+        Tira um instantâneo das alocações após uma coleta de lixo.
+
+        Returns:
+            tracemalloc.Snapshot: O instantâneo filtrado.
+        """
+        gc.collect()
+        return tracemalloc.take_snapshot().filter_traces(_FILTROS)
+
+    @contextlib.contextmanager
+    def acao(self, nome):
+        """
+        Mede o crescimento de memória e de widgets durante uma ação.
+
+        Ações aninhadas (ex.: um cadastro que troca de tela ao final) são
+        contabilizadas apenas na ação mais externa.
+
+        Args:
+            nome (str): O nome da ação (ex.: 'login').
+
+        Yields:
+            None
+        """
+        self._profundidade += 1
+        if self._profundidade > 1:
+            try:
+                yield
+            finally:
+                self._profundidade -= 1
+            return
+
+        widgets_antes = self.contar_widgets()
+        antes = self._instantaneo()
+        try:
+            yield
+        finally:
+            self._profundidade -= 1
+            depois = self._instantaneo()
+            widgets_depois = self.contar_widgets()
+            self._registrar(nome, antes, depois, widgets_antes, widgets_depois)
+
+    def _registrar(self, nome, antes, depois, widgets_antes, widgets_depois):
+        """
+        Compara os instantâneos de uma ação e registra o resultado no log.
+
+        Args:
+            nome (str): O nome da ação.
+            antes (tracemalloc.Snapshot): O instantâneo anterior à ação.
+            depois (tracemalloc.Snapshot): O instantâneo posterior à ação.
+            widgets_antes (collections.Counter): Os widgets vivos antes da ação.
+            widgets_depois (collections.Counter): Os widgets vivos depois da ação.
+
+        Returns:
+            None
+        """
+        diferencas = depois.compare_to(antes, "lineno")
+        crescimentos = [d for d in diferencas if d.size_diff > 0][:self.maiores]
+        variacao = sum(d.size_diff for d in diferencas)
+
+        widgets = {
+            classe: widgets_depois[classe] - widgets_antes[classe]
+            for classe in set(widgets_antes) | set(widgets_depois)
+            if widgets_depois[classe] != widgets_antes[classe]
+        }
+
+        self.historico.append({
+            "acao": nome,
+            "variacao": variacao,
+            "widgets": widgets,
+            "widgets_vivos": sum(widgets_depois.values()),
+            "crescimentos": [
+                (str(d.traceback[0]), d.size_diff, d.count_diff) for d in crescimentos
+            ],
+        })
+
+        linhas = [
+            f"[{self.ui}] ação '{nome}': {_formatar_bytes(variacao)} "
+            f"({sum(widgets_depois.values())} widgets vivos)"
+        ]
+        if widgets:
+            linhas.append("  widgets: " + ", ".join(
+                f"{classe} {quantidade:+d}" for classe, quantidade in sorted(widgets.items())
+            ))
+        for diferenca in crescimentos:
+            linhas.append(
+                f"  {diferenca.traceback[0]}: {_formatar_bytes(diferenca.size_diff)} "
+                f"({diferenca.count_diff:+d} blocos)"
+            )
+
+        logger.info("\n".join(linhas))
+
+
+# Monitor global, criado somente quando o diagnóstico de memória é habilitado
+_monitor = None
+
+
+def configurar_memoria(ui, contar_widgets):
+    """
+    Cria o monitor de memória se a variável de ambiente correspondente estiver definida.
+
+    Args:
+        ui (str): A interface gráfica monitorada (tk, qt, kv).
+        contar_widgets (callable): Função que retorna um Counter de widgets por classe.
+
+    Returns:
+        MonitorMemoria / None: O monitor criado ou None.
+    """
+    global _monitor
+
+    valor = os.environ.get("CADASTRO_LOGIN_MEMORIA")
+    if not valor:
+        return None
+
+    # Garante que os relatórios apareçam no log
+    logging.basicConfig(level=logging.INFO)
+
+    quadros = int(valor) if valor.isdigit() and int(valor) > 1 else 5
+    _monitor = MonitorMemoria(ui, contar_widgets, quadros=quadros)
+
+    return _monitor
+
+
+def medir_acao(nome):
+    """
+    Decorador que mede a memória de um método de interface, se o monitor existir.
+
+    Sem o monitor configurado, o custo é apenas o de uma chamada extra.
+
+    Args:
+        nome (str): O nome da ação (ex.: 'login').
+
+    Returns:
+        callable: O decorador.
+    """
+    def decorador(funcao):
+        parametros = inspect.signature(funcao).parameters.values()
+        aceita_variaveis = any(p.kind == p.VAR_POSITIONAL for p in parametros)
+        posicionais = sum(
+            p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD) for p in parametros
+        )
+
+        @functools.wraps(funcao)
+        def funcao_medida(*args, **kwargs):
+            # Sinais do Qt podem enviar argumentos extras (ex.: 'checked'); assim
+            # como o próprio Qt faz com os slots, eles são descartados
+            if not aceita_variaveis:
+                args = args[:posicionais]
+
+            if _monitor is None:
+                return funcao(*args, **kwargs)
+
+            with _monitor.acao(nome):
+                return funcao(*args, **kwargs)
+
+        return funcao_medida
+
+    return decorador
+
+
+def contar_widgets_tk(raiz):
+    """
+    Cria uma função que conta os widgets do Tkinter vivos, por classe.
+
+    Args:
+        raiz (tk.Tk): A janela principal da aplicação.
+
+    Returns:
+        callable: Função que retorna um Counter de widgets por classe.
+    """
+    def contar():
+        contagem = collections.Counter()
+        pendentes = [raiz]
+        while pendentes:
+            widget = pendentes.pop()
+            contagem[widget.winfo_class()] += 1
+            pendentes.extend(widget.winfo_children())
+
+        return contagem
+
+    return contar
+
+
+def contar_widgets_qt():
+    """
+    Conta os widgets do PySide6 vivos, por classe.
+
+    Returns:
+        collections.Counter: A contagem de widgets por classe.
+    """
+    from PySide6.QtWidgets import QApplication
+
+    return collections.Counter(type(widget).__name__ for widget in QApplication.allWidgets())
+
+
+def contar_widgets_kv():
+    """
+    Conta os widgets do Kivy vivos (inclusive os que saíram da árvore), por classe.
+
+    Returns:
+        collections.Counter: A contagem de widgets por classe.
+    """
+    from kivy.uix.widget import Widget
+
+    return collections.Counter(
+        type(objeto).__name__ for objeto in gc.get_objects() if isinstance(objeto, Widget)
+    )
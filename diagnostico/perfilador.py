@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""Módulo com um perfilador por amostragem que gera pilhas no formato 'collapsed'."""
+
+import atexit
+import collections
+import os
+import sys
+import threading
+import time
+
+
+def _descrever_quadro(quadro):
+    """
+    Gera o nome de um quadro da pilha para o arquivo de pilhas colapsadas.
+
+    Args:
+        quadro (frame): O quadro de execução.
+
+    Returns:
+        str: O nome da função seguido do arquivo e da linha onde ela é definida.
+    """
+    codigo = quadro.f_code
+    arquivo = os.path.basename(codigo.co_filename)
+    # Ponto e vírgula separa os quadros no formato 'collapsed'
+    return f"{codigo.co_name} ({arquivo}:{codigo.co_firstlineno})".replace(";", ":")
+
+
+class PerfiladorAmostragem:
+    """
+    Classe que amostra periodicamente as pilhas de todas as threads.
+
+    Diferente do 'cProfile', o custo não depende do número de chamadas: uma
+    thread de fundo lê 'sys._current_frames()' na frequência configurada, o
+    que mantém a medição fiel em trechos dominados pelo bcrypt.
+
+    Attributes:
+        frequencia (float): O número de amostras por segundo.
+        somente_principal (bool): Indica se apenas a thread principal é amostrada.
+        amostras (collections.Counter): A contagem de cada pilha amostrada.
+    """
+
+    def __init__(self, frequencia=100, somente_principal=False):
+        """
+        Inicializa o perfilador sem iniciá-lo.
+
+        Args:
+            frequencia (float): O número de amostras por segundo.
+            somente_principal (bool): Indica se apenas a thread principal é amostrada.
+
+        Returns:
+            None
+        """
+        self.frequencia = frequencia
+        self.somente_principal = somente_principal
+        self.amostras = collections.Counter()
+
+        self._parar = threading.Event()
+        self._thread = None
+
+    def iniciar(self):
+        """
+        Inicia a thread de amostragem.
+
+        Returns:
+            None
+        """
+        if self._thread is not None:
+            return
+
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._amostrar, name="perfilador", daemon=True)
+        self._thread.start()
+
+    def parar(self):
+        """
+        Interrompe a thread de amostragem.
+
+        Returns:
+            None
+        """
+        if self._thread is None:
+            return
+
+        self._parar.set()
+        self._thread.join()
+        self._thread = None
+
+    def _amostrar(self):
+        """
+        Coleta as pilhas das threads até o perfilador ser interrompido.
+
+        Returns:
+            None
+        """
+        intervalo = 1 / self.frequencia
+        id_proprio = threading.get_ident()
+        id_principal = threading.main_thread().ident
+        proximo = time.perf_counter()
+
+        while not self._parar.is_set():
+            nomes = {thread.ident: thread.name for thread in threading.enumerate()}
+
+            for id_thread, quadro in sys._current_frames().items():
+                if id_thread == id_proprio:
+                    continue
+                if self.somente_principal and id_thread != id_principal:
+                    continue
+
+                pilha = []
+                while quadro is not None:
+                    pilha.append(_descrever_quadro(quadro))
+                    quadro = quadro.f_back
+
+                pilha.append(f"thread {nomes.get(id_thread, id_thread)}")
+                pilha.reverse()
+                self.amostras[tuple(pilha)] += 1
+
+            # Compensa o tempo gasto na coleta para manter a frequência
+            proximo += intervalo
+            espera = proximo - time.perf_counter()
+            if espera > 0:
+                self._parar.wait(espera)
+            else:
+                proximo = time.perf_counter()
+
+    def gravar(self, caminho):
+        """
+        Grava as pilhas amostradas no formato 'collapsed' (uma pilha por linha).
+
+        O arquivo pode ser lido pelo 'flamegraph.pl', pelo 'speedscope' e por
+        outras ferramentas de gráficos de chama.
+
+        Args:
+            caminho (str): O caminho do arquivo de destino.
+
+        Returns:
+            None
+        """
+        with open(caminho, "w", encoding="utf-8") as arquivo:
+            for pilha, contagem in self.amostras.most_common():
+                arquivo.write(f"{';'.join(pilha)} {contagem}\n")
+
+
+def perfilar_se_configurado():
+    """
+    Inicia o perfilador se a variável de ambiente correspondente estiver definida.
+
+    As pilhas são gravadas no arquivo indicado por 'CADASTRO_LOGIN_PERFILADOR'
+    ao encerrar o processo, com a frequência de 'CADASTRO_LOGIN_PERFILADOR_HZ'.
+
+    Returns:
+        PerfiladorAmostragem / None: O perfilador iniciado ou None.
+    """
+    caminho = os.environ.get("CADASTRO_LOGIN_PERFILADOR")
+    if not caminho:
+        return None
+
+    perfilador = PerfiladorAmostragem(
+        float(os.environ.get("CADASTRO_LOGIN_PERFILADOR_HZ", "100"))
+    )
+    perfilador.iniciar()
+
+    def finalizar():
+        perfilador.parar()
+        perfilador.gravar(caminho)
+
+    atexit.register(finalizar)
+
+    return perfilador
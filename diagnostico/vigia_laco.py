@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+"""Módulo para detectar travamentos no laço de eventos das interfaces gráficas."""
+
+import atexit
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+
+import metricas
+
+
+logger = logging.getLogger(__name__)
+
+# Faixas (em segundos) do histograma de duração dos travamentos
+LIMITES_TRAVAMENTO = (0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0)
+
+DURACAO_TRAVAMENTO = metricas.registro.histograma(
+    "ui_travamento_laco_segundos",
+    "Duração dos travamentos do laço de eventos das interfaces gráficas.",
+    LIMITES_TRAVAMENTO,
+)
+
+
+class VigiaLacoEventos:
+    """
+    Classe que vigia o laço de eventos de uma interface gráfica.
+
+    Um "batimento" é agendado periodicamente pelo temporizador do próprio
+    framework (after, QTimer ou Clock). Uma thread de monitoramento confere o
+    horário do último batimento e, se ele estiver atrasado além do limite,
+    captura a pilha da thread principal para mostrar o que a está bloqueando.
+    A duração de cada travamento é registrada quando o batimento volta a ocorrer.
+
+    Attributes:
+        ui (str): A interface gráfica vigiada (tk, qt, kv).
+        limite (float): O atraso, em segundos, a partir do qual há um travamento.
+        intervalo (float): O intervalo entre os batimentos, em segundos.
+        travamentos (int): O número de travamentos detectados.
+    """
+
+    def __init__(self, ui, agendar, limite=0.2, intervalo=None):
+        """
+        Inicializa o vigia sem iniciá-lo.
+
+        Args:
+            ui (str): A interface gráfica vigiada (tk, qt, kv).
+            agendar (callable): Função 'agendar(segundos, funcao)' que executa
+                'funcao' uma vez no laço de eventos após o intervalo.
+            limite (float): O atraso, em segundos, a partir do qual há um travamento.
+            intervalo (float): O intervalo entre os batimentos (padrão: limite / 4).
+
+        Returns:
+            None
+        """
+        self.ui = ui
+        self.agendar = agendar
+        self.limite = limite
+        self.intervalo = intervalo or limite / 4
+        self.travamentos = 0
+
+        self._id_thread = None
+        self._ultimo = None
+        self._pilha = None
+        self._parar = threading.Event()
+        self._monitor = None
+
+    def iniciar(self):
+        """
+        Inicia os batimentos e a thread de monitoramento.
+
+        Deve ser chamado a partir da thread que executa o laço de eventos.
+
+        Returns:
+            None
+        """
+        self._id_thread = threading.get_ident()
+        self._ultimo = time.perf_counter()
+        self._parar.clear()
+        self.agendar(self.intervalo, self._batimento)
+
+        self._monitor = threading.Thread(
+            target=self._monitorar,
+            name=f"vigia-laco-{self.ui}",
+            daemon=True
+        )
+        self._monitor.start()
+        atexit.register(self.parar)
+
+    def parar(self):
+        """
+        Interrompe o monitoramento e registra o histograma dos travamentos no log.
+
+        Returns:
+            None
+        """
+        if self._monitor is None:
+            return
+
+        self._parar.set()
+        self._monitor.join()
+        self._monitor = None
+        logger.info(self.relatorio())
+
+    def _batimento(self):
+        """
+        Registra um batimento do laço de eventos e agenda o próximo.
+
+        Returns:
+            None
+        """
+        agora = time.perf_counter()
+        atraso = agora - self._ultimo - self.intervalo
+        self._ultimo = agora
+
+        if atraso > self.limite:
+            self.travamentos += 1
+            DURACAO_TRAVAMENTO.observar(atraso, ui=self.ui)
+            pilha = self._pilha or "(pilha não capturada)\n"
+            logger.warning(
+                "Laço de eventos '%s' ficou travado por %.0f ms. Pilha da thread principal:\n%s",
+                self.ui, atraso * 1000, pilha
+            )
+        self._pilha = None
+
+        if not self._parar.is_set():
+            self.agendar(self.intervalo, self._batimento)
+
+    def _monitorar(self):
+        """
+        Confere periodicamente o atraso do último batimento (executado em outra thread).
+
+        Returns:
+            None
+        """
+        while not self._parar.wait(self.intervalo):
+            atraso = time.perf_counter() - self._ultimo - self.intervalo
+
+            # Captura a pilha uma única vez por travamento
+            if atraso > self.limite and self._pilha is None:
+                quadro = sys._current_frames().get(self._id_thread)
+                if quadro is not None:
+                    self._pilha = "".join(traceback.format_stack(quadro))
+
+    def relatorio(self):
+        """
+        Gera um resumo textual do histograma de travamentos desta interface.
+
+        Returns:
+            str: O histograma formatado.
+        """
+        linhas = [f"Travamentos do laço de eventos '{self.ui}': {self.travamentos}"]
+
+        for amostra in DURACAO_TRAVAMENTO.amostras():
+            if amostra["rotulos"].get("ui") != self.ui:
+                continue
+
+            anterior = 0
+            for limite, acumulado in amostra["faixas"].items():
+                faixa = "> 30 s" if limite == float("inf") else f"<= {limite:g} s"
+                linhas.append(f"  {faixa:>10}: {acumulado - anterior}")
+                anterior = acumulado
+
+        return "\n".join(linhas)
+
+
+def limite_configurado():
+    """
+    Obtém o limite de travamento definido pela variável de ambiente.
+
+    Returns:
+        float / None: O limite em segundos ou None se o vigia estiver desabilitado.
+    """
+    valor = os.environ.get("CADASTRO_LOGIN_VIGIA_LACO")
+    if not valor:
+        return None
+
+    # Garante que os travamentos e o histograma apareçam no log
+    logging.basicConfig(level=logging.INFO)
+
+    return float(valor) / 1000
+
+
+def vigiar_tk(raiz, limite):
+    """
+    Inicia um vigia para o laço de eventos do Tkinter.
+
+    Args:
+        raiz (tk.Tk): A janela principal da aplicação.
+        limite (float): O atraso, em segundos, a partir do qual há um travamento.
+
+    Returns:
+        VigiaLacoEventos: O vigia iniciado.
+    """
+    vigia = VigiaLacoEventos(
+        "tk",
+        lambda segundos, funcao: raiz.after(int(segundos * 1000), funcao),
+        limite
+    )
+    vigia.iniciar()
+
+    return vigia
+
+
+def vigiar_qt(limite):
+    """
+    Inicia um vigia para o laço de eventos do PySide6.
+
+    Args:
+        limite (float): O atraso, em segundos, a partir do qual há um travamento.
+
+    Returns:
+        VigiaLacoEventos: O vigia iniciado.
+    """
+    from PySide6.QtCore import QTimer
+
+    vigia = VigiaLacoEventos(
+        "qt",
+        lambda segundos, funcao: QTimer.singleShot(int(segundos * 1000), funcao),
+        limite
+    )
+    vigia.iniciar()
+
+    return vigia
+
+
+def vigiar_kv(limite):
+    """
+    Inicia um vigia para o laço de eventos do Kivy.
+
+    Args:
+        limite (float): O atraso, em segundos, a partir do qual há um travamento.
+
+    Returns:
+        VigiaLacoEventos: O vigia iniciado.
+    """
+    from kivy.clock import Clock
+
+    vigia = VigiaLacoEventos(
+        "kv",
+        lambda segundos, funcao: Clock.schedule_once(lambda dt: funcao(), segundos),
+        limite
+    )
+    vigia.iniciar()
+
+    return vigia
@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+"""
+Confirmação agrupada (group commit) dos cadastros e do "lembrar de mim".
+
+Cada cadastro confirmado isoladamente custa um commit, e portanto um fsync.
+Com a escrita agrupada, os cadastros e as inclusões na lista de relembrados
+são entregues a uma thread escritora, que os executa em uma conexão própria e
+confirma vários de uma vez: um grupo fecha ao atingir 'max_linhas' escritas
+ou 'max_espera' segundos após a primeira. Cada chamador recebe um
+'concurrent.futures.Future' que só é resolvido depois do commit do seu grupo,
+então a durabilidade de cada requisição é a mesma da escrita isolada.
+
+Uma escrita rejeitada (ex.: nome de usuário repetido) falha somente o seu
+próprio futuro; uma falha do SQLite no grupo ou no commit falha o grupo todo.
+"""
+
+import atexit
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+
+import metricas
+
+
+logger = logging.getLogger(__name__)
+
+
+class EscritorAgrupado:
+    """
+    Classe que executa escritas em uma thread própria e as confirma em grupos.
+
+    Attributes:
+        fabrica (callable): Cria o armazenamento usado pela thread escritora.
+        max_linhas (int): A quantidade máxima de escritas por commit.
+        max_espera (float): O tempo máximo, em segundos, entre a primeira escrita de um grupo e o commit.
+        grupos (int): A quantidade de commits feitos.
+        linhas (int): A quantidade de escritas confirmadas ou rejeitadas.
+    """
+
+    def __init__(self, fabrica, max_linhas=50, max_espera=0.005):
+        """
+        Inicializa o escritor sem iniciar a thread.
+
+        Args:
+            fabrica (callable): Cria, na thread escritora, o 'BancoDeDados' com a
+                conexão própria do escritor (ex.: 'functools.partial(BancoDeDados, caminho)').
+            max_linhas (int): A quantidade máxima de escritas por commit.
+            max_espera (float): O tempo máximo de espera por mais escritas, em segundos
+                (0 confirma imediatamente o que já estiver na fila).
+
+        Returns:
+            None
+        """
+        self.fabrica = fabrica
+        self.max_linhas = max_linhas
+        self.max_espera = max_espera
+
+        self.grupos = 0
+        self.linhas = 0
+
+        self._fila = queue.SimpleQueue()
+        self._thread = None
+        self._pronto = threading.Event()
+        self._erro_abertura = None
+
+    def iniciar(self):
+        """
+        Inicia a thread escritora e aguarda a abertura da sua conexão.
+
+        Returns:
+            None
+
+        Raises:
+            sqlite3.Error: Erro lançado se a conexão do escritor não puder ser aberta.
+        """
+        if self._thread is not None:
+            return
+
+        self._pronto.clear()
+        self._thread = threading.Thread(target=self._executar, name="escritor-agrupado", daemon=True)
+        self._thread.start()
+        self._pronto.wait()
+
+        if self._erro_abertura is not None:
+            self._thread.join()
+            self._thread = None
+            raise self._erro_abertura
+
+        atexit.register(self.fechar)
+
+    def enviar(self, operacao, *args):
+        """
+        Enfileira uma escrita para o próximo grupo.
+
+        Args:
+            operacao (str): O método do armazenamento executado pelo escritor.
+            *args: Os argumentos do método.
+
+        Returns:
+            concurrent.futures.Future: Resolvido com o retorno do método após o commit.
+
+        Raises:
+            RuntimeError: Erro lançado se o escritor não estiver em execução.
+        """
+        if self._thread is None:
+            raise RuntimeError("O escritor agrupado não está em execução.")
+
+        futuro = Future()
+        self._fila.put((operacao, args, futuro))
+        return futuro
+
+    def cadastrar_usuario(self, nome_usuario, email, senha):
+        """
+        Enfileira o cadastro de um usuário.
+
+        Args:
+            nome_usuario (str): O nome de usuário do novo usuário.
+            email (str): O email do novo usuário.
+            senha (bytes): A senha criptografada do novo usuário.
+
+        Returns:
+            concurrent.futures.Future: Resolvido com o id do usuário após o commit.
+        """
+        return self.enviar("inserir_usuario", nome_usuario, email, senha)
+
+    def lembrar_usuario(self, ui, nome_usuario_email, senha):
+        """
+        Enfileira a inclusão de um usuário na lista de relembrados.
+
+        Args:
+            ui (str): A interface gráfica (tk, kv, qt).
+            nome_usuario_email (str): O nome de usuário ou email a ser relembrado.
+            senha (bytes): A senha criptografada do usuário.
+
+        Returns:
+            concurrent.futures.Future: Resolvido com None após o commit.
+        """
+        return self.enviar("lembrar_usuario", ui, nome_usuario_email, senha)
+
+    def fechar(self):
+        """
+        Confirma as escritas pendentes e encerra a thread escritora.
+
+        Returns:
+            None
+        """
+        if self._thread is not None:
+            self._fila.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def _executar(self):
+        """
+        Laço da thread escritora: coleta e confirma grupos até receber o sinal de parada.
+
+        Returns:
+            None
+        """
+        try:
+            banco_de_dados = self.fabrica()
+        except sqlite3.Error as erro:
+            self._erro_abertura = erro
+            self._pronto.set()
+            return
+
+        # Os métodos de escrita deixam o commit para o fim do grupo
+        banco_de_dados.confirmacao_adiada = True
+        self._pronto.set()
+
+        try:
+            encerrar = False
+            while not encerrar:
+                grupo, encerrar = self._coletar()
+                if grupo:
+                    self._confirmar_grupo(banco_de_dados, grupo)
+        finally:
+            banco_de_dados.fechar_conexao()
+
+    def _coletar(self):
+        """
+        Aguarda a primeira escrita e reúne as seguintes até o limite de linhas ou de tempo.
+
+        Returns:
+            tuple: (lista de escritas, True se o escritor deve encerrar após o grupo).
+        """
+        item = self._fila.get()
+        if item is None:
+            return [], True
+
+        grupo = [item]
+        prazo = time.monotonic() + self.max_espera
+        while len(grupo) < self.max_linhas:
+            try:
+                restante = prazo - time.monotonic()
+                item = self._fila.get(timeout=restante) if restante > 0 else self._fila.get_nowait()
+            except queue.Empty:
+                break
+
+            if item is None:
+                return grupo, True
+            grupo.append(item)
+
+        return grupo, False
+
+    def _confirmar_grupo(self, banco_de_dados, grupo):
+        """
+        Executa as escritas de um grupo em uma única transação e resolve os futuros.
+
+        Args:
+            banco_de_dados (BancoDeDados): O armazenamento da thread escritora.
+            grupo (list): As escritas (operação, argumentos, futuro).
+
+        Returns:
+            None
+        """
+        resultados = []
+        falha = None
+        for operacao, args, futuro in grupo:
+            if not futuro.set_running_or_notify_cancel():
+                continue
+
+            try:
+                resultados.append((futuro, getattr(banco_de_dados, operacao)(*args), None))
+            except sqlite3.Error as erro:
+                # Um erro do próprio SQLite pode ter desfeito a transação inteira
+                resultados.append((futuro, None, erro))
+                falha = erro
+            except Exception as erro:
+                # Rejeição da escrita (ex.: 'ErroChaveDuplicada'): a transação segue válida
+                resultados.append((futuro, None, erro))
+
+        if falha is None:
+            try:
+                banco_de_dados.conexao.commit()
+            except sqlite3.Error as erro:
+                falha = erro
+
+        if falha is not None:
+            banco_de_dados.conexao.rollback()
+            logger.error("Falha ao confirmar um grupo de %d escritas: %s", len(resultados), falha)
+            resultados = [(futuro, None, erro or falha) for futuro, _, erro in resultados]
+
+        self.grupos += 1
+        self.linhas += len(resultados)
+        if metricas.registro.habilitado:
+            metricas.TAMANHO_GRUPO_COMMIT.observar(len(resultados))
+
+        for futuro, resultado, erro in resultados:
+            if erro is None:
+                futuro.set_result(resultado)
+            else:
+                futuro.set_exception(erro)
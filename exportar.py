@@ -0,0 +1,318 @@
+# -*- coding: utf-8 -*-
+"""
+Exportação dos usuários e dos usuários relembrados com memória constante.
+
+As tabelas são lidas em páginas por paginação keyset no 'id' (WHERE id > ?
+ORDER BY id LIMIT ?), consumidas com 'fetchmany'. Cada página é lida por
+completo antes de ser entregue, então nenhum bloqueio de leitura fica aberto
+enquanto o arquivo é escrito, e a memória usada é limitada ao tamanho da página.
+
+O banco de dados é o armazenamento configurado (ver 'criar_armazenamento'):
+no modo fragmentado, cada fragmento é paginado da mesma forma e as linhas
+são intercaladas pelo id global ('id local * N + índice do fragmento'). O
+armazenamento em memória não é exportável, pois não é compartilhado com
+outros processos.
+
+Uso (a partir da pasta raiz do projeto):
+
+    python -m exportar usuarios usuarios.csv.gz
+    python -m exportar relembrados_tk - --formato jsonl
+    python -m exportar usuarios - --db "file:/dados/usuarios.db?mode=ro"
+"""
+
+import argparse
+import contextlib
+import csv
+import gzip
+import heapq
+import io
+import json
+import sys
+
+from armazenamento.fragmentado import ArmazenamentoFragmentado
+from database import BancoDeDados, criar_armazenamento
+
+
+# Colunas exportadas por tabela (a senha só é exportada quando solicitada)
+COLUNAS_USUARIOS = ("id", "nome_usuario", "email")
+COLUNAS_RELEMBRADOS = ("id", "id_usuario", "nome_usuario", "email")
+
+TABELAS = ("usuarios", "relembrados_tk", "relembrados_qt", "relembrados_kv")
+FORMATOS = ("csv", "jsonl")
+
+
+def _paginar(banco_de_dados, sql, tamanho_pagina, tamanho_lote):
+    """
+    Percorre uma consulta keyset página a página.
+
+    A consulta recebe (último id, limite) e deve retornar o id na primeira coluna.
+
+    Args:
+        banco_de_dados (BancoDeDados): O banco de dados lido.
+        sql (str): A consulta paginada.
+        tamanho_pagina (int): Quantas linhas cada consulta retorna.
+        tamanho_lote (int): Quantas linhas cada 'fetchmany' lê.
+
+    Yields:
+        tuple: As linhas, em ordem de id.
+    """
+    # Um cursor próprio, para não interferir no cursor compartilhado do banco
+    cursor = banco_de_dados.conexao.cursor()
+    ultimo_id = 0
+    try:
+        while True:
+            cursor.execute(sql, (ultimo_id, tamanho_pagina))
+            pagina = []
+            # Lê até o fim, para que a instrução termine e libere a leitura
+            while linhas := cursor.fetchmany(tamanho_lote):
+                pagina.extend(linhas)
+
+            yield from pagina
+
+            if len(pagina) < tamanho_pagina:
+                return
+            ultimo_id = pagina[-1][0]
+    finally:
+        cursor.close()
+
+
+def iterar_usuarios(banco_de_dados, incluir_senha=False, tamanho_pagina=1000, tamanho_lote=256):
+    """
+    Percorre a tabela de usuários em ordem de id.
+
+    Args:
+        banco_de_dados (BancoDeDados): O banco de dados lido.
+        incluir_senha (bool): Se a senha criptografada é incluída (ex.: migrações).
+        tamanho_pagina (int): Quantas linhas cada consulta retorna.
+        tamanho_lote (int): Quantas linhas cada 'fetchmany' lê.
+
+    Yields:
+        tuple: (id, nome_usuario, email) ou (id, nome_usuario, email, senha).
+    """
+    colunas = ", ".join(colunas_exportadas("usuarios", incluir_senha))
+    sql = f"SELECT {colunas} FROM usuarios WHERE id > ? ORDER BY id LIMIT ?"
+
+    return _paginar(banco_de_dados, sql, tamanho_pagina, tamanho_lote)
+
+
+def iterar_relembrados(banco_de_dados, ui, incluir_senha=False, tamanho_pagina=1000, tamanho_lote=256):
+    """
+    Percorre os usuários relembrados de uma interface, em ordem de id da lista.
+
+    Args:
+        banco_de_dados (BancoDeDados): O banco de dados lido.
+        ui (str): A interface gráfica (tk, kv, qt).
+        incluir_senha (bool): Se a senha criptografada é incluída.
+        tamanho_pagina (int): Quantas linhas cada consulta retorna.
+        tamanho_lote (int): Quantas linhas cada 'fetchmany' lê.
+
+    Yields:
+        tuple: (id, id_usuario, nome_usuario, email) ou com a senha ao final.
+    """
+    if ui not in ("tk", "qt", "kv"):
+        raise ValueError(f"Interface inválida: {ui!r}")
+
+    senha = ", u.senha" if incluir_senha else ""
+    sql = f"""
+        SELECT ur.id, ur.id_usuario, u.nome_usuario, u.email{senha}
+        FROM {ui}_usuarios_relembrados AS ur
+        JOIN usuarios AS u ON u.id = ur.id_usuario
+        WHERE ur.id > ? ORDER BY ur.id LIMIT ?
+    """
+
+    return _paginar(banco_de_dados, sql, tamanho_pagina, tamanho_lote)
+
+
+def colunas_exportadas(tabela, incluir_senha=False):
+    """
+    Obtém as colunas exportadas de uma tabela.
+
+    Args:
+        tabela (str): 'usuarios' ou 'relembrados_<ui>'.
+        incluir_senha (bool): Se a senha criptografada é incluída.
+
+    Returns:
+        tuple: Os nomes das colunas, na ordem das linhas.
+    """
+    colunas = COLUNAS_USUARIOS if tabela == "usuarios" else COLUNAS_RELEMBRADOS
+    return colunas + ("senha",) if incluir_senha else colunas
+
+
+def _texto(valor):
+    """
+    Converte as senhas criptografadas (bytes) em texto.
+
+    Args:
+        valor (object): O valor de uma coluna.
+
+    Returns:
+        object: O valor, com bytes decodificados.
+    """
+    return valor.decode() if isinstance(valor, bytes) else valor
+
+
+def iterar_tabela(armazenamento, tabela, incluir_senha=False, tamanho_pagina=1000):
+    """
+    Percorre uma tabela de um banco de dados SQLite ou de um armazenamento fragmentado.
+
+    Args:
+        armazenamento (BancoDeDados / ArmazenamentoFragmentado): O armazenamento lido.
+        tabela (str): 'usuarios' ou 'relembrados_<ui>'.
+        incluir_senha (bool): Se a senha criptografada é incluída.
+        tamanho_pagina (int): Quantas linhas cada consulta retorna (por fragmento).
+
+    Returns:
+        iterator: As linhas, em ordem de id (global, no modo fragmentado).
+
+    Raises:
+        ValueError: Erro lançado se o armazenamento não for exportável.
+    """
+    def iterar(banco_de_dados):
+        if tabela == "usuarios":
+            return iterar_usuarios(banco_de_dados, incluir_senha, tamanho_pagina)
+        return iterar_relembrados(banco_de_dados, tabela.split("_", 1)[1], incluir_senha, tamanho_pagina)
+
+    if isinstance(armazenamento, BancoDeDados):
+        return iterar(armazenamento)
+    if not isinstance(armazenamento, ArmazenamentoFragmentado):
+        raise ValueError(f"O armazenamento {type(armazenamento).__name__} não pode ser exportado.")
+
+    # Os ids (e o id do usuário nos relembrados) são locais ao fragmento
+    total = len(armazenamento.fragmentos)
+    globais = 1 if tabela == "usuarios" else 2
+
+    def linhas_globais(indice, banco_de_dados):
+        for linha in iterar(banco_de_dados):
+            yield tuple(valor * total + indice for valor in linha[:globais]) + linha[globais:]
+
+    return heapq.merge(
+        *(linhas_globais(indice, banco_de_dados) for indice, banco_de_dados in enumerate(armazenamento.fragmentos)),
+        key=lambda linha: linha[0]
+    )
+
+
+def escrever(linhas, colunas, arquivo, formato="csv"):
+    """
+    Escreve as linhas em um arquivo de texto, uma a uma.
+
+    Args:
+        linhas (iterable): As linhas a serem escritas.
+        colunas (tuple): Os nomes das colunas.
+        arquivo (file): O arquivo de texto de destino.
+        formato (str): 'csv' ou 'jsonl'.
+
+    Returns:
+        int: A quantidade de linhas escritas.
+    """
+    quantidade = 0
+    if formato == "csv":
+        escritor = csv.writer(arquivo)
+        escritor.writerow(colunas)
+        for linha in linhas:
+            escritor.writerow([_texto(valor) for valor in linha])
+            quantidade += 1
+    else:
+        for linha in linhas:
+            arquivo.write(json.dumps(
+                dict(zip(colunas, map(_texto, linha))), ensure_ascii=False
+            ))
+            arquivo.write("\n")
+            quantidade += 1
+
+    return quantidade
+
+
+@contextlib.contextmanager
+def abrir_destino(caminho, compactar=None):
+    """
+    Abre o arquivo de destino em modo texto, compactado com gzip se necessário.
+
+    Args:
+        caminho (str): O caminho do arquivo ou '-' para a saída padrão.
+        compactar (bool): Se a saída é compactada (padrão: quando o caminho termina em '.gz').
+
+    Yields:
+        file: O arquivo de texto aberto.
+    """
+    if compactar is None:
+        compactar = caminho.endswith(".gz")
+
+    if caminho == "-":
+        if compactar:
+            with gzip.GzipFile(fileobj=sys.stdout.buffer, mode="wb") as binario:
+                with io.TextIOWrapper(binario, encoding="utf-8", newline="") as arquivo:
+                    yield arquivo
+        else:
+            yield sys.stdout
+        return
+
+    abrir = gzip.open if compactar else open
+    with abrir(caminho, "wt", encoding="utf-8", newline="") as arquivo:
+        yield arquivo
+
+
+def exportar(banco_de_dados, tabela, caminho, formato="csv", compactar=None,
+             incluir_senha=False, tamanho_pagina=1000):
+    """
+    Exporta uma tabela para um arquivo CSV ou JSONL.
+
+    Args:
+        banco_de_dados (BancoDeDados / ArmazenamentoFragmentado): O armazenamento lido.
+        tabela (str): 'usuarios' ou 'relembrados_<ui>'.
+        caminho (str): O caminho do arquivo ou '-' para a saída padrão.
+        formato (str): 'csv' ou 'jsonl'.
+        compactar (bool): Se a saída é compactada com gzip (padrão: pela extensão '.gz').
+        incluir_senha (bool): Se a senha criptografada é incluída.
+        tamanho_pagina (int): Quantas linhas cada consulta retorna.
+
+    Returns:
+        int: A quantidade de linhas exportadas.
+
+    Raises:
+        ValueError: Erro lançado se o tamanho da página for menor que 1 ou se
+            o armazenamento não for exportável.
+    """
+    # Uma página vazia não avança o cursor, e um LIMIT negativo não tem limite
+    if tamanho_pagina < 1:
+        raise ValueError(f"O tamanho da página deve ser ao menos 1, não {tamanho_pagina}.")
+
+    linhas = iterar_tabela(banco_de_dados, tabela, incluir_senha, tamanho_pagina)
+
+    with abrir_destino(caminho, compactar) as arquivo:
+        return escrever(linhas, colunas_exportadas(tabela, incluir_senha), arquivo, formato)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exporta usuários em CSV ou JSONL com memória constante.")
+    parser.add_argument("tabela", choices=TABELAS, help="Tabela exportada.")
+    parser.add_argument("destino", help="Arquivo de destino ('-' para a saída padrão).")
+    parser.add_argument("--formato", choices=FORMATOS,
+                        help="Formato da saída (padrão: pela extensão do destino, ou csv).")
+    parser.add_argument("--gzip", action="store_true", default=None,
+                        help="Compacta a saída (padrão: quando o destino termina em '.gz').")
+    parser.add_argument("--incluir-senha", action="store_true",
+                        help="Inclui as senhas criptografadas (ex.: para migrações).")
+    parser.add_argument("--tamanho-pagina", type=int, default=1000, help="Linhas por consulta.")
+    parser.add_argument("--db", metavar="CAMINHO",
+                        help="Caminho ou URI do banco de dados, ou o diretório dos fragmentos "
+                             "(padrão: CADASTRO_LOGIN_DB ou o do armazenamento configurado).")
+    argumentos = parser.parse_args()
+    if argumentos.tamanho_pagina < 1:
+        parser.error("--tamanho-pagina deve ser ao menos 1")
+
+    formato = argumentos.formato
+    if formato is None:
+        formato = "jsonl" if argumentos.destino.removesuffix(".gz").endswith(".jsonl") else "csv"
+
+    banco_de_dados = criar_armazenamento(argumentos.db)
+    if not isinstance(banco_de_dados, (BancoDeDados, ArmazenamentoFragmentado)):
+        parser.error("o armazenamento em memória não é compartilhado e não pode ser exportado")
+    try:
+        quantidade = exportar(
+            banco_de_dados, argumentos.tabela, argumentos.destino, formato,
+            argumentos.gzip, argumentos.incluir_senha, argumentos.tamanho_pagina
+        )
+    finally:
+        banco_de_dados.fechar_conexao()
+
+    print(f"{quantidade} linhas exportadas de '{argumentos.tabela}'", file=sys.stderr)
@@ -0,0 +1,482 @@
+# -*- coding: utf-8 -*-
+"""Módulo para coletar e exportar métricas da camada de autenticação."""
+
+import atexit
+import os
+import threading
+import time
+
+
+# Limites (em segundos) usados por padrão nos histogramas de latência
+LIMITES_PADRAO = (
+    0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+)
+
+
+def _chave_rotulos(rotulos):
+    """
+    Converte um dicionário de rótulos em uma chave ordenada e imutável.
+
+    Args:
+        rotulos (dict): Os rótulos da amostra.
+
+    Returns:
+        tuple: Uma tupla de pares (nome, valor) ordenada pelo nome.
+    """
+    return tuple(sorted((nome, str(valor)) for nome, valor in rotulos.items()))
+
+
+def _formatar_rotulos(chave, extra=()):
+    """
+    Formata os rótulos de uma amostra no padrão textual do Prometheus.
+
+    Args:
+        chave (tuple): A chave de rótulos gerada por '_chave_rotulos'.
+        extra (tuple): Pares (nome, valor) adicionais, como o 'le' dos histogramas.
+
+    Returns:
+        str: Os rótulos formatados (ex.: '{ui="tk"}') ou uma string vazia.
+    """
+    pares = list(chave) + list(extra)
+    if not pares:
+        return ""
+
+    formatados = []
+    for nome, valor in pares:
+        valor = valor.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+        formatados.append(f'{nome}="{valor}"')
+
+    return "{" + ",".join(formatados) + "}"
+
+
+def _formatar_numero(valor):
+    """
+    Formata um número no padrão textual do Prometheus.
+
+    Args:
+        valor (int / float): O valor a ser formatado.
+
+    Returns:
+        str: O valor formatado.
+    """
+    if valor == float("inf"):
+        return "+Inf"
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+class Contador:
+    """
+    Classe que representa um contador monotônico com rótulos.
+
+    Attributes:
+        nome (str): O nome da métrica.
+        descricao (str): O texto de ajuda da métrica.
+        valores (dict): Os valores acumulados para cada combinação de rótulos.
+    """
+
+    tipo = "counter"
+
+    def __init__(self, nome, descricao):
+        """
+        Inicializa o contador.
+
+        Args:
+            nome (str): O nome da métrica.
+            descricao (str): O texto de ajuda da métrica.
+
+        Returns:
+            None
+        """
+        self.nome = nome
+        self.descricao = descricao
+        self.valores = {}
+        self._trava = threading.Lock()
+
+    def incrementar(self, valor=1, **rotulos):
+        """
+        Incrementa o contador para a combinação de rótulos informada.
+
+        Args:
+            valor (int / float): O valor a ser somado ao contador.
+            **rotulos: Os rótulos da amostra (ex.: ui="tk").
+
+        Returns:
+            None
+        """
+        chave = _chave_rotulos(rotulos)
+        with self._trava:
+            self.valores[chave] = self.valores.get(chave, 0) + valor
+
+    def amostras(self):
+        """
+        Obtém uma cópia dos valores do contador.
+
+        Returns:
+            list: Uma lista de dicionários com os rótulos e o valor de cada amostra.
+        """
+        with self._trava:
+            return [
+                {"rotulos": dict(chave), "valor": valor}
+                for chave, valor in self.valores.items()
+            ]
+
+    def exportar_texto(self):
+        """
+        Gera as linhas do contador no formato textual do Prometheus.
+
+        Returns:
+            list: As linhas de texto da métrica.
+        """
+        linhas = []
+        with self._trava:
+            for chave, valor in sorted(self.valores.items()):
+                linhas.append(f"{self.nome}{_formatar_rotulos(chave)} {_formatar_numero(valor)}")
+
+        return linhas
+
+
+class Histograma:
+    """
+    Classe que representa um histograma cumulativo com rótulos.
+
+    Attributes:
+        nome (str): O nome da métrica.
+        descricao (str): O texto de ajuda da métrica.
+        limites (tuple): Os limites superiores de cada faixa do histograma.
+        series (dict): As contagens, a soma e o total de cada combinação de rótulos.
+    """
+
+    tipo = "histogram"
+
+    def __init__(self, nome, descricao, limites=LIMITES_PADRAO):
+        """
+        Inicializa o histograma.
+
+        Args:
+            nome (str): O nome da métrica.
+            descricao (str): O texto de ajuda da métrica.
+            limites (tuple): Os limites superiores de cada faixa do histograma.
+
+        Returns:
+            None
+        """
+        self.nome = nome
+        self.descricao = descricao
+        self.limites = tuple(sorted(limites))
+        self.series = {}
+        self._trava = threading.Lock()
+
+    def observar(self, valor, **rotulos):
+        """
+        Registra uma observação no histograma.
+
+        Args:
+            valor (float): O valor observado (ex.: uma duração em segundos).
+            **rotulos: Os rótulos da amostra (ex.: consulta="fazer_login").
+
+        Returns:
+            None
+        """
+        chave = _chave_rotulos(rotulos)
+        with self._trava:
+            serie = self.series.get(chave)
+            if serie is None:
+                serie = self.series[chave] = [[0] * len(self.limites), 0.0, 0]
+
+            # Incrementa somente a primeira faixa que comporta o valor;
+            # as contagens cumulativas são calculadas na exportação
+            for indice, limite in enumerate(self.limites):
+                if valor <= limite:
+                    serie[0][indice] += 1
+                    break
+
+            serie[1] += valor
+            serie[2] += 1
+
+    def amostras(self):
+        """
+        Obtém uma cópia das séries do histograma.
+
+        Returns:
+            list: Uma lista de dicionários com os rótulos, as faixas cumulativas,
+                a soma e a contagem de cada série.
+        """
+        amostras = []
+        with self._trava:
+            for chave, (contagens, soma, total) in self.series.items():
+                acumulado = 0
+                faixas = {}
+                for limite, contagem in zip(self.limites, contagens):
+                    acumulado += contagem
+                    faixas[limite] = acumulado
+                faixas[float("inf")] = total
+
+                amostras.append({
+                    "rotulos": dict(chave),
+                    "faixas": faixas,
+                    "soma": soma,
+                    "contagem": total,
+                })
+
+        return amostras
+
+    def exportar_texto(self):
+        """
+        Gera as linhas do histograma no formato textual do Prometheus.
+
+        Returns:
+            list: As linhas de texto da métrica.
+        """
+        linhas = []
+        for amostra in sorted(self.amostras(), key=lambda a: sorted(a["rotulos"].items())):
+            chave = _chave_rotulos(amostra["rotulos"])
+            for limite, contagem in amostra["faixas"].items():
+                rotulos = _formatar_rotulos(chave, (("le", _formatar_numero(limite)),))
+                linhas.append(f"{self.nome}_bucket{rotulos} {contagem}")
+
+            rotulos = _formatar_rotulos(chave)
+            linhas.append(f"{self.nome}_sum{rotulos} {_formatar_numero(amostra['soma'])}")
+            linhas.append(f"{self.nome}_count{rotulos} {amostra['contagem']}")
+
+        return linhas
+
+
+class RegistroMetricas:
+    """
+    Classe para registrar, consultar e exportar as métricas da aplicação.
+
+    Attributes:
+        habilitado (bool): Indica se as métricas estão sendo coletadas.
+        metricas (dict): As métricas registradas, indexadas pelo nome.
+    """
+
+    def __init__(self):
+        """
+        Inicializa o registro de métricas (desabilitado por padrão).
+
+        Returns:
+            None
+        """
+        self.habilitado = False
+        self.metricas = {}
+        self._trava = threading.Lock()
+        self._parar = threading.Event()
+        self._thread = None
+
+    def _registrar(self, classe, nome, *args):
+        """
+        Obtém uma métrica existente ou registra uma nova.
+
+        Args:
+            classe (type): A classe da métrica (Contador ou Histograma).
+            nome (str): O nome da métrica.
+            *args: Argumentos adicionais para o construtor da métrica.
+
+        Returns:
+            Contador / Histograma: A métrica registrada.
+        """
+        with self._trava:
+            metrica = self.metricas.get(nome)
+            if metrica is None:
+                metrica = self.metricas[nome] = classe(nome, *args)
+            elif not isinstance(metrica, classe):
+                raise ValueError(f"A métrica '{nome}' já foi registrada com outro tipo!")
+
+        return metrica
+
+    def contador(self, nome, descricao):
+        """
+        Obtém ou registra um contador.
+
+        Args:
+            nome (str): O nome da métrica.
+            descricao (str): O texto de ajuda da métrica.
+
+        Returns:
+            Contador: O contador registrado.
+        """
+        return self._registrar(Contador, nome, descricao)
+
+    def histograma(self, nome, descricao, limites=LIMITES_PADRAO):
+        """
+        Obtém ou registra um histograma.
+
+        Args:
+            nome (str): O nome da métrica.
+            descricao (str): O texto de ajuda da métrica.
+            limites (tuple): Os limites superiores de cada faixa do histograma.
+
+        Returns:
+            Histograma: O histograma registrado.
+        """
+        return self._registrar(Histograma, nome, descricao, limites)
+
+    def snapshot(self):
+        """
+        Obtém uma cópia do estado atual de todas as métricas.
+
+        Returns:
+            dict: Um dicionário com o tipo e as amostras de cada métrica.
+        """
+        with self._trava:
+            metricas = list(self.metricas.values())
+
+        return {
+            metrica.nome: {"tipo": metrica.tipo, "amostras": metrica.amostras()}
+            for metrica in metricas
+        }
+
+    def exportar_texto(self):
+        """
+        Gera todas as métricas no formato textual do Prometheus.
+
+        Returns:
+            str: O conteúdo do arquivo de métricas.
+        """
+        with self._trava:
+            metricas = sorted(self.metricas.values(), key=lambda m: m.nome)
+
+        linhas = []
+        for metrica in metricas:
+            linhas.append(f"# HELP {metrica.nome} {metrica.descricao}")
+            linhas.append(f"# TYPE {metrica.nome} {metrica.tipo}")
+            linhas.extend(metrica.exportar_texto())
+
+        return "\n".join(linhas) + "\n"
+
+    def gravar_arquivo(self, caminho):
+        """
+        Grava as métricas em um arquivo de texto lido pelo 'textfile collector'.
+
+        O arquivo é escrito em um caminho temporário e depois renomeado, para que
+        o coletor nunca leia um arquivo pela metade.
+
+        Args:
+            caminho (str): O caminho do arquivo '.prom' de destino.
+
+        Returns:
+            None
+        """
+        temporario = f"{caminho}.{os.getpid()}.tmp"
+        with open(temporario, "w", encoding="utf-8") as arquivo:
+            arquivo.write(self.exportar_texto())
+        os.replace(temporario, caminho)
+
+    def iniciar_exportacao(self, caminho, intervalo=15.0):
+        """
+        Inicia uma thread que grava as métricas periodicamente em um arquivo.
+
+        Args:
+            caminho (str): O caminho do arquivo '.prom' de destino.
+            intervalo (float): O intervalo entre as gravações, em segundos.
+
+        Returns:
+            None
+        """
+        if self._thread is not None:
+            return
+
+        def exportar():
+            while not self._parar.wait(intervalo):
+                self.gravar_arquivo(caminho)
+
+        self._parar.clear()
+        self._thread = threading.Thread(target=exportar, name="exportador-metricas", daemon=True)
+        self._thread.start()
+
+        # Garante uma última gravação ao encerrar o processo
+        atexit.register(self.parar_exportacao, caminho)
+
+    def parar_exportacao(self, caminho=None):
+        """
+        Interrompe a exportação periódica e grava as métricas uma última vez.
+
+        Args:
+            caminho (str): O caminho do arquivo '.prom' de destino (opcional).
+
+        Returns:
+            None
+        """
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if caminho:
+            self.gravar_arquivo(caminho)
+
+
+# Registro global usado pela aplicação
+registro = RegistroMetricas()
+
+# Métricas da camada de autenticação
+DURACAO_CONSULTA = registro.histograma(
+    "auth_consulta_sql_segundos",
+    "Tempo gasto nas consultas SQL do banco de dados de usuários.",
+)
+DURACAO_HASH = registro.histograma(
+    "auth_hash_segundos",
+    "Tempo gasto nas operações de hash de senhas (bcrypt).",
+    (0.01, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.0, 5.0),
+)
+LOGINS = registro.contador(
+    "auth_logins_total",
+    "Tentativas de login por interface e resultado.",
+)
+CADASTROS_REJEITADOS = registro.contador(
+    "auth_cadastros_rejeitados_total",
+    "Cadastros rejeitados pela validação, por motivo.",
+)
+TAMANHO_GRUPO_COMMIT = registro.histograma(
+    "auth_grupo_commit_escritas",
+    "Escritas confirmadas em cada commit da escrita agrupada.",
+    (1, 2, 5, 10, 20, 50, 100, 200),
+)
+AUDITORIA_DESCARTADOS = registro.contador(
+    "auth_auditoria_descartados_total",
+    "Eventos de auditoria descartados com a fila cheia.",
+)
+
+
+def habilitar(caminho=None, intervalo=15.0):
+    """
+    Habilita a coleta de métricas e, opcionalmente, a exportação periódica.
+
+    Args:
+        caminho (str): O caminho do arquivo '.prom' de destino (opcional).
+        intervalo (float): O intervalo entre as gravações, em segundos.
+
+    Returns:
+        None
+    """
+    registro.habilitado = True
+    if caminho:
+        registro.iniciar_exportacao(caminho, intervalo)
+
+
+def cronometrar():
+    """
+    Obtém o instante inicial de uma medição somente se as métricas estiverem habilitadas.
+
+    Returns:
+        float / None: O valor de 'time.perf_counter()' ou None se desabilitado.
+    """
+    return time.perf_counter() if registro.habilitado else None
+
+
+def snapshot():
+    """
+    Obtém uma cópia do estado atual das métricas do registro global.
+
+    Returns:
+        dict: Um dicionário com o tipo e as amostras de cada métrica.
+    """
+    return registro.snapshot()
+
+
+# Habilita as métricas automaticamente se a variável de ambiente estiver definida
+if os.environ.get("CADASTRO_LOGIN_METRICAS"):
+    habilitar(
+        os.environ["CADASTRO_LOGIN_METRICAS"],
+        float(os.environ.get("CADASTRO_LOGIN_METRICAS_INTERVALO", "15")),
+    )
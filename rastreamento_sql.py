@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+"""Módulo para rastrear e agregar as instruções SQL executadas pela aplicação."""
+
+import atexit
+import os
+import re
+import signal
+import sys
+import threading
+
+
+# Literais de texto, blobs e números que devem ser trocados por '?'
+_PADRAO_LITERAIS = re.compile(r"[Xx]'[0-9A-Fa-f]*'|'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+# Listas de parâmetros em cláusulas 'IN (...)'
+_PADRAO_LISTA_IN = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+# Sequências de espaços em branco
+_PADRAO_ESPACOS = re.compile(r"\s+")
+
+
+def normalizar_sql(sql):
+    """
+    Converte uma instrução SQL em sua "forma", sem literais e espaços redundantes.
+
+    Instruções que diferem apenas nos valores (ou na quantidade de itens de uma
+    cláusula 'IN') resultam na mesma forma normalizada.
+
+    Args:
+        sql (str): A instrução SQL, com ou sem os parâmetros expandidos.
+
+    Returns:
+        str: A instrução normalizada.
+    """
+    sql = _PADRAO_LITERAIS.sub("?", sql)
+    sql = _PADRAO_ESPACOS.sub(" ", sql).strip()
+    sql = _PADRAO_LISTA_IN.sub("IN (?...)", sql)
+
+    return sql
+
+
+class EstatisticaConsulta:
+    """
+    Classe que acumula as estatísticas de uma forma de instrução SQL.
+
+    Attributes:
+        contagem (int): O número de execuções da instrução.
+        cronometradas (int): O número de execuções com tempo medido.
+        total (float): O tempo total medido, em segundos.
+        maximo (float): O maior tempo medido, em segundos.
+    """
+
+    __slots__ = ("contagem", "cronometradas", "total", "maximo")
+
+    def __init__(self):
+        """
+        Inicializa as estatísticas zeradas.
+
+        Returns:
+            None
+        """
+        self.contagem = 0
+        self.cronometradas = 0
+        self.total = 0.0
+        self.maximo = 0.0
+
+
+class RastreadorSQL:
+    """
+    Classe para rastrear as instruções SQL de uma ou mais conexões.
+
+    As execuções são contadas pelo 'set_trace_callback' do sqlite3, que também
+    enxerga instruções implícitas (BEGIN, COMMIT) e as emitidas fora do
+    'BancoDeDados'. Os tempos vêm de 'finalizar', chamado pelos invólucros de
+    execução, e são atribuídos à última instrução rastreada na mesma thread.
+
+    Attributes:
+        estatisticas (dict): As estatísticas indexadas pela instrução normalizada.
+    """
+
+    def __init__(self):
+        """
+        Inicializa o rastreador sem nenhuma conexão instalada.
+
+        Returns:
+            None
+        """
+        self.estatisticas = {}
+        self._trava = threading.Lock()
+        self._local = threading.local()
+
+    def instalar(self, conexao):
+        """
+        Passa a rastrear as instruções executadas em uma conexão.
+
+        Args:
+            conexao (sqlite3.Connection): A conexão a ser rastreada.
+
+        Returns:
+            None
+        """
+        conexao.set_trace_callback(self.registrar)
+
+    def remover(self, conexao):
+        """
+        Deixa de rastrear as instruções executadas em uma conexão.
+
+        Args:
+            conexao (sqlite3.Connection): A conexão rastreada.
+
+        Returns:
+            None
+        """
+        conexao.set_trace_callback(None)
+
+    def registrar(self, sql):
+        """
+        Contabiliza uma instrução executada (chamado pelo sqlite3).
+
+        Args:
+            sql (str): A instrução SQL executada, com os parâmetros expandidos.
+
+        Returns:
+            None
+        """
+        forma = normalizar_sql(sql)
+        with self._trava:
+            estatistica = self.estatisticas.get(forma)
+            if estatistica is None:
+                estatistica = self.estatisticas[forma] = EstatisticaConsulta()
+            estatistica.contagem += 1
+
+        self._local.pendente = estatistica
+
+    def finalizar(self, duracao):
+        """
+        Atribui um tempo de execução à última instrução rastreada na thread atual.
+
+        Args:
+            duracao (float): O tempo de execução medido, em segundos.
+
+        Returns:
+            None
+        """
+        estatistica = getattr(self._local, "pendente", None)
+        if estatistica is None:
+            return
+
+        self._local.pendente = None
+        with self._trava:
+            estatistica.cronometradas += 1
+            estatistica.total += duracao
+            if duracao > estatistica.maximo:
+                estatistica.maximo = duracao
+
+    def limpar(self):
+        """
+        Descarta todas as estatísticas acumuladas.
+
+        Returns:
+            None
+        """
+        with self._trava:
+            self.estatisticas.clear()
+
+    def relatorio(self, ordenar_por="total", limite=None):
+        """
+        Gera um relatório textual das instruções rastreadas.
+
+        Args:
+            ordenar_por (str): O critério de ordenação ('total', 'maximo' ou 'contagem').
+            limite (int): O número máximo de instruções exibidas (opcional).
+
+        Returns:
+            str: O relatório formatado.
+        """
+        with self._trava:
+            linhas = [
+                (forma, e.contagem, e.cronometradas, e.total, e.maximo)
+                for forma, e in self.estatisticas.items()
+            ]
+
+        indice = {"contagem": 1, "total": 3, "maximo": 4}[ordenar_por]
+        linhas.sort(key=lambda linha: linha[indice], reverse=True)
+        if limite is not None:
+            linhas = linhas[:limite]
+
+        saida = [
+            f"Instruções SQL rastreadas (ordenadas por '{ordenar_por}')",
+            f"{'contagem':>9} {'total(ms)':>11} {'máx(ms)':>9} {'média(ms)':>10}  instrução",
+        ]
+        for forma, contagem, cronometradas, total, maximo in linhas:
+            media = total / cronometradas if cronometradas else 0.0
+            saida.append(
+                f"{contagem:>9} {total * 1000:>11.3f} {maximo * 1000:>9.3f} "
+                f"{media * 1000:>10.3f}  {forma}"
+            )
+
+        return "\n".join(saida) + "\n"
+
+    def despejar(self, caminho=None, ordenar_por="total"):
+        """
+        Escreve o relatório em um arquivo ou na saída de erros.
+
+        Args:
+            caminho (str): O caminho do arquivo de destino (opcional).
+            ordenar_por (str): O critério de ordenação do relatório.
+
+        Returns:
+            None
+        """
+        texto = self.relatorio(ordenar_por)
+        if caminho:
+            with open(caminho, "w", encoding="utf-8") as arquivo:
+                arquivo.write(texto)
+        else:
+            sys.stderr.write(texto)
+
+
+# Rastreador global, criado somente quando o rastreamento é habilitado
+_rastreador = None
+
+
+def habilitar(caminho=None):
+    """
+    Habilita o rastreamento global de SQL e agenda o relatório de encerramento.
+
+    Em sistemas POSIX, o relatório também pode ser gerado sob demanda enviando
+    o sinal SIGUSR1 ao processo.
+
+    Args:
+        caminho (str): O arquivo onde o relatório será escrito (opcional).
+
+    Returns:
+        RastreadorSQL: O rastreador global.
+    """
+    global _rastreador
+
+    if _rastreador is None:
+        _rastreador = RastreadorSQL()
+        atexit.register(_rastreador.despejar, caminho)
+
+        if hasattr(signal, "SIGUSR1"):
+            try:
+                signal.signal(signal.SIGUSR1, lambda *_: _rastreador.despejar(caminho))
+            except ValueError:
+                # Sinais só podem ser configurados a partir da thread principal
+                pass
+
+    return _rastreador
+
+
+def obter_rastreador():
+    """
+    Obtém o rastreador global, se o rastreamento estiver habilitado.
+
+    Returns:
+        RastreadorSQL / None: O rastreador global ou None.
+    """
+    return _rastreador
+
+
+# Habilita o rastreamento automaticamente se a variável de ambiente estiver definida
+if os.environ.get("CADASTRO_LOGIN_RASTREAR_SQL"):
+    _destino = os.environ["CADASTRO_LOGIN_RASTREAR_SQL"]
+    habilitar(None if _destino == "1" else _destino)
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo com os registros compactos usados para as linhas de usuários.
+
+Os registros usam '__slots__' (sem '__dict__' por instância) e continuam
+compatíveis com o código que trata as linhas como tuplas: aceitam índices,
+desempacotamento e comparação com tuplas.
+"""
+
+
+class Registro:
+    """
+    Classe base dos registros compactos.
+
+    As subclasses definem '__slots__' com os nomes das colunas, na ordem da
+    consulta, e um '__init__' que atribui cada coluna diretamente (um laço com
+    'setattr' dobraria o custo de construção).
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def fabrica(cls, cursor, linha):
+        """
+        Constrói um registro a partir de uma linha do SQLite (assinatura de 'row_factory').
+
+        Args:
+            cursor (sqlite3.Cursor): O cursor que produziu a linha.
+            linha (tuple): A linha lida.
+
+        Returns:
+            Registro: O registro construído.
+        """
+        return cls(*linha)
+
+    def __iter__(self):
+        return (getattr(self, nome) for nome in self.__slots__)
+
+    def __getitem__(self, indice):
+        return tuple(self)[indice] if isinstance(indice, slice) else getattr(self, self.__slots__[indice])
+
+    def __len__(self):
+        return len(self.__slots__)
+
+    def __eq__(self, outro):
+        if isinstance(outro, (Registro, tuple)):
+            return tuple(self) == tuple(outro)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(tuple(self))
+
+    def __repr__(self):
+        campos = ", ".join(f"{nome}={getattr(self, nome)!r}" for nome in self.__slots__)
+        return f"{type(self).__name__}({campos})"
+
+
+class Usuario(Registro):
+    """
+    Registro de uma linha da tabela de usuários.
+
+    Attributes:
+        id (int): O id do usuário.
+        nome_usuario (str): O nome de usuário.
+        email (str): O email do usuário.
+        senha (bytes): A senha criptografada.
+    """
+
+    __slots__ = ("id", "nome_usuario", "email", "senha")
+
+    def __init__(self, id, nome_usuario, email, senha):
+        self.id = id
+        self.nome_usuario = nome_usuario
+        self.email = email
+        self.senha = senha
+
+
+class UsuarioRelembrado(Registro):
+    """
+    Registro de um usuário relembrado por uma interface.
+
+    Attributes:
+        id_usuario (int): O id do usuário.
+        nome_usuario (str): O nome de usuário.
+        email (str): O email do usuário.
+        senha (bytes): A senha criptografada.
+    """
+
+    __slots__ = ("id_usuario", "nome_usuario", "email", "senha")
+
+    def __init__(self, id_usuario, nome_usuario, email, senha):
+        self.id_usuario = id_usuario
+        self.nome_usuario = nome_usuario
+        self.email = email
+        self.senha = senha
+
+
+class Sessao(Registro):
+    """
+    Registro de uma sessão aberta por um login bem-sucedido.
+
+    Attributes:
+        token (str): O identificador opaco da sessão.
+        id_usuario (int): O id do usuário.
+        ui (str): A interface gráfica (tk, kv, qt) que abriu a sessão.
+        criada_em (float): O instante da criação (segundos desde a época).
+        expira_em (float): O instante da expiração (segundos desde a época).
+    """
+
+    __slots__ = ("token", "id_usuario", "ui", "criada_em", "expira_em")
+
+    def __init__(self, token, id_usuario, ui, criada_em, expira_em):
+        self.token = token
+        self.id_usuario = id_usuario
+        self.ui = ui
+        self.criada_em = criada_em
+        self.expira_em = expira_em
+
+
+class Acesso(Registro):
+    """
+    Registro do último login e da contagem de logins de um usuário.
+
+    Attributes:
+        id_usuario (int): O id do usuário.
+        ultimo_login_em (float): O instante do último login bem-sucedido (segundos desde a época).
+        logins (int): A quantidade de logins bem-sucedidos.
+    """
+
+    __slots__ = ("id_usuario", "ultimo_login_em", "logins")
+
+    def __init__(self, id_usuario, ultimo_login_em, logins):
+        self.id_usuario = id_usuario
+        self.ultimo_login_em = ultimo_login_em
+        self.logins = logins
@@ -0,0 +1,562 @@
+# -*- coding: utf-8 -*-
+"""
+API HTTP/JSON de autenticação, escrita apenas com a biblioteca padrão.
+
+O servidor reaproveita o núcleo do daemon de autenticação (uma única thread
+para o Banco de Dados e um grupo de threads para o bcrypt) e fala HTTP/1.1
+com conexões persistentes (keep-alive) e requisições em pipeline: as
+requisições de uma conexão são lidas em sequência e respondidas na ordem.
+
+Rotas:
+
+    POST /login              {"nome_usuario_email": "...", "senha": "...", "ui": "tk"}; com as
+                             sessões ativas, responde com o token e a expiração da sessão aberta
+    POST /register           {"nome_usuario": "...", "email": "...", "senha": "..."}
+    GET  /remembered/<ui>    usuários relembrados da interface (sem as senhas); aceita
+                             ?after_id=N&limit=N&prefix=texto para paginar
+    GET  /stats              estatísticas do processo que atendeu a requisição
+
+Uso (a partir da pasta raiz do projeto):
+
+    python -m servidor.api_http [--host 127.0.0.1] [--porta 8080] [--trabalhadores-hash N]
+"""
+
+import argparse
+import asyncio
+import collections
+import http
+import json
+import os
+import signal
+import sqlite3
+import time
+import urllib.parse
+
+from database import PERFIS
+from servidor.daemon import DaemonAutenticacao
+
+
+# Limites de tamanho de uma requisição
+TAMANHO_MAXIMO_CORPO = 1 << 16
+QUANTIDADE_MAXIMA_CABECALHOS = 100
+
+
+class ErroHTTP(Exception):
+    """
+    Erro que interrompe uma requisição com um status HTTP.
+
+    Attributes:
+        status (int): O status HTTP da resposta.
+    """
+
+    def __init__(self, status, mensagem):
+        """
+        Inicializa o erro.
+
+        Args:
+            status (int): O status HTTP da resposta.
+            mensagem (str): A mensagem de erro enviada ao cliente.
+
+        Returns:
+            None
+        """
+        super().__init__(mensagem)
+        self.status = status
+
+
+def montar_resposta(status, corpo, manter_conexao=True):
+    """
+    Monta uma resposta HTTP/1.1 com corpo JSON.
+
+    Args:
+        status (int): O status HTTP.
+        corpo (dict): O corpo da resposta.
+        manter_conexao (bool): Se a conexão continua aberta após a resposta.
+
+    Returns:
+        bytes: A resposta completa.
+    """
+    dados = json.dumps(corpo, separators=(",", ":"), ensure_ascii=False).encode()
+    cabecalho = (
+        f"HTTP/1.1 {status} {http.HTTPStatus(status).phrase}\r\n"
+        f"Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(dados)}\r\n"
+        f"Connection: {'keep-alive' if manter_conexao else 'close'}\r\n"
+        f"\r\n"
+    )
+    return cabecalho.encode("latin-1") + dados
+
+
+async def ler_requisicao(leitor):
+    """
+    Lê uma requisição HTTP de um 'asyncio.StreamReader'.
+
+    Args:
+        leitor (asyncio.StreamReader): O fluxo de leitura da conexão.
+
+    Returns:
+        tuple / None: (método, caminho, versão, cabeçalhos, corpo) ou None se a conexão foi encerrada.
+
+    Raises:
+        ErroHTTP: Erro lançado se a requisição for malformada ou grande demais.
+    """
+    linha = await leitor.readline()
+    # Tolera linhas em branco entre requisições (RFC 9112, seção 2.2)
+    while linha in (b"\r\n", b"\n"):
+        linha = await leitor.readline()
+    if not linha:
+        return None
+
+    try:
+        metodo, caminho, versao = linha.decode("latin-1").split()
+    except ValueError:
+        raise ErroHTTP(400, "Linha de requisição inválida!")
+    if not versao.startswith("HTTP/1."):
+        raise ErroHTTP(505, f"Versão não suportada: {versao}")
+
+    cabecalhos = {}
+    while True:
+        linha = await leitor.readline()
+        if linha in (b"\r\n", b"\n"):
+            break
+        if not linha:
+            raise asyncio.IncompleteReadError(b"", None)
+        if len(cabecalhos) >= QUANTIDADE_MAXIMA_CABECALHOS:
+            raise ErroHTTP(431, "Cabeçalhos demais!")
+
+        nome, separador, valor = linha.decode("latin-1").partition(":")
+        if not separador:
+            raise ErroHTTP(400, "Cabeçalho inválido!")
+        cabecalhos[nome.strip().lower()] = valor.strip()
+
+    if "transfer-encoding" in cabecalhos:
+        raise ErroHTTP(501, "Transfer-Encoding não é suportado; use Content-Length.")
+
+    try:
+        tamanho = int(cabecalhos.get("content-length", 0))
+    except ValueError:
+        raise ErroHTTP(400, "Content-Length inválido!")
+    if tamanho < 0 or tamanho > TAMANHO_MAXIMO_CORPO:
+        raise ErroHTTP(413, f"O corpo deve ter no máximo {TAMANHO_MAXIMO_CORPO} bytes!")
+
+    corpo = await leitor.readexactly(tamanho) if tamanho else b""
+
+    return metodo, caminho, versao, cabecalhos, corpo
+
+
+def manter_conexao(versao, cabecalhos):
+    """
+    Decide se a conexão continua aberta após a resposta.
+
+    Args:
+        versao (str): A versão HTTP da requisição.
+        cabecalhos (dict): Os cabeçalhos da requisição (nomes em minúsculas).
+
+    Returns:
+        bool: True se a conexão deve ser mantida.
+    """
+    conexao = cabecalhos.get("connection", "").lower()
+    if versao == "HTTP/1.0":
+        return conexao == "keep-alive"
+
+    return conexao != "close"
+
+
+class ServidorHTTP:
+    """
+    Classe que expõe o núcleo do daemon de autenticação por HTTP/JSON.
+
+    Attributes:
+        host (str): O endereço de escuta.
+        porta (int): A porta de escuta (0 escolhe uma porta livre).
+        nucleo (DaemonAutenticacao): O núcleo com o banco de dados e o bcrypt.
+        requisicoes (int): O total de requisições atendidas.
+        status (collections.Counter): A contagem de respostas por status HTTP.
+    """
+
+    def __init__(self, host="127.0.0.1", porta=8080, trabalhadores_hash=None):
+        """
+        Inicializa o servidor sem abrir a porta.
+
+        Args:
+            host (str): O endereço de escuta.
+            porta (int): A porta de escuta (0 escolhe uma porta livre).
+            trabalhadores_hash (int): O número de threads do bcrypt (padrão: núcleos da CPU).
+
+        Returns:
+            None
+        """
+        self.host = host
+        self.porta = porta
+        self.nucleo = DaemonAutenticacao(trabalhadores_hash=trabalhadores_hash)
+        self.requisicoes = 0
+        self.status = collections.Counter()
+
+        self._servidor = None
+        self._inicio = time.monotonic()
+        self._conexoes = set()
+        self._em_andamento = 0
+        self._encerrando = False
+
+    async def iniciar(self, sock=None):
+        """
+        Abre o banco de dados e passa a escutar na porta TCP.
+
+        Args:
+            sock (socket.socket): Um socket já em escuta, usado no lugar de host e porta.
+
+        Returns:
+            None
+        """
+        await self.nucleo.abrir_banco()
+
+        if sock is not None:
+            self._servidor = await asyncio.start_server(self._atender, sock=sock)
+        else:
+            self._servidor = await asyncio.start_server(self._atender, self.host, self.porta)
+        self.porta = self._servidor.sockets[0].getsockname()[1]
+
+    async def encerrar(self, prazo=5.0):
+        """
+        Para de aceitar conexões, conclui as requisições em andamento e fecha o núcleo.
+
+        As respostas enviadas durante o encerramento levam 'Connection: close';
+        conexões ociosas são fechadas assim que não houver requisição pendente
+        ou quando o prazo se esgotar.
+
+        Args:
+            prazo (float): O tempo máximo, em segundos, para concluir as requisições.
+
+        Returns:
+            None
+        """
+        self._encerrando = True
+        if self._servidor is not None:
+            self._servidor.close()
+
+        limite = time.monotonic() + prazo
+        while self._em_andamento and time.monotonic() < limite:
+            await asyncio.sleep(0.05)
+
+        for escritor in list(self._conexoes):
+            escritor.close()
+
+        if self._servidor is not None:
+            await self._servidor.wait_closed()
+            self._servidor = None
+
+        await self.nucleo.encerrar()
+
+    def estatisticas(self):
+        """
+        Obtém as estatísticas deste processo.
+
+        Returns:
+            dict: O pid, o tempo ativo, as requisições, os status e as conexões abertas.
+        """
+        return {
+            "pid": os.getpid(),
+            "tempo_ativo": time.monotonic() - self._inicio,
+            "requisicoes": self.requisicoes,
+            "status": {str(codigo): quantidade for codigo, quantidade in sorted(self.status.items())},
+            "conexoes_abertas": len(self._conexoes),
+            "em_andamento": self._em_andamento,
+        }
+
+    async def _atender(self, leitor, escritor):
+        """
+        Atende as requisições de uma conexão, na ordem em que chegam.
+
+        Args:
+            leitor (asyncio.StreamReader): O fluxo de leitura da conexão.
+            escritor (asyncio.StreamWriter): O fluxo de escrita da conexão.
+
+        Returns:
+            None
+        """
+        self._conexoes.add(escritor)
+        try:
+            while True:
+                try:
+                    requisicao = await ler_requisicao(leitor)
+                except ErroHTTP as erro:
+                    escritor.write(montar_resposta(erro.status, {"ok": False, "erro": str(erro)}, False))
+                    await escritor.drain()
+                    break
+                if requisicao is None:
+                    break
+
+                metodo, caminho, versao, cabecalhos, corpo = requisicao
+                self._em_andamento += 1
+                try:
+                    status, resposta = await self.rotear(metodo, caminho, corpo)
+                finally:
+                    self._em_andamento -= 1
+                self.requisicoes += 1
+                self.status[status] += 1
+                manter = manter_conexao(versao, cabecalhos) and not self._encerrando
+
+                # Com pipeline, as próximas requisições já estão no buffer do
+                # leitor; a escrita só espera quando o buffer de saída enche
+                escritor.write(montar_resposta(status, resposta, manter))
+                await escritor.drain()
+                if not manter:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            # ValueError: linha maior que o limite do leitor
+            pass
+        finally:
+            self._conexoes.discard(escritor)
+            escritor.close()
+
+    async def rotear(self, metodo, caminho, corpo):
+        """
+        Encaminha uma requisição para a operação correspondente do núcleo.
+
+        Args:
+            metodo (str): O método HTTP.
+            caminho (str): O caminho requisitado.
+            corpo (bytes): O corpo da requisição.
+
+        Returns:
+            tuple: (status HTTP, corpo da resposta).
+        """
+        caminho, _, consulta = caminho.partition("?")
+
+        try:
+            if caminho == "/login":
+                self._exigir_metodo(metodo, "POST")
+                dados = self._ler_json(corpo)
+                resposta = await self.nucleo.processar(
+                    self._operacao("login", dados, "nome_usuario_email", "senha", "ui")
+                )
+                if resposta["ok"] and not resposta["resultado"]:
+                    return 401, {"ok": False, "erro": "Usuário ou senha inválidos!"}
+                if resposta["ok"] and isinstance(resposta["resultado"], list):
+                    token, id_usuario, _, _, expira_em = resposta["resultado"]
+                    resposta["resultado"] = {"token": token, "id_usuario": id_usuario, "expira_em": expira_em}
+                return self._status(resposta, 200), resposta
+
+            if caminho == "/register":
+                self._exigir_metodo(metodo, "POST")
+                dados = self._ler_json(corpo)
+                resposta = await self.nucleo.processar(
+                    self._operacao("cadastrar", dados, "nome_usuario", "email", "senha")
+                )
+                return self._status(resposta, 201), resposta
+
+            if caminho.startswith("/remembered/"):
+                self._exigir_metodo(metodo, "GET")
+                ui = caminho[len("/remembered/"):]
+                if consulta:
+                    return await self._pagina_relembrados(ui, consulta)
+
+                resposta = await self.nucleo.processar({"op": "relembrados", "ui": ui})
+                if resposta["ok"]:
+                    # As senhas criptografadas nunca saem do servidor pela API HTTP
+                    resposta["resultado"] = [
+                        {"id_usuario": id_usuario, "nome_usuario": nome_usuario, "email": email}
+                        for id_usuario, nome_usuario, email, _ in resposta["resultado"]
+                    ]
+                return self._status(resposta, 200), resposta
+
+            if caminho == "/stats":
+                self._exigir_metodo(metodo, "GET")
+                return 200, {"ok": True, "resultado": self.estatisticas()}
+        except ErroHTTP as erro:
+            return erro.status, {"ok": False, "erro": str(erro)}
+        except sqlite3.Error as erro:
+            # A requisição foi lida por inteiro, então a conexão segue utilizável
+            return self._status_erro_banco(erro)
+
+        return 404, {"ok": False, "erro": f"Rota não encontrada: {caminho}"}
+
+    async def _pagina_relembrados(self, ui, consulta):
+        """
+        Obtém uma página de usuários relembrados (paginação keyset).
+
+        Args:
+            ui (str): A interface gráfica (tk, kv, qt).
+            consulta (str): A query string com 'after_id', 'limit' e 'prefix' (opcionais).
+
+        Returns:
+            tuple: (status HTTP, corpo com 'resultado' e o cursor 'proximo').
+
+        Raises:
+            ErroHTTP: Erro lançado com status 400 se 'after_id' ou 'limit' não forem inteiros.
+        """
+        parametros = dict(urllib.parse.parse_qsl(consulta))
+        try:
+            apos_id = int(parametros.get("after_id", 0))
+            limite = int(parametros.get("limit", 100))
+        except ValueError:
+            raise ErroHTTP(400, "'after_id' e 'limit' devem ser inteiros!")
+
+        resposta = await self.nucleo.processar({
+            "op": "pagina_relembrados",
+            "ui": ui,
+            "apos_id": apos_id,
+            "limite": max(1, limite),
+            "prefixo": parametros.get("prefix"),
+            "colunas": ["id_usuario", "nome_usuario", "email"],
+        })
+        if not resposta["ok"]:
+            return self._status(resposta, 200), resposta
+
+        linhas, proximo = resposta["resultado"]
+        return 200, {
+            "ok": True,
+            "resultado": [
+                {"id_usuario": id_usuario, "nome_usuario": nome_usuario, "email": email}
+                for id_usuario, nome_usuario, email in linhas
+            ],
+            "proximo": proximo,
+        }
+
+    @staticmethod
+    def _status_erro_banco(erro):
+        """
+        Obtém a resposta de uma requisição interrompida por um erro do banco de dados.
+
+        Args:
+            erro (sqlite3.Error): O erro lançado.
+
+        Returns:
+            tuple: (503 se o banco estiver travado por outra escrita, 500 nos
+                demais casos; corpo da resposta).
+        """
+        # Ex.: "database is locked", com vários trabalhadores escrevendo no mesmo arquivo
+        mensagem = str(erro).lower()
+        if isinstance(erro, sqlite3.OperationalError) and ("locked" in mensagem or "busy" in mensagem):
+            return 503, {"ok": False, "erro": "Banco de dados ocupado; tente novamente."}
+
+        return 500, {"ok": False, "erro": "Erro interno no banco de dados."}
+
+    @staticmethod
+    def _exigir_metodo(metodo, esperado):
+        """
+        Garante que a rota foi chamada com o método esperado.
+
+        Args:
+            metodo (str): O método recebido.
+            esperado (str): O método aceito pela rota.
+
+        Returns:
+            None
+
+        Raises:
+            ErroHTTP: Erro lançado com status 405 se o método for outro.
+        """
+        if metodo != esperado:
+            raise ErroHTTP(405, f"Método {metodo} não permitido; use {esperado}.")
+
+    @staticmethod
+    def _operacao(operacao, dados, *campos):
+        """
+        Monta a requisição do núcleo apenas com os campos conhecidos presentes no corpo.
+
+        Campos ausentes ficam de fora para que o núcleo os reporte como obrigatórios.
+
+        Args:
+            operacao (str): O nome da operação do núcleo.
+            dados (dict): O corpo JSON decodificado.
+            *campos (str): Os campos aceitos pela operação.
+
+        Returns:
+            dict: A requisição do núcleo.
+        """
+        return {"op": operacao, **{campo: dados[campo] for campo in campos if campo in dados}}
+
+    @staticmethod
+    def _ler_json(corpo):
+        """
+        Decodifica o corpo JSON de uma requisição.
+
+        Args:
+            corpo (bytes): O corpo da requisição.
+
+        Returns:
+            dict: O objeto decodificado.
+
+        Raises:
+            ErroHTTP: Erro lançado com status 400 se o corpo não for um objeto JSON.
+        """
+        try:
+            dados = json.loads(corpo or b"{}")
+        except ValueError:
+            raise ErroHTTP(400, "Corpo JSON inválido!")
+        if not isinstance(dados, dict):
+            raise ErroHTTP(400, "O corpo deve ser um objeto JSON!")
+
+        return dados
+
+    @staticmethod
+    def _status(resposta, status_sucesso):
+        """
+        Obtém o status HTTP de uma resposta do núcleo.
+
+        Args:
+            resposta (dict): A resposta do núcleo.
+            status_sucesso (int): O status usado quando a operação deu certo.
+
+        Returns:
+            int: O status HTTP.
+        """
+        if resposta["ok"]:
+            return status_sucesso
+        # Nome de usuário ou email já cadastrado
+        if resposta.get("motivo") in ("nome_usuario_em_uso", "email_em_uso"):
+            return 409
+        return 400
+
+
+async def executar_servidor(host, porta, trabalhadores_hash=None):
+    """
+    Executa o servidor HTTP até receber SIGINT ou SIGTERM.
+
+    Args:
+        host (str): O endereço de escuta.
+        porta (int): A porta de escuta.
+        trabalhadores_hash (int): O número de threads do bcrypt.
+
+    Returns:
+        None
+    """
+    servidor = ServidorHTTP(host, porta, trabalhadores_hash)
+    await servidor.iniciar()
+    print(f"API HTTP de autenticação escutando em http://{host}:{servidor.porta}")
+
+    parar = asyncio.Event()
+    laco = asyncio.get_running_loop()
+    for sinal in (signal.SIGINT, signal.SIGTERM):
+        laco.add_signal_handler(sinal, parar.set)
+
+    await parar.wait()
+    await servidor.encerrar()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="API HTTP/JSON de autenticação.")
+    parser.add_argument("--host", default="127.0.0.1", help="Endereço de escuta.")
+    parser.add_argument("--porta", type=int, default=8080, help="Porta de escuta.")
+    parser.add_argument("--trabalhadores-hash", type=int, help="Número de threads do bcrypt.")
+    parser.add_argument("--db", metavar="CAMINHO",
+                        help="Caminho ou URI do banco de dados (padrão: CADASTRO_LOGIN_DB ou 'usuarios.db').")
+    parser.add_argument("--agrupar-escritas", metavar="N", nargs="?", const="50",
+                        help="Confirma até N cadastros e relembrados por commit (padrão: 50).")
+    parser.add_argument("--perfil", choices=list(PERFIS),
+                        help="Perfil de configuração das conexões SQLite (padrão: CADASTRO_LOGIN_PERFIL ou 'padrao').")
+    parser.add_argument("--replica", action="store_true",
+                        help="Atende as leituras a partir de uma cópia do banco de dados em memória.")
+    argumentos = parser.parse_args()
+
+    if argumentos.db:
+        os.environ["CADASTRO_LOGIN_DB"] = argumentos.db
+    if argumentos.perfil:
+        os.environ["CADASTRO_LOGIN_PERFIL"] = argumentos.perfil
+    if argumentos.replica:
+        os.environ["CADASTRO_LOGIN_REPLICA"] = "1"
+    if argumentos.agrupar_escritas:
+        os.environ["CADASTRO_LOGIN_AGRUPAR_ESCRITAS"] = argumentos.agrupar_escritas
+
+    asyncio.run(executar_servidor(argumentos.host, argumentos.porta, argumentos.trabalhadores_hash))
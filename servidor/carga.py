@@ -0,0 +1,335 @@
+# -*- coding: utf-8 -*-
+"""
+Gerador de carga para a API HTTP de autenticação.
+
+Abre várias conexões persistentes com o servidor, envia as requisições
+(opcionalmente em pipeline) e reporta a vazão e os percentis de latência.
+
+Uso (com o servidor já em execução, a partir da pasta raiz do projeto):
+
+    python -m servidor.carga --rota login --conexoes 32 --requisicoes 5000 --pipeline 4
+"""
+
+import argparse
+import asyncio
+import collections
+import json
+import math
+import secrets
+import time
+
+
+# Percentis reportados
+PERCENTIS = (50, 90, 99, 99.9)
+
+
+def percentil(valores_ordenados, p):
+    """
+    Calcula um percentil pelo método do posto mais próximo.
+
+    Args:
+        valores_ordenados (list): Os valores em ordem crescente.
+        p (float): O percentil desejado (0 a 100).
+
+    Returns:
+        float: O valor do percentil ou 0.0 se não houver valores.
+    """
+    if not valores_ordenados:
+        return 0.0
+
+    posto = max(1, math.ceil(p / 100 * len(valores_ordenados)))
+    return valores_ordenados[posto - 1]
+
+
+def montar_requisicao(metodo, caminho, corpo=None):
+    """
+    Monta uma requisição HTTP/1.1 com conexão persistente.
+
+    Args:
+        metodo (str): O método HTTP.
+        caminho (str): O caminho requisitado.
+        corpo (dict): O corpo JSON da requisição, se houver.
+
+    Returns:
+        bytes: A requisição completa.
+    """
+    dados = json.dumps(corpo).encode() if corpo is not None else b""
+    cabecalho = (
+        f"{metodo} {caminho} HTTP/1.1\r\n"
+        f"Host: localhost\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(dados)}\r\n"
+        f"\r\n"
+    )
+    return cabecalho.encode("latin-1") + dados
+
+
+async def ler_resposta(leitor):
+    """
+    Lê uma resposta HTTP com 'Content-Length'.
+
+    Args:
+        leitor (asyncio.StreamReader): O fluxo de leitura da conexão.
+
+    Returns:
+        tuple: (status, se o servidor vai fechar a conexão, corpo).
+
+    Raises:
+        asyncio.IncompleteReadError: Erro lançado se a conexão for encerrada.
+    """
+    linha = await leitor.readline()
+    if not linha:
+        raise asyncio.IncompleteReadError(b"", None)
+    status = int(linha.split()[1])
+
+    cabecalhos = {}
+    while True:
+        linha = await leitor.readline()
+        if linha in (b"\r\n", b"\n", b""):
+            break
+        nome, _, valor = linha.decode("latin-1").partition(":")
+        cabecalhos[nome.strip().lower()] = valor.strip()
+
+    corpo = await leitor.readexactly(int(cabecalhos.get("content-length", 0)))
+    fechar = cabecalhos.get("connection", "").lower() == "close"
+
+    return status, fechar, corpo
+
+
+class GeradorCarga:
+    """
+    Classe que dispara requisições concorrentes contra a API HTTP.
+
+    Attributes:
+        host (str): O endereço do servidor.
+        porta (int): A porta do servidor.
+        rota (str): A rota exercitada ('login', 'register' ou 'remembered').
+        conexoes (int): O número de conexões simultâneas.
+        requisicoes (int): O total de requisições enviadas.
+        pipeline (int): Quantas requisições cada conexão envia antes de ler as respostas.
+        latencias (list): As latências medidas, em segundos.
+        status (collections.Counter): A contagem de respostas por status HTTP.
+        falhas (int): As conexões perdidas durante a carga.
+    """
+
+    def __init__(self, host="127.0.0.1", porta=8080, rota="login", conexoes=16,
+                 requisicoes=2000, pipeline=1, usuario="carga_http", senha="SenhaDeCarga123", ui="tk"):
+        """
+        Inicializa o gerador.
+
+        Args:
+            host (str): O endereço do servidor.
+            porta (int): A porta do servidor.
+            rota (str): A rota exercitada ('login', 'register' ou 'remembered').
+            conexoes (int): O número de conexões simultâneas.
+            requisicoes (int): O total de requisições enviadas.
+            pipeline (int): Quantas requisições cada conexão envia antes de ler as respostas.
+            usuario (str): O usuário usado nos logins.
+            senha (str): A senha do usuário.
+            ui (str): A interface informada no login e na listagem de relembrados.
+
+        Returns:
+            None
+        """
+        self.host = host
+        self.porta = porta
+        self.rota = rota
+        self.conexoes = conexoes
+        self.requisicoes = requisicoes
+        self.pipeline = max(1, pipeline)
+        self.usuario = usuario
+        self.senha = senha
+        self.ui = ui
+
+        self.latencias = []
+        self.status = collections.Counter()
+        self.falhas = 0
+
+        self._restantes = 0
+        self._sequencia = 0
+        # Prefixo curto e único por execução, para que os cadastros não colidam
+        self._execucao = secrets.token_hex(3)
+
+    def _proxima_requisicao(self):
+        """
+        Gera a próxima requisição da rota exercitada.
+
+        Returns:
+            bytes: A requisição completa.
+        """
+        if self.rota == "login":
+            return montar_requisicao("POST", "/login", {
+                "nome_usuario_email": self.usuario, "senha": self.senha, "ui": self.ui
+            })
+
+        if self.rota == "register":
+            self._sequencia += 1
+            nome_usuario = f"c{self._execucao}_{self._sequencia}"
+            return montar_requisicao("POST", "/register", {
+                "nome_usuario": nome_usuario,
+                "email": f"{nome_usuario}@carga.local",
+                "senha": self.senha,
+            })
+
+        return montar_requisicao("GET", f"/remembered/{self.ui}")
+
+    async def preparar(self):
+        """
+        Cadastra o usuário dos logins (um 409 indica que ele já existe).
+
+        Returns:
+            int: O status HTTP do cadastro.
+        """
+        leitor, escritor = await asyncio.open_connection(self.host, self.porta)
+        try:
+            escritor.write(montar_requisicao("POST", "/register", {
+                "nome_usuario": self.usuario,
+                "email": f"{self.usuario}@carga.local",
+                "senha": self.senha,
+            }))
+            await escritor.drain()
+            status, _, _ = await ler_resposta(leitor)
+        finally:
+            escritor.close()
+
+        return status
+
+    async def _conexao(self):
+        """
+        Envia requisições por uma conexão persistente até acabar a cota.
+
+        Returns:
+            None
+        """
+        leitor = escritor = None
+        try:
+            while self._restantes > 0:
+                if escritor is None:
+                    leitor, escritor = await asyncio.open_connection(self.host, self.porta)
+
+                lote = min(self.pipeline, self._restantes)
+                self._restantes -= lote
+
+                inicios = []
+                for _ in range(lote):
+                    inicios.append(time.perf_counter())
+                    escritor.write(self._proxima_requisicao())
+
+                respondidas = 0
+                try:
+                    await escritor.drain()
+                    for inicio in inicios:
+                        status, fechar, _ = await ler_resposta(leitor)
+                        self.latencias.append(time.perf_counter() - inicio)
+                        self.status[status] += 1
+                        respondidas += 1
+                        if fechar:
+                            break
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    fechar = True
+                    self.falhas += 1
+
+                # Requisições sem resposta (ex.: conexão ociosa fechada por um
+                # trabalhador em reinício) voltam para a cota, como faria um cliente HTTP
+                self._restantes += len(inicios) - respondidas
+
+                if fechar:
+                    escritor.close()
+                    leitor = escritor = None
+        finally:
+            if escritor is not None:
+                escritor.close()
+
+    async def executar(self):
+        """
+        Executa a carga e monta o relatório.
+
+        Returns:
+            dict: O total, a duração, a vazão, os status e os percentis (em ms).
+        """
+        self.latencias = []
+        self.status.clear()
+        self.falhas = 0
+        self._restantes = self.requisicoes
+
+        inicio = time.perf_counter()
+        await asyncio.gather(*(self._conexao() for _ in range(self.conexoes)))
+        duracao = time.perf_counter() - inicio
+
+        ordenadas = sorted(self.latencias)
+        return {
+            "rota": self.rota,
+            "conexoes": self.conexoes,
+            "pipeline": self.pipeline,
+            "respostas": len(ordenadas),
+            "falhas": self.falhas,
+            "duracao": duracao,
+            "vazao": len(ordenadas) / duracao if duracao else 0.0,
+            "status": dict(sorted(self.status.items())),
+            "latencia_ms": {
+                **{f"p{p:g}": percentil(ordenadas, p) * 1000 for p in PERCENTIS},
+                "max": (ordenadas[-1] if ordenadas else 0.0) * 1000,
+            },
+        }
+
+
+def formatar_relatorio(relatorio):
+    """
+    Formata o relatório de uma carga para exibição no terminal.
+
+    Args:
+        relatorio (dict): O relatório retornado por 'GeradorCarga.executar'.
+
+    Returns:
+        str: O relatório formatado.
+    """
+    latencias = "  ".join(f"{nome}={valor:.2f}" for nome, valor in relatorio["latencia_ms"].items())
+    status = ", ".join(f"{codigo}: {quantidade}" for codigo, quantidade in relatorio["status"].items())
+
+    return "\n".join([
+        f"rota: {relatorio['rota']}  conexões: {relatorio['conexoes']}  pipeline: {relatorio['pipeline']}",
+        f"respostas: {relatorio['respostas']} em {relatorio['duracao']:.2f}s "
+        f"({relatorio['vazao']:.1f} req/s), falhas de conexão: {relatorio['falhas']}",
+        f"status: {status or '-'}",
+        f"latência (ms): {latencias}",
+    ])
+
+
+async def main(argumentos):
+    """
+    Prepara o usuário de teste, executa a carga e imprime o relatório.
+
+    Args:
+        argumentos (argparse.Namespace): Os argumentos da linha de comando.
+
+    Returns:
+        None
+    """
+    gerador = GeradorCarga(
+        argumentos.host, argumentos.porta, argumentos.rota, argumentos.conexoes,
+        argumentos.requisicoes, argumentos.pipeline, argumentos.usuario, argumentos.senha
+    )
+    if argumentos.rota == "login":
+        await gerador.preparar()
+
+    relatorio = await gerador.executar()
+    if argumentos.json:
+        print(json.dumps(relatorio, ensure_ascii=False))
+    else:
+        print(formatar_relatorio(relatorio))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gerador de carga para a API HTTP de autenticação.")
+    parser.add_argument("--host", default="127.0.0.1", help="Endereço do servidor.")
+    parser.add_argument("--porta", type=int, default=8080, help="Porta do servidor.")
+    parser.add_argument("--rota", choices=("login", "register", "remembered"), default="login",
+                        help="Rota exercitada.")
+    parser.add_argument("--conexoes", type=int, default=16, help="Conexões simultâneas.")
+    parser.add_argument("--requisicoes", type=int, default=2000, help="Total de requisições.")
+    parser.add_argument("--pipeline", type=int, default=1, help="Requisições em pipeline por conexão.")
+    parser.add_argument("--usuario", default="carga_http", help="Usuário usado nos logins.")
+    parser.add_argument("--senha", default="SenhaDeCarga123", help="Senha do usuário.")
+    parser.add_argument("--json", action="store_true", help="Imprime o relatório em JSON.")
+
+    asyncio.run(main(parser.parse_args()))
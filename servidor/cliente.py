@@ -0,0 +1,308 @@
+# -*- coding: utf-8 -*-
+"""Módulo com o cliente usado pelas interfaces gráficas para falar com o daemon de autenticação."""
+
+import select
+import socket
+import sqlite3
+import threading
+
+from controller import ErroValidacao
+from registros import Sessao, UsuarioRelembrado
+from servidor.protocolo import codificar, ler_mensagem_socket
+
+
+# Operações sem efeito no daemon, que podem ser repetidas se a resposta se perder.
+# O login abre uma sessão e conta um acesso, então não é repetido.
+OPERACOES_CONSULTA = frozenset((
+    "ping", "senha_criptografada", "relembrados", "pagina_relembrados", "usuario_relembrado",
+))
+
+# Erros do banco de dados informados pelo daemon, relançados como no banco local
+ERROS_BANCO = {
+    "banco_ocupado": sqlite3.OperationalError,
+    "erro_banco": sqlite3.DatabaseError,
+}
+
+
+class ClienteAutenticacao:
+    """
+    Classe que oferece às interfaces a mesma API do 'BancoDeDados', via daemon.
+
+    Attributes:
+        remoto (bool): Sempre True; faz o 'InsereDados' delegar o cadastro ao daemon.
+        caminho_socket (str): O caminho do socket Unix do daemon.
+    """
+
+    remoto = True
+
+    def __init__(self, caminho_socket):
+        """
+        Inicializa o cliente e conecta ao daemon.
+
+        Args:
+            caminho_socket (str): O caminho do socket Unix do daemon.
+
+        Returns:
+            None
+        """
+        self.caminho_socket = caminho_socket
+        self._trava = threading.Lock()
+        self._conexao = None
+        self._conectar()
+
+    def _conectar(self):
+        """
+        Abre uma nova conexão com o daemon.
+
+        Returns:
+            None
+        """
+        conexao = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            conexao.connect(self.caminho_socket)
+        except OSError:
+            conexao.close()
+            raise
+        self._conexao = conexao
+
+    def _reconectar(self):
+        """
+        Fecha a conexão atual, se houver, e abre uma nova.
+
+        Returns:
+            None
+        """
+        if self._conexao is not None:
+            self._conexao.close()
+            self._conexao = None
+        self._conectar()
+
+    def _encerrada(self):
+        """
+        Verifica, sem bloquear, se o daemon encerrou a conexão.
+
+        O daemon só escreve em resposta a uma requisição, então uma conexão
+        ociosa com dados para ler foi encerrada do outro lado.
+
+        Returns:
+            bool: True se a conexão foi encerrada pelo daemon.
+        """
+        legiveis, _, _ = select.select([self._conexao], [], [], 0)
+        return bool(legiveis)
+
+    def _requisitar(self, operacao, **argumentos):
+        """
+        Envia uma requisição ao daemon e aguarda a resposta.
+
+        Uma conexão encerrada pelo daemon (ex.: reiniciado) é reaberta antes
+        do envio. Se o envio falhar, o daemon não recebeu o quadro inteiro e
+        a requisição é reenviada uma única vez em uma nova conexão. Se a
+        conexão cair enquanto a resposta é lida, o daemon pode já ter
+        executado a requisição: somente as consultas ('OPERACOES_CONSULTA')
+        são reenviadas; nas demais, o erro é repassado.
+
+        Args:
+            operacao (str): O nome da operação.
+            **argumentos: Os argumentos da operação.
+
+        Returns:
+            object: O resultado da operação.
+
+        Raises:
+            ErroValidacao: Erro lançado se o daemon rejeitar o cadastro.
+            sqlite3.Error: Erro lançado se a operação falhar no banco de dados do
+                daemon (sqlite3.OperationalError se ele estiver ocupado).
+            ValueError: Erro lançado para os demais erros informados pelo daemon.
+            OSError: Erro lançado se a conexão cair após o envio de uma
+                operação que não é uma consulta (o resultado é desconhecido).
+        """
+        quadro = codificar({"op": operacao, **argumentos})
+
+        with self._trava:
+            if self._conexao is None or self._encerrada():
+                self._reconectar()
+
+            try:
+                self._conexao.sendall(quadro)
+            except OSError:
+                self._reconectar()
+                self._conexao.sendall(quadro)
+
+            try:
+                resposta = ler_mensagem_socket(self._conexao)
+            except OSError:
+                # A conexão não serve mais; a próxima requisição abre outra
+                self._conexao.close()
+                self._conexao = None
+                if operacao not in OPERACOES_CONSULTA:
+                    raise
+                self._conectar()
+                self._conexao.sendall(quadro)
+                resposta = ler_mensagem_socket(self._conexao)
+
+        if not resposta["ok"]:
+            if resposta.get("motivo") in ERROS_BANCO:
+                raise ERROS_BANCO[resposta["motivo"]](resposta["erro"])
+            if resposta.get("motivo"):
+                raise ErroValidacao(resposta["erro"], resposta["motivo"])
+            raise ValueError(resposta["erro"])
+
+        return resposta["resultado"]
+
+    def fazer_login(self, nome_usuario_email, senha, ui=None):
+        """
+        Realiza o login de um usuário no sistema.
+
+        Args:
+            nome_usuario_email (str): O nome de usuário ou email do usuário.
+            senha (str): A senha do usuário.
+            ui (str): A interface gráfica (tk, kv, qt) que solicitou o login.
+
+        Returns:
+            bool / Sessao: A sessão aberta pelo daemon (ou True, sem gerenciador
+                de sessões) se o login for bem-sucedido, False caso contrário.
+        """
+        resultado = self._requisitar(
+            "login", nome_usuario_email=nome_usuario_email, senha=senha, ui=ui
+        )
+        return Sessao(*resultado) if isinstance(resultado, list) else resultado
+
+    def obter_senha_criptografada(self, nome_usuario_email, senha):
+        """
+        Retorna a senha criptografada do usuário solicitado.
+
+        Args:
+            nome_usuario_email (str): O nome de usuário ou email do usuário.
+            senha (str): A senha do usuário.
+
+        Returns:
+            bytes: A senha criptografada ou None, caso a senha não confira.
+        """
+        criptografia = self._requisitar(
+            "senha_criptografada", nome_usuario_email=nome_usuario_email, senha=senha
+        )
+        return criptografia.encode() if criptografia is not None else None
+
+    def inserir_dados(self, nome_usuario, email, senha):
+        """
+        Valida e cadastra um novo usuário pelo daemon.
+
+        Args:
+            nome_usuario (str): O nome de usuário do novo usuário.
+            email (str): O email do novo usuário.
+            senha (str): A senha do novo usuário.
+
+        Returns:
+            None
+
+        Raises:
+            ErroValidacao: Erro lançado se algum dado for inválido.
+        """
+        self._requisitar("cadastrar", nome_usuario=nome_usuario, email=email, senha=senha)
+
+    def lembrar_usuario(self, ui, nome_usuario_email, senha):
+        """
+        Cadastra o usuário na tabela de usuários lembrados.
+
+        Args:
+            ui (str): A interface gráfica (tk, kv, qt).
+            nome_usuario_email (str): O nome de usuário ou email a ser relembrado.
+            senha (bytes): A senha criptografada do usuário a ser relembrado.
+
+        Returns:
+            None
+        """
+        self._requisitar(
+            "lembrar", ui=ui, nome_usuario_email=nome_usuario_email, senha=senha.decode()
+        )
+
+    def obter_usuarios_relembrados(self, ui):
+        """
+        Obtém uma lista com os dados de todos os usuários relembrados.
+
+        Args:
+            ui (str): A interface gráfica (tk, kv, qt) para a qual os usuários foram relembrados.
+
+        Returns:
+            list: Uma lista de registros 'UsuarioRelembrado'.
+        """
+        return [
+            UsuarioRelembrado(id_usuario, nome_usuario, email, senha.encode())
+            for id_usuario, nome_usuario, email, senha in self._requisitar("relembrados", ui=ui)
+        ]
+
+    def obter_pagina_relembrados(self, ui, apos_id=0, limite=20, prefixo=None,
+                                 colunas=("id_usuario", "nome_usuario")):
+        """
+        Obtém uma página de usuários relembrados, paginada pelo id da lista (keyset).
+
+        Args:
+            ui (str): A interface gráfica (tk, kv, qt) para a qual os usuários foram relembrados.
+            apos_id (int): O cursor retornado pela página anterior (0 para a primeira).
+            limite (int): A quantidade máxima de usuários na página.
+            prefixo (str): Filtra os usuários cujo nome de usuário ou email começa com o texto.
+            colunas (tuple): As colunas retornadas, entre 'id_usuario', 'nome_usuario', 'email' e 'senha'.
+
+        Returns:
+            tuple: (lista de tuplas com as colunas pedidas, cursor da próxima página ou None).
+        """
+        linhas, proximo = self._requisitar(
+            "pagina_relembrados", ui=ui, apos_id=apos_id, limite=limite,
+            prefixo=prefixo, colunas=list(colunas)
+        )
+        if "senha" in colunas:
+            posicao = list(colunas).index("senha")
+            for linha in linhas:
+                linha[posicao] = linha[posicao].encode()
+
+        return [tuple(linha) for linha in linhas], proximo
+
+    def iterar_relembrados(self, ui, tamanho_pagina=100, prefixo=None,
+                           colunas=("id_usuario", "nome_usuario")):
+        """
+        Percorre todos os usuários relembrados de uma interface, página a página.
+
+        Args:
+            ui (str): A interface gráfica (tk, kv, qt) para a qual os usuários foram relembrados.
+            tamanho_pagina (int): A quantidade de usuários buscada por requisição.
+            prefixo (str): Filtra os usuários cujo nome de usuário ou email começa com o texto.
+            colunas (tuple): As colunas retornadas, entre 'id_usuario', 'nome_usuario', 'email' e 'senha'.
+
+        Yields:
+            tuple: As colunas pedidas de cada usuário relembrado.
+        """
+        apos_id = 0
+        while apos_id is not None:
+            linhas, apos_id = self.obter_pagina_relembrados(ui, apos_id, tamanho_pagina, prefixo, colunas)
+            yield from linhas
+
+    def obter_usuario_relembrado(self, ui, nome_usuario):
+        """
+        Obtém os dados de um único usuário relembrado, incluindo a senha.
+
+        Args:
+            ui (str): A interface gráfica (tk, kv, qt) para a qual o usuário foi relembrado.
+            nome_usuario (str): O nome de usuário escolhido.
+
+        Returns:
+            UsuarioRelembrado / None: O usuário relembrado ou None se ele não estiver relembrado.
+        """
+        usuario = self._requisitar("usuario_relembrado", ui=ui, nome_usuario=nome_usuario)
+        if usuario is None:
+            return None
+
+        id_usuario, nome_usuario, email, senha = usuario
+        return UsuarioRelembrado(id_usuario, nome_usuario, email, senha.encode())
+
+    def fechar_conexao(self):
+        """
+        Fecha a conexão com o daemon.
+
+        Returns:
+            None
+        """
+        with self._trava:
+            # A conexão já é None se a última requisição a perdeu
+            if self._conexao is not None:
+                self._conexao.close()
+                self._conexao = None
@@ -0,0 +1,525 @@
+# -*- coding: utf-8 -*-
+"""
+Daemon local de autenticação servido por um socket Unix.
+
+O daemon é o único dono do Banco de Dados: todas as instruções SQL passam por
+uma única thread (um único escritor), enquanto o bcrypt roda em um grupo de
+threads próprio. Assim, várias interfaces gráficas compartilham a mesma
+conexão, o mesmo cache de usuários relembrados e o mesmo custo de hash.
+
+Uso (a partir da pasta raiz do projeto):
+
+    python -m servidor.daemon [--socket CAMINHO] [--trabalhadores-hash N]
+"""
+
+import argparse
+import asyncio
+import functools
+import os
+import signal
+import sqlite3
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import acessos
+import backup
+import sessoes
+from alteracoes import criar_vigia
+from controller import InsereDados
+from database import PERFIS, criar_armazenamento
+from servidor.protocolo import codificar, ler_mensagem
+
+
+# Interfaces gráficas aceitas (o nome compõe o nome das tabelas de relembrados)
+UIS_VALIDAS = ("tk", "qt", "kv")
+
+# Campos que não são textos, com os seus tipos (os demais devem ser textos)
+TIPOS_CAMPOS = {"apos_id": int, "limite": int, "colunas": list}
+# Maior página de usuários relembrados entregue de uma vez
+LIMITE_PAGINA = 1000
+
+# Caminho padrão do socket do daemon
+CAMINHO_SOCKET_PADRAO = os.path.join(tempfile.gettempdir(), "cadastro_login.sock")
+
+
+class DaemonAutenticacao:
+    """
+    Classe que atende requisições de login, cadastro e usuários relembrados.
+
+    Attributes:
+        caminho_socket (str): O caminho do socket Unix.
+        banco_de_dados (Armazenamento): O armazenamento, usado somente pela thread do banco.
+        vigia (VigiaAlteracoes): Descarta o cache de relembrados quando outro
+            processo altera o arquivo (None se desabilitado).
+    """
+
+    def __init__(self, caminho_socket=CAMINHO_SOCKET_PADRAO, trabalhadores_hash=None):
+        """
+        Inicializa o daemon sem abrir o socket.
+
+        Args:
+            caminho_socket (str): O caminho do socket Unix.
+            trabalhadores_hash (int): O número de threads do bcrypt (padrão: núcleos da CPU).
+
+        Returns:
+            None
+        """
+        self.caminho_socket = caminho_socket
+        self.banco_de_dados = None
+
+        self._executor_banco = ThreadPoolExecutor(max_workers=1, thread_name_prefix="banco")
+        self._executor_hash = ThreadPoolExecutor(
+            max_workers=trabalhadores_hash or os.cpu_count(),
+            thread_name_prefix="hash"
+        )
+        self._relembrados = {}
+        self._geracao_relembrados = 0
+        self._servidor = None
+        self.vigia = None
+        self._tarefa_vigia = None
+
+        self._operacoes = {
+            "ping": self._ping,
+            "login": self._login,
+            "senha_criptografada": self._senha_criptografada,
+            "cadastrar": self._cadastrar,
+            "lembrar": self._lembrar,
+            "relembrados": self._obter_relembrados,
+            "pagina_relembrados": self._obter_pagina_relembrados,
+            "usuario_relembrado": self._obter_usuario_relembrado,
+        }
+
+    async def _no_banco(self, funcao, *args, **kwargs):
+        """
+        Executa uma função na thread exclusiva do banco de dados.
+
+        Args:
+            funcao (callable): A função a ser executada.
+            *args: Argumentos posicionais da função.
+            **kwargs: Argumentos nomeados da função.
+
+        Returns:
+            object: O retorno da função.
+        """
+        laco = asyncio.get_running_loop()
+        return await laco.run_in_executor(
+            self._executor_banco, functools.partial(funcao, *args, **kwargs)
+        )
+
+    async def _no_hash(self, funcao, *args):
+        """
+        Executa uma função no grupo de threads do bcrypt.
+
+        Args:
+            funcao (callable): A função a ser executada.
+            *args: Argumentos posicionais da função.
+
+        Returns:
+            object: O retorno da função.
+        """
+        laco = asyncio.get_running_loop()
+        return await laco.run_in_executor(self._executor_hash, funcao, *args)
+
+    async def abrir_banco(self):
+        """
+        Abre o banco de dados na thread exclusiva do banco.
+
+        Returns:
+            None
+        """
+        self.banco_de_dados = await self._no_banco(criar_armazenamento)
+
+        # As cópias de segurança periódicas rodam em uma thread e conexão próprias
+        backup.agendar_se_configurado(self.banco_de_dados.arquivo)
+
+        # Criados em cada processo (também nos trabalhadores do modo pré-fork), na thread do banco
+        self.banco_de_dados.sessoes = await self._no_banco(sessoes.criar_gerenciador, self.banco_de_dados)
+        self.banco_de_dados.acessos = await self._no_banco(acessos.criar_acumulador, self.banco_de_dados)
+
+        # O vigia usa a conexão do armazenamento, então também roda na thread do banco
+        self.vigia = await self._no_banco(criar_vigia, self.banco_de_dados)
+        if self.vigia is not None:
+            self.vigia.registrar(self._invalidar_relembrados)
+            # As sessões encerradas por outro processo não podem continuar válidas aqui
+            if self.banco_de_dados.sessoes is not None:
+                self.vigia.registrar(self.banco_de_dados.sessoes.descartar_cache)
+            await self._no_banco(self.vigia.iniciar)
+            self._tarefa_vigia = asyncio.create_task(self._vigiar_alteracoes())
+
+    async def _vigiar_alteracoes(self):
+        """
+        Verifica periodicamente se outro processo alterou o banco de dados.
+
+        Returns:
+            None
+        """
+        while True:
+            await asyncio.sleep(self.vigia.intervalo)
+            try:
+                await self._no_banco(self.vigia.verificar)
+            except sqlite3.Error:
+                # Ex.: o arquivo travado por uma escrita longa; tenta de novo no próximo ciclo
+                continue
+
+    def _invalidar_relembrados(self):
+        """
+        Descarta o cache de usuários relembrados de todas as interfaces.
+
+        Returns:
+            None
+        """
+        self._geracao_relembrados += 1
+        self._relembrados.clear()
+
+    async def iniciar(self):
+        """
+        Abre o banco de dados e passa a escutar no socket Unix.
+
+        Returns:
+            None
+        """
+        await self.abrir_banco()
+
+        # Remove um socket deixado por uma execução anterior
+        if os.path.exists(self.caminho_socket):
+            os.unlink(self.caminho_socket)
+
+        self._servidor = await asyncio.start_unix_server(self._atender, path=self.caminho_socket)
+        os.chmod(self.caminho_socket, 0o600)
+
+    async def encerrar(self):
+        """
+        Fecha o socket, o banco de dados e os grupos de threads.
+
+        Returns:
+            None
+        """
+        if self._servidor is not None:
+            self._servidor.close()
+            await self._servidor.wait_closed()
+            self._servidor = None
+            if os.path.exists(self.caminho_socket):
+                os.unlink(self.caminho_socket)
+
+        if self._tarefa_vigia is not None:
+            self._tarefa_vigia.cancel()
+            self._tarefa_vigia = None
+
+        if self.banco_de_dados is not None:
+            await self._no_banco(self.banco_de_dados.fechar_conexao)
+            self.banco_de_dados = None
+
+        self._executor_banco.shutdown()
+        self._executor_hash.shutdown()
+
+    async def _atender(self, leitor, escritor):
+        """
+        Atende as requisições de uma conexão até que ela seja encerrada.
+
+        Args:
+            leitor (asyncio.StreamReader): O fluxo de leitura da conexão.
+            escritor (asyncio.StreamWriter): O fluxo de escrita da conexão.
+
+        Returns:
+            None
+        """
+        try:
+            while True:
+                try:
+                    mensagem = await ler_mensagem(leitor)
+                except asyncio.IncompleteReadError:
+                    break
+
+                escritor.write(codificar(await self.processar(mensagem)))
+                await escritor.drain()
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            escritor.close()
+
+    async def processar(self, mensagem):
+        """
+        Processa uma requisição e monta a resposta.
+
+        Args:
+            mensagem (dict): A requisição recebida.
+
+        Returns:
+            dict: A resposta a ser enviada.
+        """
+        operacao = self._operacoes.get(mensagem.get("op"))
+        if operacao is None:
+            return {"ok": False, "erro": f"Operação desconhecida: {mensagem.get('op')!r}"}
+
+        try:
+            for campo, valor in mensagem.items():
+                tipo = TIPOS_CAMPOS.get(campo, str)
+                if valor is not None and not isinstance(valor, tipo):
+                    raise ValueError(f"O campo '{campo}' deve ser do tipo {tipo.__name__}!")
+
+            ui = mensagem.get("ui")
+            if ui is not None and ui not in UIS_VALIDAS:
+                raise ValueError(f"Interface inválida: {ui!r}")
+
+            return {"ok": True, "resultado": await operacao(mensagem)}
+        except KeyError as erro:
+            return {"ok": False, "erro": f"Campo obrigatório ausente: {erro}"}
+        except ValueError as erro:
+            return {
+                "ok": False,
+                "erro": str(erro),
+                "motivo": getattr(erro, "motivo", None),
+            }
+        except sqlite3.Error as erro:
+            # Ex.: "database is locked", com outro processo escrevendo no mesmo arquivo
+            mensagem = str(erro).lower()
+            if isinstance(erro, sqlite3.OperationalError) and ("locked" in mensagem or "busy" in mensagem):
+                return {"ok": False, "erro": "Banco de dados ocupado; tente novamente.", "motivo": "banco_ocupado"}
+            return {"ok": False, "erro": "Erro interno no banco de dados.", "motivo": "erro_banco"}
+
+    async def _ping(self, mensagem):
+        """
+        Responde a uma verificação de disponibilidade.
+
+        Args:
+            mensagem (dict): A requisição recebida.
+
+        Returns:
+            str: A resposta 'pong'.
+        """
+        return "pong"
+
+    async def _login(self, mensagem):
+        """
+        Realiza o login, com a consulta na thread do banco e o bcrypt em paralelo.
+
+        Como em 'Armazenamento.fazer_login', um login bem-sucedido é contado
+        nos acessos do usuário e abre uma sessão, quando os respectivos
+        registros estiverem ativos.
+
+        Args:
+            mensagem (dict): A requisição com 'nome_usuario_email', 'senha' e 'ui'.
+
+        Returns:
+            list / bool: [token, id_usuario, ui, criada_em, expira_em] da sessão
+                aberta (ou True, sem gerenciador de sessões) se o login for
+                bem-sucedido, False caso contrário.
+        """
+        usuario = await self._no_banco(
+            self.banco_de_dados.obter_usuario, mensagem["nome_usuario_email"]
+        )
+        login = await self._no_hash(self.banco_de_dados.conferir_senha, usuario, mensagem["senha"])
+        self.banco_de_dados.contabilizar_login(mensagem.get("ui"), login, mensagem["nome_usuario_email"])
+
+        if login and (self.banco_de_dados.acessos is not None or self.banco_de_dados.sessoes is not None):
+            login = await self._no_banco(self._registrar_login, usuario.id, mensagem.get("ui"))
+
+        return login
+
+    def _registrar_login(self, id_usuario, ui):
+        """
+        Conta o acesso e abre a sessão de um login bem-sucedido, na thread do banco.
+
+        Args:
+            id_usuario (int): O id do usuário.
+            ui (str): A interface gráfica (tk, kv, qt) que solicitou o login.
+
+        Returns:
+            list / bool: Os campos da sessão aberta ou True, sem gerenciador de sessões.
+        """
+        if self.banco_de_dados.acessos is not None:
+            self.banco_de_dados.acessos.registrar(id_usuario)
+
+        if self.banco_de_dados.sessoes is not None:
+            return list(self.banco_de_dados.sessoes.abrir(id_usuario, ui))
+
+        return True
+
+    async def _senha_criptografada(self, mensagem):
+        """
+        Obtém a senha criptografada de um usuário cuja senha foi confirmada.
+
+        Args:
+            mensagem (dict): A requisição com 'nome_usuario_email' e 'senha'.
+
+        Returns:
+            str / None: A senha criptografada ou None.
+        """
+        usuario = await self._no_banco(
+            self.banco_de_dados.obter_usuario, mensagem["nome_usuario_email"]
+        )
+        if not usuario:
+            return None
+
+        valida = await self._no_hash(
+            self.banco_de_dados.verificar_criptografia, mensagem["senha"], usuario.senha
+        )
+        return usuario.senha.decode() if valida else None
+
+    async def _cadastrar(self, mensagem):
+        """
+        Valida e cadastra um novo usuário, calculando o hash fora da thread do banco.
+
+        Args:
+            mensagem (dict): A requisição com 'nome_usuario', 'email' e 'senha'.
+
+        Returns:
+            None
+        """
+        senha_criptografada = await self._no_hash(InsereDados.gerar_criptografia, mensagem["senha"])
+        insercao = await self._no_banco(
+            InsereDados,
+            self.banco_de_dados,
+            mensagem["nome_usuario"],
+            mensagem["email"],
+            mensagem["senha"],
+            senha_criptografada=senha_criptografada,
+            aguardar=False
+        )
+
+        # Com a escrita agrupada, o commit é aguardado fora da thread do banco,
+        # que segue validando os próximos cadastros do mesmo grupo
+        await asyncio.wrap_future(insercao.cadastro)
+
+    async def _lembrar(self, mensagem):
+        """
+        Cadastra um usuário na lista de usuários relembrados de uma interface.
+
+        Args:
+            mensagem (dict): A requisição com 'ui', 'nome_usuario_email' e 'senha'.
+
+        Returns:
+            None
+        """
+        ui = mensagem["ui"]
+        lembranca = await self._no_banco(
+            self.banco_de_dados.enviar_lembranca,
+            ui,
+            mensagem["nome_usuario_email"],
+            mensagem["senha"].encode()
+        )
+        await asyncio.wrap_future(lembranca)
+        self._relembrados.pop(ui, None)
+
+    async def _obter_relembrados(self, mensagem):
+        """
+        Obtém os usuários relembrados de uma interface, a partir do cache compartilhado.
+
+        Args:
+            mensagem (dict): A requisição com 'ui'.
+
+        Returns:
+            list: Listas [id_usuario, nome_usuario, email, senha] dos usuários relembrados.
+        """
+        ui = mensagem["ui"]
+        if ui not in self._relembrados:
+            geracao = self._geracao_relembrados
+            usuarios = await self._no_banco(self.banco_de_dados.obter_usuarios_relembrados, ui)
+            relembrados = [
+                [id_usuario, nome_usuario, email, senha.decode()]
+                for id_usuario, nome_usuario, email, senha in usuarios
+            ]
+            # Uma invalidação durante a consulta pode tornar o resultado antigo: não o guarda
+            if geracao != self._geracao_relembrados:
+                return relembrados
+            self._relembrados[ui] = relembrados
+
+        return self._relembrados[ui]
+
+    async def _obter_pagina_relembrados(self, mensagem):
+        """
+        Obtém uma página de usuários relembrados diretamente do banco (paginação keyset).
+
+        Args:
+            mensagem (dict): A requisição com 'ui' e, opcionalmente, 'apos_id',
+                'limite', 'prefixo' e 'colunas'.
+
+        Returns:
+            list: [linhas, cursor da próxima página ou None].
+        """
+        colunas = tuple(mensagem.get("colunas") or ("id_usuario", "nome_usuario"))
+        linhas, proximo = await self._no_banco(
+            self.banco_de_dados.obter_pagina_relembrados,
+            mensagem["ui"],
+            mensagem.get("apos_id") or 0,
+            min(mensagem.get("limite") or 20, LIMITE_PAGINA),
+            mensagem.get("prefixo"),
+            colunas
+        )
+        return [
+            [[valor.decode() if isinstance(valor, bytes) else valor for valor in linha] for linha in linhas],
+            proximo,
+        ]
+
+    async def _obter_usuario_relembrado(self, mensagem):
+        """
+        Obtém os dados de um único usuário relembrado, incluindo a senha.
+
+        Args:
+            mensagem (dict): A requisição com 'ui' e 'nome_usuario'.
+
+        Returns:
+            list / None: [id_usuario, nome_usuario, email, senha] ou None.
+        """
+        usuario = await self._no_banco(
+            self.banco_de_dados.obter_usuario_relembrado, mensagem["ui"], mensagem["nome_usuario"]
+        )
+        if usuario is None:
+            return None
+
+        id_usuario, nome_usuario, email, senha = usuario
+        return [id_usuario, nome_usuario, email, senha.decode()]
+
+
+async def executar_daemon(caminho_socket, trabalhadores_hash=None):
+    """
+    Executa o daemon até receber SIGINT ou SIGTERM.
+
+    Args:
+        caminho_socket (str): O caminho do socket Unix.
+        trabalhadores_hash (int): O número de threads do bcrypt.
+
+    Returns:
+        None
+    """
+    daemon = DaemonAutenticacao(caminho_socket, trabalhadores_hash)
+    await daemon.iniciar()
+    print(f"Daemon de autenticação escutando em '{caminho_socket}'")
+
+    parar = asyncio.Event()
+    laco = asyncio.get_running_loop()
+    for sinal in (signal.SIGINT, signal.SIGTERM):
+        laco.add_signal_handler(sinal, parar.set)
+
+    await parar.wait()
+    await daemon.encerrar()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Daemon local de autenticação.")
+    parser.add_argument(
+        "--socket",
+        default=os.environ.get("CADASTRO_LOGIN_DAEMON", CAMINHO_SOCKET_PADRAO),
+        help="Caminho do socket Unix."
+    )
+    parser.add_argument("--trabalhadores-hash", type=int, help="Número de threads do bcrypt.")
+    parser.add_argument("--db", metavar="CAMINHO",
+                        help="Caminho ou URI do banco de dados (padrão: CADASTRO_LOGIN_DB ou 'usuarios.db').")
+    parser.add_argument("--agrupar-escritas", metavar="N", nargs="?", const="50",
+                        help="Confirma até N cadastros e relembrados por commit (padrão: 50).")
+    parser.add_argument("--perfil", choices=list(PERFIS),
+                        help="Perfil de configuração das conexões SQLite (padrão: CADASTRO_LOGIN_PERFIL ou 'padrao').")
+    parser.add_argument("--replica", action="store_true",
+                        help="Atende as leituras a partir de uma cópia do banco de dados em memória.")
+    argumentos = parser.parse_args()
+
+    if argumentos.db:
+        os.environ["CADASTRO_LOGIN_DB"] = argumentos.db
+    if argumentos.perfil:
+        os.environ["CADASTRO_LOGIN_PERFIL"] = argumentos.perfil
+    if argumentos.replica:
+        os.environ["CADASTRO_LOGIN_REPLICA"] = "1"
+    if argumentos.agrupar_escritas:
+        os.environ["CADASTRO_LOGIN_AGRUPAR_ESCRITAS"] = argumentos.agrupar_escritas
+
+    asyncio.run(executar_daemon(argumentos.socket, argumentos.trabalhadores_hash))
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo com o protocolo de quadros usado entre o daemon de autenticação e seus clientes.
+
+Cada mensagem é um objeto JSON compacto precedido pelo seu tamanho em bytes,
+codificado como um inteiro de 4 bytes (big-endian).
+
+Requisição:  {"op": "login", "nome_usuario_email": "...", "senha": "...", "ui": "tk"}
+Resposta:    {"ok": true, "resultado": ...}
+             {"ok": false, "erro": "mensagem", "motivo": "codigo"}
+"""
+
+import json
+import struct
+
+
+# Cabeçalho com o tamanho do corpo da mensagem
+CABECALHO = struct.Struct("!I")
+# Tamanho máximo aceito para o corpo de uma mensagem
+TAMANHO_MAXIMO = 1 << 22
+
+
+def codificar(mensagem):
+    """
+    Codifica uma mensagem em um quadro pronto para envio.
+
+    Args:
+        mensagem (dict): A mensagem a ser codificada.
+
+    Returns:
+        bytes: O cabeçalho seguido do corpo JSON.
+    """
+    corpo = json.dumps(mensagem, separators=(",", ":"), ensure_ascii=False).encode()
+    return CABECALHO.pack(len(corpo)) + corpo
+
+
+def decodificar(corpo):
+    """
+    Decodifica o corpo de um quadro.
+
+    Args:
+        corpo (bytes): O corpo JSON da mensagem.
+
+    Returns:
+        dict: A mensagem decodificada.
+    """
+    return json.loads(corpo)
+
+
+def _validar_tamanho(cabecalho):
+    """
+    Obtém o tamanho do corpo a partir do cabeçalho, validando o limite.
+
+    Args:
+        cabecalho (bytes): Os 4 bytes do cabeçalho.
+
+    Returns:
+        int: O tamanho do corpo.
+
+    Raises:
+        ValueError: Erro lançado se o quadro exceder o tamanho máximo.
+    """
+    (tamanho,) = CABECALHO.unpack(cabecalho)
+    if tamanho > TAMANHO_MAXIMO:
+        raise ValueError(f"Quadro de {tamanho} bytes excede o limite do protocolo!")
+
+    return tamanho
+
+
+async def ler_mensagem(leitor):
+    """
+    Lê uma mensagem de um 'asyncio.StreamReader'.
+
+    Args:
+        leitor (asyncio.StreamReader): O fluxo de leitura da conexão.
+
+    Returns:
+        dict: A mensagem lida.
+
+    Raises:
+        asyncio.IncompleteReadError: Erro lançado se a conexão for encerrada.
+    """
+    tamanho = _validar_tamanho(await leitor.readexactly(CABECALHO.size))
+    return decodificar(await leitor.readexactly(tamanho))
+
+
+def _receber_exatamente(conexao, tamanho):
+    """
+    Recebe exatamente 'tamanho' bytes de um socket bloqueante.
+
+    Args:
+        conexao (socket.socket): O socket conectado.
+        tamanho (int): A quantidade de bytes esperada.
+
+    Returns:
+        bytes: Os bytes recebidos.
+
+    Raises:
+        ConnectionError: Erro lançado se a conexão for encerrada antes do fim.
+    """
+    partes = []
+    while tamanho:
+        parte = conexao.recv(tamanho)
+        if not parte:
+            raise ConnectionError("Conexão encerrada pelo daemon de autenticação!")
+        partes.append(parte)
+        tamanho -= len(parte)
+
+    return b"".join(partes)
+
+
+def ler_mensagem_socket(conexao):
+    """
+    Lê uma mensagem de um socket bloqueante.
+
+    Args:
+        conexao (socket.socket): O socket conectado.
+
+    Returns:
+        dict: A mensagem lida.
+    """
+    tamanho = _validar_tamanho(_receber_exatamente(conexao, CABECALHO.size))
+    return decodificar(_receber_exatamente(conexao, tamanho))
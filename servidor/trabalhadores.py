@@ -0,0 +1,526 @@
+# -*- coding: utf-8 -*-
+"""
+Modo pré-fork da API HTTP de autenticação.
+
+O bcrypt é limitado pela CPU, então um único processo Python atende logins
+em cerca de um núcleo. Neste modo, um processo mestre abre o socket de escuta
+(ou deixa cada processo abrir o seu com SO_REUSEPORT) e supervisiona N
+processos trabalhadores, cada um com a sua própria conexão SQLite em modo WAL.
+
+Sinais aceitos pelo mestre:
+
+    SIGTERM / SIGINT   encerra os trabalhadores, concluindo as requisições em andamento
+    SIGHUP             reinicia os trabalhadores um a um, sem deixar de atender
+    SIGUSR1            imprime as estatísticas de cada trabalhador
+
+Uso (a partir da pasta raiz do projeto):
+
+    python -m servidor.trabalhadores [--processos N] [--porta 8080] [--reuseport]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import selectors
+import signal
+import socket
+import sys
+import time
+
+import auditoria
+from database import PERFIS, criar_armazenamento
+from servidor.api_http import ServidorHTTP
+
+
+class Trabalhador:
+    """
+    Classe que guarda o estado de um processo trabalhador, do ponto de vista do mestre.
+
+    Attributes:
+        pid (int): O pid do processo.
+        leitura (int): O descritor por onde chegam as estatísticas do trabalhador.
+        estatisticas (dict): As últimas estatísticas recebidas (vazio até o trabalhador ficar pronto).
+        saindo (bool): Se o mestre já pediu o encerramento do processo.
+    """
+
+    def __init__(self, pid, leitura):
+        """
+        Inicializa o registro do trabalhador.
+
+        Args:
+            pid (int): O pid do processo.
+            leitura (int): O descritor de leitura do pipe de estatísticas.
+
+        Returns:
+            None
+        """
+        self.pid = pid
+        self.leitura = leitura
+        self.estatisticas = {}
+        self.saindo = False
+        self._pendente = b""
+
+    def receber(self, dados):
+        """
+        Processa os bytes recebidos pelo pipe, uma linha JSON por envio.
+
+        Args:
+            dados (bytes): Os bytes lidos do pipe.
+
+        Returns:
+            None
+        """
+        *linhas, self._pendente = (self._pendente + dados).split(b"\n")
+        for linha in linhas:
+            if linha:
+                self.estatisticas = json.loads(linha)
+
+
+async def _executar_trabalhador(host, porta, sock, trabalhadores_hash, escrita, intervalo, prazo):
+    """
+    Executa a API HTTP em um processo trabalhador até receber SIGTERM ou SIGINT.
+
+    Args:
+        host (str): O endereço de escuta (usado com SO_REUSEPORT).
+        porta (int): A porta de escuta (usada com SO_REUSEPORT).
+        sock (socket.socket): O socket herdado do mestre ou None para usar SO_REUSEPORT.
+        trabalhadores_hash (int): O número de threads do bcrypt deste processo.
+        escrita (int): O descritor por onde as estatísticas são enviadas ao mestre.
+        intervalo (float): O intervalo, em segundos, entre os envios de estatísticas.
+        prazo (float): O tempo máximo para concluir as requisições ao encerrar.
+
+    Returns:
+        None
+    """
+    if sock is None:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        sock.bind((host, porta))
+        sock.listen(socket.SOMAXCONN)
+
+    servidor = ServidorHTTP(host, porta, trabalhadores_hash)
+    await servidor.iniciar(sock=sock)
+
+    parar = asyncio.Event()
+    laco = asyncio.get_running_loop()
+    for sinal in (signal.SIGINT, signal.SIGTERM):
+        laco.add_signal_handler(sinal, parar.set)
+
+    def enviar_estatisticas():
+        try:
+            os.write(escrita, json.dumps(servidor.estatisticas()).encode() + b"\n")
+        except OSError:
+            # O mestre morreu; não há a quem reportar
+            parar.set()
+
+    # O primeiro envio avisa ao mestre que o trabalhador está pronto
+    enviar_estatisticas()
+    while not parar.is_set():
+        try:
+            await asyncio.wait_for(parar.wait(), intervalo)
+        except asyncio.TimeoutError:
+            enviar_estatisticas()
+
+    await servidor.encerrar(prazo)
+    enviar_estatisticas()
+
+
+class SupervisorTrabalhadores:
+    """
+    Classe que cria, supervisiona e reinicia os processos trabalhadores.
+
+    Attributes:
+        host (str): O endereço de escuta.
+        porta (int): A porta de escuta.
+        processos (int): O número de processos trabalhadores.
+        trabalhadores_hash (int): O número de threads do bcrypt por processo.
+        reuseport (bool): Se cada trabalhador abre o seu próprio socket com SO_REUSEPORT.
+        intervalo (float): O intervalo, em segundos, entre os envios de estatísticas.
+        prazo (float): O tempo máximo para um trabalhador concluir as requisições ao encerrar.
+        trabalhadores (dict): Os trabalhadores vivos, indexados pelo pid.
+        encerrados (list): Os trabalhadores encerrados pelo mestre, com as estatísticas finais.
+        reinicios (int): Quantos trabalhadores morreram inesperadamente e foram recriados.
+    """
+
+    def __init__(self, host="127.0.0.1", porta=8080, processos=None, trabalhadores_hash=None,
+                 reuseport=False, intervalo=1.0, prazo=5.0):
+        """
+        Inicializa o supervisor sem criar processos.
+
+        Args:
+            host (str): O endereço de escuta.
+            porta (int): A porta de escuta.
+            processos (int): O número de processos trabalhadores (padrão: núcleos da CPU).
+            trabalhadores_hash (int): O número de threads do bcrypt por processo (padrão: 1).
+            reuseport (bool): Se cada trabalhador abre o seu próprio socket com SO_REUSEPORT.
+            intervalo (float): O intervalo, em segundos, entre os envios de estatísticas.
+            prazo (float): O tempo máximo para um trabalhador concluir as requisições ao encerrar.
+
+        Returns:
+            None
+        """
+        self.host = host
+        self.porta = porta
+        self.processos = processos or os.cpu_count()
+        # Cada processo já ocupa um núcleo; mais threads de hash só disputariam a CPU
+        self.trabalhadores_hash = trabalhadores_hash or 1
+        self.reuseport = reuseport
+        self.intervalo = intervalo
+        self.prazo = prazo
+
+        self.trabalhadores = {}
+        self.encerrados = []
+        self.reinicios = 0
+
+        self._sock = None
+        self._seletor = selectors.DefaultSelector()
+        self._sinais = []
+
+    def _preparar_banco(self):
+        """
+        Cria as tabelas e ativa o modo WAL antes de criar os trabalhadores.
+
+        O modo WAL fica gravado no arquivo, então todas as conexões abertas
+        depois pelos trabalhadores já o utilizam, com leituras concorrentes.
+        No armazenamento fragmentado, o modo é ativado em cada fragmento.
+
+        Returns:
+            None
+
+        Raises:
+            ValueError: Erro lançado se o banco de dados ou o armazenamento
+                estiver em memória (os processos não o compartilhariam) ou se a
+                réplica em memória estiver ativada (cada processo teria a sua,
+                sem as escritas dos demais).
+        """
+        if os.environ.get("CADASTRO_LOGIN_REPLICA") == "1":
+            raise ValueError("O modo pré-fork não pode ser usado com a réplica em memória.")
+
+        armazenamento = criar_armazenamento()
+        bancos_de_dados = getattr(armazenamento, "fragmentos", [armazenamento])
+        if any(getattr(banco_de_dados, "arquivo", None) is None for banco_de_dados in bancos_de_dados):
+            armazenamento.fechar_conexao()
+            raise ValueError("O modo pré-fork exige um banco de dados em arquivo.")
+
+        for banco_de_dados in bancos_de_dados:
+            # Lê o resultado: um cursor pendente manteria a trava após o fechamento
+            banco_de_dados.executar("PRAGMA journal_mode=WAL", nome="journal_mode").fetchone()
+        armazenamento.fechar_conexao()
+
+    def _abrir_socket(self):
+        """
+        Abre o socket de escuta compartilhado pelos trabalhadores.
+
+        Returns:
+            None
+        """
+        # Com o protocolo explícito, o asyncio ativa TCP_NODELAY nas conexões
+        # aceitas; sem ele, respostas em pipeline esperam o ACK atrasado (~40 ms)
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind((self.host, self.porta))
+        self._sock.listen(socket.SOMAXCONN)
+        self._sock.setblocking(False)
+        self.porta = self._sock.getsockname()[1]
+
+    def _criar_trabalhador(self):
+        """
+        Cria um processo trabalhador com fork.
+
+        Returns:
+            Trabalhador: O trabalhador criado.
+        """
+        leitura, escrita = os.pipe()
+        pid = os.fork()
+
+        if pid == 0:
+            codigo = 0
+            try:
+                os.close(leitura)
+                for trabalhador in self.trabalhadores.values():
+                    os.close(trabalhador.leitura)
+                for sinal in (signal.SIGINT, signal.SIGTERM, signal.SIGHUP, signal.SIGUSR1):
+                    signal.signal(sinal, signal.SIG_DFL)
+
+                asyncio.run(_executar_trabalhador(
+                    self.host, self.porta, self._sock, self.trabalhadores_hash,
+                    escrita, self.intervalo, self.prazo
+                ))
+            except BaseException as erro:
+                print(f"Trabalhador {os.getpid()} falhou: {erro!r}", file=sys.stderr)
+                codigo = 1
+            finally:
+                # O 'os._exit' não executa o 'atexit': grava os eventos de auditoria pendentes
+                auditoria.parar()
+                os._exit(codigo)
+
+        os.close(escrita)
+        os.set_blocking(leitura, False)
+        trabalhador = Trabalhador(pid, leitura)
+        self.trabalhadores[pid] = trabalhador
+        self._seletor.register(leitura, selectors.EVENT_READ, trabalhador)
+
+        return trabalhador
+
+    def _ler_estatisticas(self, tempo_limite):
+        """
+        Lê as estatísticas que chegaram pelos pipes dos trabalhadores.
+
+        Args:
+            tempo_limite (float): O tempo máximo de espera, em segundos.
+
+        Returns:
+            None
+        """
+        for chave, _ in self._seletor.select(tempo_limite):
+            try:
+                dados = os.read(chave.fd, 65536)
+            except BlockingIOError:
+                continue
+            if dados:
+                chave.data.receber(dados)
+            else:
+                # O trabalhador fechou o pipe ao sair
+                self._seletor.unregister(chave.fd)
+
+    def _recolher(self):
+        """
+        Recolhe os trabalhadores que saíram e recria os que morreram inesperadamente.
+
+        Returns:
+            list: Os pids recolhidos.
+        """
+        recolhidos = []
+        while self.trabalhadores:
+            try:
+                pid, situacao = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                break
+
+            trabalhador = self.trabalhadores.pop(pid, None)
+            if trabalhador is None:
+                continue
+            recolhidos.append(pid)
+            self._fechar_pipe(trabalhador)
+
+            if trabalhador.saindo:
+                self.encerrados.append(trabalhador)
+            else:
+                self.reinicios += 1
+                print(
+                    f"Trabalhador {pid} saiu inesperadamente (código {os.waitstatus_to_exitcode(situacao)}); recriando",
+                    file=sys.stderr
+                )
+                self._criar_trabalhador()
+
+        return recolhidos
+
+    def _fechar_pipe(self, trabalhador):
+        """
+        Lê as últimas estatísticas de um trabalhador que saiu e fecha o seu pipe.
+
+        Args:
+            trabalhador (Trabalhador): O trabalhador que saiu.
+
+        Returns:
+            None
+        """
+        if trabalhador.leitura in self._seletor.get_map():
+            self._seletor.unregister(trabalhador.leitura)
+
+        try:
+            while dados := os.read(trabalhador.leitura, 65536):
+                trabalhador.receber(dados)
+        except BlockingIOError:
+            pass
+        os.close(trabalhador.leitura)
+
+    def _aguardar_pronto(self, trabalhador, prazo=10.0):
+        """
+        Aguarda o primeiro envio de estatísticas de um trabalhador recém-criado.
+
+        Args:
+            trabalhador (Trabalhador): O trabalhador aguardado.
+            prazo (float): O tempo máximo de espera, em segundos.
+
+        Returns:
+            bool: True se o trabalhador ficou pronto dentro do prazo.
+        """
+        limite = time.monotonic() + prazo
+        while not trabalhador.estatisticas and time.monotonic() < limite:
+            self._ler_estatisticas(0.05)
+            if trabalhador.pid not in self.trabalhadores:
+                return False
+            self._recolher()
+
+        return bool(trabalhador.estatisticas)
+
+    def _encerrar_trabalhador(self, trabalhador):
+        """
+        Pede o encerramento gracioso de um trabalhador.
+
+        Args:
+            trabalhador (Trabalhador): O trabalhador a ser encerrado.
+
+        Returns:
+            None
+        """
+        trabalhador.saindo = True
+        try:
+            os.kill(trabalhador.pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+
+    def reiniciar(self):
+        """
+        Substitui os trabalhadores um a um: o novo fica pronto antes de o antigo sair.
+
+        Returns:
+            None
+        """
+        for antigo in list(self.trabalhadores.values()):
+            if antigo.saindo:
+                continue
+            novo = self._criar_trabalhador()
+            if not self._aguardar_pronto(novo):
+                print(f"Trabalhador {novo.pid} não ficou pronto; reinício interrompido", file=sys.stderr)
+                return
+            self._encerrar_trabalhador(antigo)
+
+    def encerrar(self):
+        """
+        Encerra todos os trabalhadores e fecha o socket de escuta.
+
+        Trabalhadores que não saírem dentro do prazo recebem SIGKILL.
+
+        Returns:
+            None
+        """
+        for trabalhador in list(self.trabalhadores.values()):
+            self._encerrar_trabalhador(trabalhador)
+
+        limite = time.monotonic() + self.prazo + 2
+        while self.trabalhadores and time.monotonic() < limite:
+            self._ler_estatisticas(0.05)
+            self._recolher()
+
+        for trabalhador in list(self.trabalhadores.values()):
+            os.kill(trabalhador.pid, signal.SIGKILL)
+        while self.trabalhadores:
+            pid, _ = os.waitpid(-1, 0)
+            trabalhador = self.trabalhadores.pop(pid, None)
+            if trabalhador is not None:
+                self._fechar_pipe(trabalhador)
+                self.encerrados.append(trabalhador)
+
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def relatorio(self, trabalhadores=None):
+        """
+        Formata as estatísticas mais recentes de cada trabalhador.
+
+        Args:
+            trabalhadores (list): Os trabalhadores reportados (padrão: os vivos).
+
+        Returns:
+            str: Uma tabela com pid, tempo ativo, requisições, vazão e status por trabalhador.
+        """
+        linhas = [f"{'pid':>8} {'ativo(s)':>9} {'requisições':>12} {'req/s':>9} {'conexões':>9}  status"]
+        if trabalhadores is None:
+            trabalhadores = list(self.trabalhadores.values())
+
+        total = 0
+        for trabalhador in sorted(trabalhadores, key=lambda t: t.pid):
+            pid, dados = trabalhador.pid, trabalhador.estatisticas
+            if not dados:
+                linhas.append(f"{pid:>8} {'(iniciando)':>9}")
+                continue
+
+            total += dados["requisicoes"]
+            vazao = dados["requisicoes"] / dados["tempo_ativo"] if dados["tempo_ativo"] else 0.0
+            status = ", ".join(f"{codigo}: {quantidade}" for codigo, quantidade in dados["status"].items())
+            linhas.append(
+                f"{pid:>8} {dados['tempo_ativo']:>9.1f} {dados['requisicoes']:>12} "
+                f"{vazao:>9.1f} {dados['conexoes_abertas']:>9}  {status or '-'}"
+            )
+
+        linhas.append(f"total: {total} requisições em {len(trabalhadores)} trabalhadores "
+                      f"({self.reinicios} recriados)")
+        return "\n".join(linhas)
+
+    def executar(self):
+        """
+        Cria os trabalhadores e os supervisiona até receber SIGTERM ou SIGINT.
+
+        Returns:
+            None
+        """
+        self._preparar_banco()
+        if not self.reuseport:
+            self._abrir_socket()
+
+        for _ in range(self.processos):
+            self._criar_trabalhador()
+
+        for sinal in (signal.SIGINT, signal.SIGTERM, signal.SIGHUP, signal.SIGUSR1):
+            signal.signal(sinal, lambda numero, quadro: self._sinais.append(numero))
+
+        print(
+            f"API HTTP de autenticação escutando em http://{self.host}:{self.porta} "
+            f"com {self.processos} processos (mestre {os.getpid()})"
+        )
+
+        try:
+            while True:
+                self._ler_estatisticas(0.5)
+                self._recolher()
+
+                while self._sinais:
+                    sinal = self._sinais.pop(0)
+                    if sinal in (signal.SIGINT, signal.SIGTERM):
+                        return
+                    if sinal == signal.SIGHUP:
+                        self.reiniciar()
+                    elif sinal == signal.SIGUSR1:
+                        print(self.relatorio(), flush=True)
+        finally:
+            self.encerrar()
+            print(self.relatorio(self.encerrados), flush=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="API HTTP de autenticação com vários processos.")
+    parser.add_argument("--host", default="127.0.0.1", help="Endereço de escuta.")
+    parser.add_argument("--porta", type=int, default=8080, help="Porta de escuta.")
+    parser.add_argument("--processos", type=int, help="Número de processos trabalhadores.")
+    parser.add_argument("--trabalhadores-hash", type=int, help="Threads do bcrypt por processo.")
+    parser.add_argument("--reuseport", action="store_true",
+                        help="Cada trabalhador abre o seu próprio socket com SO_REUSEPORT.")
+    parser.add_argument("--prazo", type=float, default=5.0,
+                        help="Segundos para concluir as requisições ao encerrar.")
+    parser.add_argument("--db", metavar="CAMINHO",
+                        help="Caminho ou URI do banco de dados (padrão: CADASTRO_LOGIN_DB ou 'usuarios.db').")
+    parser.add_argument("--agrupar-escritas", metavar="N", nargs="?", const="50",
+                        help="Confirma até N cadastros e relembrados por commit (padrão: 50).")
+    parser.add_argument("--perfil", choices=list(PERFIS),
+                        help="Perfil de configuração das conexões SQLite (padrão: CADASTRO_LOGIN_PERFIL ou 'padrao').")
+    argumentos = parser.parse_args()
+
+    # A variável de ambiente é herdada pelos trabalhadores criados com fork
+    if argumentos.db:
+        os.environ["CADASTRO_LOGIN_DB"] = argumentos.db
+    if argumentos.perfil:
+        os.environ["CADASTRO_LOGIN_PERFIL"] = argumentos.perfil
+    if argumentos.agrupar_escritas:
+        os.environ["CADASTRO_LOGIN_AGRUPAR_ESCRITAS"] = argumentos.agrupar_escritas
+
+    SupervisorTrabalhadores(
+        argumentos.host, argumentos.porta, argumentos.processos, argumentos.trabalhadores_hash,
+        argumentos.reuseport, prazo=argumentos.prazo
+    ).executar()
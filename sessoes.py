@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+"""
+Sessões abertas pelos logins bem-sucedidos.
+
+O armazenamento guarda as sessões na tabela 'sessoes' (com índices pela
+expiração e pelo usuário). O gerenciador mantém, na memória do processo, as
+sessões que ele abriu ou consultou, indexadas pelo token, então a busca de
+uma sessão ativa não consulta o banco de dados. Ao abrir uma sessão, as mais
+antigas do usuário além do limite de sessões simultâneas são encerradas.
+
+As sessões expiradas são removidas em lotes pequenos por uma thread com
+conexão própria, de modo que cada transação segura a escrita do banco por
+pouco tempo e a tabela não cresce sem limite quando muitas sessões são
+abertas. Sem uma conexão própria (armazenamento em memória ou réplica em
+memória), um lote é removido a cada sessão aberta.
+"""
+
+import atexit
+import heapq
+import logging
+import os
+import secrets
+import sqlite3
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+class GerenciadorSessoes:
+    """
+    Classe que abre, consulta e encerra sessões, com a limpeza das expiradas em segundo plano.
+
+    Attributes:
+        armazenamento (Armazenamento): O armazenamento das sessões.
+        duracao (float): A validade de cada sessão, em segundos.
+        max_por_usuario (int): A quantidade máxima de sessões simultâneas de um usuário.
+        lote (int): A quantidade máxima de sessões expiradas removidas por transação.
+        abertas (int): A quantidade de sessões abertas por este gerenciador.
+        excedentes (int): A quantidade de sessões encerradas pelo limite por usuário.
+        removidas (int): A quantidade de sessões expiradas removidas do armazenamento.
+    """
+
+    def __init__(self, armazenamento, duracao=3600, max_por_usuario=5, lote=500, relogio=time.time):
+        """
+        Inicializa o gerenciador sem iniciar a limpeza em segundo plano.
+
+        Args:
+            armazenamento (Armazenamento): O armazenamento das sessões.
+            duracao (float): A validade de cada sessão, em segundos.
+            max_por_usuario (int): A quantidade máxima de sessões simultâneas de um usuário.
+            lote (int): A quantidade máxima de sessões expiradas removidas por transação.
+            relogio (callable): Retorna o instante atual, em segundos.
+
+        Returns:
+            None
+        """
+        self.armazenamento = armazenamento
+        self.duracao = duracao
+        self.max_por_usuario = max_por_usuario
+        self.lote = lote
+        self.relogio = relogio
+
+        self.abertas = 0
+        self.excedentes = 0
+        self.removidas = 0
+
+        # Sessões conhecidas pelo token e a fila (expira_em, token) das suas expirações
+        self._sessoes = {}
+        self._expiracoes = []
+        self._trava = threading.Lock()
+
+        self._thread = None
+        self._parar = threading.Event()
+
+    def abrir(self, id_usuario, ui=None):
+        """
+        Abre uma sessão para um usuário, encerrando as mais antigas além do limite.
+
+        Args:
+            id_usuario (int): O id do usuário.
+            ui (str): A interface gráfica (tk, kv, qt) que solicitou o login.
+
+        Returns:
+            Sessao: A sessão aberta.
+        """
+        agora = self.relogio()
+
+        ativas = self.armazenamento.obter_sessoes_usuario(id_usuario, agora)
+        for sessao in ativas[:max(len(ativas) - self.max_por_usuario + 1, 0)]:
+            self.encerrar(sessao.token)
+            self.excedentes += 1
+
+        sessao = self.armazenamento.criar_sessao(
+            secrets.token_urlsafe(32), id_usuario, ui, agora, agora + self.duracao
+        )
+        self._guardar(sessao)
+        self.abertas += 1
+
+        # Sem a thread de limpeza, cada sessão aberta paga a remoção de um lote
+        if self._thread is None:
+            self.limpar(agora)
+
+        return sessao
+
+    def obter(self, token):
+        """
+        Obtém uma sessão ativa pelo token.
+
+        As sessões abertas por este gerenciador são encontradas em tempo
+        constante, sem consultar o armazenamento; as demais (abertas por outro
+        processo ou antes de reiniciar) são consultadas uma vez e guardadas.
+
+        Args:
+            token (str): O identificador da sessão.
+
+        Returns:
+            Sessao / None: A sessão ou None se ela não existir ou tiver expirado.
+        """
+        sessao = self._sessoes.get(token)
+        if sessao is None:
+            sessao = self.armazenamento.obter_sessao(token)
+            if sessao is None:
+                return None
+            self._guardar(sessao)
+
+        return sessao if sessao.expira_em > self.relogio() else None
+
+    def encerrar(self, token):
+        """
+        Encerra uma sessão (logout).
+
+        Args:
+            token (str): O identificador da sessão.
+
+        Returns:
+            bool: True se a sessão existia no armazenamento.
+        """
+        with self._trava:
+            self._sessoes.pop(token, None)
+
+        return self.armazenamento.remover_sessao(token)
+
+    def descartar_cache(self):
+        """
+        Esquece as sessões guardadas na memória.
+
+        Deve ser registrado no vigia de alterações ('alteracoes.VigiaAlteracoes')
+        quando outros processos também encerram sessões no mesmo arquivo.
+
+        Returns:
+            None
+        """
+        with self._trava:
+            self._sessoes.clear()
+            self._expiracoes.clear()
+
+    def limpar(self, agora=None):
+        """
+        Remove as sessões expiradas da memória e um lote delas do armazenamento.
+
+        Args:
+            agora (float): O instante de referência (padrão: o relógio do gerenciador).
+
+        Returns:
+            int: A quantidade de sessões removidas do armazenamento.
+        """
+        agora = self.relogio() if agora is None else agora
+        self._esquecer_expiradas(agora)
+
+        removidas = self.armazenamento.remover_sessoes_expiradas(agora, self.lote)
+        self.removidas += removidas
+
+        return removidas
+
+    def iniciar_limpeza(self, fabrica, intervalo=60.0):
+        """
+        Inicia a thread que remove as sessões expiradas periodicamente.
+
+        Args:
+            fabrica (callable): Cria, na thread de limpeza, o armazenamento com a
+                conexão própria da thread (ex.: 'functools.partial(BancoDeDados, caminho)').
+            intervalo (float): O intervalo entre as limpezas, em segundos.
+
+        Returns:
+            None
+        """
+        if self._thread is not None:
+            return
+
+        self._parar.clear()
+        self._thread = threading.Thread(
+            target=self._executar_limpeza, args=(fabrica, intervalo), name="limpeza-sessoes", daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.parar_limpeza)
+
+    def parar_limpeza(self):
+        """
+        Interrompe a thread de limpeza.
+
+        Returns:
+            None
+        """
+        if self._thread is not None:
+            self._parar.set()
+            self._thread.join()
+            self._thread = None
+
+    def _guardar(self, sessao):
+        """
+        Guarda uma sessão na memória e agenda o seu descarte na fila de expirações.
+
+        Args:
+            sessao (Sessao): A sessão.
+
+        Returns:
+            None
+        """
+        with self._trava:
+            self._sessoes[sessao.token] = sessao
+            heapq.heappush(self._expiracoes, (sessao.expira_em, sessao.token))
+
+    def _esquecer_expiradas(self, agora):
+        """
+        Retira da memória as sessões expiradas, pela fila de expirações.
+
+        Args:
+            agora (float): O instante de referência.
+
+        Returns:
+            None
+        """
+        with self._trava:
+            while self._expiracoes and self._expiracoes[0][0] <= agora:
+                expira_em, token = heapq.heappop(self._expiracoes)
+                sessao = self._sessoes.get(token)
+                # Ignora entradas de sessões já encerradas (ou guardadas de novo)
+                if sessao is not None and sessao.expira_em == expira_em:
+                    del self._sessoes[token]
+
+    def _executar_limpeza(self, fabrica, intervalo):
+        """
+        Laço da thread de limpeza: remove lotes até esgotar as expiradas e aguarda o próximo ciclo.
+
+        Args:
+            fabrica (callable): Cria o armazenamento da thread.
+            intervalo (float): O intervalo entre as limpezas, em segundos.
+
+        Returns:
+            None
+        """
+        armazenamento = fabrica()
+        try:
+            while not self._parar.wait(intervalo):
+                agora = self.relogio()
+                self._esquecer_expiradas(agora)
+                try:
+                    while not self._parar.is_set():
+                        removidas = armazenamento.remover_sessoes_expiradas(agora, self.lote)
+                        self.removidas += removidas
+                        if removidas < self.lote:
+                            break
+                except sqlite3.Error as erro:
+                    # Ex.: o banco travado por outra escrita; o restante fica para o próximo ciclo
+                    logger.warning("Falha ao remover sessões expiradas: %s", erro)
+        finally:
+            armazenamento.fechar_conexao()
+
+
+def criar_gerenciador(armazenamento):
+    """
+    Cria o gerenciador de sessões de um armazenamento conforme as variáveis de ambiente.
+
+    'CADASTRO_LOGIN_SESSAO_DURACAO' define a validade das sessões em segundos
+    (padrão: 3600; 0 desativa as sessões), 'CADASTRO_LOGIN_SESSOES_POR_USUARIO'
+    o limite de sessões simultâneas (padrão: 5) e
+    'CADASTRO_LOGIN_SESSOES_LIMPEZA' o intervalo da limpeza em segundos
+    (padrão: 60). A thread de limpeza só é iniciada se o armazenamento puder
+    ser aberto novamente em outra conexão ('fabrica_conexao'). Um
+    armazenamento somente leitura não registra sessões.
+
+    Args:
+        armazenamento (Armazenamento): O armazenamento das sessões.
+
+    Returns:
+        GerenciadorSessoes / None: O gerenciador ou None se as sessões estiverem
+            desativadas ou o armazenamento for somente leitura.
+    """
+    duracao = float(os.environ.get("CADASTRO_LOGIN_SESSAO_DURACAO", "3600"))
+    if duracao <= 0 or armazenamento.somente_leitura:
+        return None
+
+    gerenciador = GerenciadorSessoes(
+        armazenamento, duracao, int(os.environ.get("CADASTRO_LOGIN_SESSOES_POR_USUARIO", "5"))
+    )
+
+    fabrica = armazenamento.fabrica_conexao()
+    if fabrica is not None:
+        gerenciador.iniciar_limpeza(fabrica, float(os.environ.get("CADASTRO_LOGIN_SESSOES_LIMPEZA", "60")))
+
+    return gerenciador
@@ -12,8 +12,11 @@ from kivy.uix.floatlayout import FloatLayout
 
 kivy.require('2.2.1')
 
-from database import BancoDeDados
+from database import abrir_banco_de_dados
 from controller import InsereDados
+from diagnostico.memoria import configurar_memoria, contar_widgets_kv, medir_acao
+from diagnostico.perfilador import perfilar_se_configurado
+from diagnostico.vigia_laco import limite_configurado, vigiar_kv
 
 
 class MessageBox(Popup):
@@ -215,6 +218,7 @@ class TelaDeLogin(BoxLayout):
         # Obtém uma referência ao banco de dados
         self.banco_de_dados = banco_de_dados
 
+    @medir_acao("login")
     def clique_entrar(self, inp_nome_usuario_email, inp_senha):
         """
         Faz login ao clicar no botão "Entrar" com um nome de usuário ou email.
@@ -229,7 +233,8 @@ class TelaDeLogin(BoxLayout):
         # Tenta fazer login no sistema com os dados fornecidos pelo usuário
         login = self.banco_de_dados.fazer_login(
             inp_nome_usuario_email.text,
-            inp_senha.text
+            inp_senha.text,
+            ui="kv"
         )
         # Exibe uma mensagem para notificar se o login foi bem-sucedido
         if login:
@@ -274,6 +279,7 @@ class TelaDeCadastro(BoxLayout):
         # Obtém uma referência do banco de dados
         self.banco_de_dados = banco_de_dados
 
+    @medir_acao("cadastro")
     def clique_cadastrar(self, inp_nome_usuario, inp_email, inp_senha, inp_confirmar_senha):
         """
         Tenta cadastrar um usuário ao clicar no botão "Cadastrar" com um nome de usuário ou email.
@@ -430,7 +436,7 @@ class LayoutPrincipal(FloatLayout):
         # Obtém a referência á classe principal da aplicação
         self.app = app
         # Obtém uma refência ao banco de dados
-        self.banco_de_dados = BancoDeDados()
+        self.banco_de_dados = abrir_banco_de_dados()
         # Cria uma instância da tela de login
         self.tela_login = TelaDeLogin(self.app, self.banco_de_dados)
         # Cria uma instância da tela de cadastro
@@ -451,6 +457,7 @@ class LayoutPrincipal(FloatLayout):
         if key == ord('tab'):
             widget.focus = True
         
+    @medir_acao("trocar_tela")
     def mostrar_tela_cadastro(self):
         """
         Mostra a tela de cadastro de usuários.
@@ -475,6 +482,7 @@ class LayoutPrincipal(FloatLayout):
         # Transfere o foco para o campo de nome de usuário da tela de cadastro
         self.tela_cadastro.ids.inp_cadastro_nome_usuario.focus = True
             
+    @medir_acao("trocar_tela")
     def mostrar_tela_login(self):
         """
         Mostra a tela de cadastro de usuários.
@@ -561,11 +569,19 @@ class MainApp(App):
         """
         # Define o título da janela
         self.title = "Tela de Cadastro e Login de Usuários"
+        # Mede a memória de cada ação se o diagnóstico de memória estiver habilitado
+        configurar_memoria("kv", contar_widgets_kv)
         # Cria uma instância do layout principal da aplicação
         self.layout_principal = LayoutPrincipal(self)
+        # Vigia o laço de eventos se a detecção de travamentos estiver habilitada
+        limite_travamento = limite_configurado()
+        if limite_travamento is not None:
+            self.vigia = vigiar_kv(limite_travamento)
         # Retorna o widget principal da aplicação para o kivy
         return self.layout_principal
     
     
 if __name__ == '__main__':
+    # Inicia o perfilador por amostragem se ele estiver habilitado
+    perfilar_se_configurado()
     MainApp().run()
@@ -4,29 +4,16 @@
 import sys
 from PySide6.QtWidgets import QApplication, QMainWindow, QMessageBox, QLineEdit, QCompleter
 
+import alteracoes
 from ui.qt.screens import Ui_MainWindow
-from database import BancoDeDados
+from database import abrir_banco_de_dados
 from controller import InsereDados, LembrarUsuario
+from diagnostico.memoria import configurar_memoria, contar_widgets_qt, medir_acao
+from diagnostico.perfilador import perfilar_se_configurado
+from diagnostico.vigia_laco import limite_configurado, vigiar_qt
 from constants import *
 
 
-def obter_nomes_usuarios(usuarios):
-    """
-    Obtém uma lista com os nomes dos usuários relembrados.
-
-    Args:
-        usuarios (list): Uma lista com os dados dos usuários relembrados.
-    
-    Returns:
-        nomes (list): Uma lista com os nomes dos usuários recebidos.
-    """
-    nomes= []
-    for usuario in usuarios:
-            nomes.append(usuario[1])
-    
-    return nomes
-
-
 def autocompletar(root, opcoes, campo, comando):
     """
     Define as configurações da ferramenta de autocompletar (usuários relembrados)
@@ -38,11 +25,13 @@ def autocompletar(root, opcoes, campo, comando):
         comando (function): Um comando que será chamado em uma opção selecionada.
     
     Returns:
-        None
+        QCompleter: O recurso de autocompletar criado.
     """
     completar = QCompleter(opcoes, root)
     completar.activated.connect(comando)
     campo.setCompleter(completar)
+    
+    return completar
             
                 
 class QtApp(QMainWindow):
@@ -50,10 +39,24 @@ class QtApp(QMainWindow):
     def __init__(self):
         # Inicializa a superclasse 'QMainWindow'
         super().__init__()
+        # Mede a memória de cada ação se o diagnóstico de memória estiver habilitado
+        configurar_memoria("qt", contar_widgets_qt)
         # Cria uma instância do Banco de Dados
-        self.banco_de_dados = BancoDeDados()
+        self.banco_de_dados = abrir_banco_de_dados()
         # Carrega e configura a interface gráfica
         self.carregar_ui()
+        # Recarrega as sugestões quando outro processo alterar o Banco de Dados
+        self.vigia_alteracoes = alteracoes.vigiar_qt(self.banco_de_dados)
+        if self.vigia_alteracoes is not None:
+            self.vigia_alteracoes.registrar(self.recarregar_sugestoes)
+            # As sessões encerradas por outro processo não podem continuar válidas aqui
+            if getattr(self.banco_de_dados, "sessoes", None) is not None:
+                self.vigia_alteracoes.registrar(self.banco_de_dados.sessoes.descartar_cache)
+            self.vigia_alteracoes.iniciar()
+        # Vigia o laço de eventos se a detecção de travamentos estiver habilitada
+        limite_travamento = limite_configurado()
+        if limite_travamento is not None:
+            self.vigia = vigiar_qt(limite_travamento)
         
     def carregar_ui(self):
         """
@@ -93,13 +96,14 @@ class QtApp(QMainWindow):
         self.ui.le_login_nome_usuario_email.textEdited.connect(self.restaurar_cor_padrao)
         self.ui.le_login_senha.textEdited.connect(self.restaurar_cor_padrao)
         
-        # Obtém a lista com os dados dos usuários relembrados da tela 'qt'
-        self.lista_usuarios_relembrados = self.banco_de_dados.obter_usuarios_relembrados("qt")
-        # Obtém uma lista com os nomes dos usuários relembrados
-        lista_nomes = obter_nomes_usuarios(self.lista_usuarios_relembrados)
+        # Obtém apenas a primeira página de nomes dos usuários relembrados da tela 'qt'
+        usuarios_relembrados, self.proximo_relembrado = self.banco_de_dados.obter_pagina_relembrados(
+            "qt", limite=TAMANHO_PAGINA_SUGESTOES, colunas=("nome_usuario",)
+        )
+        lista_nomes = [nome_usuario for nome_usuario, in usuarios_relembrados]
         
         # Adiciona o recurso de autocompletar o campo de nome de usuário
-        autocompletar(
+        self.completar = autocompletar(
             # Referênca a tela de login
             self,
             # Lista com os nomes dos usuários relembrados
@@ -109,6 +113,8 @@ class QtApp(QMainWindow):
             # Ações que ocorrerão quando um nome da lista for selecionado 
             self.usuario_relembrado_selecionado
         )
+        # Busca mais sugestões conforme o texto digitado, se a primeira página não bastou
+        self.ui.le_login_nome_usuario_email.textEdited.connect(self.atualizar_sugestoes)
         
         # Tenta fazer login quando clicar em 'Entrar'
         self.ui.btn_entrar.clicked.connect(self.clique_entrar)
@@ -215,14 +221,52 @@ class QtApp(QMainWindow):
         Returns:
             None
         """
-        for usuario in self.lista_usuarios_relembrados:
-            if usuario[1] == nome_usuario:
-                senha = usuario[3]
-                self.ui.le_login_nome_usuario_email.setText(nome_usuario)
-                self.ui.le_login_senha.setText(senha.decode())
-                # Altera a cor de fundo dos campos preenchidos pelo recurso autocompletar
-                self.definir_cor_personalizada()
+        # Busca a senha somente do usuário escolhido
+        usuario = self.banco_de_dados.obter_usuario_relembrado("qt", nome_usuario)
+        if usuario:
+            self.ui.le_login_nome_usuario_email.setText(nome_usuario)
+            self.ui.le_login_senha.setText(usuario.senha.decode())
+            # Altera a cor de fundo dos campos preenchidos pelo recurso autocompletar
+            self.definir_cor_personalizada()
+
+    def atualizar_sugestoes(self, texto):
+        """
+        Substitui as sugestões pela primeira página de usuários que começam com o texto.
+
+        Só consulta o Banco de Dados se a primeira página não trouxe todos os
+        usuários relembrados; caso contrário, o próprio QCompleter filtra a lista.
+
+        Args:
+            texto (str): O texto digitado no campo de nome de usuário.
+        Returns:
+            None
+        """
+        if self.proximo_relembrado is None:
+            return
+        
+        usuarios_relembrados, _ = self.banco_de_dados.obter_pagina_relembrados(
+            "qt", limite=TAMANHO_PAGINA_SUGESTOES, prefixo=texto or None, colunas=("nome_usuario",)
+        )
+        self.completar.model().setStringList([nome_usuario for nome_usuario, in usuarios_relembrados])
+
+    def recarregar_sugestoes(self):
+        """
+        Recarrega as sugestões após outro processo alterar o Banco de Dados.
+
+        Returns:
+            None
+        """
+        usuarios_relembrados, self.proximo_relembrado = self.banco_de_dados.obter_pagina_relembrados(
+            "qt", limite=TAMANHO_PAGINA_SUGESTOES, colunas=("nome_usuario",)
+        )
+        self.completar.model().setStringList([nome_usuario for nome_usuario, in usuarios_relembrados])
+
+        # Reaplica o filtro do texto já digitado, se a primeira página não trouxe todos
+        texto = self.ui.le_login_nome_usuario_email.text()
+        if texto:
+            self.atualizar_sugestoes(texto)
 
+    @medir_acao("login")
     def clique_entrar(self):
         """
         Faz login ao clicar no botão "Entrar" com um nome de usuário ou email.
@@ -238,7 +282,7 @@ class QtApp(QMainWindow):
         senha = self.ui.le_login_senha.text()
         
         # Tenta logar no sistema se os dados forem válidos
-        login = self.banco_de_dados.fazer_login(nome_usuario_email, senha)
+        login = self.banco_de_dados.fazer_login(nome_usuario_email, senha, ui="qt")
         
         # Exibe uma menssagem de erro se os campos não forem preenchidos
         if nome_usuario_email == "" or senha == "":
@@ -291,6 +335,7 @@ class QtApp(QMainWindow):
         
         self.restaurar_cor_padrao()
     
+    @medir_acao("cadastro")
     def clique_cadastrar(self):
         """
         Tenta cadastrar um usuário ao clicar no botão "Cadastrar".
@@ -449,6 +494,7 @@ class QtApp(QMainWindow):
         # Mostra a tela de login de usuários caso o cadastramento seja bem-sucedido
         self.mostrar_tela_login()
 
+    @medir_acao("trocar_tela")
     def mostrar_tela_cadastro(self):
         """
         Ação a ser executada quando o link de comando 'Você não tem uma conta?' for clicado
@@ -463,6 +509,7 @@ class QtApp(QMainWindow):
         )
         self.restaurar_cor_padrao()
         
+    @medir_acao("trocar_tela")
     def mostrar_tela_login(self):
         """
         Ação a ser executada quando o link de comando 'Você já tem uma conta?' for clicado 
@@ -479,6 +526,8 @@ class QtApp(QMainWindow):
         )
 
 if __name__ == "__main__":
+    # Inicia o perfilador por amostragem se ele estiver habilitado
+    perfilar_se_configurado()
     app = QApplication(sys.argv)
     window = QtApp()
     window.show()
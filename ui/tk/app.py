@@ -3,7 +3,11 @@
 
 import tkinter as tk
 
-from database import BancoDeDados
+from database import abrir_banco_de_dados
+from diagnostico.memoria import configurar_memoria, contar_widgets_tk, medir_acao
+from diagnostico.perfilador import perfilar_se_configurado
+from diagnostico.vigia_laco import limite_configurado, vigiar_tk
+from ui.tk.auditoria_widgets import auditar_se_configurado
 from ui.tk.tk_utils import get_entry, clear_entries
 from ui.tk.login import TelaDeLogin
 from ui.tk.register import TelaDeCadastro
@@ -37,16 +41,26 @@ class TkApp(tk.Tk):
         self.title("Tela de Cadastro e Login de Usuários")
         self.resizable(width=False, height=False)
         self.geometry("500x600")
+        
+        # Mede a memória de cada ação se o diagnóstico de memória estiver habilitado
+        configurar_memoria("tk", contar_widgets_tk(self))
 
-        # Cria e configura o Banco de Dados
-        self.banco_de_dados = BancoDeDados()
-        self.banco_de_dados.criar_tabela()
+        # Abre o Banco de Dados (as tabelas são criadas ao abri-lo)
+        self.banco_de_dados = abrir_banco_de_dados()
         
         # Cria as telas da aplicação e exibe a Tela de Login
         self.tela_login = TelaDeLogin(self)
         self.tela_cadastro = TelaDeCadastro(self)
+        # Audita a árvore de widgets a cada troca de tela se a auditoria estiver habilitada
+        self.auditor = auditar_se_configurado(self)
         self.mostrar_tela_login()
         
+        # Vigia o laço de eventos se a detecção de travamentos estiver habilitada
+        limite_travamento = limite_configurado()
+        if limite_travamento is not None:
+            self.vigia = vigiar_tk(self, limite_travamento)
+        
+    @medir_acao("trocar_tela")
     def mostrar_tela_login(self):
         """
         Exibe a tela de login.
@@ -79,6 +93,7 @@ class TkApp(tk.Tk):
         
         ent_nome_usuario.focus_force()
         
+    @medir_acao("trocar_tela")
     def mostrar_tela_cadastro(self):
         """
         Exibe a tela de cadastro.
@@ -125,4 +140,6 @@ class TkApp(tk.Tk):
                 
 
 if __name__ == "__main__":
+    # Inicia o perfilador por amostragem se ele estiver habilitado
+    perfilar_se_configurado()
     TkApp().mainloop()
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo para auditar o crescimento da árvore de widgets da interface Tkinter.
+
+Pode ser executado diretamente para alternar as telas milhares de vezes e
+reportar a quantidade de widgets e a memória a cada ciclo:
+
+    python -m ui.tk.auditoria_widgets --ciclos 2000
+"""
+
+import argparse
+import collections
+import logging
+import os
+import tracemalloc
+
+
+logger = logging.getLogger(__name__)
+
+# Métodos da aplicação que trocam de tela
+METODOS_TROCA_TELA = ("mostrar_tela_login", "mostrar_tela_cadastro")
+
+
+def contar_widgets(raiz):
+    """
+    Conta os widgets vivos da árvore, agrupados pelo pai e pela classe.
+
+    Args:
+        raiz (tk.Tk): A janela principal da aplicação.
+
+    Returns:
+        collections.Counter: A contagem indexada por (caminho do pai, classe).
+    """
+    contagem = collections.Counter()
+    pendentes = list(raiz.winfo_children())
+    while pendentes:
+        widget = pendentes.pop()
+        contagem[(widget.winfo_parent(), widget.winfo_class())] += 1
+        pendentes.extend(widget.winfo_children())
+
+    return contagem
+
+
+class AuditorWidgets:
+    """
+    Classe que registra a árvore de widgets após cada troca de tela.
+
+    Um grupo (pai, classe) é sinalizado quando sua contagem não diminui em
+    nenhuma das últimas trocas e termina maior do que começou.
+
+    Attributes:
+        raiz (tk.Tk): A janela principal da aplicação.
+        janela (int): Quantas trocas consecutivas são analisadas.
+        historico (collections.deque): Tuplas (rótulo, contagem) das últimas trocas registradas.
+        sinalizados (set): Os grupos já reportados como crescentes.
+    """
+
+    def __init__(self, raiz, janela=5):
+        """
+        Inicializa o auditor.
+
+        Args:
+            raiz (tk.Tk): A janela principal da aplicação.
+            janela (int): Quantas trocas consecutivas são analisadas.
+
+        Returns:
+            None
+        """
+        self.raiz = raiz
+        self.janela = janela
+        self.historico = collections.deque(maxlen=janela)
+        self.sinalizados = set()
+
+    def instalar(self):
+        """
+        Passa a auditar a árvore após cada chamada dos métodos de troca de tela.
+
+        Returns:
+            None
+        """
+        for nome in METODOS_TROCA_TELA:
+            original = getattr(self.raiz, nome)
+
+            def auditado(*args, _original=original, _nome=nome, **kwargs):
+                resultado = _original(*args, **kwargs)
+                self.registrar(_nome)
+                return resultado
+
+            setattr(self.raiz, nome, auditado)
+
+    def registrar(self, rotulo):
+        """
+        Conta a árvore de widgets e sinaliza os grupos com crescimento monotônico.
+
+        Args:
+            rotulo (str): Um rótulo que identifica a troca (ex.: o método chamado).
+
+        Returns:
+            list: Os grupos (pai, classe) recém-sinalizados.
+        """
+        contagem = contar_widgets(self.raiz)
+        self.historico.append((rotulo, contagem))
+        logger.debug("%s: %d widgets", rotulo, sum(contagem.values()))
+
+        novos = [
+            grupo for grupo in self.crescimento_monotonico()
+            if grupo not in self.sinalizados
+        ]
+        for pai, classe in novos:
+            self.sinalizados.add((pai, classe))
+            valores = [c[(pai, classe)] for _, c in self.historico]
+            logger.warning(
+                "Widgets '%s' em '%s' cresceram em todas as últimas %d trocas de tela: %s",
+                classe, pai, len(valores), valores
+            )
+
+        return novos
+
+    def crescimento_monotonico(self):
+        """
+        Obtém os grupos cuja contagem cresceu de forma monotônica na janela analisada.
+
+        Returns:
+            list: Os grupos (pai, classe) com crescimento monotônico.
+        """
+        if len(self.historico) < self.janela:
+            return []
+
+        contagens = [contagem for _, contagem in self.historico]
+        grupos = set().union(*contagens)
+        crescentes = []
+        for grupo in grupos:
+            valores = [contagem[grupo] for contagem in contagens]
+            nao_diminui = all(a <= b for a, b in zip(valores, valores[1:]))
+            if nao_diminui and valores[-1] > valores[0]:
+                crescentes.append(grupo)
+
+        return sorted(crescentes)
+
+
+def estressar(raiz, ciclos=1000, amostragem=100):
+    """
+    Alterna as telas repetidamente e reporta widgets e memória por ciclo.
+
+    Cada ciclo mostra a tela de cadastro e depois a de login.
+
+    Args:
+        raiz (TkApp): A aplicação Tkinter.
+        ciclos (int): O número de ciclos executados.
+        amostragem (int): A cada quantos ciclos uma linha é reportada.
+
+    Returns:
+        list: Tuplas (ciclo, widgets, bytes rastreados) de cada amostra.
+    """
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+    amostras = []
+    print(f"{'ciclo':>8} {'widgets':>8} {'memória(KiB)':>13} {'Δ/ciclo(B)':>11}")
+
+    for ciclo in range(ciclos + 1):
+        if ciclo % amostragem == 0:
+            raiz.update_idletasks()
+            widgets = sum(contar_widgets(raiz).values())
+            memoria = tracemalloc.get_traced_memory()[0]
+
+            delta = 0.0
+            if amostras:
+                ciclo_anterior, _, memoria_anterior = amostras[-1]
+                delta = (memoria - memoria_anterior) / (ciclo - ciclo_anterior)
+
+            amostras.append((ciclo, widgets, memoria))
+            print(f"{ciclo:>8} {widgets:>8} {memoria / 1024:>13.1f} {delta:>11.1f}")
+
+        if ciclo < ciclos:
+            raiz.mostrar_tela_cadastro()
+            raiz.mostrar_tela_login()
+
+    return amostras
+
+
+def auditar_se_configurado(raiz):
+    """
+    Instala o auditor se a variável de ambiente correspondente estiver definida.
+
+    Args:
+        raiz (TkApp): A aplicação Tkinter.
+
+    Returns:
+        AuditorWidgets / None: O auditor instalado ou None.
+    """
+    if not os.environ.get("CADASTRO_LOGIN_AUDITAR_WIDGETS"):
+        return None
+
+    # Garante que os avisos de crescimento apareçam no log
+    logging.basicConfig(level=logging.INFO)
+
+    auditor = AuditorWidgets(raiz)
+    auditor.instalar()
+
+    return auditor
+
+
+if __name__ == "__main__":
+    from ui.tk.app import TkApp
+
+    parser = argparse.ArgumentParser(description="Teste de estresse da troca de telas do Tkinter.")
+    parser.add_argument("--ciclos", type=int, default=1000, help="Número de ciclos de troca de tela.")
+    parser.add_argument("--amostragem", type=int, default=100, help="Ciclos entre cada linha do relatório.")
+    argumentos = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    app = TkApp()
+    auditor = AuditorWidgets(app)
+    auditor.instalar()
+    estressar(app, argumentos.ciclos, argumentos.amostragem)
+    app.destroy()
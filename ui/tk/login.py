@@ -8,7 +8,9 @@ from tkinter import ttk
 
 from ui.tk.tk_utils import TkCustomWidget, TkCustomForm, get_entry
 from controller import LembrarUsuario
+from diagnostico.memoria import medir_acao
 
+from constants import TAMANHO_PAGINA_SUGESTOES
 from utils import get_hex_from_rgb
 
 
@@ -58,6 +60,10 @@ class TelaDeLogin(tk.Frame):
             'ent_nome_de_usuario_email',
         )
         self.mostrar_lista_usuarios_relembrados(ent_nome_usuario_email)
+        # Atualiza as sugestões com o texto digitado sempre que a lista for aberta
+        ent_nome_usuario_email.configure(
+            postcommand=lambda: self.mostrar_lista_usuarios_relembrados(ent_nome_usuario_email)
+        )
         
         # Obtém e configura a instância do formulário para a senha
         ent_senha = get_entry(
@@ -159,17 +165,18 @@ class TelaDeLogin(tk.Frame):
     def mostrar_lista_usuarios_relembrados(self, formulario):
         """
         Exibe uma lista de usuários relembrados no formulário para nome de usuário.
+
+        Apenas a primeira página de usuários cujo nome ou email começa com o
+        texto digitado é carregada, sem as senhas.
         """
         banco_de_dados = self.master.banco_de_dados
-        lista_usuarios_relembrados = banco_de_dados.obter_usuarios_relembrados("tk")
-        nomes_relembrados = []
-        
-        for usuario in lista_usuarios_relembrados:
-            nome_usuario = usuario[1]
-            email = usuario[2]
-            
-            if formulario.get() in nome_usuario or formulario.get() in email:
-                nomes_relembrados.append(nome_usuario)
+        usuarios_relembrados, _ = banco_de_dados.obter_pagina_relembrados(
+            "tk",
+            limite=TAMANHO_PAGINA_SUGESTOES,
+            prefixo=formulario.get() or None,
+            colunas=("nome_usuario",)
+        )
+        nomes_relembrados = [nome_usuario for nome_usuario, in usuarios_relembrados]
                 
         formulario.configure(values=nomes_relembrados)
             
@@ -181,24 +188,22 @@ class TelaDeLogin(tk.Frame):
             nome_usuario (_type_): _description_
         """
         banco_de_dados = self.master.banco_de_dados
-        lista_usuarios_relembrados = banco_de_dados.obter_usuarios_relembrados("tk")
         nome_usuario = ent_nome_usuario.get()
+        # Busca a senha somente do usuário escolhido
+        usuario = banco_de_dados.obter_usuario_relembrado("tk", nome_usuario)
         
-        for usuario in lista_usuarios_relembrados:
-            nome_usuario_relembrado = usuario[1]
-            senha = usuario[3]
-            
-            if nome_usuario_relembrado == nome_usuario:
-                ent_nome_usuario.delete(0, tk.END)
-                ent_nome_usuario.insert(0, nome_usuario_relembrado)
-                ent_senha.delete(0, tk.END)
-                ent_senha.insert(0, senha)
+        if usuario:
+            ent_nome_usuario.delete(0, tk.END)
+            ent_nome_usuario.insert(0, usuario.nome_usuario)
+            ent_senha.delete(0, tk.END)
+            ent_senha.insert(0, usuario.senha)
         
         # Altera a cor de fundo da caixa de texto para senha 
         cor_fundo_destaque = get_hex_from_rgb(255, 255, 100)
         self.combo_estilo.configure("TCombobox", fieldbackground=cor_fundo_destaque)
         ent_senha.configure(background=cor_fundo_destaque)
         
+    @medir_acao("login")
     def clique_entrar(self, ent_nome_usuario, ent_senha):
         """
         Faz login ao clicar no botão "Entrar" com um nome de usuário ou email.
@@ -214,7 +219,7 @@ class TelaDeLogin(tk.Frame):
         txt_senha = ent_senha.get()
         
         banco_de_dados = self.master.banco_de_dados
-        login = banco_de_dados.fazer_login(txt_nome_usuario_email, txt_senha)
+        login = banco_de_dados.fazer_login(txt_nome_usuario_email, txt_senha, ui="tk")
         
         # O usuário faz login no sistema se os dados forem válidos
         if txt_nome_usuario_email == "" or txt_senha == "":
@@ -7,6 +7,7 @@ from tkinter import messagebox
 
 from ui.tk.tk_utils import TkCustomWidget, TkCustomForm, get_entry
 from controller import InsereDados
+from diagnostico.memoria import medir_acao
 
 
 class TelaDeCadastro(tk.Frame):
@@ -102,6 +103,7 @@ class TelaDeCadastro(tk.Frame):
         texto = "Você já tem uma conta?"
         TkCustomWidget.criar_link(self, texto, lambda e: self.master.mostrar_tela_login())
 
+    @medir_acao("cadastro")
     def clique_cadastrar(self, ent_nome_usuario, ent_email, ent_senha, ent_confirmar_senha):
         """
         Cadastra um novo usuário no Banco de Dados.